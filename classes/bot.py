@@ -45,11 +45,19 @@ from classes.enums import DonatorRank
 from classes.exceptions import GlobalCooldown
 from classes.http import ProxiedClientSession
 from classes.items import ALL_ITEM_TYPES, Hand, ItemType
-from utils import i18n, paginator, random
+from utils import cooldowns, i18n, paginator, random
 from utils.cache import cache
 from utils.checks import user_is_patron
 from utils.config import ConfigLoader
+from utils.cooldowns import CooldownRegistry
 from utils.i18n import _
+from utils.leaderboards import Leaderboards
+from utils.ledger import TransactionLedger
+from utils.okapi import Okapi
+from utils.render import RenderService
+from utils.settings import SettingsCache
+from utils.singleton import ClusterLeases
+from utils.stats import StatSnapshots
 
 
 class Bot(commands.AutoShardedBot):
@@ -80,7 +88,6 @@ class Bot(commands.AutoShardedBot):
         self.linecount = 0
         self.make_linecount()
 
-        self.all_prefixes = {}
         self.activity = discord.Game(
             name=f"Fable v{self.version}"
             if self.config.bot.is_beta
@@ -148,10 +155,15 @@ class Bot(commands.AutoShardedBot):
                         self.linecount += len(f.readlines())
 
     async def close(self):
+        await self.leases.close()
         await super().close()
 
         await self.session.close()
         await self.trusted_session.close()
+        await self.okapi.close()
+        await self.ledger.close()
+        await self.leaderboards.close()
+        self.renderer.close()
         await self.pool.close()
         await self.second_pool.close()
         await self.redis.close()
@@ -169,6 +181,30 @@ class Bot(commands.AutoShardedBot):
             max_connections=20,
         )
         self.redis = aioredis.Redis(connection_pool=pool)
+        self.leases = ClusterLeases(self)
+        self.leases.start()
+        self.stats = StatSnapshots(self)
+        self.cooldowns = CooldownRegistry(self)
+        self.leaderboards = Leaderboards(self)
+        self.ledger = TransactionLedger(self)
+        self.renderer = RenderService()
+        self.okapi = Okapi(
+            self.config.external.okapi_url,
+            self.config.external.okapi_token,
+            redis=self.redis,
+        )
+        self.locales = SettingsCache(
+            self,
+            "locales",
+            'SELECT "locale" FROM user_settings WHERE "user"=$1;',
+            'SELECT "user", "locale" FROM user_settings WHERE "locale" IS NOT NULL;',
+        )
+        self.prefixes = SettingsCache(
+            self,
+            "prefixes",
+            'SELECT "prefix" FROM server WHERE "id"=$1;',
+            'SELECT "id", "prefix" FROM server WHERE "prefix" IS NOT NULL;',
+        )
         database_creds = {
             "database": self.config.database.postgres_name,
             "user": self.config.database.postgres_user,
@@ -191,6 +227,8 @@ class Bot(commands.AutoShardedBot):
             **second_database_creds, min_size=10, max_size=20, command_timeout=60.0
         )
 
+        await asyncio.gather(self.locales.warm(), self.prefixes.warm())
+
         for extension in self.config.bot.initial_extensions:
             try:
                 await self.load_extension(extension)
@@ -227,7 +265,7 @@ class Bot(commands.AutoShardedBot):
 
     async def invoke(self, ctx):
         """Handler for i18n, executes before any other commands or checks run"""
-        locale = await self.get_cog("Locale").locale(ctx.message.author.id)
+        locale = await self.locales.get(ctx.message.author.id)
         i18n.current_locale.set(locale)
         await super().invoke(ctx)
 
@@ -238,24 +276,11 @@ class Bot(commands.AutoShardedBot):
 
     async def get_ranks_for(self, thing, conn=None):
         """Returns the rank in money and xp for a user"""
-        v = thing.id if isinstance(thing, (discord.Member, discord.User)) else thing
-        if conn is None:
-            conn = await self.pool.acquire()
-            local = True
-        else:
-            local = False
-
-        xp = await conn.fetchval(
-            'SELECT COUNT(*) FROM profile WHERE "xp">=(SELECT "xp" FROM profile WHERE "user"=$1);',
-            v,
+        ranks = await self.leaderboards.ranks(
+            thing, "money", "xp", ties_last=True, conn=conn
         )
-        money = await conn.fetchval(
-            'SELECT COUNT(*) FROM profile WHERE "money">=(SELECT "money" FROM profile WHERE "user"=$1);',
-            v,
-        )
-        if local:
-            await self.pool.release(conn)
-        return money, xp
+        money, xp = ranks["money"], ranks["xp"]
+        return money[0] if money else 0, xp[0] if xp else 0
 
     async def get_raidstats(
         self,
@@ -284,26 +309,41 @@ class Bot(commands.AutoShardedBot):
             or statatk is None
             or statdef is None
         ):
-            row = await conn.fetchrow('SELECT * FROM profile WHERE "user"=$1;', v)
+            snapshot = await self.stats.get(v, conn=conn)
             atkmultiply, defmultiply, classes, race, guild, user_god, statatk, statdef = (
-                row["atkmultiply"],
-                row["defmultiply"],
-                row["class"],
-                row["race"],
-                row["guild"],
-                row["god"],
-                row["statatk"],
-                row["statdef"],
+                snapshot["atkmultiply"],
+                snapshot["defmultiply"],
+                snapshot["classes"],
+                snapshot["race"],
+                snapshot["guild"],
+                snapshot["god"],
+                snapshot["statatk"],
+                snapshot["statdef"],
             )
             if god is not None and god != user_god:
                 raise ValueError()
-        damage, armor = await self.get_damage_armor_for(
-            v, classes=classes, race=race, conn=conn
+            damage, armor = snapshot["damage"], snapshot["armor"]
+            raid_building = snapshot["raid_building"]
+        else:
+            damage, armor = await self.get_damage_armor_for(
+                v, classes=classes, race=race, conn=conn
+            )
+            buildings = await self.get_city_buildings(guild, conn=conn)
+            raid_building = buildings["raid_building"] if buildings else 0
+        dmg, deff = self.raidstats_from(
+            damage, armor, atkmultiply, defmultiply, statatk, statdef, raid_building
         )
-        if buildings := await self.get_city_buildings(guild, conn=conn):
-            atkmultiply += buildings["raid_building"] * Decimal("0.1")
-            defmultiply += buildings["raid_building"] * Decimal("0.1")
-        classes = [class_from_string(c) for c in classes]
+        if local:
+            await self.pool.release(conn)
+        return dmg, deff
+
+    def raidstats_from(
+        self, damage, armor, atkmultiply, defmultiply, statatk, statdef, raid_building=0
+    ):
+        """Applies raid multipliers, stat points and the alliance raid building"""
+        if raid_building:
+            atkmultiply += raid_building * Decimal("0.1")
+            defmultiply += raid_building * Decimal("0.1")
 
         statatk = Decimal(statatk)
         statdef = Decimal(statdef)
@@ -318,11 +358,7 @@ class Bot(commands.AutoShardedBot):
                 #grade = c.class_grade()
                 #atkmultiply = atkmultiply + Decimal("0.1") * grade
                 #defmultiply = defmultiply + Decimal("0.1") * grade
-        dmg = damage * atkmultiply
-        deff = armor * defmultiply
-        if local:
-            await self.pool.release(conn)
-        return dmg, deff
+        return damage * atkmultiply, armor * defmultiply
 
     async def get_raidstatsjug(
         self,
@@ -348,23 +384,28 @@ class Bot(commands.AutoShardedBot):
             or classes is None
             or guild is None
         ):
-            row = await conn.fetchrow('SELECT * FROM profile WHERE "user"=$1;', v)
+            snapshot = await self.stats.get(v, conn=conn)
             atkmultiply, defmultiply, classes, race, guild, user_god = (
-                row["atkmultiply"],
-                row["defmultiply"],
-                row["class"],
-                row["race"],
-                row["guild"],
-                row["god"],
+                snapshot["atkmultiply"],
+                snapshot["defmultiply"],
+                snapshot["classes"],
+                snapshot["race"],
+                snapshot["guild"],
+                snapshot["god"],
             )
             if god is not None and god != user_god:
                 raise ValueError()
-        damage, armor = await self.get_damage_armor_for(
-            v, classes=classes, race=race, conn=conn
-        )
-        if buildings := await self.get_city_buildings(guild, conn=conn):
-            atkmultiply += buildings["raid_building"] * Decimal("0.1")
-            defmultiply += buildings["raid_building"] * Decimal("0.1")
+            damage, armor = snapshot["damage"], snapshot["armor"]
+            raid_building = snapshot["raid_building"]
+        else:
+            damage, armor = await self.get_damage_armor_for(
+                v, classes=classes, race=race, conn=conn
+            )
+            buildings = await self.get_city_buildings(guild, conn=conn)
+            raid_building = buildings["raid_building"] if buildings else 0
+        if raid_building:
+            atkmultiply += raid_building * Decimal("0.1")
+            defmultiply += raid_building * Decimal("0.1")
         classes = [class_from_string(c) for c in classes]
         for c in classes:
             if c and c.in_class_line(Raider):
@@ -384,20 +425,10 @@ class Bot(commands.AutoShardedBot):
         return dmg, deff
 
     async def get_equipped_items_for(self, thing, conn=None):
-        """Fetches a list of equipped items of a user from the database"""
+        """Returns the equipped items of a user from their stat snapshot"""
         v = thing.id if isinstance(thing, (discord.Member, discord.User)) else thing
-        local = False
-        if conn is None:
-            conn = await self.pool.acquire()
-            local = True
-        items = await conn.fetch(
-            "SELECT ai.* FROM profile p JOIN allitems ai ON (p.user=ai.owner) JOIN"
-            " inventory i ON (ai.id=i.item) WHERE i.equipped IS TRUE AND p.user=$1;",
-            v,
-        )
-        if local:
-            await self.pool.release(conn)
-        return items
+        snapshot = await self.stats.get(v, conn=conn)
+        return snapshot["items"] if snapshot else []
 
     async def get_context(self, message, *, cls=None):
         """Overrides the default Context with a custom Context"""
@@ -414,15 +445,10 @@ class Bot(commands.AutoShardedBot):
             return commands.when_mentioned_or(self.config.bot.global_prefix)(
                 self, message
             )  # Use global prefix in DMs
-        pref = self.all_prefixes.get(message.guild.id)
-        if pref is None:
-            pref = (
-                await self.pool.fetchval(
-                    'SELECT "prefix" FROM server WHERE "id"=$1;', message.guild.id
-                )
-                or self.config.bot.global_prefix
-            )
-            self.all_prefixes[message.guild.id] = pref
+        pref = (
+            await self.prefixes.get(message.guild.id)
+            or self.config.bot.global_prefix
+        )
         return commands.when_mentioned_or(pref)(self, message)
 
     async def wait_for_dms(self, check, timeout=30):
@@ -436,6 +462,7 @@ class Bot(commands.AutoShardedBot):
                     args={"check": check, "timeout": timeout},
                     expected_count=1,
                     _timeout=timeout,
+                    cluster_id=self.cogs["Sharding"].cluster_for_shard(0),
                 )
             )[0]
         except IndexError:
@@ -458,23 +485,21 @@ class Bot(commands.AutoShardedBot):
 
     async def reset_cooldown(self, ctx):
         """Resets someone's cooldown for a Context"""
-        await self.redis.execute_command(
-            "DEL", f"cd:{ctx.author.id}:{ctx.command.qualified_name}"
+        await self.cooldowns.reset(
+            cooldowns.USER, ctx.author.id, ctx.command.qualified_name
         )
 
     async def reset_guild_cooldown(self, ctx):
         """Resets a guild's cooldown for a Context"""
-        await self.redis.execute_command(
-            "DEL", f"guildcd:{ctx.character_data['guild']}:{ctx.command.qualified_name}"
+        await self.cooldowns.reset(
+            cooldowns.GUILD, ctx.character_data["guild"], ctx.command.qualified_name
         )
 
     async def reset_alliance_cooldown(self, ctx):
         """Resets an alliance cooldown for a Context"""
-        alliance = await self.pool.fetchval(
-            'SELECT alliance FROM guild WHERE "id"=$1;', ctx.character_data["guild"]
-        )
-        await self.redis.execute_command(
-            "DEL", f"alliancecd:{alliance}:{ctx.command.qualified_name}"
+        _guild, alliance = await self.stats.membership(ctx.author.id)
+        await self.cooldowns.reset(
+            cooldowns.ALLIANCE, alliance, ctx.command.qualified_name
         )
 
     async def set_cooldown(
@@ -490,13 +515,7 @@ class Bot(commands.AutoShardedBot):
         else:
             user_id = ctx_or_user_id
 
-        await self.redis.execute_command(
-            "SET",
-            f"cd:{user_id}:{cmd_id}",
-            cmd_id,
-            "EX",
-            cooldown,
-        )
+        await self.cooldowns.set(cooldowns.USER, user_id, cmd_id, cooldown)
 
     async def activate_booster(self, user, type_):
         """Activates a boost of type_ for a user"""
@@ -629,6 +648,62 @@ class Bot(commands.AutoShardedBot):
             await self.pool.release(conn)
         return item
 
+    async def create_items(self, items, equipped=False, conn=None):
+        """
+        Creates many items at once, items are dicts like create_item's arguments
+
+        Both the items and their inventory rows are inserted with a single
+        statement. Returns the new items in the order they were given.
+        """
+        if not items:
+            return []
+        if conn is None:
+            conn = await self.pool.acquire()
+            local = True
+        else:
+            local = False
+        try:
+            rows = await conn.fetch(
+                'WITH new AS (INSERT INTO allitems ("owner", "name", "value", "type",'
+                ' "damage", "armor", "hand", "element") SELECT * FROM'
+                " unnest($1::bigint[], $2::text[], $3::int[], $4::text[],"
+                " $5::numeric[], $6::numeric[], $7::text[], $8::text[]) RETURNING *),"
+                ' inv AS (INSERT INTO inventory ("item", "equipped") SELECT "id", $9'
+                ' FROM new) SELECT * FROM new ORDER BY "id";',
+                [
+                    i["owner"].id
+                    if isinstance(i["owner"], (discord.User, discord.Member))
+                    else i["owner"]
+                    for i in items
+                ],
+                [i["name"] for i in items],
+                [i["value"] for i in items],
+                [i["type_"] for i in items],
+                [i["damage"] for i in items],
+                [i["armor"] for i in items],
+                [i["hand"] for i in items],
+                [i["element"] for i in items],
+                equipped,
+            )
+        finally:
+            if local:
+                await self.pool.release(conn)
+        return rows
+
+    async def create_random_items(
+        self, amount, minstat, maxstat, minvalue, maxvalue, owner, conn=None
+    ):
+        """Creates amount random items in one go, see create_random_item"""
+        return await self.create_items(
+            [
+                await self.create_random_item(
+                    minstat, maxstat, minvalue, maxvalue, owner, insert=False
+                )
+                for _i in range(amount)
+            ],
+            conn=conn,
+        )
+
     async def create_random_item(
         self, minstat, maxstat, minvalue, maxvalue, owner, insert=True, conn=None
     ):
@@ -816,21 +891,20 @@ class Bot(commands.AutoShardedBot):
     async def get_damage_armor_for(
         self, user, items=None, classes=None, race=None, conn=None
     ):
+        """Damage and armor from items, class and race, missing ones come from the stat snapshot"""
         user = user.id if isinstance(user, (discord.User, discord.Member)) else user
-        if conn is None:
-            conn = await self.pool.acquire()
-            local = True
-        else:
-            local = False
-        if items is None:
-            items = await self.get_equipped_items_for(user, conn=conn)
-        if not classes or not race:
-            row = await conn.fetchrow('SELECT * FROM profile WHERE "user"=$1;', user)
-            classes, race = row["class"], row["race"]
-
-        if local:
-            await self.pool.release(conn)
-
+        if items is None or not classes or not race:
+            snapshot = await self.stats.get(user, conn=conn)
+            if items is None and not classes and not race:
+                return snapshot["damage"], snapshot["armor"]
+            if items is None:
+                items = snapshot["items"]
+            if not classes or not race:
+                classes, race = snapshot["classes"], snapshot["race"]
+        return self.damage_armor_from(items, classes, race)
+
+    def damage_armor_from(self, items, classes, race):
+        """Adds up damage and armor of equipped items with class and race bonuses"""
         damage = 0
         armor = 0
 
@@ -899,48 +973,23 @@ class Bot(commands.AutoShardedBot):
             armor += 5
         return damage, armor
 
-    async def log_transaction(self, ctx, from_, to, subject, data, conn=None):
-        """Logs a transaction."""
-        from_ = from_.id if isinstance(from_, (discord.Member, discord.User)) else from_
-        to = to.id if isinstance(to, (discord.Member, discord.User)) else to
-        timestamp = datetime.datetime.now()
-        assert subject in [
-            "crates",
-            "money",
-            "shop",
-            "offer",
-            "guild invest",
-            "guild pay",
-            "gambling",
-            "bid",
-            "item",
-            "adventure",
-            "merch",
-            "sacrifice",
-            "exchange",
-            "trade",
-            "alliance",
-            "raid",
-        ]
+    async def log_transaction(self, ctx, from_, to, subject, data, conn=None, sync=None):
+        """
+        Logs a transaction.
 
-        id_map = {
-            0: "Guild Bank",
-            1: "Bot (added to player)",
-            2: "Bot (removed from player)",
-        }
-        from_readable = from_ if from_ not in id_map else id_map[from_]
-        to_readable = to if to not in id_map else id_map[to]
-
-        # Convert data dictionary to a string representation
-        data_ = "\n".join([f"{name}: {content}" for name, content in data.items()])
-
-        description = f"""\
-        From: {from_readable}
-        To: {to_readable}
-        Subject: {subject}
-        Command: {ctx.command.qualified_name}
-        Data: {data_}
+        Entries are queued and written in batches by the ledger. When conn is
+        inside a transaction, or sync is set, the entry is written on conn
+        right away instead so it commits or rolls back together with it.
         """
+        from_ = from_.id if isinstance(from_, (discord.Member, discord.User)) else from_
+        to = to.id if isinstance(to, (discord.Member, discord.User)) else to
+        # most money changes are logged, so this keeps the money board current
+        self.leaderboards.update(from_, to, conn=conn)
+        if sync is None:
+            sync = conn is not None and conn.is_in_transaction()
+        if not sync:
+            self.ledger.log(ctx, from_, to, subject, data)
+            return
 
         if conn is None:
             conn = await self.pool.acquire()
@@ -948,35 +997,10 @@ class Bot(commands.AutoShardedBot):
         else:
             local = False
         try:
-            await conn.execute(
-                'INSERT INTO transactions ("from", "to", "subject", "info", "data", "timestamp") VALUES ($1, $2, $3, $4, '
-                '$5, $6);',
-                from_,
-                to,
-                subject,
-                description,
-                data_,
-                timestamp,
-            )
-        except Exception as e:
-            await ctx.send(e)
-        if subject == "shop":
-            await conn.execute(
-                'INSERT INTO market_history ("item", "name", "value", "type",'
-                ' "damage", "armor", "signature", "price", "offer") VALUES ($1, $2,'
-                " $3, $4, $5, $6, $7, $8, $9);",
-                data["id"],
-                data["name"],
-                data["value"],
-                data["type"],
-                data["damage"],
-                data["armor"],
-                data["signature"],
-                data["price"],
-                data["offer"],
-            )
-        if local:
-            await self.pool.release(conn)
+            await self.ledger.write(conn, ctx, from_, to, subject, data)
+        finally:
+            if local:
+                await self.pool.release(conn)
 
     async def public_log(self, event: str):
         with handle_message_parameters(content=event) as params:
@@ -1012,6 +1036,7 @@ class Bot(commands.AutoShardedBot):
         await conn.execute('DELETE FROM profile WHERE "user"=$1;', user)
         if local:
             await self.pool.release(conn)
+        self.leaderboards.update(user)
 
     async def delete_items(self, items, conn=None):
         local = False
@@ -1020,6 +1045,12 @@ class Bot(commands.AutoShardedBot):
             local = True
         await conn.execute('DELETE FROM inventory WHERE "item"=ANY($1);', items)
         await conn.execute('DELETE FROM market WHERE "item"=ANY($1);', items)
-        await conn.execute('DELETE FROM allitems WHERE "id"=ANY($1);', items)
+        owners = await conn.fetch(
+            'DELETE FROM allitems WHERE "id"=ANY($1) RETURNING "owner";', items
+        )
         if local:
             await self.pool.release(conn)
+        # deleted items may have been equipped, their stats must not linger
+        # in anyone's snapshot
+        if owners:
+            await self.stats.invalidate(*{owner["owner"] for owner in owners})
@@ -19,6 +19,8 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import time
 
+from collections import OrderedDict
+
 from discord.ext.commands import BucketType
 
 
@@ -102,12 +104,26 @@ class Cooldown:
 
 
 class CooldownMapping:
-    def __init__(self, original):
-        self._cache = {}
+    """
+    Token buckets per user, channel etc. for one Cooldown
+
+    _cache is kept in order of last use, so the buckets that could have
+    refilled are always at the front. Expiring them stops at the first one
+    that is still in use, which makes it O(1) per call amortised instead of
+    a scan over every bucket. maxsize caps the number of buckets, the least
+    recently used ones are dropped first if there are more.
+    """
+
+    def __init__(self, original, maxsize: int = 100_000):
+        self._cache = OrderedDict()
         self._cooldown = original
+        self.maxsize = maxsize
+        # buckets dropped because they refilled or because of maxsize
+        self.expired = 0
+        self.evicted = 0
 
     def copy(self):
-        ret = CooldownMapping(self._cooldown)
+        ret = CooldownMapping(self._cooldown, self.maxsize)
         ret._cache = self._cache.copy()
         return ret
 
@@ -115,6 +131,10 @@ class CooldownMapping:
     def valid(self):
         return self._cooldown is not None
 
+    @property
+    def size(self):
+        return len(self._cache)
+
     @classmethod
     def from_cooldown(cls, rate, per, type):
         return cls(Cooldown(rate, per, type))
@@ -127,21 +147,29 @@ class CooldownMapping:
         # in a cooldown window. e.g. if we have a  command that has a
         # cooldown of 60s and it has not been used in 60s then that key should be deleted
         current = current or time.time()
-        dead_keys = [k for k, v in self._cache.items() if v.is_full_at(current)]
-        for k in dead_keys:
-            del self._cache[k]
+        while self._cache:
+            key, bucket = next(iter(self._cache.items()))
+            if not bucket.is_full_at(current):
+                break
+            del self._cache[key]
+            self.expired += 1
 
     def get_bucket(self, message, current=None):
         if self._cooldown.type is BucketType.default:
             return self._cooldown
 
+        current = current or time.time()
         self._verify_cache_integrity(current)
         key = self._bucket_key(message)
-        if key not in self._cache:
+        bucket = self._cache.get(key)
+        if bucket is None or bucket.is_full_at(current):
+            # refilled but not expired yet as it is behind a busier bucket
             bucket = self._cooldown.copy()
             self._cache[key] = bucket
-        else:
-            bucket = self._cache[key]
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+            self.evicted += 1
 
         return bucket
 
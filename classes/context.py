@@ -99,6 +99,68 @@ class Confirmation(discord.ui.View):
         self.cleanup()
 
 
+class ProfileLoader:
+    """
+    Loads profile rows for a single command invocation
+
+    Lookups made in the same event loop iteration are batched into a single
+    query and rows are kept until the invocation ends, so the checks, the
+    converters and the command body share them. Code that changes a profile,
+    or waits for minutes like the join phase of a raid, has to refresh() the
+    rows before it reads them through the loader again.
+    """
+
+    def __init__(self, pool) -> None:
+        self.pool = pool
+        # user ID -> row, None if the user has no character
+        self._rows = {}
+        self._pending = {}
+        self._scheduled = False
+
+    async def get(self, user_id: int):
+        """Returns the profile row of a user, None if they have no character"""
+        if user_id in self._rows:
+            return self._rows[user_id]
+        if (future := self._pending.get(user_id)) is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[user_id] = loop.create_future()
+            if not self._scheduled:
+                self._scheduled = True
+                # runs after everything else that was started in this iteration
+                loop.call_soon(lambda: asyncio.create_task(self._load()))
+        return await asyncio.shield(future)
+
+    async def get_many(self, user_ids) -> dict:
+        """Returns {user_id: row} for all users that have a character"""
+        rows = await asyncio.gather(*[self.get(user_id) for user_id in user_ids])
+        return {
+            user_id: row for user_id, row in zip(user_ids, rows) if row is not None
+        }
+
+    async def _load(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._scheduled = False
+        try:
+            rows = await self.pool.fetch(
+                'SELECT * FROM profile WHERE "user"=ANY($1);', list(pending)
+            )
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        found = {row["user"]: row for row in rows}
+        for user_id, future in pending.items():
+            row = self._rows[user_id] = found.get(user_id)
+            if not future.done():
+                future.set_result(row)
+
+    def refresh(self, *user_ids: int) -> None:
+        """Forgets rows so the next get() reads them again"""
+        for user_id in user_ids:
+            self._rows.pop(user_id, None)
+
+
 class Context(commands.Context):
     """
     A custom version of the default Context.
@@ -115,6 +177,15 @@ class Context(commands.Context):
     def __repr__(self):
         return "<Context>"
 
+    @property
+    def profiles(self) -> ProfileLoader:
+        """The profile rows loaded during this invocation"""
+        try:
+            return self._profiles
+        except AttributeError:
+            self._profiles = ProfileLoader(self.bot.pool)
+            return self._profiles
+
     async def confirm(
         self,
         message: str,
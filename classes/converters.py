@@ -70,9 +70,7 @@ class InvalidUrl(commands.BadArgument):
 class UserWithCharacter(commands.UserConverter):
     async def convert(self, ctx, argument):
         user = await super().convert(ctx, argument)  # error is ok here
-        ctx.user_data = await ctx.bot.pool.fetchrow(
-            'SELECT * FROM profile WHERE "user"=$1;', user.id
-        )
+        ctx.user_data = await ctx.profiles.get(user.id)
         if ctx.user_data:
             return user
         else:
@@ -83,9 +81,7 @@ class MemberWithCharacter(commands.MemberConverter):
     async def convert(self, ctx, argument):
         member = await super().convert(ctx, argument)  # error is ok here
 
-        ctx.user_data = await ctx.bot.pool.fetchrow(
-            'SELECT * FROM profile WHERE "user"=$1;', member.id
-        )
+        ctx.user_data = await ctx.profiles.get(member.id)
         if ctx.user_data:
             return member
         else:
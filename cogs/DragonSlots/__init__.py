@@ -25,12 +25,12 @@ from collections import Counter
 import discord
 from discord.ext import commands, tasks
 import random
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import io
-import requests
 from cogs.shard_communication import user_on_cooldown as user_cooldown
+from utils import render
 from utils.checks import has_char, is_gm
 from utils.i18n import locale_doc, _
+from utils.singleton import cluster_exclusive
 
 
 class Slots(commands.Cog):
@@ -107,10 +107,10 @@ class Slots(commands.Cog):
             verifycheck = random.randint(1, 100)
             if verifycheck <= 1:
                 try:
-                    captcha_text = self.generate_distorted_captcha()
+                    captcha_text, captcha_image = await self.generate_distorted_captcha()
                     self.captcha_lock[ctx.author.id] = captcha_text
                     await ctx.send(f"{ctx.author.mention} Enter the CAPTCHA Text below. You have 60 seconds",
-                                   file=discord.File('captcha.png'))
+                                   file=discord.File(io.BytesIO(captcha_image), filename="captcha.png"))
                     try:
                         await self.bot.wait_for(
                             'message',
@@ -271,12 +271,6 @@ class Slots(commands.Cog):
                 # Process each dragon roll
                 for i in range(1, dragon_count + 1):
                     await asyncio.sleep(1)
-                    background_url = 'https://storage.googleapis.com/fablerpg-f74c2.appspot.com/295173706496475136_Picsart_24-04-13_11-36-22-184.jpg'
-                    bg_image = Image.open(requests.get(background_url, stream=True).raw)
-                    font_path = 'EightBitDragon-anqx.ttf'
-                    dragonHP_font = ImageFont.truetype(font_path, size=38)
-                    HeroHP_font = ImageFont.truetype(font_path, size=33)
-                    draw = ImageDraw.Draw(bg_image)
                     random_number = random.randint(1, 5)
 
                     if random_number == 1:
@@ -387,38 +381,27 @@ class Slots(commands.Cog):
                     if updated_dragon < 0:
                         updated_dragon = 0
 
-                    # Draw HP values on image
-                    draw.text((80, 391), f"{updated_player}", font=HeroHP_font, fill="cyan")
-                    draw.text((673, 10), f"{updated_dragon}", font=dragonHP_font, fill="white")
-
                     # Run special event (send updated image or text summary)
-                    await self.run_special_event(ctx, bg_image, draw, i, random_number, seat)
+                    await self.run_special_event(
+                        ctx, i, random_number, seat, updated_player, updated_dragon
+                    )
 
 
-    async def run_special_event(self, ctx, bg_image, draw, image_index, random_number, seat):
+    async def run_special_event(self, ctx, image_index, random_number, seat, player_hp, dragon_hp):
         """
-        Draws a rounded rectangle on the image based on a preset location.
-        If the user is in text mode, a text summary is sent instead of an image.
+        Sends the dragon image with both HP values and the rolled action outlined.
+        If the user is in text mode, no image is rendered.
         """
-
-        locations = [
-            [(228, 369), (354, 402)],
-            [(228, 402), (354, 437)],
-            [(425, 369), (500, 402)],
-            [(425, 402), (590, 437)],
-            [(615, 369), (710, 402)],
-        ]
-        rectangle_location = locations[random_number - 1]
-        corner_radius = 20
-        draw.rounded_rectangle(rectangle_location, corner_radius, outline="red")
-
-        if self.text_mode.get(ctx.author.id, False):
-            pass
-        else:
-            image_buffer = io.BytesIO()
-            bg_image.save(image_buffer, format="PNG")
-            image_buffer.seek(0)
-            await ctx.send(file=discord.File(image_buffer, filename=f"modified_image_{image_index}.png"))
+        if not self.text_mode.get(ctx.author.id, False):
+            try:
+                image = await self.bot.renderer.render(
+                    render.dragon_event, player_hp, dragon_hp, random_number
+                )
+            except (render.RenderBusy, OSError):
+                # the event still has to resolve, show it the way text mode would
+                await ctx.send(f"```\nDragon HP: {dragon_hp} 🐉\nPlayer HP: {player_hp} 👤\n```")
+            else:
+                await ctx.send(file=discord.File(io.BytesIO(image), filename=f"modified_image_{image_index}.png"))
 
         # Post-event: Check and update statuses if dragon or player has reached 0 HP.
         async with self.bot.pool.acquire() as connection:
@@ -498,6 +481,7 @@ class Slots(commands.Cog):
         self.check_timeouts.cancel()
 
     @tasks.loop(seconds=60)
+    @cluster_exclusive("dragonslots_timeouts")
     async def check_timeouts(self):
         try:
             now = datetime.datetime.utcnow()
@@ -636,9 +620,9 @@ class Slots(commands.Cog):
             """
         )
         try:
-            captcha_text = self.generate_distorted_captcha()
+            captcha_text, captcha_image = await self.generate_distorted_captcha()
             await ctx.send(f"{ctx.author.mention} to prevent botting, enter the CAPTCHA Text as printed below. You have 60 seconds",
-                           file=discord.File('captcha.png'))
+                           file=discord.File(io.BytesIO(captcha_image), filename="captcha.png"))
             self.captcha_lock[ctx.author.id] = captcha_text
             try:
                 await self.bot.wait_for(
@@ -709,50 +693,11 @@ class Slots(commands.Cog):
         except Exception as e:
             await ctx.send(f"An error occurred: {e}")
 
-    def generate_distorted_captcha(self):
+    async def generate_distorted_captcha(self):
+        """Returns a random captcha text and its rendered PNG"""
         captcha_text = ''.join(random.choices(string.ascii_letters + string.digits, k=6))
         captcha_text = captcha_text.replace('l', 'L')
-        width, height = 300, 100
-        background_color = 'grey'
-        image = Image.new('RGB', (width, height), background_color)
-        draw = ImageDraw.Draw(image)
-        font_path = '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'
-        font_size = 40
-        font = ImageFont.truetype(font_path, font_size)
-        letter_colors = ['red', 'green', 'blue', 'purple', 'orange']
-        outline_thickness = 1
-
-        for _ in range(1000):
-            x = random.randint(0, width - 1)
-            y = random.randint(0, height - 1)
-            color = random.choice(letter_colors)
-            draw.point((x, y), fill=color)
-
-        for _ in range(50):
-            x = random.uniform(0, width)
-            y = random.uniform(0, height)
-            shape_type = random.choice(['ellipse', 'line'])
-            shape_color = random.choice(letter_colors)
-            size = random.randint(2, 5)
-            self.draw_random_shape(draw, x, y, shape_type, shape_color, size, outline_thickness)
-
-        for i, char in enumerate(captcha_text):
-            x = i * width / 6
-            y = random.uniform(0, height / 2)
-            color = random.choice(letter_colors)
-            draw.text((x, y), char, font=font, fill=color)
-
-        image = image.filter(ImageFilter.GaussianBlur(1))
-        image = image.filter(ImageFilter.CONTOUR)
-        image.save('captcha.png')
-        return captcha_text
-
-    def draw_random_shape(self, draw, x, y, shape_type, shape_color, size, outline_thickness):
-        if shape_type == 'ellipse':
-            draw.ellipse((x, y, x + size, y + size), outline=shape_color, width=outline_thickness)
-        elif shape_type == 'line':
-            x2, y2 = x + random.randint(10, 30), y + random.randint(10, 30)
-            draw.line([(x, y), (x2, y2)], fill=shape_color, width=outline_thickness)
+        return captcha_text, await self.bot.renderer.render(render.captcha, captcha_text)
 
     @is_gm()
     @commands.command(hidden=True)
@@ -766,8 +711,8 @@ class Slots(commands.Cog):
             """
         )
         try:
-            captcha_text = self.generate_distorted_captcha()
-            await ctx.send(f"Enter the CAPTCHA Text below. You have 60 seconds", file=discord.File('captcha.png'))
+            captcha_text, captcha_image = await self.generate_distorted_captcha()
+            await ctx.send(f"Enter the CAPTCHA Text below. You have 60 seconds", file=discord.File(io.BytesIO(captcha_image), filename="captcha.png"))
         except Exception as e:
             await ctx.send(str(e))
 
@@ -806,11 +751,10 @@ class Slots(commands.Cog):
         if ctx.author.id not in self.captcha_lock:
             await ctx.send("You are not currently locked by CAPTCHA verification.")
             return
-        captcha_text = self.generate_distorted_captcha()
         try:
-            captcha_text = self.generate_distorted_captcha()
+            captcha_text, captcha_image = await self.generate_distorted_captcha()
             await ctx.send(f"{ctx.author.mention} to prevent botting, enter the CAPTCHA Text as printed below. You have 60 seconds",
-                           file=discord.File('captcha.png'))
+                           file=discord.File(io.BytesIO(captcha_image), filename="captcha.png"))
             self.captcha_lock[ctx.author.id] = captcha_text
             try:
                 await self.bot.wait_for(
@@ -37,6 +37,7 @@ from classes.enums import DonatorRank
 from cogs.shard_communication import user_on_cooldown as user_cooldown
 from utils import items
 from utils import misc as rpgtools
+from utils import odds
 from utils import random
 import random as randomm
 from utils.checks import has_adventure, has_char, has_no_adventure, is_class, is_gm
@@ -1361,16 +1362,21 @@ class Adventure(commands.Cog):
     )
     @locale_doc
     async def adventures(self, ctx):
-        await ctx.send("Calculating please wait...")
         damage, defense = await self.bot.get_damage_armor_for(ctx.author)
         level = rpgtools.xptolevel(ctx.character_data["xp"])
         luck_booster = await self.bot.get_booster(ctx.author, "luck")
 
+        chances = odds.success_chances(
+            damage + defense,
+            int(level),
+            ctx.character_data["luck"],
+            booster=bool(luck_booster),
+        )
+
         embeds = []
         levels_per_page = 10
-        level_count = 1
 
-        while level_count <= 100:
+        for page_start in range(0, len(chances), levels_per_page):
             embed = discord.Embed(
                 title="Adventure Success Chances",
                 description=(
@@ -1379,41 +1385,14 @@ class Adventure(commands.Cog):
                     "If your chance is 100%, you will definitely succeed!"
                 ),
             )
-            for _ in range(levels_per_page):
-                if level_count >= 101:
-                    break
-
-                # Simulate 1000 runs to calculate actual success rate
-                success_count = 0
-                simulations = 5000  # Increase simulation count for better precision
-                for _ in range(simulations):
-                    if rpgtools.calcchance(
-                            damage,
-                            defense,
-                            level_count,
-                            int(level),
-                            ctx.character_data["luck"],
-                            booster=luck_booster,
-                            returnsuccess=True,
-                    ):
-                        success_count += 1
-
-                # Calculate the true success percentage
-                true_success_rate = round((success_count / simulations) * 100)
-
-                # Guarantee 100% only when all simulations succeed
-                if success_count == simulations:
-                    true_success_rate = 100
-                elif success_count == 0:
-                    true_success_rate = 0
-
-                # Add the success rate to the embed
+            for level_count in range(
+                page_start + 1, page_start + levels_per_page + 1
+            ):
                 embed.add_field(
                     name=f"Level {level_count}",
-                    value=f"**Success Chance:** {true_success_rate}%",
+                    value=f"**Success Chance:** {odds.display_percent(chances[level_count - 1])}%",
                     inline=False,
                 )
-                level_count += 1
 
             embeds.append(embed)
 
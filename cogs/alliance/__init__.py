@@ -29,6 +29,7 @@ from classes.bot import Bot
 from classes.context import Context
 from classes.converters import MemberWithCharacter
 from cogs.shard_communication import alliance_on_cooldown as alliance_cooldown
+from utils import cooldowns
 from utils import misc as rpgtools
 from utils.checks import (
     guild_has_money,
@@ -212,6 +213,7 @@ class Alliance(commands.Cog):
                 ctx.character_data["guild"],
                 ctx.user_data["guild"],
             )
+        await self.bot.stats.invalidate_guild(ctx.user_data["guild"])
 
         await ctx.send(
             _("**{newguild}** is now part of your alliance, {user}!").format(
@@ -241,6 +243,7 @@ class Alliance(commands.Cog):
                 'UPDATE guild SET "alliance"="id" WHERE "id"=$1;',
                 ctx.character_data["guild"],
             )
+        await self.bot.stats.invalidate_guild(ctx.character_data["guild"])
         await ctx.send(_("Your guild left the alliance."))
 
     @is_alliance_leader()
@@ -288,6 +291,7 @@ class Alliance(commands.Cog):
             await conn.execute(
                 'UPDATE guild SET "alliance"=$1 WHERE "id"=$1;', guild["id"]
             )
+        await self.bot.stats.invalidate_guild(guild["id"])
 
         await ctx.send(
             _("**{guild}** is no longer part of your alliance.").format(
@@ -452,6 +456,8 @@ class Alliance(commands.Cog):
                 data={"Gold": up_price, "Building": name},
                 conn=conn,
             )
+        if name == "raid":
+            await self.bot.stats.invalidate_alliance(ctx.character_data["guild"])
 
         await ctx.send(
             _(
@@ -662,6 +668,7 @@ class Alliance(commands.Cog):
             ctx.character_data["guild"],
         )
         await self.bot.redis.execute_command("DEL", f"city:{name}:occ")
+        await self.bot.stats.invalidate_alliance(ctx.character_data["guild"])
         await ctx.send(_("{city} was abandoned.").format(city=name))
         await self.bot.public_log(f"**{ctx.author}** abandoned **{name}**.")
 
@@ -702,12 +709,18 @@ class Alliance(commands.Cog):
                         city=city
                     )
                 )
+            old_owner = await conn.fetchval(
+                'SELECT "owner" FROM city WHERE "name"=$1;', city
+            )
             await conn.execute(
                 'UPDATE city SET "owner"=$1, "raid_building"=0, "thief_building"=0,'
                 ' "trade_building"=0, "adventure_building"=0 WHERE "name"=$2;',
                 ctx.character_data["guild"],
                 city,
             )
+        await self.bot.stats.invalidate_alliance(ctx.character_data["guild"])
+        if old_owner:
+            await self.bot.stats.invalidate_alliance(old_owner)
         await ctx.send(
             _(
                 "Your alliance now rules **{city}**. You should immediately buy"
@@ -857,11 +870,12 @@ class Alliance(commands.Cog):
 
         view.stop()
 
+        # the rows the checks loaded are ten minutes old by now
+        ctx.profiles.refresh(ctx.author.id)
+        profiles = await ctx.profiles.get_many([u.id for u in view.joined])
         async with self.bot.pool.acquire() as conn:
             for u in view.joined:
-                profile = await conn.fetchrow(
-                    'SELECT * FROM profile WHERE "user"=$1;', u.id
-                )
+                profile = profiles.get(u.id)
                 if not profile:
                     continue  # not a player
                 user_alliance = await conn.fetchval(
@@ -1060,18 +1074,13 @@ class Alliance(commands.Cog):
             'SELECT alliance FROM guild WHERE "id"=$1;',
             ctx.character_data["guild"],
         )
-        cooldowns = await self.bot.redis.execute_command(
-            "KEYS", f"alliancecd:{alliance}:*"
-        )
-        if not cooldowns:
+        running = await self.bot.cooldowns.timers(cooldowns.ALLIANCE, alliance)
+        if not running:
             return await ctx.send(
                 _("Your alliance does not have any active cooldown at the moment.")
             )
         timers = _("Commands on cooldown:")
-        for key in cooldowns:
-            key = key.decode()
-            cooldown = await self.bot.redis.execute_command("TTL", key)
-            cmd = key.replace(f"alliancecd:{alliance}:", "")
+        for cmd, cooldown in running:
             text = _("{cmd} is on cooldown and will be available after {time}").format(
                 cmd=cmd, time=timedelta(seconds=int(cooldown))
             )
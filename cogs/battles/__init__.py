@@ -42,8 +42,25 @@ from classes.converters import IntGreaterThan
 from cogs.shard_communication import user_on_cooldown as user_cooldown
 from utils import random
 from utils.checks import has_char, has_money, is_gm
+from utils.combat.engine import (
+    MOVE_ATTACK,
+    MOVE_DEFEND,
+    MOVE_RECOVER,
+    TANK_EVOLUTION_LEVELS,
+    TURN_ORDER_FIXED,
+    TURN_ORDER_SHUFFLED,
+    TURN_ORDER_TEAMS,
+    Battle,
+    Combatant,
+    Rules,
+    evolution_tier,
+    tank_bonuses,
+)
+from utils.combat.entity import Faction
+from utils.combat.skill import SkillDeck, fireball
 from utils.i18n import _, locale_doc
 from utils.joins import SingleJoinView
+from utils.singleton import cluster_exclusive
 
 from discord.ui import View
 from discord import Embed, Interaction
@@ -60,6 +77,22 @@ from discord.ui import View, Button
 from discord import Interaction
 import asyncio
 
+PET_GROWTH_STAGES = {
+    1: {"stage": "baby", "growth_time": 2, "stat_multiplier": 0.25, "hunger_modifier": 1.0},
+    2: {"stage": "juvenile", "growth_time": 2, "stat_multiplier": 0.50, "hunger_modifier": 0.8},
+    3: {"stage": "young", "growth_time": 1, "stat_multiplier": 0.75, "hunger_modifier": 0.6},
+    4: {"stage": "adult", "growth_time": None, "stat_multiplier": 1.0, "hunger_modifier": 0.0},
+    # Self-sufficient
+}
+
+# (hunger, happiness) lost every decay run per growth stage
+PET_NEEDS_DECAY = {
+    "baby": (10, 5),
+    "juvenile": (8, 4),
+    "young": (6, 3),
+}
+
+
 class SellConfirmationView(View):
     def __init__(self, initiator: discord.Member, receiver: discord.Member, price: int, timeout=120):
         super().__init__(timeout=timeout)
@@ -2103,9 +2136,7 @@ class Battles(commands.Cog):
     async def fight(self, ctx):
         # Initial variables and mappings
         authorchance = 0
-        fireball_shot = False
         enemychance = 0
-        cheated = False
         level = 0  # Temporary: later retrieved from your DB
         victory_description = None
 
@@ -2835,34 +2866,9 @@ class Battles(commands.Cog):
         try:
 
 
-            def select_target(targets, player_prob=0.60, pet_prob=0.40):
-                """
-                Selects a target from the given list based on provided probabilities.
-                - player_prob: Probability of selecting the player.
-                - pet_prob: Probability of selecting the pet.
-                """
-                # Filter out None values from the targets
-                valid_targets = [target for target in targets if target]
-
-                if not valid_targets:
-                    return None  # No valid targets to select
-
-                rand = randomm.random()
-                cumulative = 0.0
-                for target in valid_targets:
-                    if target.get("is_pet"):
-                        cumulative += pet_prob
-                    else:
-                        cumulative += player_prob
-
-                    if rand < cumulative:
-                        return target
-
-                return valid_targets[-1]  # Fallback to the last target
             # Initialize variables
             max_hp_limit = 5000
             authorchance = 0
-            cheated = False
             battle_log = deque(maxlen=5)
             battle_log.append("**Action #0**\nBattle Tower battle started!")
             action_number = 1
@@ -2920,15 +2926,6 @@ class Battles(commands.Cog):
                         "White Sorcerer": 6,
                     }
 
-                    evolution_damage_multiplier = {
-                        1: 1.10,  # 110%
-                        2: 1.20,  # 120%
-                        3: 1.30,  # 130%
-                        4: 1.50,  # 150%
-                        5: 1.75,  # 175%
-                        6: 2.00,  # 200%
-                    }
-
                     user_id = current_player.id
                     query_class = 'SELECT "class" FROM profile WHERE "user" = $1;'
                     query_xp = 'SELECT "xp" FROM profile WHERE "user" = $1;'
@@ -3134,388 +3131,151 @@ class Battles(commands.Cog):
 
 
 
-            # Initialize 'winner' to None
-            winner = None
-
-            # Create initial embed with the first opponent
-            current_opponent = opponents[0]
-            embed = discord.Embed(
-                title=f"Battle Tower: {ctx.author.display_name} vs {current_opponent['user']}",
-                color=self.bot.config.game.primary_colour
+            player = self.combatant_from_data(
+                player_combatant,
+                Faction.One,
+                lifesteal=lifestealauth,
+                deck=SkillDeck([fireball(mage_evolution, 0.3)]) if mage_evolution is not None else None,
+                cheat_death=author_chance,
             )
+            pet = self.combatant_from_data(pet_combatant, Faction.One)
+            team = [c for c in (player, pet) if c]
+            enemies = [
+                Combatant(
+                    opponent["user"],
+                    Faction.Two,
+                    opponent["hp"],
+                    opponent["damage"],
+                    opponent["armor"],
+                    max_hp=opponent["max_hp"],
+                    element=opponent["element"],
+                    owner=opponent["user"],
+                )
+                for opponent in opponents
+            ]
 
-            # Add player and pet status
-            for combatant in [player_combatant, pet_combatant]:
-                if not combatant:
-                    continue
-                current_hp = max(0, round(combatant["hp"], 1))
-                max_hp = round(combatant["max_hp"], 1)
-                hp_bar = self.create_hp_bar(current_hp, max_hp)
-                element_emoji = "❌"  # Default emoji
-                for emoji, element in emoji_to_element.items():
-                    if element == combatant["element"]:
-                        element_emoji = emoji
-                        break
-                field_name = f"**[TEAM A]** \n{combatant['user'].display_name} {element_emoji}" if not combatant.get(
-                    "is_pet") else f"{combatant['pet_name']} {element_emoji}"
-                field_value = f"HP: {current_hp:.1f}/{max_hp:.1f}\n{hp_bar}"
-                embed.add_field(name=field_name, value=field_value, inline=False)
-
-            # Add current opponent status
-            opponent_element = current_opponent.get("element", "unknown")  # Assuming opponents have 'element'
-            opponent_emoji = emoji_to_element.get(opponent_element, "❌")
-            current_opponent_field = f"**[TEAM B]** \n{current_opponent['user']} {opponent_emoji}"
-            current_opponent_hp = max(0, round(current_opponent["hp"], 1))
-            current_opponent_max_hp = round(current_opponent["max_hp"], 1)
-            current_opponent_hp_bar = self.create_hp_bar(current_opponent_hp, current_opponent_max_hp)
-            embed.add_field(name=current_opponent_field,
-                            value=f"HP: {current_opponent_hp:.1f}/{current_opponent_max_hp:.1f}\n{current_opponent_hp_bar}",
-                            inline=False)
+            def name_of(c):
+                if c.is_pet or c.faction == Faction.Two:
+                    return c.key
+                return c.owner.mention
 
-            # Add battle log
-            battle_log = deque(maxlen=5)
-            battle_log.append(f"**Action #0**\nBattle started against {current_opponent['user']}!")
-            embed.add_field(name="Battle Log", value=battle_log[0], inline=False)
+            def render(opponent):
+                embed = discord.Embed(
+                    title=f"Battle Tower: {ctx.author.display_name} vs {opponent.key}",
+                    color=self.bot.config.game.primary_colour
+                )
 
-            # Send initial embed
-            log_message = await ctx.send(embed=embed)
-            await asyncio.sleep(4)
+                # Add player and pet status
+                for c in team:
+                    current_hp = max(0, round(c.hp, 1))
+                    max_hp = round(c.max_hp, 1)
+                    hp_bar = self.create_hp_bar(current_hp, max_hp)
+                    element_emoji = "❌"  # Default emoji
+                    for emoji, element in emoji_to_element.items():
+                        if element == c.element:
+                            element_emoji = emoji
+                            break
 
-            # Start battle loop
-            start_time = datetime.datetime.utcnow()
-            battle_ongoing = True
-            opponent_index = 0  # Track current opponent
-            current_turn = 0  # Start turn tracker
-            action_number = 1  # Initialize action counter.
-            fireball_chance = 100
-
-            turn_order_options = [
-                [player_combatant, pet_combatant],  # Team A
-                [current_opponent]  # Team B
-            ]
+                    # Add tank indicator if applicable
+                    tank_indicator = "🛡️" if c.damage_reflection > 0 else ""
 
-            randomm.shuffle(turn_order_options)
+                    field_name = f"**[TEAM A]** \n{c.owner.display_name} {element_emoji} {tank_indicator}" if not c.is_pet else f"{c.key} {element_emoji}"
 
-            combatant_order = turn_order_options[0] + turn_order_options[1]  # Merge teams into combatant_order
+                    field_value = f"HP: {current_hp:.1f}/{max_hp:.1f}\n{hp_bar}"
 
-            while battle_ongoing and datetime.datetime.utcnow() < start_time + datetime.timedelta(minutes=9):
-                if opponent_index >= len(opponents):
-                    break  # All opponents defeated
+                    # Add reflection percentage for tanks
+                    if c.damage_reflection > 0:
+                        reflection_percent = c.damage_reflection * 100
+                        field_value += f"\nDamage Reflection: {reflection_percent:.1f}%"
 
-                # Ensure combatant_order always includes the current opponent
-                combatant_order = [player_combatant, pet_combatant, current_opponent]
+                    embed.add_field(name=field_name, value=field_value, inline=False)
 
-                # Determine the current combatant based on turn
-                combatant = combatant_order[current_turn % len(combatant_order)]
-                current_turn += 1  # Increment turn tracker
+                # Add current opponent status
+                opponent_emoji = emoji_to_element.get(opponent.element, "❌")
+                current_opponent_field = f"**[TEAM B]** \n{opponent.key} {opponent_emoji}"
+                current_opponent_hp = max(0, round(opponent.hp, 1))
+                current_opponent_max_hp = round(opponent.max_hp, 1)
+                current_opponent_hp_bar = self.create_hp_bar(current_opponent_hp, current_opponent_max_hp)
+                embed.add_field(name=current_opponent_field,
+                                value=f"HP: {current_opponent_hp:.1f}/{current_opponent_max_hp:.1f}\n{current_opponent_hp_bar}",
+                                inline=False)
 
-                if not combatant or combatant["hp"] <= 0:
-                    continue  # Skip if combatant is invalid or dead
+                # Add battle log
+                battle_log_text = '\n\n'.join(battle_log)
+                embed.add_field(name="Battle Log", value=battle_log_text, inline=False)
+                return embed
 
-                # Determine target
-                if combatant in [player_combatant, pet_combatant]:
-                    target = current_opponent  # Player's turn: attack the current opponent
+            def describe(event):
+                hit = event.hits[0]
+                attacker_name = name_of(event.attacker)
+                target_name = name_of(hit.target)
+                if event.skill is not None:
+                    message = _("You cast Fireball! **{monster}** takes **{dmg} HP** damage.").format(
+                        monster=target_name,
+                        dmg=hit.damage
+                    )
                 else:
-                    target = select_target(
-                        [c for c in [player_combatant, pet_combatant] if c and c["hp"] > 0],
-                        player_prob=0.60,
-                        pet_prob=0.40
-                    )  # Opponent's turn: attack player or pet
-
-                if target is not None:
-                    # Calculate base damage before armor
-                    damage_variance = randomm.randint(0, 100) if not combatant.get("is_pet") else randomm.randint(0,
-                                                                                                                  50)
-                    fireball_shot = False
-
-                    if not combatant.get("is_pet") and combatant["user"] == ctx.author:
-                        if target["user"] != ctx.author:
-                            if combatant.get("mage_evolution") is not None:
-                                fireball_chance = randomm.randint(1, 100)
-                                if fireball_chance <= 30:
-                                    # Fireball happens
-                                    evolution_level = combatant["mage_evolution"]
-                                    damage_multiplier = evolution_damage_multiplier.get(evolution_level, 1.0)
-
-                                    # Calculate damage using Decimals for precision
-                                    base_damage = Decimal(combatant["damage"])
-                                    random_damage = Decimal(randomm.randint(0, 100))
-                                    target_armor = Decimal(target["armor"])
-                                    damage_mult = Decimal(damage_multiplier)
-
-                                    dmg_decimal = (base_damage + random_damage - target_armor) * damage_mult
-                                    dmg_decimal = max(dmg_decimal, Decimal('1'))
-
-                                    # Store blocked damage for reflection
-                                    blocked_damage = min(float(base_damage + random_damage), float(target_armor))
-
-                                    # Convert Decimal to float for compatibility with lifesteal
-                                    dmg = float(round(dmg_decimal, 2))
-
-                                    # Apply damage to target
-                                    target["hp"] -= dmg
-
-                                    # Format the Fireball message
-                                    message = _(
-                                        "You cast Fireball! **{monster}** takes **{dmg} HP** damage.").format(
-                                        monster=target["user"],
-                                        dmg=dmg
-                                    )
-                                    fireball_shot = True
-                                else:
-                                    # Regular attack calculation with reflection tracking
-                                    raw_damage = combatant["damage"] + damage_variance
-                                    blocked_damage = min(raw_damage, target["armor"])
-                                    dmg = round(max(raw_damage - target["armor"], 1), 3)
-                                    target["hp"] -= dmg
-                                    target["hp"] = max(target["hp"], 0)
-                            else:
-                                # Regular attack calculation with reflection tracking
-                                raw_damage = combatant["damage"] + damage_variance
-                                blocked_damage = min(raw_damage, target["armor"])
-                                dmg = round(max(raw_damage - target["armor"], 1), 3)
-                                target["hp"] -= dmg
-                                target["hp"] = max(target["hp"], 0)
-                        else:
-                            # Regular attack calculation with reflection tracking
-                            raw_damage = combatant["damage"] + damage_variance
-                            blocked_damage = min(raw_damage, target["armor"])
-                            dmg = round(max(raw_damage - target["armor"], 1), 3)
-                            target["hp"] -= dmg
-                            target["hp"] = max(target["hp"], 0)
-                    else:
-                        # Regular attack calculation with reflection tracking
-                        raw_damage = combatant["damage"] + damage_variance
-                        blocked_damage = min(raw_damage, target["armor"])
-                        dmg = round(max(raw_damage - target["armor"], 1), 3)
-                        target["hp"] -= dmg
-                        target["hp"] = max(target["hp"], 0)
-
-                    # Build attack message
-                    if combatant.get("is_pet"):
-                        attacker_name = combatant['pet_name']
-                    else:
-                        attacker_name = combatant['user'].mention if isinstance(combatant['user'],
-                                                                                discord.User) else combatant['user']
+                    message = f"{attacker_name} attacks! {target_name} takes **{hit.damage:.1f}HP** damage."
 
-                    if target.get("is_pet"):
-                        target_name = target['pet_name']
-                    else:
-                        target_name = target['user'].mention if isinstance(target['user'], discord.User) else \
-                            target['user']
-
-                    if not fireball_shot:
-                        message = f"{attacker_name} attacks! {target_name} takes **{dmg:.1f}HP** damage."
-
-                    # Handle damage reflection if target is a tank
-                    if target.get("damage_reflection", 0) > 0:
-                        reflected_damage = round(blocked_damage * target["damage_reflection"], 3)
-                        if reflected_damage > 0:
-                            combatant["hp"] -= reflected_damage
-                            combatant["hp"] = max(combatant["hp"], 0)
-                            message += f"\n{target_name}'s armor reflects **{reflected_damage:.3f}HP** damage back!"
-
-                            # Check if attacker died from reflection
-                            if combatant["hp"] <= 0:
-                                message += f" {attacker_name} has been defeated by reflected damage!"
-
-                    # Handle lifesteal if applicable
-                    if not combatant.get("is_pet") and combatant["user"] == ctx.author and lifestealauth != 0:
-                        lifesteal_percentage = lifestealauth / 100.0
-                        heal = round(lifesteal_percentage * dmg, 1)
-                        combatant["hp"] = min(combatant["hp"] + heal, combatant["max_hp"])
-                        message += f" Lifesteals: **{heal:.1f}HP**"
-
-                    # Check if target is defeated
-                    if target["hp"] <= 0:
-
-                        if target["user"] == ctx.author and not target.get("is_pet"):
-                            #await ctx.send(author_chance)
-                            target["hp"] = 0
-                            # Handle Cheating Death for the player being attacked
-                            if not cheated:
-                                chance = author_chance
-                                random_number = randomm.randint(1, 100)
-                                #await ctx.send(random_number)
-                                if random_number <= chance:
-                                    target["hp"] = 75
-                                    cheated = True
-                                    message += _(f"\n\n{ctx.author} cheat death and survive with **75HP**")
-                                else:
-                                    message += f" {target_name} has been defeated!"
-                        else:
-                            message += f" {target_name} has been defeated!"
+                # Handle damage reflection if target is a tank
+                if hit.reflected:
+                    message += f"\n{target_name}'s armor reflects **{hit.reflected:.3f}HP** damage back!"
+                    if event.attacker in event.defeated:
+                        message += f" {attacker_name} has been defeated by reflected damage!"
 
-                        # Append the final attack message
-                        battle_log.append(f"**Action #{action_number}**\n{message}")
-                        action_number += 1
+                if event.attacker is player and player.lifesteal:
+                    message += f" Lifesteals: **{event.healed:.1f}HP**"
 
-                        # Update embed to reflect the final attack
-                        embed = discord.Embed(
-                            title=f"Battle Tower: {ctx.author.display_name} vs {current_opponent['user']}",
-                            color=self.bot.config.game.primary_colour
-                        )
+                if hit.revived:
+                    message += _(f"\n\n{ctx.author} cheat death and survive with **75HP**")
+                elif hit.target in event.defeated:
+                    message += f" {target_name} has been defeated!"
+                return message
 
-                        # Add player and pet status
-                        for c in [player_combatant, pet_combatant]:
-                            if not c:
-                                continue
-                            current_hp = max(0, round(c["hp"], 1))
-                            max_hp = round(c["max_hp"], 1)
-                            hp_bar = self.create_hp_bar(current_hp, max_hp)
-                            element_emoji = "❌"  # Default emoji
-                            for emoji, element in emoji_to_element.items():
-                                if element == c["element"]:
-                                    element_emoji = emoji
-                                    break
-                            field_name = f"**[TEAM A]** \n{c['user'].display_name} {element_emoji}" if not c.get(
-                                "is_pet") else f"{c['pet_name']} {element_emoji}"
-                            field_value = f"HP: {current_hp:.1f}/{max_hp:.1f}\n{hp_bar}"
-                            embed.add_field(name=field_name, value=field_value, inline=False)
-
-                        # Add current opponent status (should be 0 HP)
-                        opponent_element = current_opponent.get("element", "unknown")
-                        opponent_emoji = emoji_to_element.get(opponent_element, "❌")
-                        current_opponent_field = f"**[TEAM B]** \n{current_opponent['user']} {opponent_emoji}"
-                        current_opponent_hp = max(0, round(current_opponent["hp"], 1))
-                        current_opponent_max_hp = round(current_opponent["max_hp"], 1)
-                        current_opponent_hp_bar = self.create_hp_bar(current_opponent_hp, current_opponent_max_hp)
-                        embed.add_field(name=current_opponent_field,
-                                        value=f"HP: {current_opponent_hp:.1f}/{current_opponent_max_hp:.1f}\n{current_opponent_hp_bar}",
-                                        inline=False)
-
-                        # Add battle log
-                        battle_log_text = '\n\n'.join(battle_log)
-                        embed.add_field(name="Battle Log", value=battle_log_text, inline=False)
-
-                        # Update embed with the final attack
-                        await log_message.edit(embed=embed)
-                        await asyncio.sleep(4)  # Allow players to see the final attack
-
-                        if target["user"] == ctx.author and not target.get("is_pet"):
-                            if target["hp"] <= 0:
-                                break
-
-                        # Transition to the next opponent
-                        if target == current_opponent:
-                            opponent_index += 1
-                            if opponent_index < len(opponents):
-                                current_opponent = opponents[opponent_index]  # Update to the next opponent
-
-                                # Reset turn order and action counter
-                                combatant_order = [player_combatant, pet_combatant, current_opponent]
-                                current_turn = 0  # Reset turn tracker
-                                action_number = 1  # Reset the action counter
-                                battle_log = deque(maxlen=5)  # Reset battle log
-                                battle_log.append(
-                                    f"**Action #0**\nBattle started against {current_opponent['user']}!")
-
-                                # Create new embed for the next opponent
-                                embed = discord.Embed(
-                                    title=f"Battle Tower: {ctx.author.display_name} vs {current_opponent['user']}",
-                                    color=self.bot.config.game.primary_colour
-                                )
+            # Initialize 'winner' to None
+            winner = None
 
-                                # Add player and pet status
-                                for c in [player_combatant, pet_combatant]:
-                                    if not c:
-                                        continue
-                                    current_hp = max(0, round(c["hp"], 1))
-                                    max_hp = round(c["max_hp"], 1)
-                                    hp_bar = self.create_hp_bar(current_hp, max_hp)
-                                    element_emoji = "❌"  # Default emoji
-                                    for emoji, element in emoji_to_element.items():
-                                        if element == c["element"]:
-                                            element_emoji = emoji
-                                            break
-                                    field_name = f"**[TEAM A]** \n{c['user'].display_name} {element_emoji}" if not c.get(
-                                        "is_pet") else f"{c['pet_name']} {element_emoji}"
-                                    field_value = f"HP: {current_hp:.1f}/{max_hp:.1f}\n{hp_bar}"
-                                    embed.add_field(name=field_name, value=field_value, inline=False)
-
-                                # Add new opponent status
-                                opponent_element = current_opponent.get("element", "unknown")
-                                opponent_emoji = emoji_to_element.get(opponent_element, "❌")
-                                current_opponent_field = f"**[TEAM B]** \n{current_opponent['user']} {opponent_emoji}"
-                                current_opponent_hp = max(0, round(current_opponent["hp"], 1))
-                                current_opponent_max_hp = round(current_opponent["max_hp"], 1)
-                                current_opponent_hp_bar = self.create_hp_bar(current_opponent_hp,
-                                                                             current_opponent_max_hp)
-                                embed.add_field(name=current_opponent_field,
-                                                value=f"HP: {current_opponent_hp:.1f}/{current_opponent_max_hp:.1f}\n{current_opponent_hp_bar}",
-                                                inline=False)
-
-                                # Add battle log
-                                battle_log_text = '\n\n'.join(battle_log)
-                                embed.add_field(name="Battle Log", value=battle_log_text, inline=False)
-
-                                # Update embed for the new opponent
-                                await log_message.edit(embed=embed)
-                                await ctx.send(f"**Battle started with {current_opponent['user']}!**")
-                                await asyncio.sleep(4)
-                            else:
-                                # All opponents defeated
-                                battle_ongoing = False
-                                winner = ctx.author
-                                break
+            # Add battle log
+            battle_log = deque(maxlen=5)
+            battle_log.append(f"**Action #0**\nBattle started against {enemies[0].key}!")
 
-                    else:
-                        # Append to battle log if target wasn't defeated
-                        battle_log.append(f"**Action #{action_number}**\n{message}")
-                        action_number += 1
-
-                        # Update embed with current status
-                        embed = discord.Embed(
-                            title=f"Battle Tower: {ctx.author.display_name} vs {current_opponent['user']}",
-                            color=self.bot.config.game.primary_colour
-                        )
+            # Send initial embed
+            log_message = await ctx.send(embed=render(enemies[0]))
+            await asyncio.sleep(4)
+
+            # Start battle loop, HP carries over from one opponent to the next
+            deadline = datetime.datetime.utcnow() + datetime.timedelta(minutes=9)
+            for index, opponent in enumerate(enemies):
+                if index > 0:
+                    battle_log = deque(maxlen=5)  # Reset battle log
+                    battle_log.append(f"**Action #0**\nBattle started against {opponent.key}!")
+                    await log_message.edit(embed=render(opponent))
+                    await ctx.send(f"**Battle started with {opponent.key}!**")
+                    await asyncio.sleep(4)
+
+                battle = Battle(
+                    team + [opponent],
+                    rules=Rules(
+                        turn_order=TURN_ORDER_FIXED,
+                        pets_fight_alone=False,
+                        element_modifiers=False,
+                    ),
+                )
+                for action_number, event in enumerate(battle.turns(), start=1):
+                    if not event.hits:
+                        continue
+                    battle_log.append(f"**Action #{action_number}**\n{describe(event)}")
+                    await log_message.edit(embed=render(opponent))
+                    await asyncio.sleep(4)
+                    if datetime.datetime.utcnow() >= deadline:
+                        break
+
+                if battle.winner != Faction.One:
+                    break
+            else:
+                # All opponents defeated
+                winner = ctx.author
 
-                        # Add player and pet status
-                        for c in [player_combatant, pet_combatant]:
-                            if not c:
-                                continue
-                            current_hp = max(0, round(c["hp"], 1))
-                            max_hp = round(c["max_hp"], 1)
-                            hp_bar = self.create_hp_bar(current_hp, max_hp)
-                            element_emoji = "❌"  # Default emoji
-                            for emoji, element in emoji_to_element.items():
-                                if element == c["element"]:
-                                    element_emoji = emoji
-                                    break
-
-                            # Add tank indicator if applicable
-                            tank_indicator = "🛡️" if c.get("tank_evolution") and c.get("has_shield") else ""
-
-                            field_name = f"**[TEAM A]** \n{c['user'].display_name} {element_emoji} {tank_indicator}" if not c.get(
-                                "is_pet") else f"{c['pet_name']} {element_emoji}"
-
-                            field_value = f"HP: {current_hp:.1f}/{max_hp:.1f}\n{hp_bar}"
-
-                            # Add reflection percentage for tanks
-                            if c.get("damage_reflection", 0) > 0:
-                                reflection_percent = c["damage_reflection"] * 100
-                                field_value += f"\nDamage Reflection: {reflection_percent:.1f}%"
-
-                            embed.add_field(name=field_name, value=field_value, inline=False)
-
-                        # Add current opponent status
-                        opponent_element = current_opponent.get("element", "unknown")
-                        opponent_emoji = emoji_to_element.get(opponent_element, "❌")
-                        current_opponent_field = f"**[TEAM B]** \n{current_opponent['user']} {opponent_emoji}"
-                        current_opponent_hp = max(0, round(current_opponent["hp"], 1))
-                        current_opponent_max_hp = round(current_opponent["max_hp"], 1)
-                        current_opponent_hp_bar = self.create_hp_bar(current_opponent_hp, current_opponent_max_hp)
-                        embed.add_field(name=current_opponent_field,
-                                        value=f"HP: {current_opponent_hp:.1f}/{current_opponent_max_hp:.1f}\n{current_opponent_hp_bar}",
-                                        inline=False)
-
-                        # Add battle log
-                        battle_log_text = '\n\n'.join(battle_log)
-                        embed.add_field(name="Battle Log", value=battle_log_text, inline=False)
-
-                        # Edit the embed message
-                        await log_message.edit(embed=embed)
-                        await asyncio.sleep(4)
                 # After the loop, declare the winner
             if winner == ctx.author:
                 await ctx.send(
@@ -5459,7 +5219,6 @@ class Battles(commands.Cog):
         )
         authorchance = 0
         enemychance = 0
-        cheated = False
         max_hp_limit = 5000
 
         if enemy == ctx.author:
@@ -5706,270 +5465,99 @@ class Battles(commands.Cog):
                     ctx, enemy_, highest_element_enemy, enemy_level, lifestealopp, enemy_mage_evolution, conn
                 )
 
-            # Determine elements for damage modifiers
-            element_strengths = {
-                "Light": "Corrupted",
-                "Dark": "Light",
-                "Corrupted": "Dark",
-                "Nature": "Electric",
-                "Electric": "Water",
-                "Water": "Fire",
-                "Fire": "Nature",
-                "Wind": "Electric",
-                "Unknown": None  # Adding 'Unknown' to handle default cases
-            }
-
-            def calculate_damage_modifier(attacker_element, defender_element):
-                if attacker_element in element_strengths and element_strengths[attacker_element] == defender_element:
-                    return round(randomm.uniform(0.1, 0.3), 3)  # Positive modifier
-                elif defender_element in element_strengths and element_strengths[defender_element] == attacker_element:
-                    return round(randomm.uniform(-0.3, -0.1), 3)  # Negative modifier
-                return 0.0
-
-            # Apply damage modifiers
-            author_combatant["damage"] = round(author_combatant["damage"] * (
-                    1 + calculate_damage_modifier(author_combatant["element"], enemy_combatant["element"])), 3)
-            if author_pet_combatant:
-                author_pet_combatant["damage"] = round(author_pet_combatant["damage"] * (
-                        1 + calculate_damage_modifier(author_pet_combatant["element"], enemy_combatant["element"])),
-                                                       3)
-
-            enemy_combatant["damage"] = round(enemy_combatant["damage"] * (
-                    1 + calculate_damage_modifier(enemy_combatant["element"], author_combatant["element"])), 3)
-            if enemy_pet_combatant:
-                enemy_pet_combatant["damage"] = round(enemy_pet_combatant["damage"] * (
-                        1 + calculate_damage_modifier(enemy_pet_combatant["element"], author_combatant["element"])),
-                                                      3)
-
-            # Create initial battle log
-            battle_log = deque(
-                [
-                    f"**Action #0**\nRaidbattle {ctx.author.mention} vs. {enemy_.mention} started!"
-                ],
-                maxlen=5  # Adjust as needed for log size
+            # The combat engine runs the fight, we only render its events
+            combatants = [
+                self.combatant_from_data(author_combatant, Faction.One, lifesteal=lifestealauth),
+                self.combatant_from_data(author_pet_combatant, Faction.One),
+                self.combatant_from_data(enemy_combatant, Faction.Two, lifesteal=lifestealopp),
+                self.combatant_from_data(enemy_pet_combatant, Faction.Two),
+            ]
+            battle = Battle(
+                [c for c in combatants if c is not None],
+                rules=Rules(turn_order=TURN_ORDER_SHUFFLED),
             )
+            battle.apply_element_modifiers()
 
-            # Create initial embed
-            embed = discord.Embed(
-                title=f"Raid Battle: {ctx.author.display_name} vs {enemy_.display_name}",
-                color=self.bot.config.game.primary_colour
-            )
+            def render(battle_log):
+                embed = discord.Embed(
+                    title=f"Raid Battle: {ctx.author.display_name} vs {enemy_.display_name}",
+                    color=self.bot.config.game.primary_colour
+                )
+                for c in battle.combatants:
+                    current_hp = max(0, round(c.hp, 1))  # Rounded to .1
+                    max_hp = round(c.max_hp, 1)
+                    hp_bar = self.create_hp_bar(current_hp, max_hp)
+
+                    # Add tank indicator if applicable
+                    tank_indicator = "🛡️" if c.tank_evolution else ""
 
-            # Initialize player and pet stats in the embed
-            for combatant in [author_combatant, author_pet_combatant, enemy_combatant, enemy_pet_combatant]:
-                if not combatant:
-                    continue  # Skip if pet does not exist
-                current_hp = max(0, round(combatant["hp"], 1))  # Rounded to .0
-                max_hp = round(combatant["max_hp"], 1)
-                hp_bar = self.create_hp_bar(current_hp, max_hp)
-                if not combatant.get("is_pet"):
-                    # Player's element emoji
                     element_emoji = "❌"  # Default emoji
                     for emoji, element in emoji_to_element.items():
-                        if element == combatant["element"]:
+                        if element == c.element:
                             element_emoji = emoji
                             break
-                    if combatant['user'].id == ctx.author.id:
-                        field_name = f"[TEAM A]\n{combatant['user'].display_name} {element_emoji}"
+                    if not c.is_pet:
+                        team = "TEAM A" if c.faction == Faction.One else "TEAM B"
+                        field_name = f"[{team}]\n{c.owner.display_name} {element_emoji} {tank_indicator}"
                     else:
-                        field_name = f"[TEAM B]\n{combatant['user'].display_name} {element_emoji}"
-                else:
-                    # Pet's element emoji
-                    pet_element_emoji = "❌"  # Default emoji
-                    for emoji, element in emoji_to_element.items():
-                        if element == combatant["element"]:
-                            pet_element_emoji = emoji
-                            break
-                    field_name = f"{combatant['pet_name']} {pet_element_emoji}"
-                # Format HP with one decimal place
-                field_value = f"HP: {current_hp:.1f}/{max_hp:.1f}\n{hp_bar}"
-                embed.add_field(name=field_name, value=field_value, inline=False)
-
-            # Add initial battle log
-            embed.add_field(name="Battle Log", value=battle_log[0], inline=False)
-
-            log_message = await ctx.send(embed=embed)
-            await asyncio.sleep(4)
+                        field_name = f"{c.key} {element_emoji}"
 
-            start_time = datetime.datetime.utcnow()
+                    # Format HP with one decimal place
+                    field_value = f"HP: {current_hp:.1f}/{max_hp:.1f}\n{hp_bar}"
 
-            action_number = 1  # Starting from Action #1
+                    # Add reflection percentage for tanks
+                    if c.damage_reflection > 0:
+                        reflection_percent = c.damage_reflection * 100
+                        field_value += f"\nDamage Reflection: {reflection_percent:.1f}%"
 
-            battle_ongoing = True
-            combatant_order_options = [
-                author_combatant,
-                enemy_pet_combatant,
-                author_pet_combatant,
-                enemy_combatant
-            ]
+                    embed.add_field(name=field_name, value=field_value, inline=False)
 
-            # Shuffle the list in place
-            random.shuffle(combatant_order_options)
+                embed.add_field(name="Battle Log", value="\n\n".join(battle_log), inline=False)
+                return embed
 
-            # The shuffled list is now in combatant_order_options
-            combatant_order = combatant_order_options
+            def display_name(c):
+                return c.key if c.is_pet else c.owner.mention
 
-            while battle_ongoing and datetime.datetime.utcnow() < start_time + datetime.timedelta(minutes=5):
-                for combatant in combatant_order:
-                    if not combatant or combatant["hp"] <= 0:
-                        continue  # Skip dead or non-existent combatants
+            # Create initial battle log
+            battle_log = deque(
+                [
+                    f"**Action #0**\nRaidbattle {ctx.author.mention} vs. {enemy_.mention} started!"
+                ],
+                maxlen=5  # Adjust as needed for log size
+            )
 
-                    # Determine the opponent's combatants
-                    if combatant in [author_combatant, author_pet_combatant]:
-                        opponent_combatant = enemy_combatant
-                        opponent_pet_combatant = enemy_pet_combatant
-                        opponent_user = enemy_
-                    else:
-                        opponent_combatant = author_combatant
-                        opponent_pet_combatant = author_pet_combatant
-                        opponent_user = ctx.author
-
-                    # Combatant attacks
-                    target = self.select_target(opponent_combatant, opponent_pet_combatant, player_prob=0.60,
-                                                pet_prob=0.40)
-                    if target is not None:
-                        # Calculate base damage
-                        if combatant.get("is_pet"):
-                            damage_variance = random.randint(0, 50)
-                        else:
-                            damage_variance = random.randint(0, 100)
+            log_message = await ctx.send(embed=render(battle_log))
+            await asyncio.sleep(4)
 
-                        # Calculate raw damage before armor
-                        raw_damage = combatant["damage"] + damage_variance
+            deadline = datetime.datetime.utcnow() + datetime.timedelta(minutes=5)
 
-                        # Calculate how much damage was blocked by armor
-                        blocked_damage = min(raw_damage, target["armor"])
+            for event in battle.turns():
+                attacker_name = display_name(event.attacker)
+                target_name = display_name(event.target)
+                message = f"{attacker_name} attacks! {target_name} takes **{event.damage:.3f}HP** damage."
+                if event.reflected:
+                    message += f"\n{target_name}'s armor reflects **{event.reflected:.3f}HP** damage back!"
+                    if event.attacker in event.defeated:
+                        message += f" {attacker_name} has been defeated by reflected damage!"
+                if event.healed:
+                    message += f"\nLifesteals: **{event.healed:.3f}HP**"
+                if event.target in event.defeated:
+                    message += f"\n{target_name} has been defeated!"
 
-                        # Calculate final damage that gets through armor
-                        dmg = round(max(raw_damage - target["armor"], 1), 3)
+                battle_log.append(f"**Action #{event.number}**\n{message}")
 
-                        # Apply damage to target
-                        target["hp"] -= dmg
-                        target["hp"] = max(target["hp"], 0)
+                await log_message.edit(embed=render(battle_log))
+                await asyncio.sleep(4)
 
-                        # Build initial message
-                        if combatant.get("is_pet"):
-                            attacker_name = combatant['pet_name']
-                        else:
-                            attacker_name = combatant['user'].mention
-                        if target.get("is_pet"):
-                            target_name = target['pet_name']
-                        else:
-                            target_name = target['user'].mention
-
-                        message = f"{attacker_name} attacks! {target_name} takes **{dmg:.3f}HP** damage."
-
-                        # Handle damage reflection if target is a tank
-                        if target.get("damage_reflection", 0) > 0:
-                            # Reflect based on the total damage blocked by armor
-                            reflected_damage = round(blocked_damage * target["damage_reflection"], 3)
-                            if reflected_damage > 0:
-                                combatant["hp"] -= reflected_damage
-                                combatant["hp"] = max(combatant["hp"], 0)
-                                message += f"\n{target_name}'s armor reflects **{reflected_damage:.3f}HP** damage back!"
-
-                                # Check if attacker died from reflection
-                                if combatant["hp"] <= 0:
-                                    message += f" {attacker_name} has been defeated by reflected damage!"
-
-                        # Handle lifesteal if applicable
-                        if not combatant.get("is_pet"):
-                            if combatant["user"] == ctx.author and lifestealauth != 0:
-                                lifesteal_percentage = lifestealauth / 100.0
-                                heal = round(lifesteal_percentage * dmg, 3)
-                                combatant["hp"] = min(combatant["hp"] + heal, combatant["max_hp"])
-                                message += f"\nLifesteals: **{heal:.3f}HP**"
-                            elif combatant["user"] == enemy_ and lifestealopp != 0:
-                                lifesteal_percentage = lifestealopp / 100.0
-                                heal = round(lifesteal_percentage * dmg, 3)
-                                combatant["hp"] = min(combatant["hp"] + heal, combatant["max_hp"])
-                                message += f"\nLifesteals: **{heal:.3f}HP**"
-
-                        # Check if target is defeated
-                        if target["hp"] <= 0:
-                            message += f"\n{target_name} has been defeated!"
-
-                        # Append message to battle log
-                        battle_log.append(f"**Action #{action_number}**\n{message}")
-                        action_number += 1
-
-                        # Update the embed after each action
-                        embed = discord.Embed(
-                            title=f"Raid Battle: {ctx.author.display_name} vs {enemy_.display_name}",
-                            color=self.bot.config.game.primary_colour
-                        )
+                if datetime.datetime.utcnow() >= deadline:
+                    break
 
-                        # Update player and pet stats in the embed
-                        for c in [author_combatant, author_pet_combatant, enemy_combatant, enemy_pet_combatant]:
-                            if not c:
-                                continue  # Skip if pet does not exist
-                            current_hp = max(0, round(c["hp"], 1))  # Rounded to .1
-                            max_hp = round(c["max_hp"], 1)
-                            hp_bar = self.create_hp_bar(current_hp, max_hp)
-
-                            # Add tank indicator if applicable
-                            tank_indicator = "🛡️" if c.get("tank_evolution") else ""
-
-                            if not c.get("is_pet"):
-                                # Player's element emoji
-                                element_emoji = "❌"  # Default emoji
-                                for emoji, element in emoji_to_element.items():
-                                    if element == c["element"]:
-                                        element_emoji = emoji
-                                        break
-                                if c['user'].id == ctx.author.id:
-                                    field_name = f"[TEAM A]\n{c['user'].display_name} {element_emoji} {tank_indicator}"
-                                else:
-                                    field_name = f"[TEAM B]\n{c['user'].display_name} {element_emoji} {tank_indicator}"
-                            else:
-                                # Pet's element emoji
-                                pet_element_emoji = "❌"  # Default emoji
-                                for emoji, element in emoji_to_element.items():
-                                    if element == c["element"]:
-                                        pet_element_emoji = emoji
-                                        break
-                                field_name = f"{c['pet_name']} {pet_element_emoji}"
-
-                            # Format HP with one decimal place
-                            field_value = f"HP: {current_hp:.1f}/{max_hp:.1f}\n{hp_bar}"
-
-                            # Add reflection percentage for tanks
-                            if c.get("damage_reflection", 0) > 0:
-                                reflection_percent = c["damage_reflection"] * 100
-                                field_value += f"\nDamage Reflection: {reflection_percent:.1f}%"
-
-                            embed.add_field(name=field_name, value=field_value, inline=False)
-
-                        # Update battle log in the embed
-                        battle_log_text = '\n\n'.join(battle_log)
-                        embed.add_field(name="Battle Log", value=battle_log_text, inline=False)
-
-                        await log_message.edit(embed=embed)
-                        await asyncio.sleep(4)
-
-                        # Check win conditions including reflection deaths
-                        if opponent_combatant["hp"] <= 0 and (
-                                opponent_pet_combatant is None or opponent_pet_combatant["hp"] <= 0):
-                            battle_ongoing = False
-                            # If combatant is a pet, use its owner as winner
-                            if combatant.get("is_pet"):
-                                winner = combatant['user']  # This is the owner's user object
-                            else:
-                                winner = combatant['user']
-                            loser = opponent_user
-                            break
-                        elif author_combatant["hp"] <= 0 and (
-                                author_pet_combatant is None or author_pet_combatant["hp"] <= 0):
-                            battle_ongoing = False
-                            winner = enemy_
-                            loser = ctx.author
-                            break
-                        elif enemy_combatant["hp"] <= 0 and (
-                                enemy_pet_combatant is None or enemy_pet_combatant["hp"] <= 0):
-                            battle_ongoing = False
-                            winner = ctx.author
-                            loser = enemy_
-                            break
+            battle_ongoing = not battle.finished
+            if not battle_ongoing:
+                if battle.winner == Faction.One:
+                    winner, loser = ctx.author, enemy_
+                else:
+                    winner, loser = enemy_, ctx.author
 
             if battle_ongoing:
                 # Time limit reached, it's a tie
@@ -6032,15 +5620,8 @@ class Battles(commands.Cog):
 
     async def fetch_highest_element(self, user_id):
         try:
-            highest_items = await self.bot.pool.fetch(
-                "SELECT ai.element FROM profile p JOIN allitems ai ON (p.user=ai.owner) JOIN"
-                " inventory i ON (ai.id=i.item) WHERE i.equipped IS TRUE AND p.user=$1"
-                " ORDER BY GREATEST(ai.damage, ai.armor) DESC;",
-                user_id,
-            )
-            highest_element = highest_items[0]["element"].capitalize() if highest_items and highest_items[0][
-                "element"] else "Unknown"
-            return highest_element
+            snapshot = await self.bot.stats.get(user_id)
+            return snapshot["element"] if snapshot else "Unknown"
         except Exception as e:
             await self.bot.pool.execute(
                 'UPDATE profile SET "element"="Unknown" WHERE "user"=$1;',
@@ -6050,19 +5631,10 @@ class Battles(commands.Cog):
 
     async def fetch_combatants(self, ctx, player, highest_element, level, lifesteal, mage_evolution, conn):
         try:
-            # First check if player has a shield equipped
-            shield_check = await conn.fetchrow(
-                "SELECT ai.* FROM profile p JOIN allitems ai ON (p.user=ai.owner) "
-                "JOIN inventory i ON (ai.id=i.item) WHERE p.user=$1 AND "
-                "i.equipped IS TRUE AND ai.type='Shield';",
-                player.id
-            )
-            has_shield = bool(shield_check)
-
-            # Fetch stats
-            query = 'SELECT "luck", "health", "stathp", "class" FROM profile WHERE "user" = $1;'
-            result = await conn.fetchrow(query, player.id)
+            # Stats, equipped items and the shield come from the cached snapshot
+            result = await self.bot.stats.get(player, conn=conn)
             if result:
+                has_shield = result["has_shield"]
                 luck_value = float(result['luck'])
                 if luck_value <= 0.3:
                     Luck = 20.0
@@ -6079,7 +5651,7 @@ class Battles(commands.Cog):
                 base_health = 250.0
                 health = float(result['health']) + base_health
                 stathp = float(result['stathp']) * 50.0
-                player_classes = result['class']
+                player_classes = result['classes']
                 dmg, deff = await self.bot.get_raidstats(player, conn=conn)
 
                 # Ensure dmg and deff are floats
@@ -6088,40 +5660,10 @@ class Battles(commands.Cog):
 
                 total_health = health + level * 5.0 + stathp
 
-                # Get tank evolution level from player classes
-                tank_evolution = None
-                tank_evolution_levels = {
-                    "Protector": 1,
-                    "Guardian": 2,
-                    "Bulwark": 3,
-                    "Defender": 4,
-                    "Vanguard": 5,
-                    "Fortress": 6,
-                    "Titan": 7,
-                }
-
-                for class_name in player_classes:
-                    if class_name in tank_evolution_levels:
-                        level = tank_evolution_levels[class_name]
-                        if tank_evolution is None or level > tank_evolution:
-                            tank_evolution = level
-
-                # Only apply tank bonuses if they have a shield equipped
-                damage_reflection = 0.0
-                if tank_evolution and has_shield:
-                    # Health bonus: +5% per evolution
-                    health_multiplier = 1 + (0.04 * tank_evolution)
-                    total_health *= health_multiplier
-
-                    # Damage reflection: +3% per evolution
-                    damage_reflection = 0.03 * tank_evolution
-                elif tank_evolution and not has_shield:
-                    # If they're a tank but don't have a shield, still give them a smaller health bonus
-                    # but no reflection
-                    health_multiplier = 1 + (0.01 * tank_evolution)  # Half the normal bonus
-                    total_health *= health_multiplier
-
-
+                # Tank bonuses only fully apply with a shield equipped
+                tank_evolution = evolution_tier(player_classes, TANK_EVOLUTION_LEVELS)
+                health_multiplier, damage_reflection = tank_bonuses(tank_evolution, has_shield)
+                total_health *= health_multiplier
 
                 # Create combatant dictionary
                 combatant = {
@@ -6198,6 +5740,27 @@ class Battles(commands.Cog):
             }
             return combatant, None
 
+    def combatant_from_data(self, data, faction, lifesteal=0, **kwargs):
+        """Turns a combatant dict from fetch_combatants into an engine Combatant"""
+        if not data:
+            return None
+        return Combatant(
+            data["pet_name"] if data.get("is_pet") else data["user"].id,
+            faction,
+            data["hp"],
+            data["damage"],
+            data["armor"],
+            max_hp=data["max_hp"],
+            element=data["element"],
+            luck=data["luck"],
+            is_pet=data.get("is_pet", False),
+            lifesteal=lifesteal,
+            damage_reflection=data.get("damage_reflection", 0.0),
+            tank_evolution=data.get("tank_evolution"),
+            owner=data["user"],
+            **kwargs,
+        )
+
     def create_hp_bar(self, current_hp, max_hp, length=20):
         ratio = current_hp / max_hp if max_hp > 0 else 0
         ratio = max(0, min(1, ratio))  # Ensure ratio is between 0 and 1
@@ -6434,6 +5997,23 @@ class Battles(commands.Cog):
                 except Exception as e:
                     await ctx.send(f"An error occurred: {e}")
 
+        # Teams take turns attacking, a roll above your luck trips you for 10HP
+        battle = Battle(
+            [
+                Combatant(
+                    p["user"].id,
+                    Faction.One if p["team"] == "A" else Faction.Two,
+                    p["hp"],
+                    p["damage"],
+                    p["armor"],
+                    luck=p["luck"],
+                    owner=p["user"],
+                )
+                for p in players_data
+            ],
+            rules=Rules(turn_order=TURN_ORDER_TEAMS, trip_damage=10, element_modifiers=False),
+        )
+
         # Begin the battle
         battle_log = deque(
             [
@@ -6445,140 +6025,67 @@ class Battles(commands.Cog):
             maxlen=5,
         )
 
-        # Function to create HP bar
-        def create_hp_bar(self, current_hp, max_hp, length=20):
-            ratio = current_hp / max_hp if max_hp > 0 else 0
-            ratio = max(0, min(1, ratio))  # Ensure ratio is between 0 and 1
-            filled_length = int(length * ratio)
-            bar = '█' * filled_length + '░' * (length - filled_length)
-            return bar
-
-        # Create initial embed
-        embed = discord.Embed(
-            title=_("Raid Battle: Team A vs Team B"),
-            color=self.bot.config.game.primary_colour
-        )
+        def render():
+            embed = discord.Embed(
+                title=_("Raid Battle: Team A vs Team B"),
+                color=self.bot.config.game.primary_colour
+            )
 
-        # Initialize player stats in the embed
-        for team_label, team in [("Team A", team_a), ("Team B", team_b)]:
-            team_players = [p for p in players_data if p["user"] in team]
-            for player in team_players:
-                current_hp = max(0, round(player["hp"], 2))
-                max_hp = player["max_hp"]
-                hp_bar = create_hp_bar(current_hp, max_hp)
-                field_name = f"{player['user'].display_name} [{team_label}]"
+            # Player stats in the embed
+            for c in battle.combatants:
+                current_hp = max(0, round(c.hp, 2))
+                max_hp = round(c.max_hp, 2)
+                hp_bar = self.create_hp_bar(current_hp, max_hp)
+                team = "A" if c.faction == Faction.One else "B"
+                field_name = f"{c.owner.display_name} [Team {team}]"
                 field_value = f"HP: {current_hp}/{max_hp}\n{hp_bar}"
                 embed.add_field(name=field_name, value=field_value, inline=False)
 
-        # Add initial battle log
-        embed.add_field(name=_("Battle Log"), value=battle_log[0][1], inline=False)
+            battle_log_text = ''
+            for line in battle_log:
+                battle_log_text += f"**Action #{line[0]}**\n{line[1]}\n"
+
+            embed.add_field(name=_("Battle Log"), value=battle_log_text, inline=False)
+            return embed
 
-        log_message = await ctx.send(embed=embed)
+        log_message = await ctx.send(embed=render())
         await asyncio.sleep(4)
 
-        start = datetime.datetime.utcnow()
-        attacking_team = random.choice(["A", "B"])
-        team_players = {"A": [p for p in players_data if p["team"] == "A"],
-                        "B": [p for p in players_data if p["team"] == "B"]}
+        deadline = datetime.datetime.utcnow() + datetime.timedelta(minutes=5)
 
         # Main battle loop
-        while (
-                any(p["hp"] > 0 for p in team_players["A"])
-                and any(p["hp"] > 0 for p in team_players["B"])
-                and datetime.datetime.utcnow() < start + datetime.timedelta(minutes=5)
-        ):
-            # Attacking team attacks
-            attackers = [p for p in team_players[attacking_team] if p["hp"] > 0]
-            defenders = [p for p in team_players["B" if attacking_team == "A" else "A"] if p["hp"] > 0]
-
-            for attacker in attackers:
-                if not defenders:
-                    break  # No defenders left
-                defender = random.choice(defenders)
-
-                trickluck = float(random.randint(1, 100))
-
-                if float(trickluck) <= float(attacker["luck"]):
-                    # Regular attack
-                    dmg = (
-                            attacker["damage"] + Decimal(random.randint(0, 100)) - defender["armor"]
-                    )
-                    dmg = max(dmg, 1)
-                    defender["hp"] -= dmg
-
-                    # Initialize message
-                    message = _("{attacker} attacks! {defender} takes **{dmg}HP** damage.").format(
-                        attacker=attacker["user"],
-                        defender=defender["user"],
-                        dmg=dmg,
-                    )
-
-                    # Check if defender is defeated
-                    if defender["hp"] <= 0:
-                        defender["hp"] = 0
-                        message += _(" {defender} is defeated!").format(
-                            defender=defender["user"]
-                        )
-                        defenders.remove(defender)
-                else:
-                    # Attacker tripped and took damage
-                    dmg = Decimal('10.000')
-                    attacker["hp"] -= dmg
-                    attacker["hp"] = max(attacker["hp"], 0)
-                    message = _("{attacker} tripped and took **{dmg}HP** damage. Bad luck!").format(
-                        attacker=attacker["user"],
-                        dmg=dmg,
-                    )
-
-                # Append message to battle log
-                battle_log.append(
-                    (
-                        battle_log[-1][0] + 1,
-                        message,
-                    )
+        for event in battle.turns():
+            if event.tripped:
+                message = _("{attacker} tripped and took **{dmg}HP** damage. Bad luck!").format(
+                    attacker=event.attacker.owner,
+                    dmg=event.damage,
                 )
-
-                # Update the embed
-                embed = discord.Embed(
-                    title=_("Raid Battle: Team A vs Team B"),
-                    color=self.bot.config.game.primary_colour
+            else:
+                message = _("{attacker} attacks! {defender} takes **{dmg}HP** damage.").format(
+                    attacker=event.attacker.owner,
+                    defender=event.target.owner,
+                    dmg=event.damage,
                 )
+                if event.target in event.defeated:
+                    message += _(" {defender} is defeated!").format(
+                        defender=event.target.owner
+                    )
 
-                # Update player stats in the embed
-                for team_label, team in [("Team A", team_a), ("Team B", team_b)]:
-                    team_players_list = [p for p in players_data if p["user"] in team]
-                    for player in team_players_list:
-                        current_hp = max(0, round(player["hp"], 2))
-                        max_hp = player["max_hp"]
-                        hp_bar = create_hp_bar(current_hp, max_hp)
-                        field_name = f"{player['user'].display_name} [{team_label}]"
-                        field_value = f"HP: {current_hp}/{max_hp}\n{hp_bar}"
-                        embed.add_field(name=field_name, value=field_value, inline=False)
-
-                # Update battle log in the embed
-                battle_log_text = ''
-                for line in battle_log:
-                    battle_log_text += f"**Action #{line[0]}**\n{line[1]}\n"
-
-                embed.add_field(name=_("Battle Log"), value=battle_log_text, inline=False)
-
-                await log_message.edit(embed=embed)
-                await asyncio.sleep(2)
+            battle_log.append((event.number, message))
 
-                # Check if defenders are defeated and break if so
-                if not any(p["hp"] > 0 for p in defenders):
-                    break  # Battle ends
+            await log_message.edit(embed=render())
+            await asyncio.sleep(2)
 
-            # Swap attacking team for the next turn
-            attacking_team = "B" if attacking_team == "A" else "A"
+            if datetime.datetime.utcnow() >= deadline:
+                break
 
-        # Determine the winning team
-        if any(p["hp"] > 0 for p in team_players["A"]):
-            winning_team = team_players["A"]
-            losing_team = team_players["B"]
-        else:
-            winning_team = team_players["B"]
-            losing_team = team_players["A"]
+        # Determine the winning team, on timeout Team A wins if anyone is left standing
+        winning_faction = battle.winner or (
+            Faction.One if Faction.One in battle.alive_factions() else Faction.Two
+        )
+        winning_label = "A" if winning_faction == Faction.One else "B"
+        winning_team = [p for p in players_data if p["team"] == winning_label]
+        losing_team = [p for p in players_data if p["team"] != winning_label]
 
         # Update database and send final message
         async with self.bot.pool.acquire() as conn:
@@ -6943,15 +6450,6 @@ class Battles(commands.Cog):
             "White Sorcerer": 6,
         }
 
-        evolution_damage_multiplier = {
-            1: 1.10,  # 110%
-            2: 1.20,  # 120%
-            3: 1.30,  # 130%
-            4: 1.50,  # 150%
-            5: 1.75,  # 175%
-            6: 2.00,  # 200%
-        }
-
         tank_evolution_levels = {
             "Protector": 1,
             "Guardian": 2,
@@ -7280,7 +6778,7 @@ class Battles(commands.Cog):
                     total_health += stathp
 
                     # Fetch classes
-                    player_classes = result['class']
+                    player_classes = result['classes']
                     if isinstance(player_classes, list):
                         player_classes = player_classes
                     else:
@@ -7421,10 +6919,89 @@ class Battles(commands.Cog):
                 bar = '█' * filled_length + '░' * (length - filled_length)
                 return bar
 
-            # Initialize cheat death flag
-            cheated = False
+# Begin the battle
+            player = Combatant(
+                ctx.author.id,
+                Faction.One,
+                player_stats["hp"],
+                player_stats["damage"],
+                player_stats["armor"],
+                element=player_stats["element"],
+                luck=player_stats["luck"],
+                lifesteal=player_stats["lifesteal"],
+                damage_reflection=player_stats["damage_reflection"],
+                tank_evolution=player_stats["tank_evolution"],
+                owner=ctx.author,
+                deck=(
+                    SkillDeck([fireball(author_mage_evolution, 0.4)])
+                    if author_mage_evolution is not None
+                    else None
+                ),
+                damage_modifier=1 + float(damage_modifier_player),
+                cheat_death=author_chance,
+            )
+            enemy = Combatant(
+                monster_stats["name"],
+                Faction.Two,
+                monster_stats["hp"],
+                monster_stats["damage"],
+                monster_stats["armor"],
+                element=monster_stats["element"],
+                luck=90,  # Monsters have a fixed luck of 90
+            )
+            battle = Battle(
+                [player, enemy],
+                rules=Rules(
+                    turn_order=TURN_ORDER_TEAMS,
+                    trip_damage=10,
+                    precision=2,
+                    element_modifiers=False,
+                ),
+            )
+
+            def describe(event):
+                if event.tripped:
+                    if event.attacker is player:
+                        return _("You tripped and took **{dmg} HP** damage. Bad luck!").format(
+                            dmg=event.self_damage,
+                        )
+                    return _("{monster} tripped and took **{dmg} HP** damage.").format(
+                        monster=enemy.key,
+                        dmg=event.self_damage,
+                    )
+
+                hit = event.hits[0]
+                if event.attacker is player:
+                    if event.skill is not None:
+                        message = _("You cast Fireball! **{monster}** takes **{dmg} HP** damage.").format(
+                            monster=enemy.key,
+                            dmg=hit.damage,
+                        )
+                    else:
+                        message = _("You attack! **{monster}** takes **{dmg} HP** damage.").format(
+                            monster=enemy.key,
+                            dmg=hit.damage,
+                        )
+                    if player.lifesteal > 0:
+                        message += _(" Lifesteals: **{heal} HP**").format(heal=event.healed)
+                    if enemy in event.defeated:
+                        message += _(" **{monster}** is defeated!").format(monster=enemy.key)
+                    return message
+
+                message = _("{monster} attacks! You take **{dmg} HP** damage.").format(
+                    monster=enemy.key,
+                    dmg=hit.damage,
+                )
+                if hit.reflected:
+                    message += f"\n{ctx.author.display_name}'s armor reflects **{hit.reflected:.3f} HP** damage back!"
+                    if enemy in event.defeated:
+                        message += f" {enemy.key} has been defeated by reflected damage!"
+                if hit.revived:
+                    message += _(" You cheat death and survive with **75 HP**!")
+                elif player in event.defeated:
+                    message += _(" You are defeated!")
+                return message
 
-            # Begin the battle
             battle_log = deque(
                 [
                     (
@@ -7444,8 +7021,8 @@ class Battles(commands.Cog):
             )
 
             # Initialize player stats in the embed
-            current_hp = max(0, round(player_stats["hp"], 2))
-            max_hp = max(0, round(player_stats["max_hp"], 2))
+            current_hp = max(0, round(player.hp, 2))
+            max_hp = max(0, round(player.max_hp, 2))
             hp_bar = create_hp_bar(current_hp, max_hp)
             element_emoji = element_to_emoji.get(player_stats["element"], "❌") if player_stats["element"] else "❌"
             field_name = f"{player_stats['user'].display_name} {element_emoji}"
@@ -7453,8 +7030,8 @@ class Battles(commands.Cog):
             embed.add_field(name=field_name, value=field_value, inline=False)
 
             # Initialize monster stats in the embed
-            monster_current_hp = max(0, round(monster_stats["hp"], 2))
-            monster_max_hp = max(0, round(monster_stats["max_hp"], 2))
+            monster_current_hp = max(0, round(enemy.hp, 2))
+            monster_max_hp = max(0, round(enemy.max_hp, 2))
             monster_hp_bar = create_hp_bar(monster_current_hp, monster_max_hp)
             monster_element_emoji = element_to_emoji.get(monster_stats["element"], "❌")
             monster_field_name = f"{monster_stats['name']} {monster_element_emoji}"
@@ -7468,201 +7045,17 @@ class Battles(commands.Cog):
             await asyncio.sleep(4)
 
             start = datetime.datetime.utcnow()
-            player_turn = random.choice([True, False])
 
             # Main battle loop
-            # Main battle loop
-            while (
-                    player_stats["hp"] > 0
-                    and monster_stats["hp"] > 0
-                    and datetime.datetime.utcnow() < start + datetime.timedelta(minutes=5)
-            ):
-                if player_turn:
-                    attacker = player_stats
-                    defender = monster_stats
-                    attacker_type = "player"
-                    defender_type = "monster"
-                else:
-                    attacker = monster_stats
-                    defender = player_stats
-                    attacker_type = "monster"
-                    defender_type = "player"
-
-                trickluck = float(random.randint(1, 100))
-
-                if player_turn:
-                    attacker_luck = attacker["luck"]
-
-                else:
-                    attacker_luck = 90  # Monsters have a fixed luck of 80
-
-                if trickluck <= attacker_luck:
-                    # Attack hits
-                    if player_turn:
-                        # Player's turn
-                        # Check for Fireball ability before normal attack
-                        if attacker.get("mage_evolution") is not None:
-                            fireball_chance = random.randint(1, 100)
-                            if fireball_chance <= 40:
-                                # Fireball happens
-                                evolution_level = attacker["mage_evolution"]
-                                damage_multiplier = evolution_damage_multiplier.get(evolution_level, 1.0)
-
-                                # Convert attacker damage and defender armor to float
-                                atk_damage = float(attacker["damage"])
-                                def_armor = float(defender["armor"])
-
-                                dmg = (atk_damage + float(random.randint(0, 100)) - def_armor) * float(
-                                    damage_multiplier)
-                                dmg = max(dmg, 1.0)
-                                dmg = round(dmg, 2)
-
-                                # Ensure defender HP is a float, then subtract
-                                defender["hp"] = float(defender["hp"]) - dmg
-                                defender["hp"] = round(defender["hp"], 2)
-
-                                message = _("You cast Fireball! **{monster}** takes **{dmg} HP** damage.").format(
-                                    monster=defender["name"],
-                                    dmg=dmg
-                                )
-                            else:
-                                # Normal attack
-                                atk_damage = float(attacker["damage"])
-                                def_armor = float(defender["armor"])
-
-                                dmg = atk_damage + float(random.randint(0, 100)) - def_armor
-                                dmg = max(dmg, 1.0)
-                                dmg = round(dmg, 2)
-
-                                # Apply damage modifiers for player attacks
-                                if damage_modifier_player != 0:
-                                    dmg = dmg * (1 + float(damage_modifier_player))
-                                    dmg = round(dmg, 2)
-
-                                defender["hp"] = float(defender["hp"]) - dmg
-                                defender["hp"] = round(defender["hp"], 2)
-
-                                message = _("You attack! **{monster}** takes **{dmg} HP** damage.").format(
-                                    monster=defender["name"],
-                                    dmg=dmg,
-                                )
-                        else:
-                            # Normal attack if no mage evolution
-                            atk_damage = float(attacker["damage"])
-                            def_armor = float(defender["armor"])
-
-                            dmg = atk_damage + float(random.randint(0, 100)) - def_armor
-                            dmg = max(dmg, 1.0)
-                            dmg = round(dmg, 2)
-
-                            # Apply damage modifiers for player attacks
-                            if damage_modifier_player != 0:
-                                dmg = dmg * (1 + float(damage_modifier_player))
-                                dmg = round(dmg, 2)
-
-                            defender["hp"] = float(defender["hp"]) - dmg
-                            defender["hp"] = round(defender["hp"], 2)
-
-                            message = _("You attack! **{monster}** takes **{dmg} HP** damage.").format(
-                                monster=defender["name"],
-                                dmg=dmg,
-                            )
-
-                        # Handle lifesteal if applicable
-                        if attacker.get("lifesteal", 0) > 0:
-                            lifesteal_percentage = float(attacker["lifesteal"]) / 100.0
-                            heal = lifesteal_percentage * dmg
-                            heal = round(heal, 2)
-
-                            # Convert attacker HP to float and add
-                            attacker["hp"] = float(attacker["hp"]) + heal
-                            # Cap at max_hp
-                            if attacker["hp"] > float(attacker["max_hp"]):
-                                attacker["hp"] = float(attacker["max_hp"])
-                            attacker["hp"] = round(attacker["hp"], 2)
-
-                            message += _(" Lifesteals: **{heal} HP**").format(heal=heal)
-
-                        # Check if defender is defeated
-                        if defender["hp"] <= 0:
-                            defender["hp"] = 0.0
-                            message += _(" **{monster}** is defeated!").format(
-                                monster=defender["name"]
-                            )
-                    else:
-                        # Monster's turn
-                        atk_damage = float(attacker["damage"])
-                        def_armor = float(defender["armor"])
-
-                        raw_damage = atk_damage + float(random.randint(0, 100))
-                        dmg = max(raw_damage - def_armor, 1.0)
-                        dmg = round(dmg, 2)
-
-                        defender["hp"] = float(defender["hp"]) - dmg
-                        defender["hp"] = round(defender["hp"], 2)
-
-                        message = _("{monster} attacks! You take **{dmg} HP** damage.").format(
-                            monster=attacker["name"],
-                            dmg=dmg,
-                        )
-
-                        # Add reflection damage calculation here
-                        if defender.get("damage_reflection", 0) > 0:
-                            blocked_damage = min(raw_damage, def_armor)
-                            reflected_damage = blocked_damage * float(defender["damage_reflection"])
-                            reflected_damage = round(reflected_damage, 3)  # 3 decimals for reflection detail
-                            if reflected_damage > 0:
-                                attacker["hp"] = float(attacker["hp"]) - reflected_damage
-                                attacker["hp"] = round(attacker["hp"], 2)
-                                attacker["hp"] = max(attacker["hp"], 0.0)
-
-                                message += f"\n{defender['user'].display_name}'s armor reflects **{reflected_damage:.3f} HP** damage back!"
-
-                                # Check if monster died from reflection
-                                if attacker["hp"] <= 0:
-                                    message += f" {attacker['name']} has been defeated by reflected damage!"
-
-                        # Check if defender is defeated
-                        if defender["hp"] <= 0:
-                            defender["hp"] = 0.0
-                            # Handle Cheating Death for the player being attacked
-                            if not cheated:
-                                chance = float(author_chance)
-                                random_number = random.randint(1, 100)
-                                if random_number <= chance:
-                                    defender["hp"] = 75.0
-                                    cheated = True
-                                    message += _(" You cheat death and survive with **75 HP**!")
-                                else:
-                                    message += _(" You are defeated!")
-                            else:
-                                message += _(" You are defeated!")
-                else:
-                    # Attack misses or attacker trips
-                    dmg = 10.00  # float
-                    attacker["hp"] = float(attacker["hp"])  # Convert from Decimal to float if needed
-                    attacker["hp"] -= dmg
-                    attacker["hp"] = round(attacker["hp"], 2)
-                    attacker["hp"] = max(attacker["hp"], 0.0)
-
-                    if player_turn:
-                        message = _("You tripped and took **{dmg} HP** damage. Bad luck!").format(
-                            dmg=dmg,
-                        )
-                    else:
-                        message = _("{monster} tripped and took **{dmg} HP** damage.").format(
-                            monster=attacker["name"],
-                            dmg=dmg,
-                        )
+            for event in battle.turns():
                 # Append message to battle log
                 battle_log.append(
                     (
                         battle_log[-1][0] + 1,
-                        message,
+                        describe(event),
                     )
                 )
 
-
                 # Update the embed
                 embed = discord.Embed(
                     title=_("Raid Battle PvE"),
@@ -7670,16 +7063,16 @@ class Battles(commands.Cog):
                 )
 
                 # Update player stats in the embed
-                current_hp = max(0, round(player_stats["hp"], 2))
-                max_hp = max(0, round(player_stats["max_hp"], 2))
+                current_hp = max(0, round(player.hp, 2))
+                max_hp = max(0, round(player.max_hp, 2))
                 hp_bar = create_hp_bar(current_hp, max_hp)
                 field_name = f"{player_stats['user'].display_name} {element_to_emoji.get(player_stats['element'], '❌') if player_stats['element'] else '❌'}"
                 field_value = f"HP: {current_hp}/{max_hp}\n{hp_bar}"
                 embed.add_field(name=field_name, value=field_value, inline=False)
 
                 # Update monster stats in the embed
-                monster_current_hp = max(0, round(monster_stats["hp"], 2))
-                monster_max_hp = max(0, round(monster_stats["max_hp"], 2))
+                monster_current_hp = max(0, round(enemy.hp, 2))
+                monster_max_hp = max(0, round(enemy.max_hp, 2))
                 monster_hp_bar = create_hp_bar(monster_current_hp, monster_max_hp)
                 monster_field_name = f"{monster_stats['name']} {element_to_emoji.get(monster_stats['element'], '❌')}"
                 monster_field_value = f"HP: {monster_current_hp}/{monster_max_hp}\n{monster_hp_bar}"
@@ -7695,18 +7088,14 @@ class Battles(commands.Cog):
                 await log_message.edit(embed=embed)
                 await asyncio.sleep(4)
 
-                # Check if battle has ended
-                if player_stats["hp"] <= 0 or monster_stats["hp"] <= 0:
-                    break  # Battle ends
-
-                # Swap turn for the next round
-                player_turn = not player_turn
+                if datetime.datetime.utcnow() >= start + datetime.timedelta(minutes=5):
+                    break
 
             # Define the egg drop chance
             egg_drop_chance = 0.05 # 5% chance
 
             # Determine the outcome
-            if player_stats["hp"] > 0 and monster_stats["hp"] <= 0:
+            if player.alive and not enemy.alive:
                 # Player wins
 
                 if levelchoice == 11:
@@ -7720,6 +7109,7 @@ class Battles(commands.Cog):
                         xp_gain,
                         ctx.author.id,
                     )
+                self.bot.leaderboards.update(ctx.author)
                 await ctx.send(
                     _("You defeated the **{monster}** and gained **{xp} XP**!").format(
                         monster=monster["name"],
@@ -8377,15 +7767,13 @@ class Battles(commands.Cog):
                             await message.delete()
                             await ctx.send(f"Ha! Nice try. You must wait {time_str} before engaging in combat again!")
                             break
-                    await ctx.bot.redis.execute_command(
-                        "SET", f"cd:{ctx.author.id}:pve",
-                        "pve",
-                        "EX", 60 * 30
-                    )
+                    await ctx.bot.set_cooldown(ctx, 60 * 30, identifier="pve")
 
                     await message.delete()
                     ctx.monster_override = monster_data
                     ctx.levelchoice_override = levelchoice
+                    # the scout view may have been open for a while
+                    ctx.profiles.refresh(ctx.author.id)
                     await ctx.invoke(self.bot.get_command("pve"))
                     break
                 elif view.result == "reroll":
@@ -8431,74 +7819,110 @@ class Battles(commands.Cog):
                 )
             await ctx.send(embed=embed)
 
-    import datetime
+    async def notify_pet_owners(self, notifications, concurrency=10):
+        """DMs (user_id, message) pairs concurrently, at most concurrency at once"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def notify(user_id, message):
+            user = self.bot.get_user(user_id)
+            if not user:
+                return
+            async with semaphore:
+                try:
+                    await user.send(message)
+                except discord.Forbidden:
+                    # User has DMs disabled
+                    pass
+
+        await asyncio.gather(
+            *[notify(user_id, message) for user_id, message in notifications],
+            return_exceptions=True,
+        )
+
+    async def hatch_due_eggs(self, conn):
+        """Hatches all due eggs into baby pets with a single statement"""
+        baby_stage = PET_GROWTH_STAGES[1]
+        return await conn.fetch(
+            """
+            WITH hatched AS (
+                UPDATE monster_eggs SET hatched = TRUE
+                WHERE hatched = FALSE AND hatch_time <= NOW()
+                RETURNING *
+            )
+            INSERT INTO monster_pets (
+                user_id, name, default_name, hp, attack, defense, element, url,
+                growth_stage, growth_index, growth_time, "IV"
+            )
+            SELECT
+                user_id, egg_type, egg_type, ROUND(hp * $1::numeric),
+                ROUND(attack * $1::numeric), ROUND(defense * $1::numeric), element,
+                url, $2, 1, NOW() + $3::interval, COALESCE("IV", 0)
+            FROM hatched
+            RETURNING user_id, name;
+            """,
+            Decimal(str(baby_stage["stat_multiplier"])),
+            baby_stage["stage"],
+            datetime.timedelta(days=baby_stage["growth_time"]),
+        )
+
+    async def grow_due_pets(self, conn):
+        """Moves all due pets to their next growth stage, one statement per stage"""
+        grown = []
+        # oldest stage first so a pet never grows twice in one run
+        for index in sorted(PET_GROWTH_STAGES, reverse=True):
+            if index == 1:
+                continue
+            stage_data = PET_GROWTH_STAGES[index]
+            ratio = Decimal(str(stage_data["stat_multiplier"])) / Decimal(
+                str(PET_GROWTH_STAGES[index - 1]["stat_multiplier"])
+            )
+            growth_time = (
+                datetime.timedelta(days=stage_data["growth_time"])
+                if stage_data["growth_time"] is not None
+                else None
+            )
+            rows = await conn.fetch(
+                """
+                UPDATE monster_pets
+                SET
+                    growth_stage = $1,
+                    growth_time = NOW() + $2::interval,
+                    hp = hp * $3::numeric,
+                    attack = attack * $3::numeric,
+                    defense = defense * $3::numeric,
+                    growth_index = $4
+                WHERE
+                    growth_time <= NOW()
+                    AND growth_stage != 'adult'
+                    AND growth_index = $5
+                RETURNING user_id, name, growth_stage;
+                """,
+                stage_data["stage"],
+                growth_time,
+                ratio,
+                index,
+                index - 1,
+            )
+            grown.extend(rows)
+        return grown
 
     @tasks.loop(minutes=1)
+    @cluster_exclusive("check_egg_hatches")
     async def check_egg_hatches(self):
-        # Define the growth stages
-        growth_stages = {
-            1: {"stage": "baby", "growth_time": 2, "stat_multiplier": 0.25, "hunger_modifier": 1.0},
-            2: {"stage": "juvenile", "growth_time": 2, "stat_multiplier": 0.50, "hunger_modifier": 0.8},
-            3: {"stage": "young", "growth_time": 1, "stat_multiplier": 0.75, "hunger_modifier": 0.6},
-            4: {"stage": "adult", "growth_time": None, "stat_multiplier": 1.0, "hunger_modifier": 0.0},
-        }
-
         try:
             async with self.bot.pool.acquire() as conn:
-                # Fetch eggs that are ready to hatch
-                eggs = await conn.fetch(
-                    "SELECT * FROM monster_eggs WHERE hatched = FALSE AND hatch_time <= NOW();"
-                )
-                for egg in eggs:
-                    # Mark the egg as hatched
-                    await conn.execute(
-                        "UPDATE monster_eggs SET hatched = TRUE WHERE id = $1;", egg["id"]
-                    )
-
-                    # Get the baby stage data
-                    baby_stage = growth_stages[1]
-                    stat_multiplier = baby_stage["stat_multiplier"]
-                    growth_time_interval = datetime.timedelta(days=baby_stage["growth_time"])
-                    growth_time = datetime.datetime.utcnow() + growth_time_interval
-
-                    # Adjust the stats
-                    hp = round(egg["hp"] * stat_multiplier)
-                    attack = round(egg["attack"] * stat_multiplier)
-                    defense = round(egg["defense"] * stat_multiplier)
-
-                    iv_value = egg.get("IV") or egg.get("iv")
-                    if iv_value is None:
-                        iv_value = 0  # Set a default value or handle as needed
-
-                    # Insert the hatched egg into monster_pets
-                    await conn.execute(
-                        """
-                        INSERT INTO monster_pets (
-                            user_id, name, default_name, hp, attack, defense, element, url,
-                            growth_stage, growth_index, growth_time, "IV"
-                        )
-                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12);
-                        """,
-                        egg["user_id"],
-                        egg["egg_type"],  # Set initial pet name to the default name
-                        egg["egg_type"],  # Store the default species name
-                        hp,
-                        attack,
-                        defense,
-                        egg["element"],
-                        egg["url"],
-                        baby_stage["stage"],  # 'baby'
-                        1,  # growth_index
-                        growth_time,
-                        iv_value,
+                async with conn.transaction():
+                    hatched = await self.hatch_due_eggs(conn)
+            await self.notify_pet_owners(
+                [
+                    (
+                        pet["user_id"],
+                        f"Your **Egg** has hatched into a pet named **{pet['name']}**!"
+                        " Check your pet menu to see it.",
                     )
-
-                    # Notify the user
-                    user = self.bot.get_user(egg["user_id"])
-                    if user:
-                        await user.send(
-                            f"Your **Egg** has hatched into a pet named **{egg['egg_type']}**! Check your pet menu to see it."
-                        )
+                    for pet in hatched
+                ]
+            )
         except Exception as e:
             print(f"Error in check_egg_hatches: {e}")
             user = self.bot.get_user(295173706496475136)
@@ -8506,99 +7930,22 @@ class Battles(commands.Cog):
                 await user.send(f"Error in check_egg_hatches: {e}")
 
     @tasks.loop(minutes=1)
+    @cluster_exclusive("check_pet_growth")
     async def check_pet_growth(self):
-
-        growth_stages = {
-            1: {"stage": "baby", "growth_time": 2, "stat_multiplier": 0.25, "hunger_modifier": 1.0},
-            2: {"stage": "juvenile", "growth_time": 2, "stat_multiplier": 0.50, "hunger_modifier": 0.8},
-            3: {"stage": "young", "growth_time": 1, "stat_multiplier": 0.75, "hunger_modifier": 0.6},
-            4: {"stage": "adult", "growth_time": None, "stat_multiplier": 1.0, "hunger_modifier": 0.0},
-            # Self-sufficient
-        }
-
         try:
             async with self.bot.pool.acquire() as conn:
-                # Fetch pets that are ready to grow
-                pets = await conn.fetch(
-                    "SELECT * FROM monster_pets WHERE growth_time <= NOW() AND growth_stage != 'adult';"
-                )
-                for pet in pets:
-                    next_stage_index = pet["growth_index"] + 1
-                    if next_stage_index in growth_stages:
-                        stage_data = growth_stages[next_stage_index]
-
-                        # Compute the interval as a timedelta object
-                        if stage_data["growth_time"] is not None:
-                            growth_time_interval = datetime.timedelta(days=stage_data["growth_time"])
-                        else:
-                            growth_time_interval = None
-
-                        # Calculate the multiplier ratio
-                        old_multiplier = growth_stages[pet["growth_index"]]["stat_multiplier"]
-                        new_multiplier = stage_data["stat_multiplier"]
-                        multiplier_ratio = new_multiplier / old_multiplier
-
-                        newhp = pet["hp"] * multiplier_ratio
-                        newattack = pet["attack"] * multiplier_ratio
-                        newdefense = pet["defense"] * multiplier_ratio
-
-
-                        # Execute the appropriate query
-                        if growth_time_interval is not None:
-                            result = await conn.fetchrow(
-                                """
-                                UPDATE monster_pets
-                                SET 
-                                    growth_stage = $1,
-                                    growth_time = NOW() + $2,
-                                    hp = $3,
-                                    attack = $4,
-                                    defense = $5,
-                                    growth_index = $6
-                                WHERE 
-                                    "id" = $7
-                                RETURNING hp, attack, defense;
-                                """,
-                                stage_data["stage"],
-                                growth_time_interval,
-                                newhp,
-                                newattack,
-                                newdefense,
-                                next_stage_index,
-                                pet["id"],
-                            )
-
-
-                        else:
-                            result = await conn.fetchrow(
-                                """
-                                UPDATE monster_pets
-                                SET 
-                                    growth_stage = $1,
-                                    growth_time = NULL,
-                                    hp = $2,
-                                    attack = $3,
-                                    defense = $4,
-                                    growth_index = $5
-                                WHERE 
-                                    "id" = $6
-                                RETURNING hp, attack, defense;
-                                """,
-                                stage_data["stage"],
-                                newhp,
-                                newattack,
-                                newdefense,
-                                next_stage_index,
-                                pet["id"],
-                            )
-
-
-                        # Notify the user about the growth
-                        user = self.bot.get_user(pet["user_id"])
-                        if user:
-                            await user.send(
-                                f"Your pet **{pet['name']}** has grown into a {stage_data['stage']}!"
-                            )
+                async with conn.transaction():
+                    grown = await self.grow_due_pets(conn)
+            await self.notify_pet_owners(
+                [
+                    (
+                        pet["user_id"],
+                        f"Your pet **{pet['name']}** has grown into a"
+                        f" {pet['growth_stage']}!",
+                    )
+                    for pet in grown
+                ]
+            )
         except Exception as e:
             print(f"Error in check_pet_growth: {e}")
 
@@ -8640,62 +7987,59 @@ class Battles(commands.Cog):
             await ctx.send("You fed all your pets, and they look happy!")
 
     @tasks.loop(hours=12)
+    @cluster_exclusive("decrease_pet_stats")
     async def decrease_pet_stats(self):
-        """Background task to decrease hunger and happiness every 4 hours."""
+        """Background task to decrease hunger and happiness every 12 hours."""
         if self.softlanding == True:
             async with self.bot.pool.acquire() as conn:
-                # Fetch all pets that are not adults (since adults are self-sufficient)
-                pets = await conn.fetch(
-                    "SELECT * FROM monster_pets WHERE growth_stage != 'adult';"
-                )
-
-                for pet in pets:
-                    user_id = pet['user_id']
-                    pet_id = pet['id']
-                    pet_name = pet['name']
-                    growth_stage = pet['growth_stage']
-                    growth_index = pet['growth_index']
-
-                    # Define how much to decrease based on growth stage
-                    # You can adjust these values as needed
-                    if growth_stage == 'baby':
-                        hunger_decrease = 10  # Example value
-                        happiness_decrease = 5
-                    elif growth_stage == 'juvenile':
-                        hunger_decrease = 8
-                        happiness_decrease = 4
-                    elif growth_stage == 'young':
-                        hunger_decrease = 6
-                        happiness_decrease = 3
-                    else:
-                        hunger_decrease = 0
-                        happiness_decrease = 0
-
-                    # Update hunger and happiness
-                    await conn.execute(
+                async with conn.transaction():
+                    # adults are self-sufficient and are not part of PET_NEEDS_DECAY
+                    pets = await conn.fetch(
                         """
-                        UPDATE monster_pets
-                        SET hunger = GREATEST(hunger - $1, 0),
-                            happiness = GREATEST(happiness - $2, 0)
-                        WHERE id = $3;
+                        UPDATE monster_pets p
+                        SET hunger = GREATEST(p.hunger - d.hunger, 0),
+                            happiness = GREATEST(p.happiness - d.happiness, 0)
+                        FROM unnest($1::text[], $2::int[], $3::int[])
+                            AS d(stage, hunger, happiness)
+                        WHERE p.growth_stage = d.stage
+                        RETURNING p.id, p.user_id, p.name, p.hunger, p.happiness;
                         """,
-                        hunger_decrease,
-                        happiness_decrease,
-                        pet_id
+                        list(PET_NEEDS_DECAY),
+                        [hunger for hunger, _happiness in PET_NEEDS_DECAY.values()],
+                        [happiness for _hunger, happiness in PET_NEEDS_DECAY.values()],
                     )
 
-                    # Check if hunger or happiness has reached 0
-                    updated_pet = await conn.fetchrow(
-                        "SELECT hunger, happiness FROM monster_pets WHERE id = $1;",
-                        pet_id
-                    )
+                    notifications = []
+                    lost = []
+                    for pet in pets:
+                        if pet["hunger"] == 0:
+                            # Pet dies from starvation
+                            notifications.append(
+                                (
+                                    pet["user_id"],
+                                    f"😢 Your pet **{pet['name']}** has died from"
+                                    " starvation. Please take better care next time.",
+                                )
+                            )
+                        elif pet["happiness"] == 0:
+                            # Pet runs away due to unhappiness
+                            notifications.append(
+                                (
+                                    pet["user_id"],
+                                    f"😞 Your pet **{pet['name']}** has run away due to"
+                                    " unhappiness. Make sure to keep your pet happy!",
+                                )
+                            )
+                        else:
+                            continue
+                        lost.append(pet["id"])
 
-                    if updated_pet['hunger'] == 0:
-                        # Pet dies from starvation
-                        await self.handle_pet_death(conn, user_id, pet_id, pet_name)
-                    elif updated_pet['happiness'] == 0:
-                        # Pet runs away due to unhappiness
-                        await self.handle_pet_runaway(conn, user_id, pet_id, pet_name)
+                    if lost:
+                        await conn.execute(
+                            "DELETE FROM monster_pets WHERE id = ANY($1);", lost
+                        )
+
+            await self.notify_pet_owners(notifications)
         else:
             self.softlanding = True
 
@@ -8704,44 +8048,6 @@ class Battles(commands.Cog):
         """Wait until the bot is ready before starting the task."""
         await self.bot.wait_until_ready()
 
-    async def handle_pet_death(self, conn, user_id, pet_id, pet_name):
-        """Handles pet death due to starvation."""
-        # Delete the pet from the database
-        await conn.execute(
-            "DELETE FROM monster_pets WHERE id = $1;",
-            pet_id
-        )
-
-        # Attempt to fetch the user
-        user = self.bot.get_user(user_id)
-        if user:
-            try:
-                await user.send(
-                    f"😢 Your pet **{pet_name}** has died from starvation. Please take better care next time."
-                )
-            except discord.Forbidden:
-                # User has DMs disabled
-                pass
-
-    async def handle_pet_runaway(self, conn, user_id, pet_id, pet_name):
-        """Handles pet running away due to unhappiness."""
-        # Delete the pet from the database
-        await conn.execute(
-            "DELETE FROM monster_pets WHERE id = $1;",
-            pet_id
-        )
-
-        # Attempt to fetch the user
-        user = self.bot.get_user(user_id)
-        if user:
-            try:
-                await user.send(
-                    f"😞 Your pet **{pet_name}** has run away due to unhappiness. Make sure to keep your pet happy!"
-                )
-            except discord.Forbidden:
-                # User has DMs disabled
-                pass
-
     @user_cooldown(120)
     @pets.command(brief=_("Rename your pet or reset its name to the default"))
     async def rename(self, ctx, id: int, *, nickname: str = None):
@@ -8861,20 +8167,15 @@ class Battles(commands.Cog):
 
         players = {
             ctx.author: {
-                "hp": 0,
-                "damage": 0,
-                "defense": 0,
                 "lastmove": "",
                 "action": None,
             },
             enemy_: {
-                "hp": 0,
-                "damage": 0,
-                "defense": 0,
                 "lastmove": "",
                 "action": None,
             },
         }
+        fighters = {}
 
         async with self.bot.pool.acquire() as conn:
             await conn.execute(
@@ -8883,7 +8184,7 @@ class Battles(commands.Cog):
                 enemy_.id,
             )
 
-            for p in players:
+            for faction, p in zip((Faction.One, Faction.Two), players):
                 classes = [
                     class_from_string(i)
                     for i in await conn.fetchval(
@@ -8891,18 +8192,21 @@ class Battles(commands.Cog):
                     )
                 ]
                 if any(c.in_class_line(Ranger) for c in classes if c):
-                    players[p]["hp"] = 120
+                    hp = 120
                 else:
-                    players[p]["hp"] = 100
+                    hp = 100
 
                 attack, defense = await self.bot.get_damage_armor_for(p, conn=conn)
-                players[p]["damage"] = int(attack)
-                players[p]["defense"] = int(defense)
+                fighters[p] = Combatant(
+                    p.id, faction, hp, int(attack), int(defense), owner=p
+                )
+
+        battle = Battle(list(fighters.values()))
 
         moves = {
-            "\U00002694": "attack",
-            "\U0001f6e1": "defend",
-            "\U00002764": "recover",
+            "\U00002694": MOVE_ATTACK,
+            "\U0001f6e1": MOVE_DEFEND,
+            "\U00002764": MOVE_RECOVER,
         }
 
         msg = await ctx.send(
@@ -8919,7 +8223,7 @@ class Battles(commands.Cog):
         for emoji in moves:
             await msg.add_reaction(emoji)
 
-        while players[ctx.author]["hp"] > 0 and players[enemy_]["hp"] > 0:
+        while fighters[ctx.author].alive and fighters[enemy_].alive:
             await msg.edit(
                 embed=discord.Embed(
                     description=_(
@@ -8929,8 +8233,8 @@ class Battles(commands.Cog):
                         prevaction="\n".join([i["lastmove"] for i in players.values()]),
                         player1=ctx.author.mention,
                         player2=enemy_.mention,
-                        hp1=players[ctx.author]["hp"],
-                        hp2=players[enemy_]["hp"],
+                        hp1=f"{fighters[ctx.author].hp:g}",
+                        hp2=f"{fighters[enemy_].hp:g}",
                     )
                 )
             )
@@ -8974,62 +8278,30 @@ class Battles(commands.Cog):
                             other=playerlist[1 - playerlist.index(u)].mention,
                         )
                     )
-            plz = list(players.keys())
-            for idx, user in enumerate(plz):
-                other = plz[1 - idx]
-                if players[user]["action"] == "recover":
-                    heal_hp = round(players[user]["damage"] * 0.25) or 1
-                    players[user]["hp"] += heal_hp
+            events = battle.exchange(
+                {fighters[user]: players[user]["action"] for user in players}
+            )
+            for event in events:
+                user = event.attacker.owner
+                if event.move == MOVE_RECOVER:
                     players[user]["lastmove"] = _(
                         "{user} healed themselves for **{hp} HP**."
-                    ).format(user=user.mention, hp=heal_hp)
-                elif (
-                        players[user]["action"] == "attack"
-                        and players[other]["action"] != "defend"
-                ):
-                    eff = random.choice(
-                        [
-                            players[user]["damage"],
-                            int(players[user]["damage"] * 0.5),
-                            int(players[user]["damage"] * 0.2),
-                            int(players[user]["damage"] * 0.8),
-                        ]
-                    )
-                    players[other]["hp"] -= eff
-                    players[user]["lastmove"] = _(
-                        "{user} hit {enemy} for **{eff}** damage."
-                    ).format(user=user.mention, enemy=other.mention, eff=eff)
-                elif (
-                        players[user]["action"] == "attack"
-                        and players[other]["action"] == "defend"
-                ):
-                    eff = random.choice(
-                        [
-                            int(players[user]["damage"]),
-                            int(players[user]["damage"] * 0.5),
-                            int(players[user]["damage"] * 0.2),
-                            int(players[user]["damage"] * 0.8),
-                        ]
-                    )
-                    eff2 = random.choice(
-                        [
-                            int(players[other]["defense"]),
-                            int(players[other]["defense"] * 0.5),
-                            int(players[other]["defense"] * 0.2),
-                            int(players[other]["defense"] * 0.8),
-                        ]
-                    )
-                    if eff - eff2 > 0:
-                        players[other]["hp"] -= eff - eff2
+                    ).format(user=user.mention, hp=event.healed)
+                elif event.move == MOVE_ATTACK:
+                    other = event.target.owner
+                    if not event.defended:
                         players[user]["lastmove"] = _(
                             "{user} hit {enemy} for **{eff}** damage."
-                        ).format(user=user.mention, enemy=other.mention, eff=eff - eff2)
+                        ).format(user=user.mention, enemy=other.mention, eff=event.damage)
+                    elif event.damage > 0:
+                        players[user]["lastmove"] = _(
+                            "{user} hit {enemy} for **{eff}** damage."
+                        ).format(user=user.mention, enemy=other.mention, eff=event.damage)
                         players[other]["lastmove"] = _(
                             "{enemy} tried to defend, but failed.".format(
                                 enemy=other.mention
                             )
                         )
-
                     else:
                         players[user]["lastmove"] = _(
                             "{user}'s attack on {enemy} failed!"
@@ -9039,11 +8311,11 @@ class Battles(commands.Cog):
                                 enemy=other.mention, user=user.mention
                             )
                         )
-                elif players[user]["action"] == players[other]["action"] == "defend":
-                    players[ctx.author]["lastmove"] = _("You both tried to defend.")
-                    players[enemy_]["lastmove"] = _("It was not very effective...")
+            if players[ctx.author]["action"] == players[enemy_]["action"] == MOVE_DEFEND:
+                players[ctx.author]["lastmove"] = _("You both tried to defend.")
+                players[enemy_]["lastmove"] = _("It was not very effective...")
 
-        if players[ctx.author]["hp"] <= 0 and players[enemy_]["hp"] <= 0:
+        if not fighters[ctx.author].alive and not fighters[enemy_].alive:
             await self.bot.pool.execute(
                 'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2 or "user"=$3;',
                 money,
@@ -9051,7 +8323,7 @@ class Battles(commands.Cog):
                 enemy_.id,
             )
             return await ctx.send(_("You both died!"))
-        if players[ctx.author]["hp"] > players[enemy_]["hp"]:
+        if fighters[ctx.author].hp > fighters[enemy_].hp:
             winner, looser = ctx.author, enemy_
         else:
             looser, winner = ctx.author, enemy_
@@ -9079,8 +8351,8 @@ class Battles(commands.Cog):
                     prevaction="\n".join([i["lastmove"] for i in players.values()]),
                     player1=ctx.author.mention,
                     player2=enemy_.mention,
-                    hp1=players[ctx.author]["hp"],
-                    hp2=players[enemy_]["hp"],
+                    hp1=f"{fighters[ctx.author].hp:g}",
+                    hp2=f"{fighters[enemy_].hp:g}",
                 )
             )
         )
@@ -18,12 +18,12 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import asyncio
 
-import chess.engine
 import discord
 
 from discord.ext import commands
 
-from utils.chess import ChessGame, ProtocolAdapter
+from utils.checks import is_gm
+from utils.chess import ChessGame, EnginePool
 from utils.i18n import _, locale_doc
 
 
@@ -35,18 +35,18 @@ class Chess(commands.Cog):
 
     async def initialize(self):
         await self.bot.wait_until_ready()
-        try:
-            _, adapter = await asyncio.get_running_loop().create_connection(
-                lambda: ProtocolAdapter(chess.engine.UciProtocol()), "127.0.0.1", 4000
-            )
-        except ConnectionRefusedError:
+        config = self.bot.config.external
+        self.engines = EnginePool(
+            self.bot,
+            config.stockfish_endpoints,
+            config.stockfish_command,
+            config.stockfish_processes,
+        )
+        if not await self.engines.start():
             self.bot.logger.warning(
                 "FAILED to connect to stockfish backend, unloading chess cog..."
             )
-            self.bot.unload_extension("cogs.chess")
-            return
-        self.engine = adapter.protocol
-        await self.engine.initialize()
+            await self.bot.unload_extension("cogs.chess")
 
     @commands.group(invoke_without_command=True, brief=_("Play chess."))
     @locale_doc
@@ -217,9 +217,15 @@ class Chess(commands.Cog):
         )
         await ctx.send(moves)
 
+    @is_gm()
+    @chess.command(name="engines", hidden=True)
+    async def engines_(self, ctx):
+        # free engines and how long moves waited for one
+        await ctx.send(f"```\n{self.engines}\n```")
+
     def cog_unload(self):
-        if hasattr(self, "engine"):
-            asyncio.create_task(self.engine.quit())
+        if hasattr(self, "engines"):
+            asyncio.create_task(self.engines.close())
 
 
 async def setup(bot):
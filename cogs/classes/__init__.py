@@ -259,6 +259,7 @@ class Classes(commands.Cog):
                     await conn.execute(
                         'INSERT INTO pets ("user") VALUES ($1);', ctx.author.id
                     )
+            await self.bot.stats.invalidate(ctx.author)
             await ctx.send(
                 _("Your new class is now `{profession}`.").format(
                     profession=_(get_name(profession))
@@ -292,6 +293,7 @@ class Classes(commands.Cog):
                     data={"Gold": 5000},
                     conn=conn,
                 )
+            await self.bot.stats.invalidate(ctx.author)
             await ctx.send(
                 _(
                     "You selected the class `{profession}`. **$5000** was taken off"
@@ -358,6 +360,7 @@ class Classes(commands.Cog):
         await self.bot.pool.execute(
             'UPDATE profile SET "class"=$1 WHERE "user"=$2;', new_classes, ctx.author.id
         )
+        await self.bot.stats.invalidate(ctx.author)
         await ctx.send(
             _("You are now a `{class1}` and a `{class2}`.").format(
                 class1=new_classes[0], class2=new_classes[1]
@@ -257,6 +257,7 @@ class Errorhandler(commands.Cog):
                     classes,
                     ctx.author.id,
                 )
+                await self.bot.stats.invalidate(ctx.author)
             elif isinstance(error, utils.checks.PetDied):
                 await ctx.send(
                     _(
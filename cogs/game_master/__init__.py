@@ -26,10 +26,10 @@ import aiohttp
 import discord
 import discord
 from discord.ext import commands, menus
+from utils import cooldowns
 from utils import misc as rpgtools
 
 from discord import Object, HTTPException
-from PIL import Image
 import io
 import aiohttp
 from asyncpg.exceptions import UniqueViolationError
@@ -40,7 +40,7 @@ import json
 from classes.converters import CrateRarity, IntFromTo, IntGreaterThan, UserWithCharacter
 from classes.items import ItemType
 from cogs.shard_communication import user_on_cooldown as user_cooldown
-from utils import random
+from utils import random, render
 from utils.checks import has_char, is_gm
 from utils.i18n import _, locale_doc
 
@@ -562,9 +562,11 @@ class GameMaster(commands.Cog):
             g = await conn.fetchval(
                 'DELETE FROM guild WHERE "leader"=$1 RETURNING id;', other.id
             )
+            members = []
             if g:
-                await conn.execute(
-                    'UPDATE profile SET "guildrank"=$1, "guild"=$2 WHERE "guild"=$3;',
+                members = await conn.fetch(
+                    'UPDATE profile SET "guildrank"=$1, "guild"=$2 WHERE "guild"=$3'
+                    ' RETURNING "user";',
                     "Member",
                     0,
                     g,
@@ -583,6 +585,9 @@ class GameMaster(commands.Cog):
                 other.id,
             )
             await self.bot.delete_profile(other.id, conn=conn)
+        await self.bot.stats.invalidate(other, *[m["user"] for m in members])
+        if g:
+            await self.bot.stats.invalidate_alliance(g)
         await ctx.send(_("Successfully deleted the character."))
 
         with handle_message_parameters(
@@ -783,6 +788,7 @@ class GameMaster(commands.Cog):
         await self.bot.pool.execute(
             'UPDATE profile SET "xp"="xp"+$1 WHERE "user"=$2;', amount, target.id
         )
+        self.bot.leaderboards.update(target)
         await ctx.send(
             _("Successfully gave **{amount}** XP to **{target}**.").format(
                 amount=amount, target=target
@@ -1519,6 +1525,7 @@ class GameMaster(commands.Cog):
             await conn.execute(
                 'UPDATE guild SET "memberlimit"=$1 WHERE "leader"=$2;', 50, target.id
             )
+        await self.bot.stats.invalidate(target)
 
         await ctx.send(
             _(
@@ -1555,6 +1562,7 @@ class GameMaster(commands.Cog):
             """UPDATE profile SET "class"='{"No Class", "No Class"}' WHERE "user"=$1;""",
             target.id,
         )
+        await self.bot.stats.invalidate(target)
 
         await ctx.send(_("Successfully reset {target}'s class.").format(target=target))
 
@@ -1600,38 +1608,18 @@ class GameMaster(commands.Cog):
             # Reinitialize the user to ensure a valid Member object
             user = await ctx.guild.fetch_member(user.id)
 
-            # Fetch the base image and user avatar
-            base_image_data = await self.fetch_image(external_image_url)
+            # Fetch the user avatar, the render workers keep the base image
             avatar_data = await self.fetch_avatar(user.id)
-
-            with io.BytesIO(base_image_data) as base_io, io.BytesIO(avatar_data) as avatar_io:
-                base_image = Image.open(base_io).convert("RGBA")  # Convert base image to RGBA mode
-
-                # Open the avatar, convert to RGBA, and resize
-                avatar_image = Image.open(avatar_io).convert("RGBA")
-                avatar_resized = avatar_image.resize((200, 200))  # Adjust size as needed
-
-                # Rotate the avatar without any fill color
-                avatar_resized = avatar_resized.rotate(35, expand=True)
-
-                # Calculate positioning
-                x_center = (base_image.width - avatar_resized.width) // 2
-                y_position_75_percent = int(base_image.height * 0.75)
-                y_center = y_position_75_percent - (avatar_resized.height // 2)
-
-                # Use alpha channel as mask if available
-                mask = avatar_resized.split()[3] if avatar_resized.mode == 'RGBA' else None
-
-                base_image.paste(avatar_resized, (x_center, y_center), mask)
-
-                with io.BytesIO() as output:
-                    base_image.save(output, format="PNG")
-                    output.seek(0)
-                    await ctx.send(file=discord.File(output, 'banned_avatar.png'))
+            image = await self.bot.renderer.render(
+                render.poop, external_image_url, avatar_data
+            )
+            await ctx.send(file=discord.File(io.BytesIO(image), 'banned_avatar.png'))
 
             # Ban the user
             await ctx.guild.ban(user, reason=reason)
             await ctx.send(f"Trash taken out! {user.mention} has been banned.")
+        except (render.RenderBusy, OSError):
+            await ctx.send("The image could not be rendered right now, try again later.")
         except discord.Forbidden:
             await ctx.send("I do not have permission to ban this user.")
         except discord.HTTPException as e:
@@ -1649,40 +1637,19 @@ class GameMaster(commands.Cog):
             return
 
         try:
-            base_image_data = await self.fetch_image(external_image_url)
             avatar_data = await self.fetch_avatar(user.id)
-
-            with io.BytesIO(base_image_data) as base_io, io.BytesIO(avatar_data) as avatar_io:
-                base_image = Image.open(base_io).convert("RGBA")  # Convert base image to RGBA mode
-
-                # Open the avatar, convert to RGBA, and resize
-                avatar_image = Image.open(avatar_io).convert("RGBA")
-                avatar_resized = avatar_image.resize((100, 100))  # Adjust size as needed
-
-                # Rotate the avatar without any fillcolor
-                avatar_resized = avatar_resized.rotate(35, expand=True)
-
-                # Calculate the vertical shift - 10% of the avatar's height
-                vertical_shift = int(avatar_resized.height * 0.20)
-
-                x_center = (base_image.width - avatar_resized.width) // 2
-                y_center = (base_image.height - avatar_resized.height) // 2 - vertical_shift
-
-                # Check if the avatar has an alpha channel (transparency) and use it as a mask if present
-                mask = avatar_resized.split()[3] if avatar_resized.mode == 'RGBA' else None
-
-                base_image.paste(avatar_resized, (x_center, y_center), mask)
-
-                with io.BytesIO() as output:
-                    base_image.save(output, format="PNG")
-                    output.seek(0)
-                    await ctx.send(file=discord.File(output, 'banned_avatar.png'))
+            image = await self.bot.renderer.render(
+                render.trash, external_image_url, avatar_data
+            )
+            await ctx.send(file=discord.File(io.BytesIO(image), 'banned_avatar.png'))
 
             # user = Object(id=user_id)
             # await ctx.guild.ban(user, reason=reason)
 
             await ctx.send(f'Trash taken out!')
             # await ctx.send(f'The trash known as <@{user_id}> was taken out in **__1 server(s)__** for the reason: {reason}')
+        except (render.RenderBusy, OSError):
+            await ctx.send('The image could not be rendered right now, try again later.')
         except HTTPException:
             await ctx.send(f'Failed to fetch user or image.')
         except Exception as e:
@@ -1708,9 +1675,13 @@ class GameMaster(commands.Cog):
         if len(text) > 100:
             await self.bot.reset_cooldown(ctx)
             return await ctx.send(_("Text exceeds 50 characters."))
-        await self.bot.pool.execute(
-            'UPDATE allitems SET "signature"=$1 WHERE "id"=$2;', text, itemid
+        owner = await self.bot.pool.fetchval(
+            'UPDATE allitems SET "signature"=$1 WHERE "id"=$2 RETURNING "owner";',
+            text,
+            itemid,
         )
+        if owner:
+            await self.bot.stats.invalidate(owner)
         await ctx.send(_("Item successfully signed."))
 
         with handle_message_parameters(
@@ -1994,9 +1965,7 @@ class GameMaster(commands.Cog):
         else:
             user_id = user
 
-        result = await self.bot.redis.execute_command("DEL", f"cd:{user_id}:{command}")
-
-        if result == 1:
+        if await self.bot.cooldowns.reset(cooldowns.USER, user_id, command):
             await ctx.send(_("The cooldown has been updated!"))
             if ctx.author.id != 295173706496475136:
                 with handle_message_parameters(
@@ -2094,6 +2063,7 @@ class GameMaster(commands.Cog):
                 'UPDATE profile SET "luck"=1.0 WHERE "god" IS NULL RETURNING "user";'
             )
             all_ids.extend([u["user"] for u in ids])
+        await self.bot.stats.invalidate(*all_ids)
         await ctx.send("\n".join(text_collection))
 
         with handle_message_parameters(
@@ -2363,7 +2333,7 @@ class GameMaster(commands.Cog):
         """[Owner only] Evaluates python code on all processes."""
 
         data = await self.bot.cogs["Sharding"].handler(
-            "evaluate", self.bot.shard_count, {"code": code}
+            "evaluate", self.bot.cluster_count, {"code": code}
         )
         filtered_data = {instance: data.count(instance) for instance in data}
         pretty_data = "".join(
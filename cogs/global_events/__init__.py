@@ -156,7 +156,7 @@ class GlobalEvents(commands.Cog):
         return {
             "server_count": sum(
                 await self.bot.cogs["Sharding"].handler(
-                    "guild_count", self.bot.shard_count
+                    "guild_count", self.bot.cluster_count
                 )
             ),
             "shard_count": self.bot.shard_count,
@@ -166,7 +166,7 @@ class GlobalEvents(commands.Cog):
         return {
             "server_count": sum(
                 await self.bot.cogs["Sharding"].handler(
-                    "guild_count", self.bot.shard_count
+                    "guild_count", self.bot.cluster_count
                 )
             )
         }
@@ -175,7 +175,7 @@ class GlobalEvents(commands.Cog):
         return {
             "guilds": sum(
                 await self.bot.cogs["Sharding"].handler(
-                    "guild_count", self.bot.shard_count
+                    "guild_count", self.bot.cluster_count
                 )
             )
         }
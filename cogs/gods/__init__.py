@@ -207,6 +207,7 @@ class Gods(commands.Cog):
             await conn.execute(
                 'UPDATE profile SET "god"=$1 WHERE "user"=$2;', god, ctx.author.id
             )
+        await self.bot.stats.invalidate(ctx.author)
 
         # Get the target guild and check if the user is a member
         guild_id = 1199287508794626078
@@ -281,6 +282,7 @@ class Gods(commands.Cog):
                 ' "user"=$1;',
                 ctx.author.id,
             )
+        await self.bot.stats.invalidate(ctx.author)
 
         old_role_id = god_roles.get(old_god)
         if old_role_id:
@@ -38,6 +38,7 @@ from classes.converters import (
 )
 from cogs.shard_communication import guild_on_cooldown as guild_cooldown
 from cogs.shard_communication import user_on_cooldown as user_cooldown
+from utils import cooldowns
 from utils import misc as rpgtools
 from utils import random
 from utils.checks import (
@@ -328,6 +329,7 @@ class Guild(commands.Cog):
                 10000,
                 ctx.author.id,
             )
+        await self.bot.stats.invalidate(ctx.author)
         await ctx.send(
             _(
                 "Successfully added your guild **{name}** with a member limit of"
@@ -545,6 +547,7 @@ class Guild(commands.Cog):
         await self.bot.pool.execute(
             'UPDATE profile SET "guild"=$1 WHERE "user"=$2;', id_, newmember.id
         )
+        await self.bot.stats.invalidate(newmember)
         if channel:
             with suppress(discord.Forbidden, discord.HTTPException):
                 with handle_message_parameters(
@@ -580,6 +583,7 @@ class Guild(commands.Cog):
                 'SELECT "channel" FROM guild WHERE "id"=$1;',
                 ctx.character_data["guild"],
             )
+        await self.bot.stats.invalidate(ctx.author)
 
         if channel:
             with suppress(discord.Forbidden, discord.HTTPException):
@@ -604,9 +608,7 @@ class Guild(commands.Cog):
             Only guild leaders and officers can use this command."""
         )
         if not hasattr(ctx, "user_data"):
-            ctx.user_data = await self.bot.pool.fetchrow(
-                'SELECT * FROM profile WHERE "user"=$1;', member
-            )
+            ctx.user_data = await ctx.profiles.get(member)
         else:
             member = member.id
 
@@ -623,6 +625,7 @@ class Guild(commands.Cog):
             channel = await conn.fetchval(
                 'SELECT channel FROM guild WHERE "id"=$1;', ctx.character_data["guild"]
             )
+        await self.bot.stats.invalidate(member)
         if channel:
             with suppress(discord.Forbidden, discord.HTTPException):
                 with handle_message_parameters(
@@ -655,12 +658,15 @@ class Guild(commands.Cog):
                         'DELETE FROM guild WHERE "leader"=$1 RETURNING "channel";',
                         ctx.author.id,
                     )
-                    await conn.execute(
-                        'UPDATE profile SET "guild"=$1, "guildrank"=$2 WHERE "guild"=$3;',
+                    members = await conn.fetch(
+                        'UPDATE profile SET "guild"=$1, "guildrank"=$2 WHERE "guild"=$3'
+                        ' RETURNING "user";',
                         0,
                         "Member",
                         ctx.character_data["guild"],
                     )
+            await self.bot.stats.invalidate(*[m["user"] for m in members])
+            await self.bot.stats.invalidate_alliance(ctx.character_data["guild"])
             if channel:
                 with suppress(discord.Forbidden, discord.HTTPException):
                     with handle_message_parameters(
@@ -1467,11 +1473,7 @@ class Guild(commands.Cog):
 
 
         guild_id = ctx.character_data["guild"]
-        keys_to_delete = await self.bot.redis.keys(f"guildcd:{guild_id}:*")
-
-            # Delete each matching key
-        if keys_to_delete:
-            await ctx.bot.redis.delete(*keys_to_delete)
+        if await self.bot.cooldowns.clear(cooldowns.GUILD, guild_id):
             await ctx.send(f"All cooldown entries for guild ID {guild_id} have been deleted.")
         else:
             await ctx.send(f"No cooldown entries found for guild ID {guild_id}.")
@@ -1540,15 +1542,14 @@ class Guild(commands.Cog):
 
             joined = []
 
-            # Gather participants' data
-            async with self.bot.pool.acquire() as conn:
-                for u in view.joined:
-                    user = await conn.fetchrow(
-                        'SELECT * FROM profile WHERE "user"=$1;', u.id
-                    )
-                    if user and user["guild"] == guild["id"]:
-                        difficulty += int(rpgtools.xptolevel(user["xp"]))
-                        joined.append(u)
+            # Gather participants' data, the rows the checks loaded are outdated by now
+            ctx.profiles.refresh(ctx.author.id)
+            profiles = await ctx.profiles.get_many([u.id for u in view.joined])
+            for u in view.joined:
+                user = profiles.get(u.id)
+                if user and user["guild"] == guild["id"]:
+                    difficulty += int(rpgtools.xptolevel(user["xp"]))
+                    joined.append(u)
 
             # Update the advmembers column for the specified guild
             async with self.bot.pool.acquire() as conn:
@@ -2173,19 +2174,16 @@ class Guild(commands.Cog):
         _(
             """Lists guild-specific cooldowns, meaning all guild members have these cooldowns and cannot use the commands."""
         )
-        cooldowns = await self.bot.redis.execute_command(
-            "KEYS", f"guildcd:{ctx.character_data['guild']}:*"
+        running = await self.bot.cooldowns.timers(
+            cooldowns.GUILD, ctx.character_data["guild"]
         )
         adv = await self.bot.get_guild_adventure(ctx.character_data["guild"])
-        if not cooldowns and (not adv or adv[2]):
+        if not running and (not adv or adv[2]):
             return await ctx.send(
                 _("You don't have any active cooldown at the moment.")
             )
         timers = _("Commands on cooldown:")
-        for key in cooldowns:
-            key = key.decode()
-            cooldown = await self.bot.redis.execute_command("TTL", key)
-            cmd = key.replace(f"guildcd:{ctx.character_data['guild']}:", "")
+        for cmd, cooldown in running:
             text = _("{cmd} is on cooldown and will be available after {time}").format(
                 cmd=cmd, time=timedelta(seconds=int(cooldown))
             )
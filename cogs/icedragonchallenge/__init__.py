@@ -1,4 +1,3 @@
-from decimal import Decimal
 
 import discord
 from discord.ext import commands
@@ -9,6 +8,17 @@ from collections import deque
 
 from cogs.shard_communication import user_on_cooldown
 from utils.checks import has_char, is_gm, is_patreon
+from utils.combat.effect import Effects
+from utils.combat.engine import (
+    TANK_EVOLUTION_LEVELS,
+    TURN_ORDER_SHUFFLED,
+    Battle,
+    Combatant,
+    Rules,
+    evolution_tier,
+)
+from utils.combat.entity import Faction
+from utils.combat.skill import Action, BaseSkill, SkillDeck, SkillType, Target
 from utils.i18n import _
 from utils import misc as rpgtools
 
@@ -477,198 +487,85 @@ class IceDragonChallenge(commands.Cog):
             error_message = f"Error occurred: {e}\n" + traceback.format_exc()
             await ctx.send(error_message)
 
-    async def apply_effect(self, target, effect, damage, action_log):
-        """Apply special effects from dragon moves"""
-        effect_duration = 2  # rounds
-
-        if effect == "freeze":
-            target["frozen"] = effect_duration
-            action_log.append(
-                f"{target['user'].display_name if not target.get('is_pet') else target['pet_name']} is frozen solid! ❄️"
-            )
-        elif effect == "dot":
-            dot_damage = round(float(damage) * 0.2, 2)
-            target["dot"] = {"damage": dot_damage, "duration": effect_duration}
-            action_log.append(
-                f"{target['user'].display_name if not target.get('is_pet') else target['pet_name']} is taking frost damage over time! ☠️"
-            )
-        elif effect == "random_debuff":
-            debuffs = ["damage_down", "armor_down"]
-            debuff = random.choice(debuffs)
-
-            # Store original stats before debuff
-            if debuff == "damage_down":
-                target["original_damage"] = target["damage"]  # Store original damage
-                target["damage"] = round(float(target["damage"]) * 0.7, 2)  # Reduce damage by 30%
-                debuff_text = "Damage heavily reduced%"
-            elif debuff == "armor_down":
-                target["original_armor"] = target["armor"]  # Store original armor
-                target["armor"] = round(float(target["armor"]) * 0.7, 2)  # Reduce armor by 30%
-                debuff_text = "Armor heavily reduced"
-
-            # Store debuff info with duration
-            target[debuff] = {
-                "duration": effect_duration,
-                "type": debuff
-            }
+    def dragon_skills(self, moves):
+        """
+        Turn the moves of a dragon stage into skills for the dragon's deck
 
-            action_log.append(
-                f"{target['user'].display_name if not target.get('is_pet') else target['pet_name']} is debuffed: {debuff_text}! ⚡"
-            )
-        elif effect == "summon_adds":
-            num_soldiers = random.randint(1, 3)
-            soldier_damage = round(float(damage) * 0.7 + 150, 2)  # Each soldier deals 70% of original damage
-            total_soldier_damage = round(float(soldier_damage * num_soldiers), 2)
-            target["hp"] = round(max(0, float(target["hp"]) - total_soldier_damage), 2)
-            action_log.append(
-                f"{num_soldiers} Minions appear and attack {target['user'].display_name if not target.get('is_pet') else target['pet_name']} for **{total_soldier_damage:,.2f}HP**!"
-            )
-        elif effect == "stun":
-            target["stunned"] = effect_duration
-            action_log.append(
-                f"{target['user'].display_name if not target.get('is_pet') else target['pet_name']} is stunned! ⚡"
-            )
-        elif effect == "curse":
-            target["cursed"] = effect_duration
-            action_log.append(
-                f"{target['user'].display_name if not target.get('is_pet') else target['pet_name']} is cursed! Defense is slightly reduced! 👻"
-            )
-        elif effect == "aoe_dot":
-            dot_damage = round(float(damage) * 0.15, 2)  # 15% damage per turn
-            target["dot"] = {"damage": dot_damage, "duration": effect_duration}
-            action_log.append(
-                f"🌀 Dark energy swirls around {target['user'].display_name if not target.get('is_pet') else target['pet_name']}, dealing damage over time!"
-            )
-        elif effect == "steal_buffs":
-            target["buffs_stolen"] = effect_duration
-            action_log.append(
-                f"{target['user'].display_name if not target.get('is_pet') else target['pet_name']} had their buffs stolen! 💫"
-            )
-        elif effect == "aoe":
-            # Don't log AOE message, it's handled in execute_dragon_move
-            pass
-        elif effect == "execute":
-            if target["hp"] / target["max_hp"] <= 1.0:  # If target is below 20% HP
-                damage = round(float(target["hp"]), 2)  # Instant kill
-                target["hp"] = 0
-                action_log.append(
-                    f"{target['user'].display_name if not target.get('is_pet') else target['pet_name']} is executed! ⚰️"
+        The dragon uses a special move 40% of the time, split between the moves
+        by their chance. Returns skill -> (effect message, minions) for the log.
+        """
+        total = sum(move["chance"] for move in moves.values())
+        skills = {}
+        for move_name, move in moves.items():
+            effect = move["effect"]
+            # (share of the move's chance, effects, action options, message, minions)
+            if effect == "freeze":
+                variants = [(1, Effects(frozen=2), {}, "{name} is frozen solid! ❄️", 0)]
+            elif effect == "stun":
+                variants = [(1, Effects(stunned=2), {}, "{name} is stunned! ⚡", 0)]
+            elif effect == "dot":
+                variants = [(1, Effects(frostbite=2), {"over_time": 0.2},
+                             "{name} is taking frost damage over time! ☠️", 0)]
+            elif effect == "aoe_dot":
+                variants = [(1, Effects(frostbite=2), {"over_time": 0.15},
+                             "🌀 Dark energy swirls around {name}, dealing damage over time!", 0)]
+            elif effect == "arena_hazard":
+                variants = [(1, Effects(frostbite=2), {"over_time": 0.1},
+                             "The arena is filled with deadly ice shards! ❄️", 0)]
+            elif effect == "random_debuff":
+                variants = [
+                    (0.5, Effects(weakened=2), {}, "{name} is debuffed: Damage heavily reduced! ⚡", 0),
+                    (0.5, Effects(brittle=2), {}, "{name} is debuffed: Armor heavily reduced! ⚡", 0),
+                ]
+            elif effect == "summon_adds":
+                variants = [
+                    (1 / 3, Effects(), {}, "{minions} Minions appear and attack {name} for **{damage:,.2f}HP**!", minions)
+                    for minions in range(1, 4)
+                ]
+            elif effect == "curse":
+                variants = [(1, Effects(brittle=2), {}, "{name} is cursed! Defense is slightly reduced! 👻", 0)]
+            elif effect == "steal_buffs":
+                variants = [(1, Effects(), {}, "{name} had their buffs stolen! 💫", 0)]
+            elif effect == "execute":
+                variants = [(1, Effects(), {"execute_below": 1.0}, "{name} is executed! ⚰️", 0)]
+            elif effect == "aoe":
+                variants = [(1, Effects(), {"variance": 100}, "", 0)]
+            else:
+                variants = [(1, Effects(), {}, "", 0)]
+
+            for share, effects, options, message, minions in variants:
+                actions = [
+                    Action(
+                        target=Target.Hostile,
+                        damage=move["dmg"],
+                        healing=0,
+                        causes_effects=effects,
+                        removes_effects=Effects(),
+                        **options,
+                    )
+                ]
+                if minions:
+                    # Each minion deals 70% of the move's damage, ignoring armor
+                    actions.append(
+                        Action(
+                            target=Target.Hostile,
+                            damage=minions * (move["dmg"] * 0.7 + 150),
+                            healing=0,
+                            causes_effects=Effects(),
+                            removes_effects=Effects(),
+                            pierce=True,
+                        )
+                    )
+                skill = BaseSkill(
+                    skill_type=SkillType.SpecialAttack,
+                    actions=actions,
+                    name=move_name,
+                    recharge=0,
+                    chance=0.4 * move["chance"] / total * share,
+                    area=effect == "aoe",
                 )
-        elif effect == "arena_hazard":
-            hazard_damage = round(float(damage) * 0.1, 2)
-            target["arena_hazard"] = {"damage": hazard_damage, "duration": effect_duration}
-            action_log.append(
-                f"The arena is filled with deadly ice shards! ❄️"
-            )
-
-    async def execute_dragon_move(self, dragon_stats, targets, action_log):
-        """Execute a special dragon move with clear damage messages"""
-        stage_name, stage_data = await self.get_current_stage()
-        moves = stage_data["moves"]
-
-        selected_move = random.choices(
-            list(moves.keys()),
-            weights=[move["chance"] for move in moves.values()]
-        )[0]
-        move_data = moves[selected_move]
-
-        if move_data["effect"] == "aoe":
-            total_damage = []
-            for target in targets:
-                if target["hp"] <= 0:
-                    continue
-                bonus = Decimal(random.randint(0, 100))
-                # Calculate damage and round to two decimal places
-                damage = max(1, round(float(move_data["dmg"]) - float(target["armor"]) + float(bonus), 2))
-                if target.get("damage_reduction"):
-                    damage *= (1 - target["damage_reduction"])
-                    damage = round(damage, 2)  # Round again after applying damage reduction
-                target["hp"] = max(0, round(float(target["hp"]) - damage, 2))
-                name = target['user'].display_name if not target.get('is_pet') else target['pet_name']
-                total_damage.append(f"**{name}** ({damage:,.2f}HP)")
-                # Apply effect without adding to action log
-                await self.apply_effect(target, move_data["effect"], damage, [])
-
-            action_log.append(f"Dragon unleashes **{selected_move}**!\nDamage dealt to: {' | '.join(total_damage)}")
-
-
-        elif move_data["effect"] == "multihit":
-
-            valid_targets = [t for t in targets if t["hp"] > 0]
-
-            if valid_targets:
-
-                target = random.choice(valid_targets)
-
-                name = target['user'].display_name if not target.get('is_pet') else target['pet_name']
-
-                hits = random.randint(2, 4)
-
-                total_damage = 0
-
-                for _ in range(hits):
-
-                    base_damage = round(move_data["dmg"] / hits, 2)  # Ensure base damage is rounded
-
-                    damage = max(1, round(base_damage - float(target["armor"]), 2))
-
-                    if target.get("damage_reduction"):
-                        damage *= (1 - target["damage_reduction"])
-
-                        damage = round(damage, 2)  # Round after applying damage reduction
-
-                    total_damage += damage
-
-                    target["hp"] = max(0, round(float(target["hp"]) - damage, 2))
-
-                action_log.append(f"Dragon unleashes **{selected_move}** on **{name}**!\n"
-
-                                  f"Strikes {hits} times for **{total_damage:,.2f}HP** total damage!")
-
-                # Apply effect after damage
-
-                effect_log = []
-
-                await self.apply_effect(target, move_data["effect"], total_damage, effect_log)
-
-                # Add any effect messages to the action log
-
-                action_log.extend(effect_log)
-
-
-
-        else:  # Single target attacks
-
-            valid_targets = [t for t in targets if t["hp"] > 0]
-
-            if valid_targets:
-
-                target = random.choice(valid_targets)
-
-                name = target['user'].display_name if not target.get('is_pet') else target['pet_name']
-
-                damage = max(1, round(move_data["dmg"] - float(target["armor"]), 2))
-
-                if target.get("damage_reduction"):
-                    damage *= (1 - target["damage_reduction"])
-
-                    damage = round(damage, 2)  # Round after applying damage reduction
-
-                target["hp"] = max(0, round(float(target["hp"]) - damage, 2))
-
-                action_log.append(f"Dragon unleashes **{selected_move}** on **{name}**!\n"
-
-                                  f"Deals **{damage:,.2f}HP** damage!")
-
-                # Apply effect and collect any effect messages
-
-                effect_log = []
-
-                await self.apply_effect(target, move_data["effect"], damage, effect_log)
-
-                # Add any effect messages to the action log
-
-                action_log.extend(effect_log)
+                skills[skill] = (message, minions)
+        return skills
 
     def get_effect_text(self, effect):
         """Get descriptive text for effects"""
@@ -821,80 +718,7 @@ class IceDragonChallenge(commands.Cog):
 
     async def update_battle_embed(self, battle_msg, dragon, battle_participants, battle_log):
         """Update the battle embed with the latest stats and battle log"""
-        embed = discord.Embed(
-            title=f"🐉 {dragon['name']} Battle",
-            color=0x87CEEB
-        )
-
-        # Dragon HP
-        hp_bar = self.create_hp_bar(dragon["hp"], dragon["max_hp"])
-        embed.add_field(
-            name=f"**[BOSS] {dragon['name']}**",
-            value=f"**HP:** {dragon['hp']:,.1f}/{dragon['max_hp']:,.1f}\n{hp_bar}",
-            inline=False
-        )
-
-        # Track which player each pet belongs to
-        player_pets = {}
-        for combatant in battle_participants:
-            if combatant.get("is_pet"):
-                player_pets[combatant["owner_id"]] = combatant
-
-        # Track players in order of appearance to assign teams
-        player_teams = {}  # Map player IDs to team letters
-        team_letters = ['A', 'B', 'C', 'D']
-        current_team = 0
-
-        # First pass to assign teams to players
-        for combatant in battle_participants:
-            if not combatant.get("is_pet"):
-                if combatant["user"].id not in player_teams and current_team < 4:
-                    player_teams[combatant["user"].id] = team_letters[current_team]
-                    current_team += 1
-
-        # Display participants with proper team labels
-        for combatant in battle_participants:
-            current_hp = max(0, round(combatant["hp"], 1))
-            max_hp = round(combatant["max_hp"], 1)
-            hp_bar = self.create_hp_bar(current_hp, max_hp)
-
-            # Gather status effects
-            status_effects = []
-            if combatant.get("frozen"): status_effects.append("❄️")
-            if combatant.get("stunned"): status_effects.append("⚡")
-            if combatant.get("dot"): status_effects.append("☠️")
-            if combatant.get("cursed"): status_effects.append("👻")
-            if combatant.get("damage_down"): status_effects.append("⬇️")
-            if combatant.get("armor_down"): status_effects.append("🛡️")
-            if combatant.get("buffs_stolen"): status_effects.append("💫")
-            if combatant.get("healing_corrupted"): status_effects.append("🔻")
-            if combatant.get("damage_reduction"): status_effects.append("🛡️")
-
-            status = " ".join(status_effects)
-
-            if not combatant.get("is_pet"):
-                # For players, get their assigned team
-                team = player_teams.get(combatant["user"].id, "?")
-                name = f"**[TEAM {team}] {combatant['user'].display_name}** {status}"
-            else:
-                # For pets, use same team as their owner
-                owner_id = combatant["owner_id"]
-                team = player_teams.get(owner_id, "?")
-                name = f"**[TEAM {team}] {combatant['pet_name']}** {status}"
-
-            embed.add_field(
-                name=name,
-                value=f"**HP:** {current_hp:.1f}/{max_hp:.1f}\n{hp_bar}",
-                inline=False
-            )
-
-        # Add last 6 battle log entries
-        last_logs = list(battle_log)[-6:]
-        log_text = "\n\n".join(last_logs)
-        embed.add_field(name="**Battle Log**", value=log_text, inline=False)
-
-        await battle_msg.edit(embed=embed)
-
+        await battle_msg.edit(embed=await self.create_battle_embed(dragon, battle_participants, battle_log))
 
     async def fetch_highest_element(self, user_id):
         """Fetch highest element for a user"""
@@ -912,67 +736,49 @@ class IceDragonChallenge(commands.Cog):
             return "Unknown"
 
     async def create_battle_embed(self, dragon, battle_participants, battle_log):
-        """Create the initial battle embed with stats and log"""
+        """Create the battle embed with stats and log"""
         embed = discord.Embed(
-            title=f"🐉 {dragon['name']} Battle",
+            title=f"🐉 {dragon.key} Battle",
             color=0x87CEEB
         )
 
         # Dragon HP
-        hp_bar = self.create_hp_bar(dragon["hp"], dragon["max_hp"])
+        hp_bar = self.create_hp_bar(dragon.hp, dragon.max_hp)
         embed.add_field(
-            name=f"**[BOSS] {dragon['name']}**",
-            value=f"**HP:** {dragon['hp']:,.1f}/{dragon['max_hp']:,.1f}\n{hp_bar}",
+            name=f"**[BOSS] {dragon.key}**",
+            value=f"**HP:** {dragon.hp:,.1f}/{dragon.max_hp:,.1f}\n{hp_bar}",
             inline=False
         )
 
-        # Track which player each pet belongs to
-        player_pets = {}
-        for combatant in battle_participants:
-            if combatant.get("is_pet"):
-                player_pets[combatant["owner_id"]] = combatant
-
-        # Track players in order of appearance to assign teams
+        # Players get team letters in order of appearance, pets share their owner's
         player_teams = {}  # Map player IDs to team letters
         team_letters = ['A', 'B', 'C', 'D']
-        current_team = 0
-
-        # First pass to assign teams to players
         for combatant in battle_participants:
-            if not combatant.get("is_pet"):
-                if combatant["user"].id not in player_teams and current_team < 4:
-                    player_teams[combatant["user"].id] = team_letters[current_team]
-                    current_team += 1
+            if not combatant.is_pet and len(player_teams) < len(team_letters):
+                player_teams.setdefault(combatant.owner.id, team_letters[len(player_teams)])
 
         # Participants
         for combatant in battle_participants:
-            current_hp = max(0, round(combatant["hp"], 1))
-            max_hp = round(combatant["max_hp"], 1)
+            current_hp = max(0, round(combatant.hp, 1))
+            max_hp = round(combatant.max_hp, 1)
             hp_bar = self.create_hp_bar(current_hp, max_hp)
 
             # Gather all status effects
+            effects = combatant.effects
             status_effects = []
-            if combatant.get("frozen"): status_effects.append("❄️")
-            if combatant.get("stunned"): status_effects.append("⚡")
-            if combatant.get("dot"): status_effects.append("☠️")
-            if combatant.get("cursed"): status_effects.append("👻")
-            if combatant.get("damage_down"): status_effects.append("⬇️")
-            if combatant.get("armor_down"): status_effects.append("🛡️")
-            if combatant.get("buffs_stolen"): status_effects.append("💫")
-            if combatant.get("healing_corrupted"): status_effects.append("🔻")
-            if combatant.get("damage_reduction"): status_effects.append("🛡️")
+            if effects.frozen: status_effects.append("❄️")
+            if effects.stunned: status_effects.append("⚡")
+            if effects.frostbite: status_effects.append("☠️")
+            if effects.weakened: status_effects.append("⬇️")
+            if effects.brittle: status_effects.append("🛡️")
 
             status = " ".join(status_effects)
 
-            if not combatant.get("is_pet"):
-                # For players, get their assigned team
-                team = player_teams.get(combatant["user"].id, "?")
-                name = f"**[TEAM {team}] {combatant['user'].display_name}** {status}"
+            team = player_teams.get(combatant.owner.id, "?")
+            if not combatant.is_pet:
+                name = f"**[TEAM {team}] {combatant.owner.display_name}** {status}"
             else:
-                # For pets, use same team as their owner
-                owner_id = combatant["owner_id"]
-                team = player_teams.get(owner_id, "?")
-                name = f"**[TEAM {team}] {combatant['pet_name']}** {status}"
+                name = f"**[TEAM {team}] {combatant.key}** {status}"
 
             embed.add_field(
                 name=name,
@@ -980,8 +786,8 @@ class IceDragonChallenge(commands.Cog):
                 inline=False
             )
 
-        # Add battle log (initial log will only have the start message)
-        embed.add_field(name="**Battle Log**", value="\n".join(list(battle_log)[-6:]), inline=False)
+        # Add last 6 battle log entries
+        embed.add_field(name="**Battle Log**", value="\n\n".join(list(battle_log)[-6:]), inline=False)
 
         return embed
 
@@ -1057,18 +863,17 @@ class IceDragonChallenge(commands.Cog):
         """Start a fight with the Ice Dragon"""
         await self.check_weekly_reset()
 
-        # Initialize dragon
+        # Initialize dragon, its special moves come from the deck
         dragon_stats = await self.calculate_dragon_stats()
-        dragon = {
-            "name": dragon_stats["name"],
-            "hp": dragon_stats["hp"],
-            "max_hp": dragon_stats["hp"],
-            "damage": dragon_stats["damage"],
-            "armor": dragon_stats["armor"],
-            "stage": dragon_stats["stage"],
-            "passive_effects": dragon_stats["passive_effects"],
-            "is_dragon": True
-        }
+        skills = self.dragon_skills(dragon_stats["moves"])
+        dragon = Combatant(
+            dragon_stats["name"],
+            Faction.Two,
+            dragon_stats["hp"],
+            dragon_stats["damage"],
+            dragon_stats["armor"],
+            deck=SkillDeck(list(skills)),
+        )
 
         async with self.bot.pool.acquire() as conn:
             result = await conn.fetchrow(
@@ -1087,144 +892,132 @@ class IceDragonChallenge(commands.Cog):
         async with self.bot.pool.acquire() as conn:
             party_stats = await self.get_party_stats(ctx, party_members, conn)
 
-        # Debug: await ctx.send party_stats
         await ctx.send("Party Stats:")
-        for idx, (player, pet) in enumerate(party_stats, start=1):
-            player_name = player["user"].display_name if not player.get("is_pet", False) else player.get("pet_name",
-                                                                                                         "Unknown Pet")
-            pet_name = pet["pet_name"] if pet else "No Pet"
-            #await ctx.send(f"  Member {idx}: Player: {player_name}, Pet: {pet_name}")
 
 
 
 
-        # Ensure uniqueness in party members by converting to dictionaries
-        unique_participants = {}
+        # Every party member joins once, followed by their pet
         battle_participants = []
+        seen_ids = set()
         for player, pet in party_stats:
-            # Handle player
-            if not player.get("is_pet", False):
-                player_id = player["user"].id
-                playername = player["user"]
-                if player_id not in unique_participants:
-                    player_stats = await self.get_player_stats(playername, player_id)
-                    # Get tank evolution level if any
-                    async with self.bot.pool.acquire() as conn:
-                        result = await conn.fetchrow('SELECT class FROM profile WHERE "user" = $1', player_id)
-                        if result and result['class']:
-                            classes = result['class'] if isinstance(result['class'], list) else [result['class']]
-
-                            # Check for tank class
-                            tank_evolution = None
-                            tank_evolution_levels = {
-                                "Protector": 1,
-                                "Guardian": 2,
-                                "Bulwark": 3,
-                                "Defender": 4,
-                                "Vanguard": 5,
-                                "Fortress": 6,
-                                "Titan": 7,
-                            }
-
-                            for class_name in classes:
-                                if class_name in tank_evolution_levels:
-                                    level = tank_evolution_levels[class_name]
-                                    if tank_evolution is None or level > tank_evolution:
-                                        tank_evolution = level
-
-                            # Apply tank HP bonus if tank class found
-                            if tank_evolution:
-                                health_multiplier = 1 + (0.04 * tank_evolution)  # 5% per level
-                                player_stats["hp"] *= health_multiplier
-                                player_stats["max_hp"] *= health_multiplier
-
-                    player_dict = {
-                        "user": player["user"],
-                        "hp": player_stats["hp"],
-                        "max_hp": player_stats["max_hp"],
-                        "damage": player_stats["damage"],
-                        "armor": player_stats["armor"],
-                        "is_dragon": False,
-                        "is_pet": False,
-                        "tank_evolution": tank_evolution if tank_evolution else None,
-                    }
-                    unique_participants[player_id] = player_dict
-                    battle_participants.append(player_dict)
-
-            else:
-                # If player is already a pet or another type
-                battle_participants.append(player)
-                #await ctx.send(f"Added player (non-Member type) to battle: {player}")
+            member = player["user"]
+            if member.id in seen_ids:
+                continue
+            seen_ids.add(member.id)
+
+            player_stats = await self.get_player_stats(member, member.id)
+            # Get tank evolution level if any
+            tank_evolution = None
+            async with self.bot.pool.acquire() as conn:
+                result = await conn.fetchrow('SELECT class FROM profile WHERE "user" = $1', member.id)
+            if result and result['class']:
+                classes = result['class'] if isinstance(result['class'], list) else [result['class']]
+                tank_evolution = evolution_tier(classes, TANK_EVOLUTION_LEVELS)
+
+            # Apply tank HP bonus if tank class found
+            health_multiplier = 1 + (0.04 * tank_evolution) if tank_evolution else 1
+            battle_participants.append(
+                Combatant(
+                    member.id,
+                    Faction.One,
+                    float(player_stats["hp"]) * health_multiplier,
+                    player_stats["damage"],
+                    player_stats["armor"],
+                    owner=member,
+                    tank_evolution=tank_evolution,
+                )
+            )
 
-            # Handle pet
             if pet:
-                if pet.get("is_pet", False):
-                    owner_id = pet.get("owner_id", "unknown_owner")
-                    pet_name = pet.get("pet_name", "unknown_pet")
-                    pet_unique_id = f"pet_{owner_id}_{pet_name}"
-                    if pet_unique_id not in unique_participants:
-                        pet_stats = await self.get_pet_stats(pet["user"].id)
-                        pet_dict = {
-                            "user": pet["user"],
-                            "owner_id": owner_id,
-                            "pet_name": pet_name,
-                            "hp": pet_stats["hp"],
-                            "max_hp": pet_stats["max_hp"],
-                            "damage": pet_stats["damage"],
-                            "armor": pet_stats["armor"],
-                            "is_dragon": False,
-                            "is_pet": True,
-                            # Add other necessary attributes
-                        }
-                        unique_participants[pet_unique_id] = pet_dict
-                        battle_participants.append(pet_dict)
-                else:
-                    # If pet is already a dictionary or another type
-                    battle_participants.append(pet)
-                    #await ctx.send(f"Added pet (non-Member type) to battle: {pet}")
-            else:
-                player_name = player["user"].display_name if not player.get("is_pet", False) else player.get("pet_name",
-                                                                                                             "Unknown Pet")
-                #await ctx.send(f"No pet for player: {player_name}")
-
-        # Initialize battle turn order
-        initial_turn_order = [dragon] + battle_participants
-        random.shuffle(initial_turn_order)
+                pet_stats = await self.get_pet_stats(member.id)
+                battle_participants.append(
+                    Combatant(
+                        pet["pet_name"],
+                        Faction.One,
+                        pet_stats["hp"],
+                        pet_stats["damage"],
+                        pet_stats["armor"],
+                        is_pet=True,
+                        owner=member,
+                    )
+                )
 
-        # Remove duplicates based on unique identifiers
-        seen_ids = set()
-        unique_turn_order = []
-        for entity in initial_turn_order:
-            if entity.get("is_dragon", False):
-                entity_id = "dragon"
-            elif entity.get("is_pet", False):
-                owner_id = entity.get("owner_id", "unknown_owner")
-                pet_name = entity.get("pet_name", "unknown_pet")
-                entity_id = f"pet_{owner_id}_{pet_name}"
-            else:
-                entity_id = entity["user"].id
+        # Everyone acts once per round in one random order
+        battle = Battle(
+            [dragon, *battle_participants],
+            rules=Rules(
+                turn_order=TURN_ORDER_SHUFFLED,
+                # the dragon goes for tanks 85% of the time
+                tank_focus=0.85,
+                player_target_weight=1,
+                pet_target_weight=1,
+                pet_variance=100,
+                precision=2,
+                element_modifiers=False,
+            ),
+        )
 
-            if entity_id not in seen_ids:
-                seen_ids.add(entity_id)
-                unique_turn_order.append(entity)
-                name = "Dragon" if entity.get("is_dragon", False) else (
-                    entity["user"].display_name if not entity.get("is_pet", False) else entity["pet_name"]
-                )
-                #await ctx.send(f"Added to turn order: {name}")
-        random.shuffle(unique_turn_order)
-
-        battle_turn_order = unique_turn_order
-
-        # Debug: await ctx.send final turn order
-        #await ctx.send("Final battle turn order:")
-        for entity in battle_turn_order:
-            if entity.get("is_dragon", False):
-                name = "Dragon"
-            elif entity.get("is_pet", False):
-                name = entity.get("pet_name", "Unknown Pet")
+        def name_of(combatant):
+            return combatant.key if combatant.is_pet else combatant.owner.display_name
+
+        def describe(event):
+            """Turns an event into battle log entries"""
+            entries = []
+            attacker = event.attacker
+            if attacker is dragon:
+                if event.skill is None:
+                    hit = event.hits[0]
+                    message = f"Dragon attacks **{name_of(hit.target)}** for **{hit.damage:,.1f}HP** damage"
+                    if hit.target in event.defeated:
+                        message += f"\n**{name_of(hit.target)}** has fallen! ☠️"
+                    entries.append(message + "!")
+                    return entries
+
+                effect_message, minions = skills[event.skill]
+                main_hits = [hit for hit in event.hits if hit.action is event.skill.actions[0]]
+                if event.skill.area:
+                    dealt = " | ".join(f"**{name_of(hit.target)}** ({hit.damage:,.2f}HP)" for hit in main_hits)
+                    entries.append(f"Dragon unleashes **{event.skill.name}**!\nDamage dealt to: {dealt}")
+                elif main_hits:
+                    hit = main_hits[0]
+                    entries.append(
+                        f"Dragon unleashes **{event.skill.name}** on **{name_of(hit.target)}**!\n"
+                        f"Deals **{hit.damage:,.2f}HP** damage!"
+                    )
+                    if effect_message and (hit.executed or not hit.action.execute_below):
+                        entries.append(
+                            effect_message.format(
+                                name=name_of(hit.target),
+                                minions=minions,
+                                damage=sum(h.damage for h in event.hits if h is not hit),
+                            )
+                        )
+                for fallen in event.defeated:
+                    entries.append(f"**{name_of(fallen)}** has fallen! ☠️")
+                return entries
+
+            # Player/Pet turn
+            name = name_of(attacker)
+            if event.incapacitated:
+                status = "frozen" if attacker.effects.frozen or "frozen" in event.expired else "stunned"
+                entries.append(f"**{name}** is {status} and cannot move!")
+            for effect, debuff in (("weakened", "damage down"), ("brittle", "armor down")):
+                if effect in event.expired:
+                    entries.append(f"**{name}**'s {debuff} effect has worn off!")
+
+            if event.hits:
+                message = f"**{name}** attacks dragon for **{event.damage:,.1f}HP** damage"
+                if event.self_damage > 0:
+                    message += f" and takes **{event.self_damage:,.1f}HP** damage from bleeding"
+            elif event.self_damage > 0:
+                message = f"**{name}** takes **{event.self_damage:,.1f}HP** damage from bleeding"
             else:
-                name = entity["user"].display_name
-            #await ctx.send(f"- {name}")
+                return entries
+            if attacker in event.defeated:
+                message += f"\n**{name}** has fallen! ☠️"
+            entries.append(message + "!")
+            return entries
 
         # Initialize battle log and message
         battle_log = deque(maxlen=20)
@@ -1252,174 +1045,24 @@ class IceDragonChallenge(commands.Cog):
         try:
             start_time = datetime.utcnow()
             action_number = 2
-            battle_ongoing = True
-            current_round = 1
-
-            while battle_ongoing and datetime.utcnow() < start_time + timedelta(minutes=15):
-                try:
-                    #await ctx.send(f"--- Starting Round {current_round} ---")
-
-                    # Reset turn order at start of each round to match initial order
-                    active_turn_order = battle_turn_order.copy()
-                    round_order_names = [
-                        "Dragon" if entity.get("is_dragon", False) else (
-                            entity["user"].display_name if not entity.get("is_pet", False) else entity["pet_name"]
-                        )
-                        for entity in active_turn_order
-                    ]
-                    #await ctx.send(f"Round {current_round} order: {round_order_names}")
-
-                    # Process each participant's turn in the fixed order
-                    for entity in active_turn_order:
-                        if not battle_ongoing:
-                            break
-
-                        # Skip if entity died
-                        if entity["hp"] <= 0:
-                            name = "Dragon" if entity.get("is_dragon", False) else (
-                                entity["user"].display_name if not entity.get("is_pet", False) else entity["pet_name"]
-                            )
-                            #await ctx.send(f"Skipping dead entity: {name}")
-                            continue
-
-                        # Check battle end conditions
-                        if dragon["hp"] <= 0 or all(p["hp"] <= 0 for p in battle_participants):
-                            battle_ongoing = False
-                            break
-
-                        # Rest of your turn processing code
-                        current_action_log = []
-
-                        if entity.get("is_dragon"):
-                            # Dragon's turn
-                            valid_targets = [p for p in battle_participants if p["hp"] > 0]
-                            if not valid_targets:
-                                battle_ongoing = False
-                                break
-
-                            use_special = random.random() < 0.4
-                            if use_special:
-                                await self.execute_dragon_move(dragon_stats, valid_targets, current_action_log)
-                            else:
-                                # Identify tanks among valid targets
-                                tanks = [p for p in valid_targets if p.get("tank_evolution") is not None]
-
-                                # 60% chance to target a tank if any exist
-                                if tanks and random.random() < 0.85:
-                                    target = random.choice(tanks)
-                                else:
-                                    target = random.choice(valid_targets)
-
-                                bonus = Decimal(random.randint(0, 100))
-                                # Calculate damage and round to two decimal places
-                                damage = round(
-                                    max(1, float(dragon["damage"]) - float(target["armor"]) + float(bonus), 2))
-                                if target.get("damage_reduction"):
-                                    damage *= (1 - target["damage_reduction"])
-                                target["hp"] = max(0, target["hp"] - damage)
-                                name = target["user"].display_name if not target.get("is_pet", False) else target[
-                                    "pet_name"]
-                                message = f"Dragon attacks **{name}** for **{damage:,.1f}HP** damage"
-
-                                if target["hp"] <= 0:
-                                    message += f"\n**{name}** has fallen! ☠️"
-                                message += "!"
-                                current_action_log.append(message)
 
-                        else:
-                            # Player/Pet turn
-                            name = entity["user"].display_name if not entity.get("is_pet", False) else entity[
-                                "pet_name"]
-
-                            # Process status effects
-                            can_attack = True
-                            if entity.get("frozen") or entity.get("stunned"):
-                                status = "frozen" if entity.get("frozen") else "stunned"
-                                current_action_log.append(f"**{name}** is {status} and cannot move!")
-                                can_attack = False
-
-                                for status_effect in ["frozen", "stunned"]:
-                                    if entity.get(status_effect):
-                                        entity[status_effect] -= 1
-                                        if entity[status_effect] <= 0:
-                                            del entity[status_effect]
-
-                            for debuff in ["damage_down", "armor_down"]:
-                                if entity.get(debuff):
-                                    entity[debuff]["duration"] -= 1
-                                    if entity[debuff]["duration"] <= 0:
-                                        # Restore original stats
-                                        if debuff == "damage_down":
-                                            entity["damage"] = entity["original_damage"]
-                                            del entity["original_damage"]
-                                        elif debuff == "armor_down":
-                                            entity["armor"] = entity["original_armor"]
-                                            del entity["original_armor"]
-                                        del entity[debuff]
-                                        current_action_log.append(
-                                            f"**{name}**'s {debuff.replace('_', ' ')} effect has worn off!")
-
-                            # Process DoTs
-                            dot_damage = 0
-                            for effect in ["dot", "arena_hazard"]:
-                                if entity.get(effect):
-                                    effect_data = entity[effect]
-                                    damage = effect_data["damage"]
-                                    entity["hp"] = max(0, entity["hp"] - damage)
-                                    dot_damage += damage
-
-                                    effect_data["duration"] -= 1
-                                    if effect_data["duration"] <= 0:
-                                        del entity[effect]
-
-                            if can_attack and entity["hp"] > 0:
-                                bonus = Decimal(random.randint(0, 100))
-                                damage = max(1,
-                                             round(float(entity["damage"]) - float(dragon["armor"]) + float(bonus), 2))
-
-                                if entity.get("damage_down"):
-                                    damage *= 0.7
-                                dragon["hp"] = round(max(0, float(dragon["hp"]) - float(damage)), 2)
-
-                                message = f"**{name}** attacks dragon for **{damage:,.1f}HP** damage"
-                                if dot_damage > 0:
-                                    message += f" and takes **{dot_damage:,.1f}HP** damage from bleeding"
-                                if entity["hp"] <= 0:
-                                    message += f"\n**{name}** has fallen! ☠️"
-                                message += "!"
-                                current_action_log.append(message)
-                            elif dot_damage > 0:
-                                message = f"**{name}** takes **{dot_damage:,.1f}HP** damage from bleeding"
-                                if entity["hp"] <= 0:
-                                    message += f"\n**{name}** has fallen! ☠️"
-                                message += "!"
-                                current_action_log.append(message)
-
-                        # Log actions and update display
-                        if current_action_log:
-                            for log_entry in current_action_log:
-                                battle_log.append(f"**Action #{action_number}**\n{log_entry}")
-                                action_number += 1
-                            await self.update_battle_embed(battle_msg, dragon, battle_participants, battle_log)
-                            await asyncio.sleep(2)
-
-                    #await ctx.send(f"--- End of Round {current_round} ---")
-                    current_round += 1
-
-                except Exception as e:
-                    import traceback
-                    error_message = f"Error occurred: {e}\n"
-                    error_message += traceback.format_exc()
-                    await ctx.send(error_message)
-                    print(error_message)
-                    continue
+            for event in battle.turns():
+                entries = describe(event)
+                if entries:
+                    for log_entry in entries:
+                        battle_log.append(f"**Action #{action_number}**\n{log_entry}")
+                        action_number += 1
+                    await self.update_battle_embed(battle_msg, dragon, battle_participants, battle_log)
+                    await asyncio.sleep(2)
+                if datetime.utcnow() >= start_time + timedelta(minutes=15):
+                    break
 
             # Handle battle end
-            if dragon["hp"] <= 0:
+            if not dragon.alive:
                 battle_log.append(f"**Action #{action_number}**\nThe dragon has been defeated! Victory! 🎉")
                 await self.update_battle_embed(battle_msg, dragon, battle_participants, battle_log)
                 await self.handle_victory(ctx, party_members, dragon, current_level, weekly_defeats)
-            elif not any(p["hp"] > 0 for p in battle_participants):
+            elif not any(c.alive for c in battle_participants):
                 battle_log.append(f"**Action #{action_number}**\nThe party has been defeated! 💀")
                 await self.update_battle_embed(battle_msg, dragon, battle_participants, battle_log)
                 await self.handle_defeat(ctx, party_members)
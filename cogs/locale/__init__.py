@@ -26,7 +26,6 @@ from utils.i18n import _, locale_doc
 class Locale(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.bot.locale_cache = {}
 
     async def set_locale(self, user, locale):
         """Sets the locale for a user."""
@@ -43,7 +42,7 @@ class Locale(commands.Cog):
                     locale,
                     user.id,
                 )
-        self.bot.locale_cache[user.id] = locale
+        await self.bot.locales.set(user.id, locale)
 
     async def get_locale(self, user):
         """Gets the locale for a user from DB."""
@@ -52,12 +51,7 @@ class Locale(commands.Cog):
         )
 
     async def locale(self, user):
-        lang = self.bot.locale_cache.get(user, None)
-        if lang:
-            return lang
-        lang = await self.get_locale(user)
-        self.bot.locale_cache[user] = lang
-        return lang
+        return await self.bot.locales.get(user)
 
     @commands.group(
         invoke_without_command=True,
@@ -74,7 +68,7 @@ class Locale(commands.Cog):
         )
         all_locales = ", ".join(i18n.locales)
         current_locale = (
-            self.bot.locale_cache.get(ctx.author.id, None) or i18n.default_locale
+            await self.bot.locales.get(ctx.author.id) or i18n.default_locale
         )
         await ctx.send(
             _(
@@ -102,7 +96,8 @@ class Locale(commands.Cog):
             await self.set_locale(ctx.author, locale)
         except ForeignKeyViolationError:
             i18n.current_locale.set(locale)
-            self.bot.locale_cache[ctx.author.id] = locale
+            # only on this cluster, nothing in the database to keep in sync with
+            self.bot.locales.store(ctx.author.id, locale)
             await ctx.send(
                 _(
                     "To permanently choose a language, please create a character and"
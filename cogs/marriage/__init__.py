@@ -179,6 +179,7 @@ class Marriage(commands.Cog):
                 'UPDATE children SET "father"=0 WHERE "mother"=$1;',
                 ctx.character_data["marriage"],
             )
+        self.bot.leaderboards.update(ctx.author, ctx.character_data["marriage"])
         await ctx.send(_("You are now divorced."))
 
     @has_char()
@@ -311,6 +312,7 @@ class Marriage(commands.Cog):
                 round(item[1] * lovescore_multiplier),
                 ctx.character_data["marriage"],
             )
+            self.bot.leaderboards.update(ctx.character_data["marriage"])
             await conn.execute(
                 'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
                 item[1],
@@ -368,6 +370,7 @@ class Marriage(commands.Cog):
             num,
             marriage,
         )
+        self.bot.leaderboards.update(marriage)
 
         partner = await self.bot.get_user_global(marriage)
         scenario = random.choice(
@@ -413,6 +416,7 @@ class Marriage(commands.Cog):
             ctx.author.id,
             marriage,
         )
+        self.bot.leaderboards.update(ctx.author, marriage)
         return await ctx.send(
             _(
                 "You had a lovely night and gained {ls} lovescore. 😏\n\n{additional}".format(
@@ -178,9 +178,7 @@ class Miscellaneous(commands.Cog):
         - This command itself has a cooldown of 1 second""")
 
         # Check tier access
-        character_data = await ctx.bot.pool.fetchrow(
-            'SELECT tier, class FROM profile WHERE "user"=$1;', ctx.author.id
-        )
+        character_data = await ctx.profiles.get(ctx.author.id)
         if not character_data or character_data["tier"] < 1:
             return await ctx.send(_("You do not have access to this command."))
 
@@ -234,10 +232,8 @@ class Miscellaneous(commands.Cog):
 
             # Add command to task list and set cooldown
             tasks.append(ctx.invoke(command))
-            await ctx.bot.redis.set(
-                f"cd:{ctx.author.id}:{command.qualified_name}",
-                command.qualified_name,
-                ex=config['cooldown']
+            await ctx.bot.set_cooldown(
+                ctx, config['cooldown'], identifier=command.qualified_name
             )
 
         # Execute all commands concurrently
@@ -395,7 +391,7 @@ class Miscellaneous(commands.Cog):
                     if await user_is_patron(self.bot, ctx.author, "silver"):
                         money = round(money * 1.5)
 
-                    result = await self.bot.pool.fetchval('SELECT tier FROM profile WHERE "user" = $1;', ctx.author.id)
+                    result = (await ctx.profiles.get(ctx.author.id))["tier"]
 
                     if result >= 3:
                         money = round(money * 3)
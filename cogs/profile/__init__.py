@@ -23,7 +23,6 @@ import discord
 import io
 from io import BytesIO
 
-from aiohttp import ContentTypeError
 from discord import Embed
 from discord.ext import commands
 
@@ -34,12 +33,12 @@ from classes.context import Context
 from classes.converters import IntFromTo, MemberWithCharacter, UserWithCharacter
 from classes.items import ALL_ITEM_TYPES, ItemType
 from cogs.adventure import ADVENTURE_NAMES
-from cogs.help import chunks
 from cogs.shard_communication import user_on_cooldown as user_cooldown
 from utils import checks, colors
 from utils import misc as rpgtools
 from utils.checks import is_gm
 from utils.i18n import _, locale_doc
+from utils.okapi import OkapiError
 
 
 class Profile(commands.Cog):
@@ -427,125 +426,51 @@ class Profile(commands.Cog):
                     badges = []
 
                 if targetid == 295173706496475131:
-
-                    async with self.bot.trusted_session.post(
-                            f"{self.bot.config.external.okapi_url}/api/genprofile",
-                            json={
-                                "name": profile["name"],
-                                "color": color,
-                                "image": profile["background"],
-                                "race": profile["race"],
-                                "classes": profile["class"],
-                                "profession": "Novice Planter",
-                                "class_icons": icons,
-                                "left_hand_item": left_hand,
-                                "right_hand_item": right_hand,
-                                "level": f"{rpgtools.xptolevel(profile['xp'])}",
-                                "guild_rank": guild_rank,
-                                "guild_name": profile["guild_name"],
-                                "money": f"{profile['money']}",
-                                "pvp_wins": f"{profile['pvpwins']}",
-                                "marriage": marriage,
-                                "god": profile["god"] or _("No God"),
-                                "adventure_name": adventure_name,
-                                "adventure_time": adventure_time,
-                                "badges": badges,
-                            },
-                            headers={"Authorization": self.bot.config.external.okapi_token},
-                    ) as req:
-                        if req.status == 200:
-
-                            img = await req.text()
-
-
-
-                        else:
-                            # Error, means try reading the response JSON error
-                            try:
-                                error_json = await req.json()
-                                async with self.bot.pool.acquire() as conn:
-                                    # Update the background column in the profile table for the target user
-                                    update_query = 'UPDATE profile SET background = 0 WHERE "user" = $1'
-                                    await conn.execute(update_query, targetid)
-
-                                return await ctx.send(
-                                    _(
-                                        "There was an error processing your image. Reason: {reason} ({detail}). (Due to this, the profile image has been reset)"
-                                    ).format(
-                                        reason=error_json["reason"], detail=error_json["detail"]
-                                    )
-                                )
-                            except ContentTypeError:
-                                return await ctx.send(
-                                    _("Unexpected internal error when generating image.")
-                                )
-                            except Exception:
-                                return await ctx.send(_("Unexpected error when generating image."))
-
-                        async with self.bot.trusted_session.get(img) as resp:
-                            bytebuffer = await resp.read()
-                            if resp.status != 200:
-                                return await ctx.send("Error failed to fetch image")
-
+                    profession = "Novice Planter"
                 else:
-                    async with self.bot.trusted_session.post(
-                            f"{self.bot.config.external.okapi_url}/api/genprofile",
-                            json={
-                                "name": profile["name"],
-                                "color": color,
-                                "image": profile["background"],
-                                "race": profile["race"],
-                                "classes": profile["class"],
-                                "profession": "None",
-                                "class_icons": icons,
-                                "left_hand_item": left_hand,
-                                "right_hand_item": right_hand,
-                                "level": f"{rpgtools.xptolevel(profile['xp'])}",
-                                "guild_rank": guild_rank,
-                                "guild_name": profile["guild_name"],
-                                "money": f"{profile['money']}",
-                                "pvp_wins": f"{profile['pvpwins']}",
-                                "marriage": marriage,
-                                "god": profile["god"] or _("No God"),
-                                "adventure_name": adventure_name,
-                                "adventure_time": adventure_time,
-                                "badges": badges,
-                            },
-                            headers={"Authorization": self.bot.config.external.okapi_token},
-                    ) as req:
-                        if req.status == 200:
-
-                            img = await req.text()
-
+                    profession = "None"
 
+                try:
+                    bytebuffer = await self.bot.okapi.profile(
+                        {
+                            "name": profile["name"],
+                            "color": color,
+                            "image": profile["background"],
+                            "race": profile["race"],
+                            "classes": profile["class"],
+                            "profession": profession,
+                            "class_icons": icons,
+                            "left_hand_item": left_hand,
+                            "right_hand_item": right_hand,
+                            "level": f"{rpgtools.xptolevel(profile['xp'])}",
+                            "guild_rank": guild_rank,
+                            "guild_name": profile["guild_name"],
+                            "money": f"{profile['money']}",
+                            "pvp_wins": f"{profile['pvpwins']}",
+                            "marriage": marriage,
+                            "god": profile["god"] or _("No God"),
+                            "adventure_name": adventure_name,
+                            "adventure_time": adventure_time,
+                            "badges": badges,
+                        }
+                    )
+                except OkapiError as e:
+                    if e.url is not None:
+                        return await ctx.send("Error failed to fetch image")
+                    if e.reason is None:
+                        return await ctx.send(
+                            _("Unexpected internal error when generating image.")
+                        )
+                    async with self.bot.pool.acquire() as conn:
+                        # Update the background column in the profile table for the target user
+                        update_query = 'UPDATE profile SET background = 0 WHERE "user" = $1'
+                        await conn.execute(update_query, targetid)
 
-                        else:
-                            # Error, means try reading the response JSON error
-                            try:
-                                error_json = await req.json()
-                                async with self.bot.pool.acquire() as conn:
-                                    # Update the background column in the profile table for the target user
-                                    update_query = 'UPDATE profile SET background = 0 WHERE "user" = $1'
-                                    await conn.execute(update_query, targetid)
-
-                                return await ctx.send(
-                                    _(
-                                        "There was an error processing your image. Reason: {reason} ({detail}). (Due to this, the profile image has been reset)"
-                                    ).format(
-                                        reason=error_json["reason"], detail=error_json["detail"]
-                                    )
-                                )
-                            except ContentTypeError:
-                                return await ctx.send(
-                                    _("Unexpected internal error when generating image.")
-                                )
-                            except Exception:
-                                return await ctx.send(_("Unexpected error when generating image."))
-
-                        async with self.bot.trusted_session.get(img) as resp:
-                            bytebuffer = await resp.read()
-                            if resp.status != 200:
-                                return await ctx.send("Error failed to fetch image")
+                    return await ctx.send(
+                        _(
+                            "There was an error processing your image. Reason: {reason} ({detail}). (Due to this, the profile image has been reset)"
+                        ).format(reason=e.reason, detail=e.detail)
+                    )
 
                 await ctx.send(
                     _("Your Profile:"),
@@ -814,6 +739,7 @@ class Profile(commands.Cog):
                     """
 
                     await conn.execute(update_query, total_stats, profile["resetpotion"] - 1, ctx.author.id)
+                await self.bot.stats.invalidate(ctx.author)
 
                 await ctx.send(
                     "Stats updated successfully. As you drink the reset potion, a wave of dizziness washes over you, making the world spin for a moment. You feel disoriented but also strangely invigorated, as if your very being has been refreshed.")
@@ -1289,11 +1215,14 @@ class Profile(commands.Cog):
                 inline=False,
             )
 
-        result.set_footer(
-            text=_("Page {page} of {maxpages}").format(
-                page=currentpage + 1, maxpages=maxpage + 1
+        if maxpage is None:
+            result.set_footer(text=_("Page {page}").format(page=currentpage + 1))
+        else:
+            result.set_footer(
+                text=_("Page {page} of {maxpages}").format(
+                    page=currentpage + 1, maxpages=maxpage + 1
+                )
             )
-        )
         return result
 
     def invembedd(self, ctx, reset_potions_chunk, current_page, max_page):
@@ -1472,6 +1401,7 @@ class Profile(commands.Cog):
         stat_column = valid_types[type]
         update_query = f'UPDATE profile SET "statpoints" = $1, "{stat_column}" = "{stat_column}" + $2 WHERE "user" = $3;'
         await self.bot.pool.execute(update_query, new_stat_points, amount, ctx.author.id)
+        await self.bot.stats.invalidate(ctx.author)
 
         # Confirmation message
         await ctx.send(
@@ -1517,64 +1447,67 @@ class Profile(commands.Cog):
                             " `{all_types}`"
                         ).format(all_types=", ".join([t.name for t in ALL_ITEM_TYPES]))
                     )
+        args = [ctx.author.id, lowest, highest]
         if itemtype == "All":
-            ret = await self.bot.pool.fetch(
-                "SELECT ai.*, i.equipped, i.locked FROM profile p JOIN allitems ai ON"
-                " (p.user=ai.owner) JOIN inventory i ON (ai.id=i.item) WHERE"
-                ' p."user"=$1 AND ((ai."damage"+ai."armor" BETWEEN $2 AND $3) OR'
-                ' i."equipped") ORDER BY i."equipped" DESC, i.locked DESC, ai."damage"+ai."armor"'
-                " DESC;",
-                ctx.author.id,
-                lowest,
-                highest,
-            )
+            matches = 'ai."damage"+ai."armor" BETWEEN $2 AND $3'
         elif itemtype == "2h":
-            twohand = "both"
-            ret = await self.bot.pool.fetch(
-                "SELECT ai.*, i.equipped, i.locked FROM profile p JOIN allitems ai ON"
-                " (p.user=ai.owner) JOIN inventory i ON (ai.id=i.item) WHERE"
-                ' p."user"=$1 AND ((ai."damage"+ai."armor" BETWEEN $2 AND $3 AND'
-                ' ai."hand"=$4)  OR i."equipped") ORDER BY i."equipped" DESC, i.locked DESC,'
-                ' ai."damage"+ai."armor" DESC;',
-                ctx.author.id,
-                lowest,
-                highest,
-                twohand,
-            )
+            matches = 'ai."damage"+ai."armor" BETWEEN $2 AND $3 AND ai."hand"=$4'
+            args.append("both")
         elif itemtype == "1h":
-            twohand = "both"
-            ret = await self.bot.pool.fetch(
-                "SELECT ai.*, i.equipped, i.locked FROM profile p JOIN allitems ai ON"
-                " (p.user=ai.owner) JOIN inventory i ON (ai.id=i.item) WHERE"
-                ' p."user"=$1 AND ((ai."damage"+ai."armor" BETWEEN $2 AND $3 AND'
-                ' ai."hand"!=$4)  OR i."equipped") ORDER BY i."equipped" DESC, i.locked DESC,'
-                ' ai."damage"+ai."armor" DESC;',
-                ctx.author.id,
-                lowest,
-                highest,
-                twohand,
-            )
+            matches = 'ai."damage"+ai."armor" BETWEEN $2 AND $3 AND ai."hand"!=$4'
+            args.append("both")
         else:
-            ret = await self.bot.pool.fetch(
+            matches = 'ai."damage"+ai."armor" BETWEEN $2 AND $3 AND ai."type"=$4'
+            args.append(itemtype)
+        where = f'p."user"=$1 AND (({matches}) OR i."equipped")'
+        order = (
+            'i."equipped", COALESCE(i."locked", FALSE), ai."damage"+ai."armor", ai."id"'
+        )
+
+        # Seeks past the last item shown, pages are loaded as they are needed
+        async def fetch(after, limit):
+            params = [*args]
+            seek = ""
+            if after is not None:
+                n = len(params)
+                seek = f" AND ({order}) < (${n + 1}, ${n + 2}, ${n + 3}, ${n + 4})"
+                params.extend(after)
+            params.append(limit)
+            return await self.bot.pool.fetch(
                 "SELECT ai.*, i.equipped, i.locked FROM profile p JOIN allitems ai ON"
                 " (p.user=ai.owner) JOIN inventory i ON (ai.id=i.item) WHERE"
-                ' p."user"=$1 AND ((ai."damage"+ai."armor" BETWEEN $2 AND $3 AND'
-                ' ai."type"=$4)  OR i."equipped") ORDER BY i."equipped" DESC, i.locked DESC,'
-                ' ai."damage"+ai."armor" DESC;',
-                ctx.author.id,
-                lowest,
-                highest,
-                itemtype,
+                f' {where}{seek} ORDER BY i."equipped" DESC,'
+                ' COALESCE(i."locked", FALSE) DESC, ai."damage"+ai."armor" DESC,'
+                f' ai."id" DESC LIMIT ${len(params)};',
+                *params,
             )
-        if not ret:
+
+        async def count():
+            return await self.bot.pool.fetchval(
+                "SELECT COUNT(*) FROM profile p JOIN allitems ai ON (p.user=ai.owner)"
+                f" JOIN inventory i ON (ai.id=i.item) WHERE {where};",
+                *args,
+            )
+
+        def render(chunk, idx, total):
+            maxpage = (total - 1) // 5 if total else None
+            return self.invembed(ctx, chunk, idx, maxpage)
+
+        source = self.bot.paginator.KeysetPages(
+            fetch,
+            key=lambda item: (
+                item["equipped"],
+                bool(item["locked"]),
+                item["damage"] + item["armor"],
+                item["id"],
+            ),
+            per_page=5,
+        )
+        if not await source.get(0):
             return await ctx.send(_("Your inventory is empty."))
-        allitems = list(chunks(ret, 5))
-        maxpage = len(allitems) - 1
-        embeds = [
-            self.invembed(ctx, chunk, idx, maxpage)
-            for idx, chunk in enumerate(allitems)
-        ]
-        await self.bot.paginator.Paginator(extras=embeds).paginate(ctx)
+        await self.bot.paginator.LazyPaginator(ctx, source, render, count=count).start(
+            ctx
+        )
 
     def lootembed(self, ctx, ret, currentpage, maxpage):
         result = discord.Embed(
@@ -1606,19 +1539,31 @@ class Profile(commands.Cog):
             You can gain loot items by completing adventures. The higher the difficulty, the higher the chance to get loot.
             If you are a Ritualist, your loot chances are doubled. Check [our wiki](https://wiki.idlerpg.xyz/index.php?title=Loot#Probability) for the exact chances."""
         )
-        ret = await self.bot.pool.fetch(
-            'SELECT * FROM loot WHERE "user"=$1 ORDER BY "value" DESC, "id" DESC;',
-            ctx.author.id,
+
+        async def fetch(after, limit):
+            if after is None:
+                return await self.bot.pool.fetch(
+                    'SELECT * FROM loot WHERE "user"=$1 ORDER BY "value" DESC, "id" DESC'
+                    " LIMIT $2;",
+                    ctx.author.id,
+                    limit,
+                )
+            return await self.bot.pool.fetch(
+                'SELECT * FROM loot WHERE "user"=$1 AND ("value", "id") < ($2, $3) ORDER'
+                ' BY "value" DESC, "id" DESC LIMIT $4;',
+                ctx.author.id,
+                *after,
+                limit,
+            )
+
+        source = self.bot.paginator.KeysetPages(
+            fetch, key=lambda item: (item["value"], item["id"]), per_page=7
         )
-        if not ret:
+        if not await source.get(0):
             return await ctx.send(_("You do not have any loot at this moment."))
-        allitems = list(chunks(ret, 7))
-        maxpage = len(allitems) - 1
-        embeds = [
-            self.lootembed(ctx, chunk, idx, maxpage)
-            for idx, chunk in enumerate(allitems)
-        ]
-        await self.bot.paginator.Paginator(extras=embeds).paginate(ctx)
+        await self.bot.paginator.LazyPaginator(
+            ctx, source, lambda chunk, idx, total: self.lootembed(ctx, chunk, idx, None)
+        ).start(ctx)
 
     @checks.has_char()
     @user_cooldown(180, identifier="sacrificeexchange")
@@ -1817,6 +1762,7 @@ class Profile(commands.Cog):
             await conn.execute(
                 'UPDATE inventory SET "equipped"=True WHERE "item"=$1;', itemid
             )
+        await self.bot.stats.invalidate(ctx.author)
         await self.bot.reset_cooldown(ctx)
         if put_off:
             await ctx.send(
@@ -1859,6 +1805,7 @@ class Profile(commands.Cog):
             await conn.execute(
                 'UPDATE inventory SET "equipped"=False WHERE "item"=$1;', itemid
             )
+        await self.bot.stats.invalidate(ctx.author)
         await ctx.send(
             _("Successfully unequipped item `{itemid}`.").format(itemid=itemid)
         )
@@ -1934,6 +1881,7 @@ class Profile(commands.Cog):
             )
             await conn.execute('DELETE FROM inventory WHERE "item"=$1;', seconditemid)
             await conn.execute('DELETE FROM allitems WHERE "id"=$1;', seconditemid)
+        await self.bot.stats.invalidate(ctx.author)
         await ctx.send(
             _(
                 "The {stat} of your **{item}** is now **{newstat}**. The other item was"
@@ -2016,6 +1964,7 @@ class Profile(commands.Cog):
                 data={"Gold": pricetopay},
                 conn=conn,
             )
+        await self.bot.stats.invalidate(ctx.author)
         await ctx.send(
             _(
                 "The {stat} of your **{item}** is now **{newstat}**. **${pricetopay}**"
@@ -2158,9 +2107,11 @@ class Profile(commands.Cog):
                 g = await conn.fetchval(
                     'DELETE FROM guild WHERE "leader"=$1 RETURNING "id";', ctx.author.id
                 )
+                members = []
                 if g:
-                    await conn.execute(
-                        'UPDATE profile SET "guildrank"=$1, "guild"=$2 WHERE "guild"=$3;',
+                    members = await conn.fetch(
+                        'UPDATE profile SET "guildrank"=$1, "guild"=$2 WHERE "guild"=$3'
+                        ' RETURNING "user";',
                         "Member",
                         0,
                         g,
@@ -2179,6 +2130,9 @@ class Profile(commands.Cog):
                     ctx.author.id,
                 )
                 await self.bot.delete_profile(ctx.author.id, conn=conn)
+            await self.bot.stats.invalidate(ctx.author, *[m["user"] for m in members])
+            if g:
+                await self.bot.stats.invalidate_alliance(g)
             await self.bot.delete_adventure(ctx.author)
             await ctx.send(
                 _("Successfully deleted your character. Sorry to see you go :frowning:")
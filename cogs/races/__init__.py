@@ -221,6 +221,7 @@ class Races(commands.Cog):
                 answer,
                 ctx.author.id,
             )
+        await self.bot.stats.invalidate(ctx.author)
         await ctx.send(_("You are now a {race}.").format(race=race_))
 
 
@@ -21,7 +21,7 @@ import datetime
 import re
 import traceback
 
-from discord import Embed, File
+from discord import Embed
 from decimal import Decimal, ROUND_HALF_UP, getcontext
 import utils.misc as rpgtools
 import discord
@@ -38,7 +38,10 @@ from classes.classes import from_string as class_from_string
 from classes.converters import IntGreaterThan
 from cogs.shard_communication import user_on_cooldown as user_cooldown
 from utils import random
+from utils.broadcast import Broadcaster
 from utils.checks import AlreadyRaiding, has_char, is_gm, is_god
+from utils.combat.engine import TURN_ORDER_TEAMS, Battle, Combatant, Rules
+from utils.combat.entity import Faction
 from utils.i18n import _, locale_doc
 from utils.joins import JoinView
 
@@ -111,6 +114,8 @@ class Raid(commands.Cog):
         self.active_view = None
         self.raid_preparation = False
         self.boss = None
+        # fan-out to the raid channels of the event currently running
+        self.broadcast = None
         self.allow_sending = discord.PermissionOverwrite(
             send_messages=True, read_messages=True
         )
@@ -136,12 +141,86 @@ class Raid(commands.Cog):
     async def clear_raid_timer(self):
         await self.bot.redis.execute_command("DEL", "special:raid")
 
+    async def resolve_users(self, user_ids, concurrency=25):
+        """Turns user IDs into users, fetching the uncached ones concurrently"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def resolve(user_id):
+            if user := self.bot.get_user(user_id):
+                return user
+            async with semaphore:
+                try:
+                    return await self.bot.fetch_user(user_id)
+                except discord.NotFound:
+                    return None
+
+        users = await asyncio.gather(*[resolve(user_id) for user_id in user_ids])
+        return [user for user in users if user]
+
+    async def load_roster(self, users, raid_hp=None):
+        """
+        Loads the raid stats of all participants at once
+
+        Returns {user: {"hp", "armor", "damage"}} for everyone with a character
+        and the IDs of those in the Raider class line. raid_hp overrides the
+        health of every participant.
+        """
+        users = list({user.id: user for user in users}.values())
+        user_ids = [user.id for user in users]
+        async with self.bot.pool.acquire() as conn:
+            snapshots = await self.bot.stats.get_many(user_ids, conn=conn)
+            xps = {
+                row["user"]: row["xp"]
+                for row in await conn.fetch(
+                    'SELECT "user", "xp" FROM profile WHERE "user"=ANY($1);', user_ids
+                )
+            }
+
+        roster = {}
+        raiders = set()
+        for user in users:
+            if (snapshot := snapshots.get(user.id)) is None:
+                continue
+            dmg, deff = self.bot.raidstats_from(
+                snapshot["damage"],
+                snapshot["armor"],
+                snapshot["atkmultiply"],
+                snapshot["defmultiply"],
+                snapshot["statatk"],
+                snapshot["statdef"],
+                snapshot["raid_building"],
+            )
+            if raid_hp is None:
+                level = rpgtools.xptolevel(xps[user.id])
+                hp = snapshot["health"] + 250 + (level * 5) + snapshot["stathp"] * 50
+            else:
+                hp = raid_hp
+            roster[user] = {"hp": hp, "armor": deff, "damage": dmg}
+            if any(
+                (class_ := class_from_string(name)) and class_.in_class_line(Raider)
+                for name in snapshot["classes"]
+            ):
+                raiders.add(user.id)
+        return roster, raiders
+
     @is_gm()
     @commands.command(hidden=True)
     async def gmclearraid(self, ctx):
         await self.bot.redis.execute_command("DEL", "special:raid")
         await ctx.send("Raid timer cleared!")
 
+    @is_gm()
+    @commands.command(hidden=True)
+    async def raidlag(self, ctx):
+        """[Bot Admin only] Shows how far behind the raid channels are."""
+        if not self.broadcast:
+            return await ctx.send("No raid has been broadcast yet!")
+        lines = [
+            f"<#{channel_id}>: {stats}" for channel_id, stats in self.broadcast.stats.items()
+        ]
+        lines.extend(f"<#{channel_id}>: not found" for channel_id in self.broadcast.missing)
+        await ctx.send("\n".join(lines) or "No raid channels.")
+
     @is_gm()
     @commands.command(hidden=True)
     async def alterraid(self, ctx, newhp: IntGreaterThan(0)):
@@ -167,6 +246,9 @@ class Raid(commands.Cog):
     @raid_free()
     @commands.command(hidden=True, brief=_("Start a Ragnorak raid"))
     async def spawn(self, ctx, hp: IntGreaterThan(0), rarity: str = "magic", raid_hp: int = 17776):
+        broadcast = self.broadcast = Broadcaster(
+            self.bot, [1140211789573935164, 1199297906755252234, 1158743317325041754]
+        )
         try:
             if rarity not in ["magic", "legendary", "rare", "uncommon", "common", "mystery", "fortune", "divine"]:
                 raise ValueError("Invalid rarity specified.")
@@ -175,7 +257,6 @@ class Raid(commands.Cog):
             """[Bot Admin only] Starts a raid."""
             await ctx.message.delete()
             await self.set_raid_timer()
-            survival_used = set()
 
             self.boss = {"hp": hp, "initial_hp": hp, "min_dmg": 1, "max_dmg": 750}
             self.joined = []
@@ -206,49 +287,35 @@ class Raid(commands.Cog):
             )
             fi_path = "assets/other/startdragon.webp"
             try:
-                channels_ids = [1140211789573935164, 1199297906755252234,
-                                1158743317325041754]  # Replace with your actual channel IDs
-
-                message_ids = []  # To store the IDs of the sent messages
+                for channel_id in broadcast.missing:
+                    await ctx.send(f"Channel with ID {channel_id} not found.")
 
-                for channel_id in channels_ids:
-                    try:
-                        channel = self.bot.get_channel(channel_id)  # Assumes ctx.guild is available
-                        if channel:
-                            fi = File(fi_path)  # Create a new File instance for each channel
-                            sent_msg = await channel.send(embed=em, file=fi, view=view)
-                            message_ids.append(sent_msg.id)
+                async def send_to_channels(*args, **kwargs):
+                    """Sends to all raid channels at once, returns the message IDs"""
+                    message_ids = []  # To store the IDs of the sent messages
+                    results = await broadcast.send(*args, **kwargs)
+                    for channel_id, result in results.items():
+                        if isinstance(result, Exception):
+                            error_message = f"Error in channel with ID {channel_id}: {result}. continuing.."
+                            await ctx.send(error_message)
+                            print(error_message)
                         else:
-                            await ctx.send(f"Channel with ID {channel_id} not found.")
-                    except Exception as e:
-                        error_message = f"Error in channel with ID {channel_id}: {e}. continuing.."
-                        await ctx.send(error_message)
-                        print(error_message)
-                        continue
+                            message_ids.append(result.id)
+                    return message_ids
 
+                # A new File instance is opened for each channel
+                message_ids = await send_to_channels(embed=em, file_path=fi_path, view=view)
                 self.boss.update(message=message_ids)
 
                 if self.bot.config.bot.is_beta:
                     summary_channel = self.bot.get_channel(1199299514490683392)
 
-                    channels_ids = [1140211789573935164, 1199297906755252234,
-                                    1158743317325041754]  # Replace with your actual channel IDs
-                    message_ids = []  # To store the IDs of the sent messages
-
-                    for channel_id in channels_ids:
-                        try:
-                            channel = self.bot.get_channel(channel_id)  # Assumes ctx.guild is available
-                            if channel:
-                                role_id = 1199307259965079552  # Replace with the actual role ID
-                                role = discord.utils.get(ctx.guild.roles, id=role_id)
-                                content = f"{role.mention} Ragnarok spawned! 15 Minutes until he is vulnerable..."
-                                sent_msg = await channel.send(content, allowed_mentions=discord.AllowedMentions(roles=True))
-                                message_ids.append(sent_msg.id)
-                        except Exception as e:
-                            error_message = f"Error in channel with ID {channel_id}: {e}. continuing.."
-                            await ctx.send(error_message)
-                            print(error_message)
-                            continue
+                    role_id = 1199307259965079552  # Replace with the actual role ID
+                    role = discord.utils.get(ctx.guild.roles, id=role_id)
+                    content = f"{role.mention} Ragnarok spawned! 15 Minutes until he is vulnerable..."
+                    message_ids = await send_to_channels(
+                        content, allowed_mentions=discord.AllowedMentions(roles=True)
+                    )
 
                     self.boss.update(message=message_ids)
                     self.raid_preparation = True
@@ -266,16 +333,7 @@ class Raid(commands.Cog):
 
                     for interval, message in zip(time_intervals, messages):
                         await asyncio.sleep(interval)
-                        for channel_id in channels_ids:
-                            try:
-                                channel = self.bot.get_channel(channel_id)
-                                if channel:
-                                    await channel.send(message)
-                            except Exception as e:
-                                error_message = f"Error in channel with ID {channel_id}: {e}. continuing.."
-                                await ctx.send(error_message)
-                                print(error_message)
-                                continue
+                        await send_to_channels(message)
             except Exception as e:
                 error_message = f"Unexpected error: {e}"
                 await ctx.send(error_message)
@@ -285,10 +343,7 @@ class Raid(commands.Cog):
 
             view.stop()
 
-            for channel_id in channels_ids:
-                channel = self.bot.get_channel(channel_id)
-                if channel:
-                    await channel.send("**Ragnarok is vulnerable! Fetching participant data... Hang on!**")
+            await broadcast.send("**Ragnarok is vulnerable! Fetching participant data... Hang on!**")
 
             self.joined.extend(view.joined)
             # Assuming you have the role ID for the server booster role
@@ -314,7 +369,7 @@ class Raid(commands.Cog):
             user_ids_list = [record['user'] for record in discord_ids]
 
             # Get User objects for each user ID, handling cases where a user may not be found
-            users = [self.bot.get_user(user_id) or await self.bot.fetch_user(user_id) for user_id in user_ids_list]
+            users = await self.resolve_users(user_ids_list)
 
             # Append the User objects to your existing list (e.g., self.joined)
             self.joined.extend(users)
@@ -329,136 +384,111 @@ class Raid(commands.Cog):
                     # Append these members to self.joined
                     self.joined.extend(booster_members)
 
-            async with self.bot.pool.acquire() as conn:
-                for u in self.joined:
-                    profile = await conn.fetchrow('SELECT * FROM profile WHERE "user"=$1;', u.id)
-                    if not profile:
-                        # You might want to send a message or log that the profile wasn't found.
-                        continue
-                    dmg, deff = await self.bot.get_raidstats(
-                        u,
-                        atkmultiply=profile["atkmultiply"],
-                        defmultiply=profile["defmultiply"],
-                        classes=profile["class"],
-                        race=profile["race"],
-                        guild=profile["guild"],
-                        conn=conn,
-                    )
-                    if raid_hp == 17776:
-                        stathp = profile["stathp"] * 50
-                        level = rpgtools.xptolevel(profile["xp"])
-                        raidhp = profile["health"] + 250 + (level * 5) + stathp
-                    else:
-                        raidhp = raid_hp
-                    self.raid[(u, "user")] = {"hp": raidhp, "armor": deff, "damage": dmg}
+            roster, raider_ids = await self.load_roster(
+                self.joined, raid_hp=None if raid_hp == 17776 else raid_hp
+            )
+            for u, stats in roster.items():
+                self.raid[(u, "user")] = stats
 
             raiders_joined = len(self.raid)  # Replace with your actual channel IDs
 
             # Final message with gathered data
-            for channel_id in channels_ids:
-                channel = self.bot.get_channel(channel_id)
-                if channel:
-                    await channel.send(f"**Done getting data! {raiders_joined} Raiders joined.**")
+            await broadcast.send(f"**Done getting data! {raiders_joined} Raiders joined.**")
+
+            boss = Combatant(
+                "boss",
+                Faction.Two,
+                self.boss["hp"],
+                self.boss["min_dmg"],
+                0,
+                variance=self.boss["max_dmg"] - self.boss["min_dmg"],
+            )
+            raiders = {
+                Combatant(
+                    key,
+                    Faction.One,
+                    stats["hp"],
+                    stats["damage"],
+                    stats["armor"],
+                    # AI reinforcements are keyed by their name
+                    owner=key[0] if key[1] == "user" else None,
+                    variance=0,
+                    # Raiders survive their first death, classes were loaded with the roster
+                    cheat_death=100 if key[1] == "user" and key[0].id in raider_ids else 0,
+                    revive_hp=1,
+                ): key
+                for key, stats in self.raid.items()
+            }
+            battle = Battle(
+                [boss, *raiders],
+                rules=Rules(
+                    turn_order=TURN_ORDER_TEAMS,
+                    first_faction=Faction.Two,
+                    min_damage=0,
+                    element_modifiers=False,
+                ),
+            )
 
             start = datetime.datetime.utcnow()
 
-            while (
-                    self.boss["hp"] > 0
-                    and len(self.raid) > 0
-                    and datetime.datetime.utcnow() < start + datetime.timedelta(minutes=60)
-            ):
-                (target, participant_type) = random.choice(list(self.raid.keys()))
-                dmg = random.randint(self.boss["min_dmg"], self.boss["max_dmg"])
-                finaldmg = self.getfinaldmg(dmg, self.raid[(target, participant_type)]["armor"])
-                self.raid[(target, participant_type)]["hp"] -= finaldmg
-
-                em = discord.Embed(title="Ragnarok attacked!", colour=0xFFB900)
-
-                if self.raid[(target, participant_type)]["hp"] > 0:  # If target is still alive
-                    description = f"{target.mention if participant_type == 'user' else target} now has {self.raid[(target, participant_type)]['hp']} HP!"
-                    em.description = description
-                    em.add_field(name="Theoretical Damage",
-                                 value=finaldmg + self.raid[(target, participant_type)]["armor"])
-                    em.add_field(name="Shield", value=self.raid[(target, participant_type)]["armor"])
-                    em.add_field(name="Effective Damage", value=finaldmg)
-                else:  # If target has died
-                    # Check if target is a Raider and hasn't used their survival
-                    if self.raid[(target, participant_type)]["hp"] <= 0:  # Changed from else to explicit check
-                        # Check if target is a Raider and hasn't used their survival
-                        survived = False  # Add this flag
-                        if participant_type == "user" and target.id not in survival_used:
-                            # Check if they're a Raider
-                            async with self.bot.pool.acquire() as conn:
-                                profile = await conn.fetchrow('SELECT class FROM profile WHERE "user"=$1;', target.id)
-                                if profile and profile['class']:
-                                    raider_classes = {"Adventurer", "Swordsman", "Fighter", "Swashbuckler",
-                                                      "Dragonslayer",
-                                                      "Raider", "Eternal Hero"}
-
-                                    is_raider = bool(set(profile['class']) & raider_classes)
-
-                                    if is_raider:
-                                        self.raid[(target, participant_type)]["hp"] = 1
-                                        survival_used.add(target.id)
-                                        description = f"💫 {target.mention}'s Raider instincts allowed them to survive with 1 HP!"
-                                        em.description = description
-                                        em.add_field(name="Theoretical Damage",
-                                                     value=finaldmg + self.raid[(target, participant_type)]["armor"])
-                                        em.add_field(name="Shield",
-                                                     value=self.raid[(target, participant_type)]["armor"])
-                                        em.add_field(name="Effective Damage", value=finaldmg)
-                                        survived = True  # Set the flag
-
-
-
-                        # Only handle death if they didn't survive
-                        if not survived:
-
-                            description = f"{target.mention if participant_type == 'user' else target} died!"
-                            em.description = description
-                            em.add_field(name="Theoretical Damage",
-                                         value=finaldmg + self.raid[(target, participant_type)]["armor"])
-                            em.add_field(name="Shield", value=self.raid[(target, participant_type)]["armor"])
-                            em.add_field(name="Effective Damage", value=finaldmg)
-                            del self.raid[(target, participant_type)]
-
-
-                if participant_type == "user":
-                    em.set_author(name=str(target), icon_url=target.display_avatar.url)
-                else:  # For bots
-                    em.set_author(name=str(target))
-                em.set_thumbnail(url=f"https://storage.googleapis.com/fablerpg-f74c2.appspot.com/295173706496475136_dragonattack.webp")
-                for channel_id in channels_ids:
-                    channel = self.bot.get_channel(channel_id)
-                    if channel:
-
-                        await channel.send(embed=em)
-                await ctx.send(f"{target.mention}")
-
-                dmg_to_take = sum(i["damage"] for i in self.raid.values())
-                self.boss["hp"] -= dmg_to_take
-                await asyncio.sleep(4)
+            for events in battle.team_turns():
+                if events[0].attacker is boss:
+                    event = events[0]
+                    hit = event.hits[0]
+                    (target, participant_type) = hit.target.key
+                    armor = self.raid[hit.target.key]["armor"]
+                    self.raid[hit.target.key]["hp"] = hit.target.hp
+
+                    em = discord.Embed(title="Ragnarok attacked!", colour=0xFFB900)
+                    if hit.revived:
+                        em.description = f"💫 {target.mention}'s Raider instincts allowed them to survive with 1 HP!"
+                    elif hit.target in event.defeated:
+                        em.description = f"{target.mention if participant_type == 'user' else target} died!"
+                        del self.raid[hit.target.key]
+                    else:  # If target is still alive
+                        em.description = f"{target.mention if participant_type == 'user' else target} now has {hit.target.hp} HP!"
+                    em.add_field(name="Theoretical Damage", value=hit.damage + armor)
+                    em.add_field(name="Shield", value=armor)
+                    em.add_field(name="Effective Damage", value=hit.damage)
+
+                    if participant_type == "user":
+                        em.set_author(name=str(target), icon_url=target.display_avatar.url)
+                    else:  # For bots
+                        em.set_author(name=str(target))
+                    em.set_thumbnail(url=f"https://storage.googleapis.com/fablerpg-f74c2.appspot.com/295173706496475136_dragonattack.webp")
+                    # Every channel gets every attack, only the HP updates may be coalesced
+                    await broadcast.send(embed=em)
+                    if participant_type == "user":
+                        await ctx.send(f"{target.mention}")
+                    await asyncio.sleep(4)
+                else:
+                    dmg_to_take = sum(event.damage for event in events)
+                    self.boss["hp"] = boss.hp
 
-                em = discord.Embed(title="The raid attacked Ragnarok!", colour=0xFF5C00)
-                em.set_thumbnail(url=f"https://storage.googleapis.com/fablerpg-f74c2.appspot.com/295173706496475136_attackdragon.webp")
-                em.add_field(name="Damage", value=dmg_to_take)
+                    em = discord.Embed(title="The raid attacked Ragnarok!", colour=0xFF5C00)
+                    em.set_thumbnail(url=f"https://storage.googleapis.com/fablerpg-f74c2.appspot.com/295173706496475136_attackdragon.webp")
+                    em.add_field(name="Damage", value=dmg_to_take)
 
-                if self.boss["hp"] > 0:
-                    em.add_field(name="HP left", value=self.boss["hp"])
-                else:
-                    em.add_field(name="HP left", value="Dead!")
-                for channel_id in channels_ids:
-                    channel = self.bot.get_channel(channel_id)
-                    if channel:
-                        await channel.send(embed=em)
-                await asyncio.sleep(4)
+                    if boss.alive:
+                        em.add_field(name="HP left", value=self.boss["hp"])
+                    else:
+                        em.add_field(name="HP left", value="Dead!")
+                    broadcast.status(embed=em)
+                    await asyncio.sleep(4)
+
+                if datetime.datetime.utcnow() >= start + datetime.timedelta(minutes=60):
+                    break
 
             if len(self.raid) == 0:
-                for channel_id in channels_ids:
-                    channel = self.bot.get_channel(channel_id)
-                    if channel:
-                        m = await channel.send("The raid was all wiped!")
-                        await m.add_reaction("\U0001F1EB")
+                results = await broadcast.send("The raid was all wiped!")
+                await asyncio.gather(
+                    *[
+                        m.add_reaction("\U0001F1EB")
+                        for m in results.values()
+                        if isinstance(m, discord.Message)
+                    ],
+                    return_exceptions=True,
+                )
 
                 summary_text = (
                     "Emoji_here The raid was all wiped! Ragnarok had"
@@ -547,11 +577,8 @@ class Raid(commands.Cog):
                     )
 
                     # Assuming page.pages is a list of pages
-                    for channel_id in channels_ids:
-                        channel = self.bot.get_channel(channel_id)
-                        if channel:
-                            for p in page.pages:
-                                await channel.send(p[4:-4])
+                    for p in page.pages:
+                        await broadcast.send(p[4:-4])
 
                     while True:
                         try:
@@ -566,16 +593,10 @@ class Raid(commands.Cog):
                             highest_bid = [msg.author.id, bid]
                             if highest_bid[1] >= 100:
                                 next_bid = int(highest_bid[1] * 1.1)
-                                for channel_id in channels_ids:
-                                    channel = self.bot.get_channel(channel_id)
-                                    if channel:
-                                        await channel.send(f"{msg.author.mention} bids **${msg.content}**!\n The minimum next bid is **${next_bid}**.")
+                                await broadcast.send(f"{msg.author.mention} bids **${msg.content}**!\n The minimum next bid is **${next_bid}**.")
 
                             else:
-                                for channel_id in channels_ids:
-                                    channel = self.bot.get_channel(channel_id)
-                                    if channel:
-                                        await channel.send(f"{msg.author.mention} bids **${msg.content}**!")
+                                await broadcast.send(f"{msg.author.mention} bids **${msg.content}**!")
 
 
                     msg_content = (
@@ -584,10 +605,7 @@ class Raid(commands.Cog):
                     )
 
                     # Send the initial message to all channels
-                    for channel_id in channels_ids:
-                        channel = self.bot.get_channel(channel_id)
-                        if channel:
-                            msg = await channel.send(msg_content)
+                    await broadcast.send(msg_content)
 
                     # Execute the database commands once outside the loop
                     money = await self.bot.pool.fetchval(
@@ -620,24 +638,18 @@ class Raid(commands.Cog):
                             f"sold to: **<@{highest_bid[0]}>** for **${highest_bid[1]:,.0f}**"
                         )
                     else:
-                        for channel_id in channels_ids:
-                            channel = self.bot.get_channel(channel_id)
-                            if channel:
-                                await channel.send(
-                                    f"<@{highest_bid[0]}> spent the money in the meantime... Meh!"
-                                    " No one gets it then, pah!\nThis incident has been reported and"
-                                    " they will get banned if it happens again. Cheers!"
-                                )
+                        await broadcast.send(
+                            f"<@{highest_bid[0]}> spent the money in the meantime... Meh!"
+                            " No one gets it then, pah!\nThis incident has been reported and"
+                            " they will get banned if it happens again. Cheers!"
+                        )
 
                         # Edit the message content once after executing the database commands
-                        for channel_id in channels_ids:
-                            channel = self.bot.get_channel(channel_id)
-                            if channel:
-                                await channel.send(
-                                    f"Emoji_here The {rarity.capitalize()} Crate was not given to anyone since the"
-                                    f" supposed winning bidder <@{highest_bid[0]}> spent the money in"
-                                    " the meantime. They will get banned if it happens again."
-                                )
+                        await broadcast.send(
+                            f"Emoji_here The {rarity.capitalize()} Crate was not given to anyone since the"
+                            f" supposed winning bidder <@{highest_bid[0]}> spent the money in"
+                            " the meantime. They will get banned if it happens again."
+                        )
 
                     cash_pool = hp * 1.3
                     survivors = len(self.raid)
@@ -687,38 +699,37 @@ class Raid(commands.Cog):
                                         user.id
                                     )
                                     # Announce bonus if there was one
-                                    for channel_id in channels_ids:
-                                        channel = self.bot.get_channel(channel_id)
-                                        if channel:
-                                            await channel.send(
-                                                f"💰 {user.mention}'s Raider abilities earned them an extra ${bonus_amount:,.0f}!"
-                                            )
+                                    await broadcast.send(
+                                        f"💰 {user.mention}'s Raider abilities earned them an extra ${bonus_amount:,.0f}!"
+                                    )
 
                     # Send the final message to all channels
-                    for channel_id in channels_ids:
-                        channel = self.bot.get_channel(channel_id)
-                        if channel:
-                            await channel.send(
-                                f"**Gave ${base_cash:,.0f} of Ragnarok's ${cash_pool:,.0f} drop to all survivors!**")
-
-                        summary_text = (
-                            f"Emoji_here Defeated in: **{summary_duration}**\n"
-                            f"{summary_crate}\n"
-                            f"Emoji_here Payout per survivor: **${base_cash:,.0f}**\n"
-                            f"Emoji_here Survivors: **{survivors} and {bots} of placeholders forces**"
-                        )
+                    await broadcast.send(
+                        f"**Gave ${base_cash:,.0f} of Ragnarok's ${cash_pool:,.0f} drop to all survivors!**")
+
+                    summary_text = (
+                        f"Emoji_here Defeated in: **{summary_duration}**\n"
+                        f"{summary_crate}\n"
+                        f"Emoji_here Payout per survivor: **${base_cash:,.0f}**\n"
+                        f"Emoji_here Survivors: **{survivors} and {bots} of placeholders forces**"
+                    )
 
-                    # Assuming channels_ids is a list of channel IDs
             if self.boss["hp"] > 1:
-                for channel_id in channels_ids:
-                    channel = self.bot.get_channel(channel_id)
-                    if channel:
-                        m = await ctx.send(
-                            "The raid did not manage to kill Ragnarok within an hour... He disappeared!")
-                        await m.add_reaction("\U0001F1EB")
-                        summary = (
-                            "The raid did not manage to kill Ragnarok within an hour... He disappeared with **{self.boss['hp']:,.3f}** health remaining."
-                        )
+                # Announced in every raid channel like the other outcomes, this used to
+                # be sent to the command's channel once per raid channel
+                results = await broadcast.send(
+                    "The raid did not manage to kill Ragnarok within an hour... He disappeared!")
+                await asyncio.gather(
+                    *[
+                        m.add_reaction("\U0001F1EB")
+                        for m in results.values()
+                        if isinstance(m, discord.Message)
+                    ],
+                    return_exceptions=True,
+                )
+                summary = (
+                    "The raid did not manage to kill Ragnarok within an hour... He disappeared with **{self.boss['hp']:,.3f}** health remaining."
+                )
 
             await asyncio.sleep(30)
             await ctx.channel.set_permissions(ctx.guild.default_role, overwrite=self.deny_sending)
@@ -757,6 +768,8 @@ class Raid(commands.Cog):
             error_message += traceback.format_exc()
             await ctx.send(error_message)
             print(error_message)
+        finally:
+            await broadcast.close()
 
     async def get_random_user_info(self, ctx):
         try:
@@ -864,6 +877,9 @@ class Raid(commands.Cog):
     async def goodspawn(self, ctx):
         """[Astraea only] Starts a Trial."""
         await self.set_raid_timer()
+        broadcast = self.broadcast = Broadcaster(
+            self.bot, [1154245321451388948, 1199300356081995847]
+        )
 
         try:
 
@@ -873,25 +889,18 @@ class Raid(commands.Cog):
                 timeout=60 * 15,
             )
 
-            channels = [
-                self.bot.get_channel(1154245321451388948),  # This is the current channel where the command was invoked
-                self.bot.get_channel(1199300356081995847),  # Replace with the actual channel ID
-            ]
-
-            channel1 = self.bot.get_channel(1154245321451388948)
-            channel2 = self.bot.get_channel(1199300356081995847)
-            role_id1 = 1153887457775980566
-            role_id2 = 1199303066227331163
-
-            if channel1:
-                role1 = ctx.guild.get_role(role_id1)
-                if role1:
-                    await channel1.send(content=f"{role1.mention}", allowed_mentions=discord.AllowedMentions(roles=True))
-
-            if channel2:
-                role2 = ctx.guild.get_role(role_id2)
-                if role2:
-                    await channel2.send(content=f"{role2.mention}", allowed_mentions=discord.AllowedMentions(roles=True))
+            # Every channel pings its own role, all pings go out at once
+            role_ids = {1154245321451388948: 1153887457775980566, 1199300356081995847: 1199303066227331163}
+            await broadcast.send_each(
+                {
+                    channel_id: {
+                        "content": f"{role.mention}",
+                        "allowed_mentions": discord.AllowedMentions(roles=True),
+                    }
+                    for channel_id, role_id in role_ids.items()
+                    if (role := ctx.guild.get_role(role_id))
+                }
+            )
 
             # Message content, organized for better formatting
             message_intro = """
@@ -927,19 +936,15 @@ class Raid(commands.Cog):
 
             # Updated helper function to send to both channels and handle file closing issue
             async def send_to_channels(embed=None, content=None, view=None, file_path=None):
-                """Helper function to send a message to all channels."""
-                for channel in channels:
-                    if channel is not None:  # Ensure the channel is valid
-                        try:
-                            if file_path:
-                                file = discord.File(file_path, filename="lyx.webp")
-                                await channel.send(embed=embed, content=content, view=view, file=file)
-                            else:
-                                await channel.send(embed=embed, content=content, view=view)
-                        except Exception as e:
-                            await ctx.send(f"Failed to send message to {channel.name}: {str(e)}")
-                    else:
-                        await ctx.send("One of the channels could not be found.")
+                """Helper function to send a message to all channels at once."""
+                for _channel_id in broadcast.missing:
+                    await ctx.send("One of the channels could not be found.")
+                results = await broadcast.send(
+                    content, embed=embed, view=view, file_path=file_path, filename="lyx.webp"
+                )
+                for channel_id, result in results.items():
+                    if isinstance(result, Exception):
+                        await ctx.send(f"Failed to send message to {broadcast.outboxes[channel_id].channel.name}: {str(result)}")
 
             # Call this function with file_path
             await send_to_channels(embed=embed, content=None, view=view, file_path="assets/other/lyx.webp")
@@ -977,21 +982,15 @@ class Raid(commands.Cog):
 
             await send_to_channels(content="**Astraea's trial will commence! Fetch participant data... Hang on!**")
 
-            async with self.bot.pool.acquire() as conn:
-                raid = []
-                HowMany = 0
-                for u in view.joined:
-                    if (
-                            not (
-                                    profile := await conn.fetchrow(
-                                        'SELECT * FROM profile WHERE "user"=$1;', u.id
-                                    )
-                            )
-                            or profile["god"] != "Astraea"
-                    ):
-                        continue
-                    HowMany = HowMany + 1
-                    raid.append(u)
+            profiles = await ctx.profiles.get_many([u.id for u in view.joined])
+            raid = []
+            HowMany = 0
+            for u in view.joined:
+                profile = profiles.get(u.id)
+                if not profile or profile["god"] != "Astraea":
+                    continue
+                HowMany = HowMany + 1
+                raid.append(u)
 
             await send_to_channels(content="**Done getting data!**")
             await send_to_channels(content=f"**{HowMany} followers joined!**")
@@ -1014,7 +1013,7 @@ class Raid(commands.Cog):
                         colour=0xFFB900,
                     )
                 em.set_thumbnail(url=f"{self.bot.BASE_URL}/image/lyx.png")
-                await send_to_channels(embed=em)
+                broadcast.status(embed=em)
                 await asyncio.sleep(5)
                 target = random.choice(raid)
                 if time == "day":
@@ -1099,7 +1098,7 @@ class Raid(commands.Cog):
                 em.set_author(name=f"{target}", icon_url=target.display_avatar.url)
                 em.set_footer(text=f"{len(raid)} followers remain")
                 em.set_thumbnail(url=f"{self.bot.BASE_URL}/image/lyx.png")
-                await send_to_channels(embed=em)
+                await broadcast.send(embed=em)
                 await asyncio.sleep(5)
 
             winner = raid[0]
@@ -1165,6 +1164,8 @@ class Raid(commands.Cog):
             error_message += traceback.format_exc()
             await ctx.send(error_message)
             print(error_message)
+        finally:
+            await broadcast.close()
 
     async def get_player_decision(self, player, options, role, prompt=None, embed=None):
         """
@@ -1263,16 +1264,11 @@ class Raid(commands.Cog):
                 return arrow * num_of_arrows + space * (bar_length - num_of_arrows)
             HowMany = 0
 
+            profiles = await ctx.profiles.get_many([u.id for u in view.joined])
             async with self.bot.pool.acquire() as conn:
                 for u in view.joined:
-                    if (
-                            not (
-                                    profile := await conn.fetchrow(
-                                        'SELECT * FROM profile WHERE "user"=$1;', u.id
-                                    )
-                            )
-                            or profile["god"] != "Sepulchure"
-                    ):
+                    profile = profiles.get(u.id)
+                    if not profile or profile["god"] != "Sepulchure":
                         continue
                     HowMany = HowMany + 1
                     try:
@@ -1290,17 +1286,14 @@ class Raid(commands.Cog):
                         continue
                     raid[u] = {"hp": 250, "armor": deff, "damage": dmg}
 
-            async def is_valid_participant(user, conn):
-                # Check if the user is a follower of "Sepulchure"
-                profile = await conn.fetchrow('SELECT * FROM profile WHERE "user"=$1;', user.id)
-                if profile and profile["god"] == "Sepulchure":
-                    return True
-                return False
-
             await ctx.send("**Gathering the faithful... checking dm eligibility this may take awhile**")
             embed_message_id = None
-            async with self.bot.pool.acquire() as conn:
-                participants = [u for u in view.joined if await is_valid_participant(u, conn)]
+            # Only followers of "Sepulchure" take part
+            participants = [
+                u
+                for u in view.joined
+                if u.id in profiles and profiles[u.id]["god"] == "Sepulchure"
+            ]
 
             if not participants:
                 await ctx.send("No valid participants joined the ritual.")
@@ -2153,19 +2146,16 @@ class Raid(commands.Cog):
     @commands.command(hidden=True, brief=_("Start a Drakath raid"))
     async def chaosspawn(self, ctx, boss_hp: IntGreaterThan(0)):
         """[Drakath only] Starts a raid."""
+        # Define the channels where the raid messages will be sent
+        broadcast = self.broadcast = Broadcaster(
+            self.bot, [1154244627822551060, 1199300319256006746]
+        )
         try:
             await self.set_raid_timer()
 
-            # Define the channels where the raid messages will be sent
-            channels = [
-                self.bot.get_channel(1154244627822551060),  # This is the current channel where the command was invoked
-                self.bot.get_channel(1199300319256006746),  # Replace with the actual channel ID
-            ]
-
             async def send_to_channels(embed=None, content=None, view=None):
-                """Helper function to send a message to all channels."""
-                for channel in channels:
-                    await channel.send(embed=embed, content=content, view=view)
+                """Helper function to send a message to all channels at once."""
+                await broadcast.send(content, embed=embed, view=view)
 
             view = JoinView(
                 Button(style=ButtonStyle.primary, label="Join the raid!"),
@@ -2173,20 +2163,18 @@ class Raid(commands.Cog):
                 timeout=60 * 15,
             )
 
-            channel1 = self.bot.get_channel(1154244627822551060)
-            channel2 = self.bot.get_channel(1199300319256006746)
-            role_id1 = 1153880715419717672
-            role_id2 = 1199302687083204649
-
-            if channel1:
-                role1 = ctx.guild.get_role(role_id1)
-                if role1:
-                    await channel1.send(content=f"{role1.mention}", allowed_mentions=discord.AllowedMentions(roles=True))
-
-            if channel2:
-                role2 = ctx.guild.get_role(role_id2)
-                if role2:
-                    await channel2.send(content=f"{role2.mention}", allowed_mentions=discord.AllowedMentions(roles=True))
+            # Every channel pings its own role, all pings go out at once
+            role_ids = {1154244627822551060: 1153880715419717672, 1199300319256006746: 1199302687083204649}
+            await broadcast.send_each(
+                {
+                    channel_id: {
+                        "content": f"{role.mention}",
+                        "allowed_mentions": discord.AllowedMentions(roles=True),
+                    }
+                    for channel_id, role_id in role_ids.items()
+                    if (role := ctx.guild.get_role(role_id))
+                }
+            )
 
             em = discord.Embed(
                 title="Raid the Void",
@@ -2239,20 +2227,14 @@ class Raid(commands.Cog):
             await send_to_channels(content="**The raid on the facility started! Fetching participant data... Hang on!**")
             HowMany = 0
 
-            async with self.bot.pool.acquire() as conn:
-                raid = {}
-                for u in view.joined:
-                    if (
-                            not (
-                                    profile := await conn.fetchrow(
-                                        'SELECT * FROM profile WHERE "user"=$1;', u.id
-                                    )
-                            )
-                            or profile["god"] != "Drakath"
-                    ):
-                        continue
-                    raid[u] = 250
-                    HowMany = HowMany + 1
+            profiles = await ctx.profiles.get_many([u.id for u in view.joined])
+            raid = {}
+            for u in view.joined:
+                profile = profiles.get(u.id)
+                if not profile or profile["god"] != "Drakath":
+                    continue
+                raid[u] = 250
+                HowMany = HowMany + 1
 
             await send_to_channels(content="**Done getting data!**")
             self.chaoslist = [u.id for u in raid.keys()]
@@ -2284,7 +2266,7 @@ class Raid(commands.Cog):
                 em.add_field(name="Damage", value=dmg)
                 em.set_author(name=str(target), icon_url=target.display_avatar.url)
                 em.set_thumbnail(url="https://i.imgur.com/YS4A6R7.png")
-                await send_to_channels(embed=em)
+                await broadcast.send(embed=em)
                 if raid[target] <= 0:
                     del raid[target]
                     if len(raid) == 0:
@@ -2301,7 +2283,7 @@ class Raid(commands.Cog):
                     )
                     em.set_author(name=str(target), icon_url=target.display_avatar.url)
                     em.set_thumbnail(url="https://i.imgur.com/md5dWFk.png")
-                    await send_to_channels(embed=em)
+                    await broadcast.send(embed=em)
 
                 if random.randint(1, 5) == 1:
                     await asyncio.sleep(4)
@@ -2319,7 +2301,7 @@ class Raid(commands.Cog):
                         colour=0xFFB900,
                     )
                     em.set_thumbnail(url="https://i.imgur.com/lDqNHua.png")
-                    await send_to_channels(embed=em)
+                    await broadcast.send(embed=em)
 
                 dmg_to_take = sum(
                     25 if random.randint(1, 10) != 10 else random.randint(75, 100)
@@ -2336,7 +2318,7 @@ class Raid(commands.Cog):
                     em.add_field(name="HP left", value=boss_hp)
                 else:
                     em.add_field(name="HP left", value="Dead!")
-                await send_to_channels(embed=em)
+                broadcast.status(embed=em)
                 await asyncio.sleep(4)
 
             if boss_hp > 1 and len(raid) > 0:
@@ -2448,6 +2430,8 @@ class Raid(commands.Cog):
             error_message += traceback.format_exc()
             await ctx.send(error_message)
             print(error_message)
+        finally:
+            await broadcast.close()
 
     @commands.command()
     async def joinraid(self, ctx):
@@ -2527,6 +2511,7 @@ class Raid(commands.Cog):
                 data={"Gold": price},
                 conn=conn,
             )
+        await self.bot.stats.invalidate(ctx.author)
         await ctx.send(
             _(
                 "You upgraded your weapon attack raid multiplier to {newlvl} for"
@@ -2586,6 +2571,7 @@ class Raid(commands.Cog):
                 data={"Gold": price},
                 conn=conn,
             )
+        await self.bot.stats.invalidate(ctx.author)
         await ctx.send(
             _(
                 "You upgraded your health pool to {healthpoolcheck} for"
@@ -2638,6 +2624,7 @@ class Raid(commands.Cog):
                 data={"Gold": price},
                 conn=conn,
             )
+        await self.bot.stats.invalidate(ctx.author)
         await ctx.send(
             _(
                 "You upgraded your shield defense raid multiplier to {newlvl} for"
@@ -30,53 +30,45 @@ from utils.markdown import escape_markdown
 class Ranks(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
+        # only the cluster holding the lease rebuilds the boards
+        self.bot.leases.run_exclusive("leaderboards", self.bot.leaderboards.maintain)
+
+    async def cog_unload(self) -> None:
+        await self.bot.leases.stop_exclusive("leaderboards")
 
     @commands.command(brief=_("Show the top 10 richest"))
     @locale_doc
     async def richest(self, ctx: Context) -> None:
         _("""The 10 richest players in Fable.""")
         await ctx.typing()
-        # Fetch the top 10 richest players
-        players = await self.bot.pool.fetch(
-            'SELECT "user", "name", "money" FROM profile ORDER BY "money" DESC LIMIT 10;'
-        )
+        # Fetch the top 10 richest players and the user's own rank
+        players = await self.bot.leaderboards.top("money")
+        position = await self.bot.leaderboards.rank("money", ctx.author)
+        top_10_ids = [user for user, _money in players]
+        profiles = await ctx.profiles.get_many([*top_10_ids, ctx.author.id])
         result = ""
-        top_10_ids = [player["user"] for player in players]
         user_in_top_10 = ctx.author.id in top_10_ids
 
         # Build the leaderboard string
-        for idx, profile in enumerate(players):
-            username = await rpgtools.lookup(self.bot, profile["user"])
+        for idx, (user, money) in enumerate(players):
+            if (profile := profiles.get(user)) is None:
+                continue
+            username = await rpgtools.lookup(self.bot, user)
             text = _("{name}, a character by {username} with **${money}**").format(
                 name=escape_markdown(profile["name"]),
                 username=escape_markdown(username),
-                money=profile["money"],
+                money=money,
             )
-            # Highlight user's own entry if they are in top 10
-            if user_in_top_10 and profile["user"] == ctx.author.id:
-                result += f"{idx + 1}. {text}\n"
-            else:
-                result += f"{idx + 1}. {text}\n"
+            result += f"{idx + 1}. {text}\n"
 
-        # If the user isn't in the top 10, fetch their rank
+        # If the user isn't in the top 10, show their rank
         if not user_in_top_10:
-            # Fetch user's own money
-            user_profile = await self.bot.pool.fetchrow(
-                'SELECT "money", "name" FROM profile WHERE "user" = $1;', ctx.author.id
-            )
-            if user_profile:
-                user_money = user_profile["money"]
-                user_name = user_profile["name"]
-                # Calculate the user's rank
-                user_rank = await self.bot.pool.fetchval(
-                    'SELECT COUNT(*) FROM profile WHERE "money" > $1;', user_money
-                )
-                user_rank += 1  # Adjust rank to be 1-based
-
+            if position and (user_profile := profiles.get(ctx.author.id)):
+                user_rank, user_money = position
                 username = await rpgtools.lookup(self.bot, ctx.author.id)
 
                 text = _("{name}, a character by {username} with **${money}**").format(
-                    name=escape_markdown(user_name),
+                    name=escape_markdown(user_profile["name"]),
                     username=escape_markdown(username),
                     money=user_money,
                 )
@@ -308,52 +300,39 @@ class Ranks(commands.Cog):
     async def highscore(self, ctx: Context) -> None:
         _("""Shows you the top 10 players by XP and displays the corresponding level.""")
         await ctx.typing()
-        # Fetch the top 10 players by XP
-        players = await self.bot.pool.fetch(
-            'SELECT "user", "name", "xp" FROM profile ORDER BY "xp" DESC LIMIT 10;'
-        )
+        # Fetch the top 10 players by XP and the user's own rank
+        players = await self.bot.leaderboards.top("xp")
+        position = await self.bot.leaderboards.rank("xp", ctx.author)
+        top_10_ids = [user for user, _xp in players]
+        profiles = await ctx.profiles.get_many([*top_10_ids, ctx.author.id])
         result = ""
-        top_10_ids = [player["user"] for player in players]
         user_in_top_10 = ctx.author.id in top_10_ids
 
         # Build the leaderboard string
-        for idx, profile in enumerate(players):
-            username = await rpgtools.lookup(self.bot, profile["user"])
+        for idx, (user, xp) in enumerate(players):
+            if (profile := profiles.get(user)) is None:
+                continue
+            username = await rpgtools.lookup(self.bot, user)
             text = _(
                 "{name}, a character by {username} with Level **{level}** (**{xp}** XP)"
             ).format(
                 name=escape_markdown(profile["name"]),
                 username=escape_markdown(username),
-                level=rpgtools.xptolevel(profile["xp"]),
-                xp=profile["xp"],
+                level=rpgtools.xptolevel(xp),
+                xp=xp,
             )
-            # Highlight user's own entry if they are in top 10
-            if user_in_top_10 and profile["user"] == ctx.author.id:
-                result += f"{idx + 1}. {text}\n"
-            else:
-                result += f"{idx + 1}. {text}\n"
+            result += f"{idx + 1}. {text}\n"
 
-        # If the user isn't in the top 10, fetch their rank
+        # If the user isn't in the top 10, show their rank
         if not user_in_top_10:
-            # Fetch user's own XP
-            user_profile = await self.bot.pool.fetchrow(
-                'SELECT "xp", "name" FROM profile WHERE "user" = $1;', ctx.author.id
-            )
-            if user_profile:
-                user_xp = user_profile["xp"]
-                user_name = user_profile["name"]
-                # Calculate the user's rank
-                user_rank = await self.bot.pool.fetchval(
-                    'SELECT COUNT(*) FROM profile WHERE "xp" > $1;', user_xp
-                )
-                user_rank += 1  # Adjust rank to be 1-based
-
+            if position and (user_profile := profiles.get(ctx.author.id)):
+                user_rank, user_xp = position
                 username = await rpgtools.lookup(self.bot, ctx.author.id)
 
                 text = _(
                     "{name}, a character by {username} with Level **{level}** (**{xp}** XP)"
                 ).format(
-                    name=escape_markdown(user_name),
+                    name=escape_markdown(user_profile["name"]),
                     username=escape_markdown(username),
                     level=rpgtools.xptolevel(user_xp),
                     xp=user_xp,
@@ -376,47 +355,34 @@ class Ranks(commands.Cog):
     async def pvpstats(self, ctx: Context) -> None:
         _("""Shows you the top 10 players by the amount of wins in PvP matches.""")
         await ctx.typing()
-        # Fetch the top 10 PvP players
-        players = await self.bot.pool.fetch(
-            'SELECT "user", "name", "pvpwins" FROM profile ORDER BY "pvpwins" DESC LIMIT 10;'
-        )
+        # Fetch the top 10 PvP players and the user's own rank
+        players = await self.bot.leaderboards.top("pvpwins")
+        position = await self.bot.leaderboards.rank("pvpwins", ctx.author)
+        top_10_ids = [user for user, _wins in players]
+        profiles = await ctx.profiles.get_many([*top_10_ids, ctx.author.id])
         result = ""
-        top_10_ids = [player["user"] for player in players]
         user_in_top_10 = ctx.author.id in top_10_ids
 
         # Build the leaderboard string
-        for idx, profile in enumerate(players):
-            username = await rpgtools.lookup(self.bot, profile["user"])
+        for idx, (user, wins) in enumerate(players):
+            if (profile := profiles.get(user)) is None:
+                continue
+            username = await rpgtools.lookup(self.bot, user)
             text = _("{name}, a character by {username} with **{wins}** wins").format(
                 name=escape_markdown(profile["name"]),
                 username=escape_markdown(username),
-                wins=profile["pvpwins"],
+                wins=wins,
             )
-            # Highlight user's own entry if they are in top 10
-            if user_in_top_10 and profile["user"] == ctx.author.id:
-                result += f"{idx + 1}. {text}\n"
-            else:
-                result += f"{idx + 1}. {text}\n"
+            result += f"{idx + 1}. {text}\n"
 
-        # If the user isn't in the top 10, fetch their rank
+        # If the user isn't in the top 10, show their rank
         if not user_in_top_10:
-            # Fetch user's own PvP wins
-            user_profile = await self.bot.pool.fetchrow(
-                'SELECT "pvpwins", "name" FROM profile WHERE "user" = $1;', ctx.author.id
-            )
-            if user_profile:
-                user_pvpwins = user_profile["pvpwins"]
-                user_name = user_profile["name"]
-                # Calculate the user's rank
-                user_rank = await self.bot.pool.fetchval(
-                    'SELECT COUNT(*) FROM profile WHERE "pvpwins" > $1;', user_pvpwins
-                )
-                user_rank += 1  # Adjust rank to be 1-based
-
+            if position and (user_profile := profiles.get(ctx.author.id)):
+                user_rank, user_pvpwins = position
                 username = await rpgtools.lookup(self.bot, ctx.author.id)
 
                 text = _("{name}, a character by {username} with **{wins}** wins").format(
-                    name=escape_markdown(user_name),
+                    name=escape_markdown(user_profile["name"]),
                     username=escape_markdown(username),
                     wins=user_pvpwins,
                 )
@@ -439,50 +405,39 @@ class Ranks(commands.Cog):
         _("""The top 10 lovers sorted by their spouse's lovescore.""")
         await ctx.typing()
         # Fetch the top 10 lovers
-        players = await self.bot.pool.fetch(
-            'SELECT "user", "marriage", "lovescore" FROM profile ORDER BY "lovescore" DESC LIMIT 10;'
-        )
+        players = await self.bot.leaderboards.top("lovescore")
+        top_10_ids = [user for user, _points in players]
+        profiles = await ctx.profiles.get_many([*top_10_ids, ctx.author.id])
         result = ""
-        top_10_ids = [player["user"] for player in players]
         user_in_top_10 = ctx.author.id in top_10_ids
 
         # Build the leaderboard string
-        for idx, profile in enumerate(players):
-            lovee = await rpgtools.lookup(self.bot, profile["user"])
+        for idx, (user, points) in enumerate(players):
+            if (profile := profiles.get(user)) is None:
+                continue
+            lovee = await rpgtools.lookup(self.bot, user)
             lover = await rpgtools.lookup(self.bot, profile["marriage"])
             text = _(
                 "**{lover}** gifted their love **{lovee}** items worth **${points}**"
             ).format(
                 lover=discord.utils.escape_markdown(lover),
                 lovee=discord.utils.escape_markdown(lovee),
-                points=profile["lovescore"],
+                points=points,
             )
-            # Highlight user's own entry if they are in top 10
-            if user_in_top_10 and profile["user"] == ctx.author.id:
-                result += f"{idx + 1}. {text}\n"
-            else:
-                result += f"{idx + 1}. {text}\n"
+            result += f"{idx + 1}. {text}\n"
 
-        # If the user isn't in the top 10, fetch their rank
+        # If the user isn't in the top 10, rank them by their spouse's lovescore
         if not user_in_top_10:
-            # Fetch user's own lovescore and marriage
-            user_profile = await self.bot.pool.fetchrow(
-                'SELECT "marriage", "lovescore" FROM profile WHERE "user" = $1;', ctx.author.id
+            user_profile = profiles.get(ctx.author.id)
+            user_marriage = user_profile["marriage"] if user_profile else None
+            position = (
+                await self.bot.leaderboards.rank("lovescore", user_marriage)
+                if user_marriage
+                else None
             )
 
-            if user_profile:
-
-                user_marriage = user_profile["marriage"]
-
-                marriage = await self.bot.pool.fetchrow(
-                    'SELECT "marriage", "lovescore" FROM profile WHERE "user" = $1;', user_marriage
-                )
-                user_lovescore = marriage["lovescore"]
-                # Calculate the user's rank
-                user_rank = await self.bot.pool.fetchval(
-                    'SELECT COUNT(*) FROM profile WHERE "lovescore" > $1;', user_lovescore
-                )
-                user_rank += 1  # Adjust rank to be 1-based
+            if position:
+                user_rank, user_lovescore = position
 
                 lover = await rpgtools.lookup(self.bot, ctx.author.id)
                 lovee = await rpgtools.lookup(self.bot, user_marriage)
@@ -19,15 +19,14 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 from __future__ import annotations
 
 import asyncio
+import heapq
 import re
 
 from datetime import datetime, timedelta
 
-import asyncpg
 import discord
 
-from discord.ext import commands, tasks
-from discord.http import handle_message_parameters
+from discord.ext import commands
 
 from classes.bot import Bot
 from classes.context import Context
@@ -90,171 +89,153 @@ class Timer:
 
 
 class Scheduling(commands.Cog):
+    # How far ahead of now timers are loaded into memory
+    LOAD_WINDOW = timedelta(hours=1)
+    # Maximum amount of timers kept in memory per window
+    LOAD_LIMIT = 5000
+    # Maximum amount of timers fired and deleted in one go
+    BATCH_SIZE = 100
+
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
-        self._handles = 0 in self.bot.shard_ids
-
-        self._have_data = asyncio.Event()
-        self._current_timer = None
-        self.reminder_check.start()
-
-        if self._handles:
-            self._task = asyncio.create_task(self.dispatch_timers())
-        else:
-            self._task = None
-
-    async def get_active_timer(self, *, connection=None, days=7) -> Timer | None:
-        query = 'SELECT * FROM reminders WHERE "end" < (CURRENT_DATE + $1::interval) ORDER BY "end" LIMIT 1;'
-        con = connection or self.bot.pool
 
-        record = await con.fetchrow(query, timedelta(days=days))
-        return Timer(record=record) if record else None
+        # min-heap of (end, id, timer) for all timers ending before _horizon
+        self._queue: list[tuple[datetime, int, Timer]] = []
+        self._queued: set[int] = set()
+        self._cancelled: set[int] = set()
+        self._horizon: datetime | None = None
+        self._wakeup = asyncio.Event()
 
-    async def wait_for_active_timers(self, *, conn=None, days=7) -> Timer:
-        async with self.bot.pool.acquire() as conn:
-            timer = await self.get_active_timer(connection=conn, days=days)
-            if timer is not None:
-                self._have_data.set()
-                return timer
+        # only the cluster holding the lease dispatches timers
+        self.bot.leases.run_exclusive("reminders", self.dispatch_timers)
 
-            self._have_data.clear()
-            self._current_timer = None
-            await self._have_data.wait()
-            return await self.get_active_timer(connection=conn, days=days)
+    def _push(self, timer: Timer) -> None:
+        if timer.id is None or timer.id in self._queued:
+            return
+        self._queued.add(timer.id)
+        heapq.heappush(self._queue, (timer.end, timer.id, timer))
+
+    async def load_timers(self, now: datetime) -> None:
+        """Loads the next window of timers into the queue using the index on end"""
+        until = now + self.LOAD_WINDOW
+        records = await self.bot.pool.fetch(
+            'SELECT * FROM reminders WHERE "end" < $1 ORDER BY "end" LIMIT $2;',
+            until,
+            self.LOAD_LIMIT,
+        )
+        for record in records:
+            self._push(Timer(record=record))
+        if len(records) == self.LOAD_LIMIT:
+            # window is full, everything after the last row gets loaded later
+            self._horizon = records[-1]["end"]
+        else:
+            self._horizon = until
+
+    def _pop_due(self, now: datetime) -> list[Timer]:
+        due = []
+        while self._queue and len(due) < self.BATCH_SIZE:
+            end, timer_id, timer = self._queue[0]
+            if end > now:
+                break
+            heapq.heappop(self._queue)
+            self._queued.discard(timer_id)
+            if timer_id in self._cancelled:
+                self._cancelled.discard(timer_id)
+                continue
+            due.append(timer)
+        return due
+
+    async def _wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
 
     async def dispatch_timers(self):
+        self._queue.clear()
+        self._queued.clear()
+        self._cancelled.clear()
+        self._horizon = None
         try:
+            await self.bot.wait_until_ready()
             while not self.bot.is_closed():
-                timer = self._current_timer = await self.wait_for_active_timers(days=40)
                 now = datetime.utcnow()
-
-                if timer.end >= now:
-                    to_sleep = (timer.end - now).total_seconds()
-                    await asyncio.sleep(to_sleep)
-
-                try:
-                    await self._remind(timer)
-                except Exception:
-                    pass
-        except asyncio.CancelledError:
-            raise
-        except (OSError, discord.ConnectionClosed, asyncpg.PostgresConnectionError):
-            self.restart()
+                if self._horizon is None or now >= self._horizon:
+                    await self.load_timers(now)
+
+                due = self._pop_due(now)
+                if due:
+                    await self.fire_timers(due)
+                    continue
+
+                # sleep until the next timer is due or the window runs out,
+                # timer_add and timer_remove wake us up earlier
+                wake_at = self._horizon
+                if self._queue and self._queue[0][0] < wake_at:
+                    wake_at = self._queue[0][0]
+                await self._wait((wake_at - now).total_seconds())
+        finally:
+            # on errors the lease holder restarts us on its next heartbeat
+            self._horizon = None
+
+    async def fire_timers(self, timers: list[Timer]) -> None:
+        """Sends a batch of timers concurrently and deletes them in one query"""
+        await asyncio.gather(
+            *[self._remind(timer) for timer in timers], return_exceptions=True
+        )
+        await self.bot.pool.execute(
+            'DELETE FROM reminders WHERE "id"=ANY($1);', [t.id for t in timers]
+        )
 
     @commands.Cog.listener()
     async def on_timer_add(self, timer: Timer) -> None:
-        if not self._handles:
+        if self._horizon is None:
             return
 
-        if (timer.end - timer.start).total_seconds() <= (86400 * 40):  # 40 days
-            self._have_data.set()
-        if self._current_timer and timer.end < self._current_timer.end:
-            self.restart()
+        if timer.end < self._horizon:
+            self._push(timer)
+            self._wakeup.set()
 
     @commands.Cog.listener()
     async def on_timer_remove(self, timer_id: int) -> None:
-        if not self._handles:
-            return
-
-        if self._current_timer and self._current_timer.id == timer_id:
-            self.restart()
+        if timer_id in self._queued:
+            self._cancelled.add(timer_id)
+            self._wakeup.set()
 
     async def add_timer(self, timer: Timer) -> None:
-        await self.bot.cogs["Sharding"].handler("add_timer", 0, args=timer.to_dict())
+        args = timer.to_dict()
+        args["start"] = timer.start.isoformat()
+        args["end"] = timer.end.isoformat()
+        await self.bot.cogs["Sharding"].handler("add_timer", 0, args=args)
 
     async def remove_timer(self, timer_id: int) -> None:
         await self.bot.cogs["Sharding"].handler(
             "remove_timer", 0, args={"timer_id": timer_id}
         )
 
-    async def fetch_reminders(self):
-        try:
-            async with self.bot.pool.acquire() as connection:
-                async with connection.transaction():
-                    reminders = await connection.fetch(
-                        "SELECT * FROM reminders"
-                    )
-            return reminders
-        except Exception as e:
-            # If an exception occurs, send a direct message to a specific user
-            user_id = 295173706496475136  # ID of the user to send the message to
-            user = self.bot.get_user(user_id)
-            if user:
-                await user.send(f"An exception occurred while fetching reminders: {e}")
-            else:
-                print(f"Failed to send DM: User {user_id} not found")
-            return []
-
-    @tasks.loop(seconds=1)  # Adjust the interval as needed
-    async def reminder_check(self):
-        try:
-            reminders = await self.fetch_reminders()
-            current_time = datetime.now()
+    async def _remind(self, timer: Timer) -> None:
+        # Neither the user nor the channel have to be fetched over REST to send
+        channel = self.bot.get_channel(
+            timer.channel
+        ) or self.bot.get_partial_messageable(timer.channel)
+        mention = f"<@{timer.user}>"
 
-            for reminder in reminders:
-                end_time = reminder["end"]
-                if current_time >= end_time:
-                    await self._send_reminder(reminder)
-        except Exception as e:
-            # If an exception occurs, send a direct message to a specific user
-            print(f"Failed to send DM: User not found")
-    @reminder_check.before_loop
-    async def before_reminder_check(self):
-        await self.bot.wait_until_ready()  # Wait until the bot is fully ready
-
-    async def _send_reminder(self, reminder: dict) -> None:
-        user_id = reminder["user"]
-        content = reminder["content"]
-        channel_id = reminder["channel"]
-        reminder_id = reminder["id"]
-        reminder_start = reminder["start"]
-        type = reminder["type"] # Assuming reminder["start"] is already a datetime object
-
-        try:
-            user = await self.bot.fetch_user(user_id)
-            channel = await self.bot.fetch_channel(channel_id)
-
-            # Calculate timedelta
-            timedelta = datetime.now() - reminder_start
-
-            # Format timedelta
-            hours, remainder = divmod(timedelta.total_seconds(), 3600)
+        if timer.type != "adventure":
+            delta = datetime.utcnow() - timer.start
+            hours, remainder = divmod(delta.total_seconds(), 3600)
             minutes, seconds = divmod(remainder, 60)
-            formatted_timedelta = f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
-            if type != "adventure":
-            # Send the reminder message
-                await channel.send(f"{user.mention} you wanted to be reminded about {content} {formatted_timedelta} ago.")
-            else:
-                await channel.send(
-                    f"{user.mention} adventure level: **{content}** is finished!")
-
-            # Delete the reminder from the database
-            async with self.bot.pool.acquire() as connection:
-                async with connection.transaction():
-                    await connection.execute(
-                        "DELETE FROM reminders WHERE id = $1",
-                        reminder_id
-                    )
-        except Exception as e:
-                    # Send a message to a specific user if any other error occurs
-                async with self.bot.pool.acquire() as connection:
-                    async with connection.transaction():
-                        await connection.execute(
-                            "DELETE FROM reminders WHERE id = $1",
-                            reminder_id
-                        )
-                print(f"Failed to send DM: User {user_id} not found.")
-
-    def restart(self):
-        if self._task:
-            self._task.cancel()
-            self._task = asyncio.create_task(self.dispatch_timers())
-
-    async def short_timer_optimisation(self, seconds: int, timer: Timer) -> None:
-        await asyncio.sleep(seconds)
-        await self._remind(timer)
-
-
+            formatted_timedelta = (
+                f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
+            )
+            await channel.send(
+                f"{mention} you wanted to be reminded about {timer.content}"
+                f" {formatted_timedelta} ago."
+            )
+        else:
+            await channel.send(
+                f"{mention} adventure level: **{timer.content}** is finished!"
+            )
 
     async def create_reminder(
             self,
@@ -278,32 +259,26 @@ class Scheduling(commands.Cog):
                 end=end,
             )
             delta = (end - now).total_seconds()
-
-            if delta <= 7884000:
-                # a shortcut for small timers
-                #asyncio.create_task(self.short_timer_optimisation(delta, timer))
-
-                id = await conn.fetchval(
-                    'INSERT INTO reminders ("user", "content", "channel", "start", "end", "type") VALUES'
-                    ' ($1, $2, $3, $4, $5, $6) RETURNING "id";',
-                    ctx.author.id,
-                    content,
-                    ctx.channel.id,
-                    now,
-                    end,
-                    type,
-                )
-                timer.id = id
-
+            if delta > 7884000:
                 return timer
 
-
+            id = await conn.fetchval(
+                'INSERT INTO reminders ("user", "content", "channel", "start", "end", "type") VALUES'
+                ' ($1, $2, $3, $4, $5, $6) RETURNING "id";',
+                ctx.author.id,
+                content,
+                ctx.channel.id,
+                now,
+                end,
+                type,
+            )
         except Exception as e:
             # Handle the exception here
             await ctx.send(f"An error occurred: {e}")
             # You can add more error handling or logging as needed
         else:
             timer.id = id
+            # wakes up the dispatcher in case this ends before its next timer
             await self.add_timer(timer)
         return timer
 
@@ -473,8 +448,8 @@ class Scheduling(commands.Cog):
         else:
             await ctx.send(_("Opted out of automatic adventure reminders."))
 
-    def cog_unload(self):
-        self.reminder_check.cancel()
+    async def cog_unload(self):
+        await self.bot.leases.stop_exclusive("reminders")
 
 
 async def setup(bot):
@@ -77,7 +77,10 @@ class Server(commands.Cog):
                         prefix,
                         ctx.guild.id,
                     )
-        self.bot.all_prefixes[ctx.guild.id] = prefix
+        await self.bot.prefixes.set(
+            ctx.guild.id,
+            None if prefix == self.bot.config.bot.global_prefix else prefix,
+        )
         await ctx.send(_("Prefix changed to `{prefix}`.").format(prefix=prefix))
 
     @commands.has_permissions(manage_guild=True)
@@ -86,7 +89,7 @@ class Server(commands.Cog):
     async def reset(self, ctx: Context) -> None:
         _("""Resets the server settings.""")
         await self.bot.pool.execute('DELETE FROM server WHERE "id"=$1;', ctx.guild.id)
-        self.bot.all_prefixes.pop(ctx.guild.id, None)
+        await self.bot.prefixes.set(ctx.guild.id, None)
         await ctx.send(_("Done!"))
 
     @commands.guild_only()
@@ -94,8 +97,9 @@ class Server(commands.Cog):
     @locale_doc
     async def prefix(self, ctx: Context) -> None:
         _("""View the bot prefix for the server""")
-        prefix_ = self.bot.all_prefixes.get(
-            ctx.guild.id, self.bot.config.bot.global_prefix
+        prefix_ = (
+            await self.bot.prefixes.get(ctx.guild.id)
+            or self.bot.config.bot.global_prefix
         )
         await ctx.send(
             _(
@@ -17,7 +17,6 @@ You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import asyncio
-import json
 
 from datetime import datetime, timedelta
 from time import time
@@ -26,10 +25,12 @@ from uuid import uuid4
 from datetime import timedelta
 
 import discord
+import orjson
 import textwrap
 from discord.ext import commands
 
 from cogs.scheduler import Timer
+from utils import cooldowns
 from utils.eval import evaluate as _evaluate
 from utils.i18n import _, locale_doc
 from utils.misc import nice_join
@@ -42,17 +43,10 @@ def user_on_cooldown(cooldown: int, identifier: str = None):
             cmd_id = ctx.command.qualified_name
         else:
             cmd_id = identifier
-        command_ttl = await ctx.bot.redis.execute_command(
-            "TTL", f"cd:{ctx.author.id}:{cmd_id}"
+        command_ttl = await ctx.bot.cooldowns.acquire(
+            cooldowns.USER, ctx.author.id, cmd_id, cooldown
         )
-        if command_ttl == -2:
-            await ctx.bot.redis.execute_command(
-                "SET",
-                f"cd:{ctx.author.id}:{cmd_id}",
-                cmd_id,
-                "EX",
-                cooldown,
-            )
+        if command_ttl is None:
             return True
         else:
             raise commands.CommandOnCooldown(ctx, command_ttl, commands.BucketType.user)
@@ -65,22 +59,13 @@ def guild_on_cooldown(cooldown: int):
     async def predicate(ctx):
         guild = getattr(ctx, "character_data", None)
         if not guild:
-            guild = await ctx.bot.pool.fetchval(
-                'SELECT guild FROM profile WHERE "user"=$1;', ctx.author.id
-            )
+            guild, _alliance = await ctx.bot.stats.membership(ctx.author.id)
         else:
             guild = guild["guild"]
-        command_ttl = await ctx.bot.redis.execute_command(
-            "TTL", f"guildcd:{guild}:{ctx.command.qualified_name}"
+        command_ttl = await ctx.bot.cooldowns.acquire(
+            cooldowns.GUILD, guild, ctx.command.qualified_name, cooldown
         )
-        if command_ttl == -2:
-            await ctx.bot.redis.execute_command(
-                "SET",
-                f"guildcd:{guild}:{ctx.command.qualified_name}",
-                ctx.command.qualified_name,
-                "EX",
-                cooldown,
-            )
+        if command_ttl is None:
             return True
         else:
             raise commands.CommandOnCooldown(
@@ -93,30 +78,11 @@ def guild_on_cooldown(cooldown: int):
 # Cross-process cooldown check (pass this to commands)
 def alliance_on_cooldown(cooldown: int):
     async def predicate(ctx):
-        data = getattr(ctx, "character_data", None)
-        if not data:
-            alliance = await ctx.bot.pool.fetchval(
-                'SELECT alliance FROM guild WHERE "id"=(SELECT guild FROM profile WHERE'
-                ' "user"=$1);',
-                ctx.author.id,
-            )
-        else:
-            guild = data["guild"]
-            alliance = await ctx.bot.pool.fetchval(
-                'SELECT alliance FROM guild WHERE "id"=$1;', guild
-            )
-
-        command_ttl = await ctx.bot.redis.execute_command(
-            "TTL", f"alliancecd:{alliance}:{ctx.command.qualified_name}"
+        _guild, alliance = await ctx.bot.stats.membership(ctx.author.id)
+        command_ttl = await ctx.bot.cooldowns.acquire(
+            cooldowns.ALLIANCE, alliance, ctx.command.qualified_name, cooldown
         )
-        if command_ttl == -2:
-            await ctx.bot.redis.execute_command(
-                "SET",
-                f"alliancecd:{alliance}:{ctx.command.qualified_name}",
-                ctx.command.qualified_name,
-                "EX",
-                cooldown,
-            )
+        if command_ttl is None:
             return True
         else:
             raise commands.CommandOnCooldown(
@@ -128,20 +94,13 @@ def alliance_on_cooldown(cooldown: int):
 
 def next_day_cooldown():
     async def predicate(ctx):
-        command_ttl = await ctx.bot.redis.execute_command(
-            "TTL", f"cd:{ctx.author.id}:{ctx.command.qualified_name}"
+        ctt = int(
+            86400 - (time() % 86400)
+        )  # Calculate the number of seconds until next UTC midnight
+        command_ttl = await ctx.bot.cooldowns.acquire(
+            cooldowns.USER, ctx.author.id, ctx.command.qualified_name, ctt
         )
-        if command_ttl == -2:
-            ctt = int(
-                86400 - (time() % 86400)
-            )  # Calculate the number of seconds until next UTC midnight
-            await ctx.bot.redis.execute_command(
-                "SET",
-                f"cd:{ctx.author.id}:{ctx.command.qualified_name}",
-                ctx.command.qualified_name,
-                "EX",
-                ctt,
-            )
+        if command_ttl is None:
             return True
         else:
             raise commands.CommandOnCooldown(ctx, command_ttl, commands.BucketType.user)
@@ -149,6 +108,10 @@ def next_day_cooldown():
     return commands.check(predicate)  # TODO: Needs a redesign
 
 
+# Records of which cluster sent a message with a view are kept this long
+VIEW_OWNER_TTL = 86400
+
+
 class Sharding(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -159,15 +122,65 @@ class Sharding(commands.Cog):
         """
         _messages should be a dict with the syntax {"<command_id>": [outputs]}
         """
+        # command_id -> channel the output of a running action goes to
+        self._reply_to = dict()
+        self._store_view = None
         if 0 in self.bot.shard_ids:
             self.bot.add_listener(self.on_raw_interaction)
+        else:
+            self._track_views()
 
     def cog_unload(self):
+        if self._store_view is not None:
+            self.bot._connection.store_view = self._store_view
         asyncio.create_task(self.unregister_sub())
 
+    @property
+    def broadcast_channel(self) -> str:
+        return self.bot.config.database.redis_shard_announce_channel
+
+    def cluster_channel(self, cluster_id: int) -> str:
+        return f"{self.broadcast_channel}:{cluster_id}"
+
+    def cluster_for_shard(self, shard_id: int) -> int:
+        # the launcher hands out shards in consecutive chunks, starting at 1
+        return shard_id // self.bot.config.launcher.shards_per_cluster + 1
+
+    def cluster_for_guild(self, guild_id: int) -> int:
+        return self.cluster_for_shard((guild_id >> 22) % self.bot.shard_count)
+
+    def view_owner_key(self, message_id: int) -> str:
+        return f"{self.broadcast_channel}:view:{message_id}"
+
+    def _track_views(self):
+        """
+        Remembers which cluster sent which message with a view
+
+        Interactions in DMs always arrive on shard 0. If another cluster sent
+        the message, the shard 0 cluster looks the owner up and forwards the
+        interaction only to it.
+        """
+        state = self.bot._connection
+        store_view = self._store_view = state.store_view
+
+        def tracking_store_view(view, message_id=None, *args, **kwargs):
+            store_view(view, message_id, *args, **kwargs)
+            if message_id is not None:
+                asyncio.create_task(
+                    self.bot.redis.execute_command(
+                        "SET",
+                        self.view_owner_key(message_id),
+                        self.bot.cluster_id,
+                        "EX",
+                        VIEW_OWNER_TTL,
+                    )
+                )
+
+        state.store_view = tracking_store_view
+
     async def register_sub(self):
         await self.pubsub.subscribe(
-            self.bot.config.database.redis_shard_announce_channel
+            self.broadcast_channel, self.cluster_channel(self.bot.cluster_id)
         )
         self.router = asyncio.create_task(self.event_handler())
 
@@ -175,23 +188,25 @@ class Sharding(commands.Cog):
         if self.router and not self.router.cancelled:
             self.router.cancel()
         await self.pubsub.unsubscribe(
-            self.bot.config.database.redis_shard_announce_channel
+            self.broadcast_channel, self.cluster_channel(self.bot.cluster_id)
         )
 
     async def event_handler(self):
         """
         main router
 
+        Listens on the broadcast channel and on the channel of this cluster.
         Possible messages to come:
-        {"scope":<bot/launcher>, "action": "<name>", "args": "<dict of args>", "command_id": "<uuid4>"}
+        {"scope":<bot/launcher>, "action": "<name>", "args": "<dict of args>", "command_id": "<uuid4>", "reply_to": "<channel>"}
         {"output": "<string>", "command_id": "<uuid4>"}
+        {"type": "raw_interaction", "data": "<interaction payload>"}
         """
         async for message in self.pubsub.listen():
             if message["type"] != "message":
                 continue
             try:
-                payload = json.loads(message["data"])
-            except json.JSONDecodeError:
+                payload = orjson.loads(message["data"])
+            except orjson.JSONDecodeError:
                 continue
 
             if (type := payload.get("type")) and (data := payload.get("data")):
@@ -201,6 +216,8 @@ class Sharding(commands.Cog):
             if payload.get("action") and hasattr(self, payload.get("action")):
                 if payload.get("scope") != "bot":
                     continue  # it's not our cup of tea
+                if reply_to := payload.get("reply_to"):
+                    self._reply_to[payload["command_id"]] = reply_to
                 if payload.get("args"):
                     asyncio.create_task(
                         getattr(self, payload["action"])(
@@ -220,12 +237,27 @@ class Sharding(commands.Cog):
                         fut.set_result(payload["output"])
                         break
 
+    async def reply(self, command_id: str, output: Any) -> None:
+        """Sends the output of an action back to the cluster that asked for it"""
+        channel = self._reply_to.pop(command_id, self.broadcast_channel)
+        await self.bot.redis.execute_command(
+            "PUBLISH",
+            channel,
+            orjson.dumps({"output": output, "command_id": command_id}),
+        )
+
     async def reload_bans(self, command_id: int):
         await self.bot.load_bans()
 
     async def clear_donator_cache(self, user_id: int, command_id: int):
         self.bot.get_donator_rank.invalidate(self.bot, user_id)
 
+    async def clear_stats_cache(self, user_ids: list[int], command_id: int):
+        self.bot.stats.forget(user_ids)
+
+    async def update_setting(self, name: str, id_: int, value, command_id: int):
+        getattr(self.bot, name).store(id_, value)
+
     async def remove_timer(self, timer_id: int, command_id: int) -> None:
         self.bot.dispatch("timer_remove", timer_id)
 
@@ -243,51 +275,28 @@ class Sharding(commands.Cog):
         self.bot.dispatch("timer_add", timer)
 
     async def guild_count(self, command_id: str):
-        payload = {"output": len(self.bot.guilds), "command_id": command_id}
-        await self.bot.redis.execute_command(
-            "PUBLISH",
-            self.bot.config.database.redis_shard_announce_channel,
-            json.dumps(payload),
-        )
+        await self.reply(command_id, len(self.bot.guilds))
 
     async def send_latency_and_shard_count(self, command_id: str):
-        payload = {
-            "output": {
+        await self.reply(
+            command_id,
+            {
                 f"{self.bot.cluster_id}": [
                     self.bot.cluster_name,
                     self.bot.shard_ids,
                     round(self.bot.latency * 1000),
                 ]
             },
-            "command_id": command_id,
-        }
-        await self.bot.redis.execute_command(
-            "PUBLISH",
-            self.bot.config.database.redis_shard_announce_channel,
-            json.dumps(payload),
         )
 
     async def evaluate(self, code, command_id: str):
         if code.startswith("```") and code.endswith("```"):
             code = "\n".join(code.split("\n")[1:-1])
         code = code.strip("` \n")
-        payload = {"output": await _evaluate(self.bot, code), "command_id": command_id}
-        await self.bot.redis.execute_command(
-            "PUBLISH",
-            self.bot.config.database.redis_shard_announce_channel,
-            json.dumps(payload),
-        )
+        await self.reply(command_id, await _evaluate(self.bot, code))
 
     async def latency(self, command_id: str):
-        payload = {
-            "output": round(self.bot.latency * 1000, 2),
-            "command_id": command_id,
-        }
-        await self.bot.redis.execute_command(
-            "PUBLISH",
-            self.bot.config.database.redis_shard_announce_channel,
-            json.dumps(payload),
-        )
+        await self.reply(command_id, round(self.bot.latency * 1000, 2))
 
     async def wait_for_dms(self, check, timeout, command_id: str):
         """
@@ -315,13 +324,14 @@ class Sharding(commands.Cog):
         def pred(e):
             return data_matches(check, e)
 
-        out = await self.bot.wait_for("raw_message_create", check=pred, timeout=timeout)
-        payload = {"output": out, "command_id": command_id}
-        await self.bot.redis.execute_command(
-            "PUBLISH",
-            self.bot.config.database.redis_shard_announce_channel,
-            json.dumps(payload),
-        )
+        try:
+            out = await self.bot.wait_for(
+                "raw_message_create", check=pred, timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            self._reply_to.pop(command_id, None)
+            raise
+        await self.reply(command_id, out)
 
     async def handler(
             self,
@@ -330,6 +340,7 @@ class Sharding(commands.Cog):
             args: dict = {},
             _timeout: int = 2,
             scope: str = "bot",
+            cluster_id: int | None = None,
     ):  # TODO: think of a better name
         """
         coro
@@ -343,6 +354,7 @@ class Sharding(commands.Cog):
         args: dict           A dictionary for the action function's args to pass
         _timeout: int=2      Maximal amount of time waiting for incoming responses
         scope: str="bot"     Can be either launcher or bot. Used to differentiate them
+        cluster_id: int=None Only sends the event to this cluster, see cluster_for_guild/cluster_for_shard
         """
         # Preparation
         command_id = f"{uuid4()}"  # str conversion
@@ -356,10 +368,15 @@ class Sharding(commands.Cog):
         payload = {"scope": scope, "action": action, "command_id": command_id}
         if args:
             payload["args"] = args
+        if expected_count > 0:
+            # outputs only need to reach us, not every cluster
+            payload["reply_to"] = self.cluster_channel(self.bot.cluster_id)
+        if scope == "bot" and cluster_id is not None:
+            channel = self.cluster_channel(cluster_id)
+        else:
+            channel = self.broadcast_channel
         await self.bot.redis.execute_command(
-            "PUBLISH",
-            self.bot.config.database.redis_shard_announce_channel,
-            json.dumps(payload),
+            "PUBLISH", channel, orjson.dumps(payload)
         )
 
         if expected_count > 0:
@@ -377,12 +394,26 @@ class Sharding(commands.Cog):
 
     async def on_raw_interaction(self, interaction_data: dict[str, Any]) -> None:
         # Method called when a DM interaction is received
+        if guild_id := interaction_data.get("guild_id"):
+            cluster_id = self.cluster_for_guild(int(guild_id))
+        elif (message := interaction_data.get("message")) is not None:
+            if self.bot._connection._view_store.is_message_tracked(int(message["id"])):
+                return  # our own view, discord.py already handles it
+            cluster_id = await self.bot.redis.execute_command(
+                "GET", self.view_owner_key(message["id"])
+            )
+        else:
+            cluster_id = None
+
+        if cluster_id is None:
+            # e.g. modals or views older than VIEW_OWNER_TTL, anyone could own it
+            channel = self.broadcast_channel
+        elif int(cluster_id) == self.bot.cluster_id:
+            return
+        else:
+            channel = self.cluster_channel(int(cluster_id))
         payload = {"type": "raw_interaction", "data": interaction_data}
-        await self.bot.redis.execute_command(
-            "PUBLISH",
-            self.bot.config.database.redis_shard_announce_channel,
-            json.dumps(payload),
-        )
+        await self.bot.redis.execute_command("PUBLISH", channel, orjson.dumps(payload))
 
     @commands.command(
         aliases=["cooldowns", "t", "cds"], brief=_("Lists all your cooldowns")
@@ -391,9 +422,7 @@ class Sharding(commands.Cog):
     async def timers(self, ctx):
         _("""Lists all your cooldowns, including your adventure timer.""")
         try:
-            cooldowns = await self.bot.redis.execute_command(
-                "KEYS", f"cd:{ctx.author.id}:*"
-            )
+            timers = await self.bot.cooldowns.timers(cooldowns.USER, ctx.author.id)
             adv = await self.bot.get_adventure(ctx.author)
 
             # Create dictionaries to map commands to emojis for different categories
@@ -420,7 +449,7 @@ class Sharding(commands.Cog):
             class_cooldowns = []  # New list for class cooldowns
             adventure_cooldowns = []  # New list for adventure cooldowns
 
-            if not cooldowns and (not adv or adv[2]):
+            if not timers and (not adv or adv[2]):
                 embed = discord.Embed(
                     title=_("Cooldowns"),
                     description=_("You don't have any active cooldowns at the moment. 🕒"),
@@ -430,10 +459,8 @@ class Sharding(commands.Cog):
             else:
                 max_length = 0  # Initialize the maximum length
                 message_lengths = []
-                for key in cooldowns:
-                    key = key.decode()
-                    cooldown = await self.bot.redis.execute_command("TTL", key)
-                    cmd = key.replace(f"cd:{ctx.author.id}:", "").lower()  # Use lowercase for comparison
+                for cmd, cooldown in timers:
+                    cmd = cmd.lower()  # Use lowercase for comparison
                     formatted_time = timedelta(seconds=int(cooldown))
 
                     # Check the category of the cooldown and add it to the respective list
@@ -67,45 +67,43 @@ class Story(commands.Cog):
 
         await asyncio.sleep(5)
 
-        async with self.bot.pool.acquire() as conn:
-            profile = await conn.fetchrow('SELECT * FROM profile WHERE "user"=$1;', ctx.author.id)
-
-            if not profile:
-                return
-
-            god_specific_embed = discord.Embed()  # Create a new embed for god-specific message
-            god = profile["god"]
-            if god == "Drakath":
-                god_specific_embed.color = 0x3498db
-                god_specific_embed.description = (
-                    "Champion of Chaos, Drakath has sensed your loyalty. As the winds of unpredictability howl, "
-                    "you are called upon to harness the chaos and claim the Nexus for a world without rules.")
-            elif god == "Astraea":
-                god_specific_embed.color = 0xf1c40f
-                god_specific_embed.description = (
-                    "Disciple of Justice, Astraea beckons you. The celestial call resonates, urging you to seek "
-                    "the Nexus and establish a harmonious Eldoria, pure and just.")
-            elif god == "Sepulchure":
-                god_specific_embed.color = 0xe74c3c
-                god_specific_embed.description = (
-                    "Warrior of the Shadows, Sepulchure has marked you. The whispers of the undead guide your path, "
-                    "leading you to the Nexus to cast an eternal night over Eldoria.")
-
-            god_specific_embed.add_field(name="Your Quest Begins!",
-                                         value="React with ✨ to embark on your journey, or ❌ to return to your mundane life.")
-            message = await ctx.send(embed=god_specific_embed)
-            await message.add_reaction("✨")
-            await message.add_reaction("❌")
-
-            def check(reaction, user):
-                return user == ctx.author and str(reaction.emoji) in ["✨", "❌"]
-
-            reaction, user = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
-
-            if str(reaction.emoji) == "✨":
-                await self.start_journey(ctx, god)
-            elif str(reaction.emoji) == "❌":
-                await ctx.send("Perhaps another time, adventurer.")
+        profile = await ctx.profiles.get(ctx.author.id)
+        if not profile:
+            return
+
+        god_specific_embed = discord.Embed()  # Create a new embed for god-specific message
+        god = profile["god"]
+        if god == "Drakath":
+            god_specific_embed.color = 0x3498db
+            god_specific_embed.description = (
+                "Champion of Chaos, Drakath has sensed your loyalty. As the winds of unpredictability howl, "
+                "you are called upon to harness the chaos and claim the Nexus for a world without rules.")
+        elif god == "Astraea":
+            god_specific_embed.color = 0xf1c40f
+            god_specific_embed.description = (
+                "Disciple of Justice, Astraea beckons you. The celestial call resonates, urging you to seek "
+                "the Nexus and establish a harmonious Eldoria, pure and just.")
+        elif god == "Sepulchure":
+            god_specific_embed.color = 0xe74c3c
+            god_specific_embed.description = (
+                "Warrior of the Shadows, Sepulchure has marked you. The whispers of the undead guide your path, "
+                "leading you to the Nexus to cast an eternal night over Eldoria.")
+
+        god_specific_embed.add_field(name="Your Quest Begins!",
+                                     value="React with ✨ to embark on your journey, or ❌ to return to your mundane life.")
+        message = await ctx.send(embed=god_specific_embed)
+        await message.add_reaction("✨")
+        await message.add_reaction("❌")
+
+        def check(reaction, user):
+            return user == ctx.author and str(reaction.emoji) in ["✨", "❌"]
+
+        reaction, user = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
+
+        if str(reaction.emoji) == "✨":
+            await self.start_journey(ctx, god)
+        elif str(reaction.emoji) == "❌":
+            await ctx.send("Perhaps another time, adventurer.")
 
 
     async def start_journey(self, ctx, god):
@@ -41,6 +41,9 @@ from cogs.help import chunks
 from cogs.shard_communication import user_on_cooldown as user_cooldown
 from utils import random
 from utils.checks import has_char, is_gm
+from utils.combat.engine import TURN_ORDER_FIXED, TURN_ORDER_TEAMS, Battle, Combatant, Rules
+from utils.combat.entity import Faction
+from utils.combat.skill import SkillDeck, smash
 from utils.i18n import _, locale_doc
 from utils.joins import JoinView
 
@@ -160,13 +163,8 @@ class Tournament(commands.Cog):
             )
             await asyncio.sleep(60 * 10)
             view.stop()
-            participants = []
-            async with self.bot.pool.acquire() as conn:
-                for u in view.joined:
-                    if await conn.fetchrow(
-                            'SELECT * FROM profile WHERE "user"=$1;', u.id
-                    ):
-                        participants.append(u)
+            profiles = await ctx.profiles.get_many([u.id for u in view.joined])
+            participants = [u for u in view.joined if u.id in profiles]
 
         else:
             view = JoinView(
@@ -188,13 +186,8 @@ class Tournament(commands.Cog):
             )
             await asyncio.sleep(60 * 5)
             view.stop()
-            participants = []
-            async with self.bot.pool.acquire() as conn:
-                for u in view.joined:
-                    if await conn.fetchrow(
-                            'SELECT * FROM profile WHERE "user"=$1;', u.id
-                    ):
-                        participants.append(u)
+            profiles = await ctx.profiles.get_many([u.id for u in view.joined])
+            participants = [u for u in view.joined if u.id in profiles]
 
         if len(participants) < 2:
             await self.bot.reset_cooldown(ctx)
@@ -352,13 +345,8 @@ class Tournament(commands.Cog):
                 )
             await asyncio.sleep(60 * 3)
             view.stop()
-            participants = []
-            async with self.bot.pool.acquire() as conn:
-                for u in view.joined:
-                    if await conn.fetchrow(
-                            'SELECT * FROM profile WHERE "user"=$1;', u.id
-                    ):
-                        participants.append(u)
+            profiles = await ctx.profiles.get_many([u.id for u in view.joined])
+            participants = [u for u in view.joined if u.id in profiles]
 
         else:
             view = JoinView(
@@ -380,13 +368,8 @@ class Tournament(commands.Cog):
             )
             await asyncio.sleep(60 * 3)
             view.stop()
-            participants = []
-            async with self.bot.pool.acquire() as conn:
-                for u in view.joined:
-                    if await conn.fetchrow(
-                            'SELECT * FROM profile WHERE "user"=$1;', u.id
-                    ):
-                        participants.append(u)
+            profiles = await ctx.profiles.get_many([u.id for u in view.joined])
+            participants = [u for u in view.joined if u.id in profiles]
 
         if len(participants) < 3:
             await self.bot.reset_cooldown(ctx)
@@ -419,12 +402,21 @@ class Tournament(commands.Cog):
             self.deffbuff += Decimal(round_to_nearest(rnd.uniform(0.1, 0.2)))
             self.dmgbuff += Decimal(round_to_nearest(rnd.uniform(0.1, 0.2)))
 
-        juggernaut_tracker_HP = juggernaut_hp
-        TurnCounter = 0
+        # The juggernaut keeps their HP from one duel to the next
+        juggernaut_combatant = Combatant(
+            juggernaut.id,
+            Faction.Two,
+            juggernaut_hp,
+            juggernaut_dmg,
+            juggernaut_deff,
+            owner=juggernaut,
+            charge_turns=6,
+            charge_damage=1000,
+        )
+        rules = Rules(turn_order=TURN_ORDER_FIXED, precision=2, element_modifiers=False)
         juggernaut_killer = None
         all_player_stats = {}
         defeated = []
-        turnpass = False
         turn = False
         battle_ongoing = True  # Initialize a variable to track the battle state
 
@@ -457,23 +449,16 @@ class Tournament(commands.Cog):
                         "damage": dmg,
                     }
                     all_player_stats[player.id] = player_stats
-                    # Set up the battle participants
-                    try:
-                        players = [player_stats, {
-                            "user": juggernaut,
-                            "hp": juggernaut_tracker_HP,
-                            "damage": juggernaut_dmg,
-                            "armor": juggernaut_deff
-                        }]
-                    except Exception as e:
-                        await ctx.send(f"An error occurred: {e}")
+                    # Set up the battle participants, the player strikes first
+                    player_combatant = Combatant(player.id, Faction.One, hp, dmg, deff, owner=player)
+                    battle = Battle([player_combatant, juggernaut_combatant], rules=rules)
 
                     battle_log = deque(
                         [
                             (
                                 0,
                                 _("Raidbattle {p1} vs. {p2} started!").format(
-                                    p1=players[0]["user"].mention, p2=players[1]["user"].mention
+                                    p1=player.mention, p2=juggernaut.mention
                                 ),
                             )
                         ],
@@ -489,25 +474,10 @@ class Tournament(commands.Cog):
                     await asyncio.sleep(4)
 
                     start = datetime.datetime.utcnow()
-                    attacker, defender = players
-                    while (
-                            attacker["hp"] > 0
-                            and defender["hp"] > 0
-                            and datetime.datetime.utcnow()
-                            < start + datetime.timedelta(minutes=5)
-                    ):
-                        dmg = (
-                                attacker["damage"]
-                                + Decimal(random.randint(0, 100))
-                                - defender["armor"]
-                        )
-                        dmg = 1 if dmg <= 0 else dmg  # make sure no negative damage happens
-                        if defender["user"] != juggernaut and TurnCounter >= 6:
+                    for event in battle.turns():
+                        hit = event.hits[0]
+                        if hit.charged:
                             await ctx.send("The Juggernaut charges their weapon")
-                            dmg = dmg + 1000
-                        defender["hp"] -= dmg
-                        if defender["hp"] < 0:
-                            defender["hp"] = 0
                         battle_log.append(
                             (
                                 battle_log[-1][0] + 1,
@@ -515,9 +485,9 @@ class Tournament(commands.Cog):
                                     "{attacker} attacks! {defender} takes **{dmg}HP**"
                                     " damage."
                                 ).format(
-                                    attacker=attacker["user"].mention,
-                                    defender=defender["user"].mention,
-                                    dmg=dmg,
+                                    attacker=event.attacker.owner.mention,
+                                    defender=hit.target.owner.mention,
+                                    dmg=hit.damage,
                                 ),
                             )
                         )
@@ -526,10 +496,10 @@ class Tournament(commands.Cog):
                             description=_(
                                 "{p1} - {hp1} HP left\n{p2} - {hp2} HP left"
                             ).format(
-                                p1=players[0]["user"].mention,
-                                hp1=players[0]["hp"],
-                                p2=players[1]["user"].mention,
-                                hp2=players[1]["hp"],
+                                p1=player.mention,
+                                hp1=player_combatant.hp,
+                                p2=juggernaut.mention,
+                                hp2=juggernaut_combatant.hp,
                             ),
                             color=self.bot.config.game.primary_colour,
                         )
@@ -539,27 +509,24 @@ class Tournament(commands.Cog):
                                 name=_("Action #{number}").format(number=line[0]),
                                 value=line[1],
                             )
-                        TurnCounter = TurnCounter + 1
                         await log_message.edit(embed=embed)
                         await asyncio.sleep(4)
-                        juggernaut_tracker_HP = players[1]["hp"]
-                        if juggernaut_tracker_HP <= 0:
+                        if not juggernaut_combatant.alive:
                             await ctx.send(_("Juggernaut has been defeated!"))
-                            juggernaut_killer = attacker["user"].id
+                            juggernaut_killer = event.attacker.owner
                             await ctx.send(
                                 _("{attacker} has dealt the finishing blow to the juggernaut and is the winner!").format(
-                                    attacker=attacker["user"].mention))
+                                    attacker=juggernaut_killer.mention))
                             battle_ongoing = False
                             self.deffbuff = 0
                             self.dmgbuff = 0
                             break
-                        if players[0]["hp"] <= 0:
+                        if not player_combatant.alive:
                             defeated.append(player)
                             await ctx.send(_(f"Juggernaut has defeated {player.name}!"))
-                            TurnCounter = 0
-                            juggernaut_tracker_HP = players[1]["hp"]
                             await asyncio.sleep(2)
-                        attacker, defender = defender, attacker  # This line swaps attacker and defender
+                        if datetime.datetime.utcnow() >= start + datetime.timedelta(minutes=5):
+                            break
 
             # If all players are defeated, buff their stats and go for another round
             if battle_ongoing:
@@ -596,7 +563,7 @@ class Tournament(commands.Cog):
                 await conn.execute(
                     'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
                     prize,
-                    juggernaut_killer,
+                    juggernaut_killer.id,
                 )
                 await conn.execute(
                     'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
@@ -675,7 +642,7 @@ class Tournament(commands.Cog):
         view.joined.add(ctx.author)
 
         # Start the join phase
-        initial_message = await ctx.send(
+        await ctx.send(
             f"{ctx.author.mention} started a Juggernaut game mode! Free entries, prize pool is **${prize}**! The game starts in 5 minutes!",
             view=view,
         )
@@ -683,11 +650,8 @@ class Tournament(commands.Cog):
         view.stop()
 
         # Gather valid participants from the database
-        participants = []
-        async with self.bot.pool.acquire() as conn:
-            for u in view.joined:
-                if await conn.fetchrow('SELECT * FROM profile WHERE "user"=$1;', u.id):
-                    participants.append(u)
+        profiles = await ctx.profiles.get_many([u.id for u in view.joined])
+        participants = [u for u in view.joined if u.id in profiles]
 
         # Check if there are enough participants
         if len(participants) < 3:
@@ -729,274 +693,209 @@ class Tournament(commands.Cog):
             )
 
             # Initialize player stats
-            player_stats = {}
+            players = []
             for player in participants:
                 async with self.bot.pool.acquire() as conn:
                     dmg, deff = await self.get_raidstatsjug(player, conn=conn)
-                player_stats[player.id] = {
-                    "user": player,
-                    "hp": Decimal(hp),
-                    "damage": Decimal(dmg),
-                    "defense": Decimal(deff),
-                }
-
-            juggernaut_stats = {
-                "user": juggernaut,
-                "hp": Decimal(juggernaut_hp),
-                "damage": Decimal(juggernaut_dmg),
-                "defense": Decimal(juggernaut_def),
-                "base_damage": Decimal(juggernaut_dmg)  # To reset after revival
-            }
+                players.append(
+                    Combatant(
+                        player.id,
+                        Faction.One,
+                        hp,
+                        dmg,
+                        deff,
+                        owner=player,
+                        variance=0,
+                        bonus_damage=40,  # +40 for both abilities
+                        miss_chance=0.1,
+                        # misses are rolled first, this keeps crits at 10% of all attacks
+                        crit_chance=0.1 / 0.9,
+                    )
+                )
+
+            juggernaut_combatant = Combatant(
+                juggernaut.id,
+                Faction.Two,
+                juggernaut_hp,
+                juggernaut_dmg,
+                juggernaut_def,
+                owner=juggernaut,
+                deck=SkillDeck([smash(0.4)]),
+                variance=0,
+                bonus_damage=40,
+                # +40 damage every turn, reset after a revival
+                damage_growth=40,
+            )
+            base_damage = juggernaut_combatant.damage
+            rules = Rules(
+                turn_order=TURN_ORDER_TEAMS,
+                first_faction=Faction.One,
+                precision=2,
+                element_modifiers=False,
+            )
 
             # Battle variables
-            battle_round = 1
-            battle_turn = 1
-            buff_amount = Decimal("0.3")  # Increased buff amount for better scaling
+            buff_amount = 0.3  # Increased buff amount for better scaling
             MAX_ROUNDS = 10  # Fixed maximum rounds for Juggernaut victory
+            winners = []
+
+            def juggernaut_field():
+                return f"{juggernaut_combatant.hp:.2f}/{juggernaut_hp}"
+
+            def player_statuses():
+                return "\n".join(
+                    f"{c.owner.mention}: {c.hp:.2f}/{hp} HP" + (" 💀" if not c.alive else "")
+                    for c in players
+                )
 
             # Initialize the embed with battle status
             embed = discord.Embed(
-                title=f"Juggernaut Battle - Round {battle_round}",
+                title="Juggernaut Battle - Round 1",
                 description="The battle begins!",
                 color=self.bot.config.game.primary_colour,
             )
             embed.add_field(
-                name=f"{juggernaut_stats['user'].display_name}'s HP",
-                value=f"{juggernaut_stats['hp']:.2f}/{juggernaut_hp}",
+                name=f"{juggernaut.display_name}'s HP",
+                value=juggernaut_field(),
                 inline=False,
             )
-            player_statuses = []
-            for stats in player_stats.values():
-                status = (
-                        f"{stats['user'].mention}: {stats['hp']:.2f}/{hp} HP"
-                        + (" 💀" if stats["hp"] <= 0 else "")
-                )
-                player_statuses.append(status)
             embed.add_field(
                 name="Players' Status",
-                value="\n".join(player_statuses),
+                value=player_statuses(),
                 inline=False,
             )
             battle_message = await ctx.send(embed=embed)
 
             # Battle loop
-            while battle_round <= MAX_ROUNDS:
-                battle_log = []
-                embed.title = f"Juggernaut Battle - Round {battle_round}"
-                embed.description = f"*Battle Round {battle_round} - Turn {battle_turn} begins!*\n"
-
-                # Players' Turns
-                for player_id, stats in player_stats.items():
-                    if stats["hp"] <= 0:
-                        continue  # Skip defeated players
-
-                    # Determine if the attack hits
-                    hit_chance = randomm.random()
-                    if hit_chance < 0.1:
-                        # Missed attack: No damage and skip logging
+            for battle_round in range(1, MAX_ROUNDS + 1):
+                battle = Battle(players + [juggernaut_combatant], rules=rules)
+                battle_turn = 1
+                for events in battle.team_turns():
+                    battle_log = []
+                    if events[0].attacker is not juggernaut_combatant:
+                        # Players' Turns
+                        embed.title = f"Juggernaut Battle - Round {battle_round}"
+                        embed.description = f"*Battle Round {battle_round} - Turn {battle_turn} begins!*\n"
+                        for event in events:
+                            if event.missed:
+                                # Missed attack: No damage and skip logging
+                                continue
+                            hit = event.hits[0]
+                            if hit.critical:
+                                battle_log.append(
+                                    f"{event.attacker.owner.mention} landed a critical hit! 🔥"
+                                )
+                            battle_log.append(
+                                f"{event.attacker.owner.mention} deals {hit.damage:.2f} damage to the Juggernaut. ✅"
+                            )
+                            embed.description += "\n".join(battle_log) + "\n"
+                            embed.set_field_at(
+                                0,
+                                name=f"{juggernaut.display_name}'s HP",
+                                value=juggernaut_field(),
+                                inline=False,
+                            )
+                            await battle_message.edit(embed=embed)
+                            await asyncio.sleep(2)  # 2-second delay per attack
+                            battle_log.clear()  # Clear the log for the next entry
                         continue
-                    elif hit_chance > 0.9:
-                        # Critical hit
-                        damage = stats["damage"] * Decimal("2") + Decimal("40")  # +40 for both abilities
-                        battle_log.append(
-                            f"{stats['user'].mention} landed a critical hit! 🔥"
-                        )
-                    else:
-                        # Normal hit
-                        damage = stats["damage"] + Decimal("40")  # +40 for both abilities
-
-                    # Calculate damage to Juggernaut
-                    dmg = max(Decimal("1"), damage - juggernaut_stats["defense"])
-                    juggernaut_stats["hp"] -= dmg
-                    juggernaut_stats["hp"] = max(juggernaut_stats["hp"], Decimal("0"))  # Ensure HP doesn't go below 0
 
-                    # Log the damage if dmg > 0
-                    if dmg > 0:
+                    # Juggernaut's Turn to Attack
+                    event = events[0]
+                    if event.skill is not None:
+                        battle_log.append("The Juggernaut uses Smash! 💥")
+                        for hit in event.hits:
+                            battle_log.append(
+                                f"{hit.target.owner.mention} takes {hit.damage:.2f} damage from Smash. ⚔️"
+                            )
+                            if hit.target in event.defeated:
+                                battle_log.append(
+                                    f"{hit.target.owner.mention} has been defeated! 💀"
+                                )
+                    elif event.hits:
+                        hit = event.hits[0]
                         battle_log.append(
-                            f"{stats['user'].mention} deals {dmg:.2f} damage to the Juggernaut. ✅"
+                            f"The Juggernaut attacks {hit.target.owner.mention} for {hit.damage:.2f} damage. ⚔️"
                         )
+                        if hit.target in event.defeated:
+                            battle_log.append(
+                                f"{hit.target.owner.mention} has been defeated! 💀"
+                            )
 
-                    # Update the embed after each attack
+                    # Announce the Juggernaut's attack results
                     if battle_log:
                         embed.description += "\n".join(battle_log) + "\n"
                         embed.set_field_at(
                             0,
-                            name=f"{juggernaut_stats['user'].display_name}'s HP",
-                            value=f"{juggernaut_stats['hp']:.2f}/{juggernaut_hp}",
+                            name=f"{juggernaut.mention}'s HP",
+                            value=juggernaut_field(),
+                            inline=False,
+                        )
+                        embed.set_field_at(
+                            1,
+                            name="Players' Status",
+                            value=player_statuses(),
                             inline=False,
                         )
                         await battle_message.edit(embed=embed)
-                        await asyncio.sleep(2)  # 2-second delay per attack
-                        battle_log.clear()  # Clear the log for the next entry
+                        await asyncio.sleep(5)  # 5-second delay after Juggernaut's attack
 
-                    # Check if Juggernaut is defeated
-                    if juggernaut_stats["hp"] <= 0:
-                        break
+                    # Increment the turn after Juggernaut's attack
+                    battle_turn += 1
 
                 # Check if Juggernaut is defeated
-                if juggernaut_stats["hp"] <= 0:
-                    battle_log.append("The Juggernaut has been defeated by the players! 🏆")
-                    embed.description += "\n".join(battle_log) + "\n"
+                if battle.winner == Faction.One:
+                    embed.description += "The Juggernaut has been defeated by the players! 🏆\n"
                     embed.set_field_at(
                         0,
-                        name=f"{juggernaut_stats['user'].display_name}'s HP",
-                        value=f"{juggernaut_stats['hp']:.2f}/{juggernaut_hp}",
+                        name=f"{juggernaut.display_name}'s HP",
+                        value=juggernaut_field(),
                         inline=False,
                     )
                     await battle_message.edit(embed=embed)
-                    # Set winner_ids to all players still alive
-                    winner_ids = [pid for pid, stats in player_stats.items() if stats["hp"] > 0]
+                    # All players still alive are winners
+                    winners = [c.owner for c in players if c.alive]
                     break  # Exit the battle loop
 
-                # Juggernaut's Turn to Attack
-                battle_log = []
-                # Increment Juggernaut's damage by +40 for the new turn
-                juggernaut_stats["current_damage"] = juggernaut_stats.get("current_damage",
-                                                                          juggernaut_stats["base_damage"])
-                juggernaut_stats["current_damage"] += Decimal("40")
-
-                # Determine if Juggernaut uses Smash ability
-                smash_chance = randomm.random()
-                if smash_chance < 0.4:
-                    # Smash ability: Attack all players with increased damage (+40)
-                    battle_log.append("The Juggernaut uses Smash! 💥")
-                    for stats in player_stats.values():
-                        if stats["hp"] > 0:
-                            dmg = max(
-                                Decimal("1"),
-                                (juggernaut_stats["current_damage"] + Decimal("40")) - stats["defense"]
-                            )
-                            stats["hp"] -= dmg
-                            stats["hp"] = max(stats["hp"], Decimal("0"))  # Ensure HP doesn't go below 0
-                            battle_log.append(
-                                f"{stats['user'].mention} takes {dmg:.2f} damage from Smash. ⚔️"
-                            )
-                            if stats["hp"] <= 0:
-                                battle_log.append(
-                                    f"{stats['user'].mention} has been defeated! 💀"
-                                )
-                else:
-                    # Normal attack: Attack one random alive player with increased damage (+40)
-                    alive_players = [stats for stats in player_stats.values() if stats["hp"] > 0]
-                    if alive_players:
-                        target_stats = randomm.choice(alive_players)
-                        dmg = max(
-                            Decimal("1"), (juggernaut_stats["current_damage"] + Decimal("40")) - target_stats["defense"]
-                        )
-                        target_stats["hp"] -= dmg
-                        target_stats["hp"] = max(target_stats["hp"], Decimal("0"))  # Ensure HP doesn't go below 0
-                        battle_log.append(
-                            f"The Juggernaut attacks {target_stats['user'].mention} for {dmg:.2f} damage. ⚔️"
-                        )
-                        if target_stats["hp"] <= 0:
-                            battle_log.append(
-                                f"{target_stats['user'].mention} has been defeated! 💀"
-                            )
-
-                # Announce the Juggernaut's attack results
-                if battle_log:
-                    embed.description += "\n".join(battle_log) + "\n"
-                    embed.set_field_at(
-                        0,
-                        name=f"{juggernaut_stats['user'].mention}'s HP",
-                        value=f"{juggernaut_stats['hp']:.2f}/{juggernaut_hp}",
-                        inline=False,
-                    )
-                    # Update player statuses
-                    player_statuses = []
-                    for stats in player_stats.values():
-                        status = (
-                                f"{stats['user'].mention}: {stats['hp']:.2f}/{hp} HP"
-                                + (" 💀" if stats["hp"] <= 0 else "")
-                        )
-                        player_statuses.append(status)
-                    embed.set_field_at(
-                        1,
-                        name="Players' Status",
-                        value="\n".join(player_statuses),
-                        inline=False,
-                    )
-                    await battle_message.edit(embed=embed)
-                    await asyncio.sleep(5)  # 5-second delay after Juggernaut's attack
-
-                # Check if all players are defeated
-                if all(stats["hp"] <= 0 for stats in player_stats.values()):
-                    battle_log = ["All players have been defeated! They receive buffs and try again. 🔄"]
-                    # Buff players' stats
-                    for stats in player_stats.values():
-                        stats["hp"] = Decimal(hp)
-                        stats["damage"] *= (Decimal("1") + buff_amount)
-                        stats["defense"] *= (Decimal("1") + buff_amount)
-                    # Announce the buff
-                    battle_log.append("Players have been buffed! Their damage and defense have increased. 📈")
-                    # Increment the round
-                    battle_round += 1
-                    # Reset turns for the new round
-                    battle_turn = 1
-                    # Reset Juggernaut's damage to base_damage
-                    juggernaut_stats["current_damage"] = juggernaut_stats["base_damage"]
-                    # Update the embed with buff information
-                    embed = discord.Embed(
-                        title=f"Juggernaut Battle - Round {battle_round}",
-                        description="\n".join(battle_log),
-                        color=self.bot.config.game.primary_colour,
-                    )
-                    embed.add_field(
-                        name=f"{juggernaut_stats['user'].mention}'s HP",
-                        value=f"{juggernaut_stats['hp']:.2f}/{juggernaut_hp}",
-                        inline=False,
-                    )
-                    player_statuses = []
-                    for stats in player_stats.values():
-                        status = (
-                                f"{stats['user'].mention}: {stats['hp']:.2f}/{hp} HP"
-                                + (" 💀" if stats["hp"] <= 0 else "")
-                        )
-                        player_statuses.append(status)
-                    embed.add_field(
-                        name="Players' Status",
-                        value="\n".join(player_statuses),
-                        inline=False,
-                    )
-                    await battle_message.edit(embed=embed)
-                    await asyncio.sleep(3)  # 3-second wait between rounds
-                    continue  # Continue to the next round
-
-                # Increment the turn after Juggernaut's attack
-                battle_turn += 1
-
-                # Check if maximum rounds have been reached
-                if battle_round > MAX_ROUNDS:
+                if battle_round == MAX_ROUNDS:
                     # Juggernaut wins
-                    battle_log = ["Maximum number of rounds reached. The Juggernaut wins! ⚔️"]
-                    embed.description += "\n".join(battle_log) + "\n"
-                    embed.set_field_at(
-                        0,
-                        name=f"{juggernaut_stats['user'].mention}'s HP",
-                        value=f"{juggernaut_stats['hp']:.2f}/{juggernaut_hp}",
-                        inline=False,
-                    )
-                    # Update player statuses
-                    player_statuses = []
-                    for stats in player_stats.values():
-                        status = (
-                                f"{stats['user'].mention}: {stats['hp']:.2f}/{hp} HP"
-                                + (" 💀" if stats["hp"] <= 0 else "")
-                        )
-                        player_statuses.append(status)
-                    embed.set_field_at(
-                        1,
-                        name="Players' Status",
-                        value="\n".join(player_statuses),
-                        inline=False,
-                    )
+                    embed.description += "Maximum number of rounds reached. The Juggernaut wins! ⚔️\n"
                     await battle_message.edit(embed=embed)
-                    break  # Exit the battle loop
+                    break
+
+                # All players are defeated, buff them and try again
+                battle_log = [
+                    "All players have been defeated! They receive buffs and try again. 🔄",
+                    "Players have been buffed! Their damage and defense have increased. 📈",
+                ]
+                for c in players:
+                    c.hp = float(hp)
+                    c.damage *= 1 + buff_amount
+                    c.armor *= 1 + buff_amount
+                # Reset Juggernaut's damage to base_damage
+                juggernaut_combatant.damage = base_damage
+                # Update the embed with buff information
+                embed = discord.Embed(
+                    title=f"Juggernaut Battle - Round {battle_round + 1}",
+                    description="\n".join(battle_log),
+                    color=self.bot.config.game.primary_colour,
+                )
+                embed.add_field(
+                    name=f"{juggernaut.mention}'s HP",
+                    value=juggernaut_field(),
+                    inline=False,
+                )
+                embed.add_field(
+                    name="Players' Status",
+                    value=player_statuses(),
+                    inline=False,
+                )
+                await battle_message.edit(embed=embed)
+                await asyncio.sleep(3)  # 3-second wait between rounds
 
             # Distribute prizes
             juggernaut_prize = round(prize * 0.2)
             winner_prize = round(prize * 0.8)
-            winners = [player_stats[pid]["user"] for pid in (winner_ids if 'winner_ids' in locals() else [])]
 
             async with self.bot.pool.acquire() as conn:
                 # Give prize to Juggernaut
@@ -1110,13 +1009,8 @@ class Tournament(commands.Cog):
                     )
                 await asyncio.sleep(60*5)
                 view.stop()
-                participants = []
-                async with self.bot.pool.acquire() as conn:
-                    for u in view.joined:
-                        if await conn.fetchrow(
-                                'SELECT * FROM profile WHERE "user"=$1;', u.id
-                        ):
-                            participants.append(u)
+                profiles = await ctx.profiles.get_many([u.id for u in view.joined])
+                participants = [u for u in view.joined if u.id in profiles]
 
             else:
                 view = JoinView(
@@ -1141,13 +1035,8 @@ class Tournament(commands.Cog):
 
             # Process the users as before
             view.stop()
-            participants = []
-            async with self.bot.pool.acquire() as conn:
-                for u in view.joined:
-                    if await conn.fetchrow(
-                            'SELECT * FROM profile WHERE "user"=$1;', u.id
-                    ):
-                        participants.append(u)
+            profiles = await ctx.profiles.get_many([u.id for u in view.joined])
+            participants = [u for u in view.joined if u.id in profiles]
             if len(participants) < 2:
                 await self.bot.reset_cooldown(ctx)
                 await self.bot.pool.execute(
@@ -294,6 +294,8 @@ class Trading(commands.Cog):
                 itemid,
                 price,
             )
+        # the item may have been equipped
+        await self.bot.stats.invalidate(ctx.author)
         await ctx.send(
             _(
                 "Successfully added your item to the shop! Use `{prefix}shop` to view"
@@ -653,29 +655,33 @@ class Trading(commands.Cog):
                 )
             )
 
+        conditions = ['m."price"<=$1', '(ai."damage">=$2 OR ai."armor">=$2)']
+        args = [highestprice, minstat]
         if item_types:
-            items = await self.bot.pool.fetch(
-                "SELECT * FROM allitems ai JOIN market m ON (ai.id=m.item) WHERE"
-                ' ai."type"=ANY($1) AND (ai."damage">=$2 OR ai."armor">=$3) AND m."price"<=$4;',
-                item_types,
-                minstat,
-                minstat,
-                highestprice,
-            )
-        else:
-            items = await self.bot.pool.fetch(
-                "SELECT * FROM allitems ai JOIN market m ON (ai.id=m.item) WHERE"
-                ' m."price"<=$1 AND (ai."damage">=$2 OR ai."armor">=$3);',
-                highestprice,
-                minstat,
-                minstat,
+            conditions.append('ai."type"=ANY($3)')
+            args.append(item_types)
+        where = " AND ".join(conditions)
+
+        # Walks the market along market_item_idx, only a few items are loaded at a time
+        async def fetch(after, limit):
+            return await self.bot.pool.fetch(
+                f"SELECT * FROM allitems ai JOIN market m ON (ai.id=m.item) WHERE {where}"
+                f' AND m."item">${len(args) + 1} ORDER BY m."item" LIMIT ${len(args) + 2};',
+                *args,
+                after or 0,
+                limit,
             )
 
-        if not items:
-            return await ctx.send(_("No results."))
+        async def count():
+            return await self.bot.pool.fetchval(
+                "SELECT COUNT(*) FROM allitems ai JOIN market m ON (ai.id=m.item)"
+                f" WHERE {where};",
+                *args,
+            )
 
-        entries = [
-            (
+        def render(rows, index, total):
+            item = rows[0]
+            return (
                 discord.Embed(
                     title=_("Fable Shop"),
                     description=_("Use `{prefix}buy {item}` to buy this.").format(
@@ -693,16 +699,21 @@ class Trading(commands.Cog):
                     value=f"${item['price']} (+${round(item['price'] * 0.05)} (5%) tax)",
                 )
                 .set_footer(
-                    text=_("Item {num} of {total}").format(
-                        num=idx + 1, total=len(items)
+                    text=(
+                        _("Item {num} of {total}").format(num=index + 1, total=total)
+                        if total is not None
+                        else _("Item {num}").format(num=index + 1)
                     )
-                ),
-                item["item"],
+                )
             )
-            for idx, item in enumerate(items)
-        ]
 
-        await self.bot.paginator.ShopPaginator(entries=entries).paginate(ctx)
+        source = self.bot.paginator.KeysetPages(fetch, key=lambda item: item["item"])
+        if not await source.get(0):
+            return await ctx.send(_("No results."))
+
+        await self.bot.paginator.LazyChooseShop(
+            ctx, source, render, count=count, timeout=90
+        ).start(ctx)
 
     @has_char()
     @user_cooldown(180)
@@ -822,6 +833,7 @@ class Trading(commands.Cog):
                 data=item,
                 conn=conn,
             )
+        await self.bot.stats.invalidate(ctx.author)
         await ctx.send(
             _(
                 "Successfully bought item `{itemid}`. Use `{prefix}inventory` to view"
@@ -887,6 +899,8 @@ class Trading(commands.Cog):
                     value,
                     ctx.author.id,
                 )
+            # equipped items may have been sold, refresh after the commit
+            await self.bot.stats.invalidate(ctx.author)
             await self.bot.log_transaction(
                 ctx,
                 from_=1,
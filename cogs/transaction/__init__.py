@@ -325,6 +325,8 @@ class Transaction(commands.Cog):
                         *query_args_user_2,
                     )
 
+            if user1_items or user2_items:
+                await self.bot.stats.invalidate(user1, user2)
             await chan.send(_("Trade successful."))
 
     @has_no_transaction()
@@ -6,6 +6,7 @@ from typing import Optional
 import asyncio
 
 from utils.checks import is_gm
+from utils.paginator import KeysetPages
 
 # The big list of all valid subjects
 VALID_SUBJECTS = [
@@ -184,6 +185,9 @@ class TransactionView(ui.View):
         self.end_date = None
         self.current_page = 0
         self.message: Optional[discord.Message] = None
+        # Pages of the current filters and the filters they were loaded for
+        self.source: Optional[KeysetPages] = None
+        self.source_filters = None
 
     @ui.select(
         placeholder="Select transaction category",
@@ -313,153 +317,164 @@ class TransactionView(ui.View):
         except discord.NotFound:
             pass
 
+    async def fetch_transactions(self, after, limit):
+        """
+        Fetch up to `limit` transactions older than the (timestamp, id) cursor `after`.
+        Both sides are separate index scans on ("from"/"to", timestamp, id), the
+        UNION merges them and drops transactions a user made to themselves twice.
+        """
+        params = [self.user1.id]
+        if self.user2:
+            # Filter between two specific users
+            params.append(self.user2.id)
+            branches = ['"from" = $1 AND "to" = $2', '"from" = $2 AND "to" = $1']
+        else:
+            # All transactions for one user
+            branches = ['"from" = $1', '"to" = $1']
+
+        filters = ""
+        # subject vs category
+        if self.subject != "all":
+            if self.subject in VALID_SUBJECTS:
+                # exact match
+                params.append(self.subject)
+                filters += f" AND subject = ${len(params)}"
+            else:
+                # partial/LIKE match
+                params.append(f"%{self.subject}%")
+                filters += f" AND subject ILIKE ${len(params)}"
+
+        # date filters
+        if self.start_date:
+            params.append(self.start_date)
+            filters += f" AND timestamp >= ${len(params)}"
+        if self.end_date:
+            params.append(self.end_date)
+            filters += f" AND timestamp <= ${len(params)}"
+
+        # keyset: continue right after the last transaction shown
+        if after is not None:
+            params.extend(after)
+            filters += f" AND (timestamp, id) < (${len(params) - 1}, ${len(params)})"
+
+        params.append(limit)
+        order = f"ORDER BY timestamp DESC, id DESC LIMIT ${len(params)}"
+        query = " UNION ".join(
+            f"(SELECT * FROM transactions WHERE {branch}{filters} {order})"
+            for branch in branches
+        )
+        return await self.ctx.bot.pool.fetch(f"{query} {order}", *params)
+
     async def refresh_view(self, interaction: discord.Interaction, deferred: bool = False):
         """
-        Re-query the database and re-render the embed for the current page of results.
+        Load the current page of results and re-render the embed, pages are fetched
+        lazily and only re-queried when the filters change.
         If `deferred=True`, we call `interaction.edit_original_response`, else we do `response.edit_message`.
         """
         try:
-            async with self.ctx.bot.pool.acquire() as connection:
-                # Build base query
-                params = []
-                param_index = 1
+            filters = (
+                self.user2.id if self.user2 else None,
+                self.subject,
+                self.start_date,
+                self.end_date,
+            )
+            if self.source is None or filters != self.source_filters:
+                self.source = KeysetPages(
+                    self.fetch_transactions,
+                    key=lambda transaction: (transaction["timestamp"], transaction["id"]),
+                    per_page=5,
+                )
+                self.source_filters = filters
 
-                if self.user2:
-                    # Filter between two specific users
-                    query = """
-                        SELECT * FROM transactions
-                        WHERE (( "from" = $1 AND "to" = $2 ) OR ( "from" = $2 AND "to" = $1 ))
-                    """
-                    params.extend([self.user1.id, self.user2.id])
-                    param_index += 2
-                else:
-                    # All transactions for one user
-                    query = """
-                        SELECT * FROM transactions
-                        WHERE ("from" = $1 OR "to" = $1)
-                    """
-                    params.append(self.user1.id)
-                    param_index += 1
-
-                # subject vs category
-                if self.subject != "all":
-                    if self.subject in VALID_SUBJECTS:
-                        # exact match
-                        query += f" AND subject = ${param_index}"
-                        params.append(self.subject)
-                        param_index += 1
-                    else:
-                        # partial/LIKE match
-                        query += f" AND subject ILIKE ${param_index}"
-                        params.append(f"%{self.subject}%")
-                        param_index += 1
-
-                # date filters
-                if self.start_date:
-                    query += f" AND timestamp >= ${param_index}"
-                    params.append(self.start_date)
-                    param_index += 1
-                if self.end_date:
-                    query += f" AND timestamp <= ${param_index}"
-                    params.append(self.end_date)
-                    param_index += 1
-
-                query += " ORDER BY timestamp DESC"
-
-                transactions = await connection.fetch(query, *params)
-
-                if not transactions:
-                    embed = discord.Embed(
-                        title="Transaction History",
-                        color=discord.Color.red()
-                    )
-                    if self.user2:
-                        user_filter = f"📊 Transactions between **{self.user1.name}** and **{self.user2.name}**"
-                    else:
-                        user_filter = f"📊 All transactions for **{self.user1.name}**"
-
-                    embed.description = (
-                        f"{user_filter}\n\n"
-                        "❌ No transactions found matching the criteria."
-                    )
-                    # Update the message
-                    if deferred:
-                        await interaction.edit_original_response(embed=embed, view=self)
-                    else:
-                        await interaction.response.edit_message(embed=embed, view=self)
-                    return
-
-                # Pagination
-                per_page = 5
-                pages = [transactions[i:i + per_page] for i in range(0, len(transactions), per_page)]
-                if self.current_page >= len(pages):
-                    self.current_page = len(pages) - 1  # clamp to last page
-
-                current_transactions = pages[self.current_page]
+            transactions = await self.source.get(self.current_page)
+            while transactions is None and self.current_page > 0:
+                self.current_page -= 1  # clamp to last page
+                transactions = await self.source.get(self.current_page)
 
+            if not transactions:
                 embed = discord.Embed(
                     title="Transaction History",
-                    color=discord.Color.blurple()
+                    color=discord.Color.red()
                 )
-
-                # Create header
                 if self.user2:
                     user_filter = f"📊 Transactions between **{self.user1.name}** and **{self.user2.name}**"
                 else:
                     user_filter = f"📊 All transactions for **{self.user1.name}**"
 
-                filter_info = []
-                if self.subject != "all":
-                    filter_info.append(f"Type: {self.subject}")
-                if self.start_date:
-                    date_str = f"{self.start_date.strftime('%Y-%m-%d')} to {self.end_date.strftime('%Y-%m-%d')}"
-                    filter_info.append(f"Period: {date_str}")
-
-                embed.description = f"{user_filter}\n"
-                if filter_info:
-                    embed.description += f"**Active Filters:** {' | '.join(filter_info)}\n"
-
-                # Add transaction fields
-                for transaction in current_transactions:
-                    # Attempt to fetch 'from' user
-                    try:
-                        from_user = await self.ctx.bot.fetch_user(transaction['from'])
-                        from_name = from_user.name if from_user else f"Unknown ({transaction['from']})"
-                    except discord.NotFound:
-                        from_name = f"Unknown ({transaction['from']})"
-
-                    # Attempt to fetch 'to' user
-                    try:
-                        to_user = await self.ctx.bot.fetch_user(transaction['to'])
-                        to_name = to_user.name if to_user else f"Unknown ({transaction['to']})"
-                    except discord.NotFound:
-                        to_name = f"Unknown ({transaction['to']})"
-
-                    embed.add_field(
-                        name="Transaction",
-                        value=(
-                            f"**From:** {from_name}\n"
-                            f"**To:** {to_name}\n"
-                            f"**Type:** {transaction['subject']}\n"
-                            f"**Info:** {transaction.get('info', 'N/A')}\n"
-                            f"**Time:** {transaction['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}"
-                        ),
-                        inline=False
-                    )
-
-                total_pages = len(pages)
-                embed.set_footer(
-                    text=(
-                        f"Page {self.current_page + 1}/{total_pages} • "
-                        "Menu times out after 5m of inactivity."
-                    )
+                embed.description = (
+                    f"{user_filter}\n\n"
+                    "❌ No transactions found matching the criteria."
                 )
-
-                # Finally, edit the existing message
+                # Update the message
                 if deferred:
                     await interaction.edit_original_response(embed=embed, view=self)
                 else:
                     await interaction.response.edit_message(embed=embed, view=self)
+                return
+
+            embed = discord.Embed(
+                title="Transaction History",
+                color=discord.Color.blurple()
+            )
+
+            # Create header
+            if self.user2:
+                user_filter = f"📊 Transactions between **{self.user1.name}** and **{self.user2.name}**"
+            else:
+                user_filter = f"📊 All transactions for **{self.user1.name}**"
+
+            filter_info = []
+            if self.subject != "all":
+                filter_info.append(f"Type: {self.subject}")
+            if self.start_date:
+                date_str = f"{self.start_date.strftime('%Y-%m-%d')} to {self.end_date.strftime('%Y-%m-%d')}"
+                filter_info.append(f"Period: {date_str}")
+
+            embed.description = f"{user_filter}\n"
+            if filter_info:
+                embed.description += f"**Active Filters:** {' | '.join(filter_info)}\n"
+
+            # Add transaction fields
+            for transaction in transactions:
+                # Attempt to fetch 'from' user
+                try:
+                    from_user = await self.ctx.bot.fetch_user(transaction['from'])
+                    from_name = from_user.name if from_user else f"Unknown ({transaction['from']})"
+                except discord.NotFound:
+                    from_name = f"Unknown ({transaction['from']})"
+
+                # Attempt to fetch 'to' user
+                try:
+                    to_user = await self.ctx.bot.fetch_user(transaction['to'])
+                    to_name = to_user.name if to_user else f"Unknown ({transaction['to']})"
+                except discord.NotFound:
+                    to_name = f"Unknown ({transaction['to']})"
+
+                embed.add_field(
+                    name="Transaction",
+                    value=(
+                        f"**From:** {from_name}\n"
+                        f"**To:** {to_name}\n"
+                        f"**Type:** {transaction['subject']}\n"
+                        f"**Info:** {transaction.get('info', 'N/A')}\n"
+                        f"**Time:** {transaction['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}"
+                    ),
+                    inline=False
+                )
+
+            if self.source.last is not None:
+                page_info = f"Page {self.current_page + 1}/{self.source.last + 1}"
+            else:
+                page_info = f"Page {self.current_page + 1}"
+            embed.set_footer(
+                text=f"{page_info} • Menu times out after 5m of inactivity."
+            )
+
+            # Finally, edit the existing message
+            if deferred:
+                await interaction.edit_original_response(embed=embed, view=self)
+            else:
+                await interaction.response.edit_message(embed=embed, view=self)
 
         except Exception as e:
             # If something goes wrong (DB error, etc.), show an error
@@ -124,6 +124,7 @@ class Valentine(commands.Cog):
                 lovescore,
                 ctx.author.id,
             )
+            self.bot.leaderboards.update(ctx.author)
             return await ctx.send(
                 _(
                     "The chocolate box contained **{lovescore} lovescore points!**"
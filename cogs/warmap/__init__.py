@@ -21,55 +21,124 @@ import random
 import discord
 from discord.ext import commands
 import asyncio
-from PIL import Image, ImageDraw, ImageEnhance
+import hashlib
+import orjson
 from io import BytesIO
 
+from utils import render
 from utils.checks import is_gm
 
+# Predefined coordinates for territories
+TERRITORIES = {
+    "Drakath": (1344, 306),
+    "Zanjuro": (1172, 405),
+    "OrderTemple": (944, 209),
+    "Isyldill": (932, 500),
+    "Shir": (1305, 822),
+    "Ollin": (787, 702),
+    "Sepulchre": (440, 874),
+    "Lankerque": (710, 498),
+    "DragonFoe": (552, 695),
+    "Asterea": (119, 144),
+    "BuhayCitadel": (327, 309),
+    "BreftValley": (473, 135),
+    "WellOfUnity": (615, 289),
+    "Manumit": (260, 470),
+    "BoneDunes": (157, 549),
+    "DragonMountain": (75, 781),
+    "Lakoldon": (468, 448),
+    "Telfinor": (741, 179),
+    "OnlookerPeak": (298, 774),
+}
+
+CONNECTIONS = [
+    ("Drakath", "Zanjuro"),
+    ("Zanjuro", "OrderTemple"),
+    ("OrderTemple", "Isyldill"),
+    ("Isyldill", "Shir"),
+    ("Zanjuro", "Shir"),
+    ("Shir", "Ollin"),
+    ("Ollin", "Lankerque"),
+    ("Sepulchre", "OnlookerPeak"),
+    ("Lankerque", "DragonFoe"),
+    ("Asterea", "BuhayCitadel"),
+    ("BuhayCitadel", "BreftValley"),
+    ("BreftValley", "WellOfUnity"),
+    ("BuhayCitadel", "Manumit"),
+    ("Manumit", "BoneDunes"),
+    ("BoneDunes", "DragonMountain"),
+    ("OnlookerPeak", "DragonMountain"),
+    ("Lakoldon", "Manumit"),
+    ("Lakoldon", "Lankerque"),
+    ("Telfinor", "BreftValley"),
+    ("Telfinor", "OrderTemple"),
+    ("Lankerque", "WellOfUnity"),
+    ("Lankerque", "Isyldill"),
+    ("Isyldill", "WellOfUnity"),
+    ("OnlookerPeak", "DragonFoe"),
+]
+
+# Example data from your database (replace this with actual data)
+DEFAULT_CONTROL = {
+    "Drakath": "Drakath",
+    "Sepulchre": "Sepulchre",
+    "Asterea": "Asterea",
+}
+
+# Bump when render.warmap draws differently, so older renders are not reused
+MAP_VERSION = 1
+MAP_TTL = 7 * 86400
+# Attachment URLs are signed and expire, so they are only reused for a while
+MAP_URL_TTL = 12 * 3600
+
+
+def map_key(control: dict) -> str:
+    """Hash of everything the rendered map depends on"""
+    state = orjson.dumps(
+        [MAP_VERSION, TERRITORIES, CONNECTIONS, control], option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.sha1(state).hexdigest()
+
 
 class WarMap(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.territories_control = dict(DEFAULT_CONTROL)
+        self._render_lock = asyncio.Lock()
+        self._warm_up = None
 
+    async def cog_load(self):
+        self._warm_up = asyncio.create_task(self.warm_up())
 
-    def lerp(self, a, b, t):
-        """Linear interpolation between a and b."""
-        return a + (b - a) * t
+    async def cog_unload(self):
+        if self._warm_up is not None:
+            self._warm_up.cancel()
 
-    def gradient_arrow(self, draw, start, end, start_color, end_color, steps=100):
-        """Draw an arrow with a gradient from start_color to end_color."""
-        for i in range(steps):
-            t = i / steps
-            color = (
-                int(self.lerp(start_color[0], end_color[0], t)),
-                int(self.lerp(start_color[1], end_color[1], t)),
-                int(self.lerp(start_color[2], end_color[2], t))
-            )
-            segment_start = (self.lerp(start[0], end[0], t), self.lerp(start[1], end[1], t))
-            segment_end = (self.lerp(start[0], end[0], t + 1 / steps), self.lerp(start[1], end[1], t + 1 / steps))
-            draw.line([segment_start, segment_end], fill=color, width=5)
-
-        # Draw the arrowhead (triangle)
-        arrowhead_length = 15
-        arrowhead_width = 10
-        arrow_direction = ((end[0] - start[0]), (end[1] - start[1]))
-        arrow_direction_normalized = (
-            arrow_direction[0] / (arrow_direction[0] ** 2 + arrow_direction[1] ** 2) ** 0.5,
-            arrow_direction[1] / (arrow_direction[0] ** 2 + arrow_direction[1] ** 2) ** 0.5)
-
-        point1 = end
-        point2 = (
-            end[0] - arrowhead_length * arrow_direction_normalized[0] + arrowhead_width * 0.5 *
-            arrow_direction_normalized[1],
-            end[1] - arrowhead_length * arrow_direction_normalized[1] - arrowhead_width * 0.5 *
-            arrow_direction_normalized[0])
-        point3 = (
-            end[0] - arrowhead_length * arrow_direction_normalized[0] - arrowhead_width * 0.5 *
-            arrow_direction_normalized[1],
-            end[1] - arrowhead_length * arrow_direction_normalized[1] + arrowhead_width * 0.5 *
-            arrow_direction_normalized[0])
-
-        draw.polygon([point1, point2, point3], fill=end_color)
+    async def warm_up(self):
+        """Renders the current state ahead of the first view, on one cluster"""
+        try:
+            # clusters booting later find the finished render in redis
+            if not await self.bot.leases.acquire("warmap"):
+                return
+            try:
+                await self.map_image(self.territories_control)
+            finally:
+                await self.bot.leases.release("warmap")
+        except Exception:
+            self.bot.logger.exception("Failed to render the war map")
+
+    async def map_image(self, control: dict) -> bytes:
+        """The map PNG for an ownership state, rendered once for all clusters"""
+        key = map_key(control)
+        if (image := await self.bot.redis.get(f"warmap:png:{key}")) is not None:
+            return image
+        async with self._render_lock:
+            if (image := await self.bot.redis.get(f"warmap:png:{key}")) is None:
+                image = await self.bot.renderer.render(
+                    render.warmap, TERRITORIES, CONNECTIONS, control
+                )
+                await self.bot.redis.set(f"warmap:png:{key}", image, ex=MAP_TTL)
+        return image
 
     @is_gm()
     @commands.command()
@@ -83,136 +152,29 @@ class WarMap(commands.Cog):
 
             await asyncio.sleep(4)
 
-            # Load your map
-            base_map = Image.open("assets/conquest/Map.png")
-
-            enhancer = ImageEnhance.Brightness(base_map)
-            base_map = enhancer.enhance(0.65)  # Decrease brightness (0.7 is just an example, adjust as needed)
-
-            # Load flags and resize them
-            flag_size = (75, 150)
-            asterea_flag = Image.open("assets/conquest/Good_Flag.png").resize(flag_size)
-            sepulchre_flag = Image.open("assets/conquest/Evil_Flag.png").resize(flag_size)
-            drakath_flag = Image.open("assets/conquest/Chaos_Flag.png").resize(flag_size)
-            neutral_flag = Image.open("assets/conquest/Neutral.png").resize(flag_size)
-
-            # Define predefined coordinates for territories
-            territories_coords = {
-                "Drakath": (1344, 306),
-                "Zanjuro": (1172, 405),
-                "OrderTemple": (944, 209),
-                "Isyldill": (932, 500),
-                "Shir": (1305, 822),
-                "Ollin": (787, 702),
-                "Sepulchre": (440, 874),
-                "Lankerque": (710, 498),
-                "DragonFoe": (552, 695),
-                "Asterea": (119, 144),
-                "BuhayCitadel": (327, 309),
-                "BreftValley": (473, 135),
-                "WellOfUnity": (615, 289),
-                "Manumit": (260, 470),
-                "BoneDunes": (157, 549),
-                "DragonMountain": (75, 781),
-                "Lakoldon": (468, 448),
-                "Telfinor": (741, 179),
-                "OnlookerPeak": (298, 774),
-            }
-
-            connections = [
-                ("Drakath", "Zanjuro"),
-                ("Zanjuro", "OrderTemple"),
-                ("OrderTemple", "Isyldill"),
-                ("Isyldill", "Shir"),
-                ("Zanjuro", "Shir"),
-                ("Shir", "Ollin"),
-                ("Ollin", "Lankerque"),
-                ("Sepulchre", "OnlookerPeak"),
-                ("Lankerque", "DragonFoe"),
-                ("Asterea", "BuhayCitadel"),
-                ("BuhayCitadel", "BreftValley"),
-                ("BreftValley", "WellOfUnity"),
-                ("BuhayCitadel", "Manumit"),
-                ("Manumit", "BoneDunes"),
-                ("BoneDunes", "DragonMountain"),
-                ("OnlookerPeak", "DragonMountain"),
-                ("Lakoldon", "Manumit"),
-                ("Lakoldon", "Lankerque"),
-                ("Telfinor", "BreftValley"),
-                ("Telfinor", "OrderTemple"),
-                ("Lankerque", "WellOfUnity"),
-                ("Lankerque", "Isyldill"),
-                ("Isyldill", "WellOfUnity"),
-                ("OnlookerPeak", "DragonFoe"),
-            ]
-
-            # Example data from your database (replace this with actual data)
-            territories_control = {
-                "Drakath": "Drakath",
-                "Sepulchre": "Sepulchre",
-                "Asterea": "Asterea",
-            }
-
-            # Overlay flags on territories
-            color_map = {
-                'Asterea': (255, 255, 0),
-                'Sepulchre': (255, 0, 0),
-                'Drakath': (128, 0, 128),
-                'Neutral': (255, 255, 255)  # White color for neutral
-            }
-
-            # Overlay flags on territories
-            for territory, coords in territories_coords.items():
-                god = territories_control.get(territory, "Neutral")  # Default to "Neutral" if not found
-                adjusted_coords = (coords[0] - flag_size[0] // 2, coords[1] - flag_size[1])
-
-                flag_map = {
-                    'Asterea': asterea_flag,
-                    'Sepulchre': sepulchre_flag,
-                    'Drakath': drakath_flag,
-                    'Neutral': neutral_flag
-                }
-                flag = flag_map.get(god)
-
-                if flag:
-                    base_map.paste(flag, adjusted_coords, flag)
-
-            draw = ImageDraw.Draw(base_map)
+            control = self.territories_control
+            key = map_key(control)
 
-            # Draw arrows for connections and flags on top of arrows
-            for start, end in connections:
-                start_coords = territories_coords[start]
-                end_coords = territories_coords[end]
-                start_color = color_map.get(territories_control.get(start, "Neutral"))
-                end_color = color_map.get(territories_control.get(end, "Neutral"))
+            # The same map was uploaded before, point to it instead
+            if (url := await self.bot.redis.get(f"warmap:url:{key}")) is not None:
+                embed = discord.Embed(colour=discord.Colour.blurple())
+                embed.set_image(url=url.decode())
+                await ctx.send(embed=embed)
+                return
 
-                self.gradient_arrow(draw, start_coords, end_coords, start_color, end_color)
-
-                # Place flags on top of the arrows
-                start_flag = flag_map.get(territories_control.get(start, "Neutral"))
-                end_flag = flag_map.get(territories_control.get(end, "Neutral"))
-
-                if start_flag:
-                    base_map.paste(start_flag, (start_coords[0] - flag_size[0] // 2, start_coords[1] - flag_size[1]),
-                                   start_flag)
-                if end_flag:
-                    base_map.paste(end_flag, (end_coords[0] - flag_size[0] // 2, end_coords[1] - flag_size[1]),
-                                   end_flag)
-
-            # Save the Resulting Map
-            base_map.save("result.png")
-
-            # Load the generated map image
-            map_image = Image.open("result.png")
-
-            # Convert the PIL image to bytes
-            image_bytes = BytesIO()
-            map_image.save(image_bytes, format="PNG")
-            image_bytes.seek(0)
+            image = await self.map_image(control)
 
             # Send the image to the Discord channel
-            await ctx.send(file=discord.File(image_bytes, filename="result.png"))
+            message = await ctx.send(
+                file=discord.File(BytesIO(image), filename="result.png")
+            )
+            if message.attachments:
+                await self.bot.redis.set(
+                    f"warmap:url:{key}", message.attachments[0].url, ex=MAP_URL_TTL
+                )
 
+        except (render.RenderBusy, OSError):
+            await ctx.send("The map could not be rendered right now, try again later.")
         except Exception as e:
             # Handle exceptions and send an error message
             await ctx.send(f"An error occurred: {str(e)}")
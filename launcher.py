@@ -253,7 +253,9 @@ class Main:
                     }
                 await self.redis.execute_command(
                     "PUBLISH",
-                    config.database.redis_shard_announce_channel,
+                    payload.get(
+                        "reply_to", config.database.redis_shard_announce_channel
+                    ),
                     orjson.dumps(
                         {"command_id": payload["command_id"], "output": statuses}
                     ),
@@ -905,6 +905,13 @@ CREATE INDEX inventory_item_idx ON public.inventory USING btree (item);
 CREATE INDEX loot_id_idx ON public.loot USING btree (id);
 
 
+--
+-- Name: loot_user_value_idx; Type: INDEX; Schema: public; Owner: jens
+--
+
+CREATE INDEX loot_user_value_idx ON public.loot USING btree ("user", value, id);
+
+
 --
 -- Name: market_item_idx; Type: INDEX; Schema: public; Owner: jens
 --
@@ -947,6 +954,27 @@ CREATE INDEX profile_pvpwins_idx ON public.profile USING btree (pvpwins);
 CREATE INDEX profile_xp_idx ON public.profile USING btree (xp);
 
 
+--
+-- Name: reminders_end_idx; Type: INDEX; Schema: public; Owner: jens
+--
+
+CREATE INDEX reminders_end_idx ON public.reminders USING btree ("end");
+
+
+--
+-- Name: transactions_from_timestamp_idx; Type: INDEX; Schema: public; Owner: jens
+--
+
+CREATE INDEX transactions_from_timestamp_idx ON public.transactions USING btree ("from", "timestamp", id);
+
+
+--
+-- Name: transactions_to_timestamp_idx; Type: INDEX; Schema: public; Owner: jens
+--
+
+CREATE INDEX transactions_to_timestamp_idx ON public.transactions USING btree ("to", "timestamp", id);
+
+
 --
 -- Name: guild insert_alliance_default; Type: TRIGGER; Schema: public; Owner: jens
 --
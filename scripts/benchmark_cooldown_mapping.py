@@ -0,0 +1,84 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Measures the cost of one global cooldown check with many active buckets,
+comparing the ordered expiry in classes/bucket_cooldown.py to the previous
+scan over every bucket. Needs no database.
+
+Usage (from the repository root):
+    python scripts/benchmark_cooldown_mapping.py [buckets]
+"""
+import sys
+import time
+
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from discord.ext.commands import BucketType  # noqa: E402
+
+from classes.bucket_cooldown import Cooldown, CooldownMapping  # noqa: E402
+
+CALLS = 20_000
+
+
+class ScanningCooldownMapping(CooldownMapping):
+    """The previous implementation, checks every bucket on every call"""
+
+    def _verify_cache_integrity(self, current=None):
+        current = current or time.time()
+        dead_keys = [k for k, v in self._cache.items() if v.is_full_at(current)]
+        for k in dead_keys:
+            del self._cache[k]
+
+
+def message(user_id):
+    return SimpleNamespace(author=SimpleNamespace(id=user_id))
+
+
+def measure(name, mapping_cls, buckets):
+    # the same settings as Bot.normal_cooldown
+    mapping = mapping_cls(Cooldown(3, 3, 1, 3, BucketType.user))
+    now = time.time()
+    # every user used a command within the last second, nobody refilled yet
+    for user_id in range(buckets):
+        mapping.update_rate_limit(message(user_id), now - 1 + user_id / buckets)
+    calls = min(CALLS, buckets)
+    start = time.perf_counter()
+    for user_id in range(calls):
+        mapping.update_rate_limit(message(user_id), now)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<10} {buckets:>7} buckets {elapsed / calls * 1_000_000:>10.2f}µs"
+        f" per call, {mapping.size} tracked, {mapping.expired} expired"
+    )
+
+
+def main(max_buckets):
+    buckets = 1_000
+    while buckets <= max_buckets:
+        measure("ordered", CooldownMapping, buckets)
+        # the scan is quadratic here, a few thousand buckets already show it
+        if buckets <= 10_000:
+            measure("scan", ScanningCooldownMapping, buckets)
+        buckets *= 10
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,130 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Compares listing someone's cooldowns with KEYS plus a TTL per key against
+the per-owner index in utils/cooldowns.py. It seeds the cooldown keys into
+a separate, empty Redis database on the redis_host from config.toml and
+flushes that database again afterwards.
+
+Usage (from the repository root):
+    python scripts/benchmark_cooldowns.py [keys] [database]
+"""
+import asyncio
+import sys
+import time
+
+from pathlib import Path
+from types import SimpleNamespace
+
+from redis import asyncio as aioredis
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import cooldowns  # noqa: E402
+from utils.config import ConfigLoader  # noqa: E402
+
+COMMANDS = [
+    "adventure",
+    "battle",
+    "child",
+    "daily",
+    "date",
+    "familyevent",
+    "hunt",
+    "pve",
+    "steal",
+    "vote",
+]
+LOOKUPS = 200
+
+
+async def seed(redis, registry, count):
+    now = time.time()
+    owners = count // len(COMMANDS)
+    for start in range(0, owners, 1000):
+        async with redis.pipeline(transaction=False) as pipe:
+            for owner in range(start, min(start + 1000, owners)):
+                for i, command in enumerate(COMMANDS):
+                    seconds = 3600 + owner % 600 + i
+                    pipe.set(
+                        registry.key(cooldowns.USER, owner, command), command, ex=seconds
+                    )
+                    pipe.zadd(
+                        registry.index_key(cooldowns.USER, owner),
+                        {command: now + seconds},
+                    )
+            await pipe.execute()
+    return owners
+
+
+async def timers_keys(redis, owner):
+    """The previous implementation, KEYS and one TTL per match"""
+    timers = []
+    for key in await redis.execute_command("KEYS", f"cd:{owner}:*"):
+        key = key.decode()
+        ttl = await redis.execute_command("TTL", key)
+        timers.append((key.replace(f"cd:{owner}:", ""), ttl))
+    return timers
+
+
+async def measure(name, coro_func, owners):
+    step = max(owners // LOOKUPS, 1)
+    start = time.perf_counter()
+    found = 0
+    for owner in range(0, owners, step):
+        found += len(await coro_func(owner))
+    elapsed = time.perf_counter() - start
+    lookups = len(range(0, owners, step))
+    print(
+        f"{name:<16} {lookups:>5} lookups {found:>7} timers"
+        f" {elapsed / lookups * 1000:>10.2f}ms per lookup"
+    )
+
+
+async def main(count, database):
+    config = ConfigLoader("config.toml")
+    redis = aioredis.Redis(
+        host=config.database.redis_host,
+        port=config.database.redis_port,
+        db=database,
+    )
+    if await redis.dbsize():
+        print(f"Redis database {database} is not empty, pick another one")
+        return
+    registry = cooldowns.CooldownRegistry(SimpleNamespace(redis=redis))
+    try:
+        owners = await seed(redis, registry, count)
+        print(f"Seeded {owners * len(COMMANDS)} cooldowns for {owners} owners")
+        await measure("KEYS + TTL", lambda owner: timers_keys(redis, owner), owners)
+        await measure(
+            "index",
+            lambda owner: registry.timers(cooldowns.USER, owner),
+            owners,
+        )
+    finally:
+        await redis.flushdb()
+        await redis.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 15,
+        )
+    )
@@ -0,0 +1,152 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Benchmarks the transaction ledger against the database from config.toml.
+Everything happens in temporary tables that shadow the real ones, nothing
+is written to the actual transactions/market_history.
+
+Usage (from the repository root):
+    python scripts/benchmark_ledger.py [count]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import asyncpg
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.config import ConfigLoader  # noqa: E402
+from utils.ledger import TransactionLedger  # noqa: E402
+
+SETUP = """
+CREATE TEMPORARY TABLE IF NOT EXISTS transactions (
+    id serial PRIMARY KEY,
+    "from" bigint,
+    "to" bigint,
+    subject text,
+    info text,
+    data jsonb,
+    "timestamp" timestamp without time zone
+);
+CREATE TEMPORARY TABLE IF NOT EXISTS market_history (
+    id serial PRIMARY KEY,
+    item integer,
+    name text,
+    value integer,
+    type text,
+    damage numeric,
+    armor numeric,
+    signature text,
+    price integer,
+    offer bigint
+);
+"""
+
+CTX = SimpleNamespace(command=SimpleNamespace(qualified_name="crates open"))
+
+
+def entries(count):
+    for i in range(count):
+        if i % 10 == 0:
+            yield (
+                1,
+                i,
+                "shop",
+                {
+                    "id": i,
+                    "name": "Sword",
+                    "value": 100,
+                    "type": "Sword",
+                    "damage": 40,
+                    "armor": 0,
+                    "signature": None,
+                    "price": 500,
+                    "offer": i,
+                },
+            )
+        else:
+            yield 1, i, "money", {"Gold": i}
+
+
+async def per_entry(pool, count):
+    """The previous implementation, one INSERT on the caller's connection each"""
+    ledger = TransactionLedger(None)
+    async with pool.acquire() as conn:
+        for from_, to, subject, data in entries(count):
+            await ledger.write(conn, CTX, from_, to, subject, data)
+    return 0
+
+
+async def write_behind(pool, count):
+    """Queued entries written with COPY, returns the time callers spent"""
+    bot = SimpleNamespace(pool=pool, logger=logging.getLogger("ledger"))
+    ledger = TransactionLedger(bot)
+    spent = 0
+    for from_, to, subject, data in entries(count):
+        start = time.perf_counter()
+        ledger.log(CTX, from_, to, subject, data)
+        spent += time.perf_counter() - start
+        if to % ledger.batch == 0:
+            # let the writer run as it would between commands
+            await asyncio.sleep(0)
+    await ledger.close()
+    return spent
+
+
+async def measure(pool, name, coro_func, count):
+    async with pool.acquire() as conn:
+        await conn.execute("TRUNCATE transactions, market_history;")
+    start = time.perf_counter()
+    spent = await coro_func(pool, count)
+    elapsed = time.perf_counter() - start
+    async with pool.acquire() as conn:
+        written = await conn.fetchval("SELECT COUNT(*) FROM transactions;")
+    spent = f"{spent * 1000:.1f}ms in callers" if spent else ""
+    print(
+        f"{name:<16} {written:>7} entries {elapsed * 1000:>10.1f}ms"
+        f" {written / elapsed:>10.0f}/s  {spent}"
+    )
+
+
+async def main(count):
+    config = ConfigLoader("config.toml")
+    # a single connection so the temporary tables are always the same
+    pool = await asyncpg.create_pool(
+        database=config.database.postgres_name,
+        user=config.database.postgres_user,
+        password=config.database.postgres_password,
+        host=config.database.postgres_host,
+        port=config.database.postgres_port,
+        min_size=1,
+        max_size=1,
+        init=lambda conn: conn.execute(SETUP),
+    )
+    try:
+        await measure(pool, "per entry", per_entry, count)
+        await measure(pool, "write behind", write_behind, count)
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
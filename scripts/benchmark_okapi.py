@@ -0,0 +1,97 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Benchmarks the Okapi client against the stub from okapi_stub.py, which is
+started in this process with a fixed render delay. Bursts of identical and
+of distinct renders show how many reach Okapi and how long the burst takes,
+once with one-off sessions as the cogs used to do and once with the client.
+Runs without Redis, so only the coalescing is measured.
+
+Usage (from the repository root):
+    python scripts/benchmark_okapi.py [renders] [delay in seconds]
+"""
+import asyncio
+import sys
+import time
+
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from okapi_stub import OkapiStub  # noqa: E402
+from utils.okapi import Okapi  # noqa: E402
+
+PORT = 3999
+URL = f"http://127.0.0.1:{PORT}"
+
+
+def payloads(count, identical):
+    for i in range(count):
+        yield {"image": f"https://example.com/{0 if identical else i}.png"}
+
+
+async def direct(payload):
+    """The previous implementation, a POST and a GET on the shared session"""
+    async with direct.session.post(f"{URL}/api/imageops/pixel", json=payload) as r:
+        image = await r.text()
+    async with direct.session.get(image) as resp:
+        return await resp.read()
+
+
+async def measure(stub, name, render, count, identical):
+    stub.calls.clear()
+    start = time.perf_counter()
+    await asyncio.gather(*(render(payload) for payload in payloads(count, identical)))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<8} {'identical' if identical else 'distinct':<10} {count:>6} renders"
+        f" {elapsed * 1000:>10.1f}ms {count / elapsed:>8.0f}/s"
+        f" {stub.calls.get('imageops/pixel', 0):>6} reached Okapi"
+    )
+
+
+async def main(count, delay):
+    stub = OkapiStub(delay)
+    runner = await stub.start(port=PORT)
+    direct.session = aiohttp.ClientSession()
+    okapi = Okapi(URL, None)
+
+    async def client(payload):
+        return await okapi.image_op("pixel", payload["image"])
+
+    try:
+        for identical in (True, False):
+            await measure(stub, "direct", direct, count, identical)
+            await measure(stub, "client", client, count, identical)
+        print(f"client: {okapi.stats}")
+    finally:
+        await okapi.close()
+        await direct.session.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+            float(sys.argv[2]) if len(sys.argv) > 2 else 0.05,
+        )
+    )
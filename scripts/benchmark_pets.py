@@ -0,0 +1,181 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Benchmarks the pet growth and egg hatching loops against the database
+from config.toml. Everything happens in temporary tables that shadow the
+real ones, nothing is written to the actual monster_pets/monster_eggs.
+
+Usage (from the repository root):
+    python scripts/benchmark_pets.py [count]
+"""
+import asyncio
+import sys
+import time
+
+from decimal import Decimal
+from pathlib import Path
+
+import asyncpg
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cogs.battles import PET_GROWTH_STAGES, Battles  # noqa: E402
+from utils.config import ConfigLoader  # noqa: E402
+
+SETUP = """
+CREATE TEMPORARY TABLE monster_pets (
+    id serial PRIMARY KEY,
+    user_id bigint,
+    name text,
+    default_name text,
+    hp numeric,
+    attack numeric,
+    defense numeric,
+    element text,
+    url text,
+    growth_stage text,
+    growth_index integer,
+    growth_time timestamp with time zone,
+    "IV" numeric,
+    hunger integer DEFAULT 100,
+    happiness integer DEFAULT 100
+);
+CREATE TEMPORARY TABLE monster_eggs (
+    id serial PRIMARY KEY,
+    user_id bigint,
+    egg_type text,
+    hp integer,
+    attack integer,
+    defense integer,
+    element text,
+    url text,
+    hatch_time timestamp with time zone,
+    hatched boolean DEFAULT FALSE,
+    "IV" numeric
+);
+"""
+
+
+async def seed(conn, count):
+    await conn.execute("TRUNCATE monster_pets, monster_eggs;")
+    await conn.execute(
+        """
+        INSERT INTO monster_pets (
+            user_id, name, default_name, hp, attack, defense, element, url,
+            growth_stage, growth_index, growth_time, "IV"
+        )
+        SELECT i, 'Pet', 'Pet', 100, 100, 100, 'Fire', '', 'baby', 1,
+            NOW() - interval '1 minute', 50
+        FROM generate_series(1, $1) i;
+        """,
+        count,
+    )
+    await conn.execute(
+        """
+        INSERT INTO monster_eggs (
+            user_id, egg_type, hp, attack, defense, element, url, hatch_time, "IV"
+        )
+        SELECT i, 'Egg', 400, 400, 400, 'Fire', '', NOW() - interval '1 minute', 50
+        FROM generate_series(1, $1) i;
+        """,
+        count,
+    )
+
+
+async def grow_per_row(conn):
+    """The previous implementation, one UPDATE round-trip per pet"""
+    pets = await conn.fetch(
+        "SELECT * FROM monster_pets WHERE growth_time <= NOW() AND growth_stage !="
+        " 'adult';"
+    )
+    for pet in pets:
+        stage = PET_GROWTH_STAGES[pet["growth_index"] + 1]
+        ratio = Decimal(str(stage["stat_multiplier"])) / Decimal(
+            str(PET_GROWTH_STAGES[pet["growth_index"]]["stat_multiplier"])
+        )
+        await conn.fetchrow(
+            "UPDATE monster_pets SET growth_stage=$1, hp=$2, attack=$3, defense=$4,"
+            " growth_index=$5, growth_time=NOW() + interval '2 days' WHERE id=$6"
+            " RETURNING hp, attack, defense;",
+            stage["stage"],
+            pet["hp"] * ratio,
+            pet["attack"] * ratio,
+            pet["defense"] * ratio,
+            pet["growth_index"] + 1,
+            pet["id"],
+        )
+    return pets
+
+
+async def hatch_per_row(conn):
+    """The previous implementation, an UPDATE and an INSERT per egg"""
+    eggs = await conn.fetch(
+        "SELECT * FROM monster_eggs WHERE hatched = FALSE AND hatch_time <= NOW();"
+    )
+    for egg in eggs:
+        await conn.execute("UPDATE monster_eggs SET hatched = TRUE WHERE id = $1;", egg["id"])
+        await conn.execute(
+            'INSERT INTO monster_pets (user_id, name, default_name, hp, attack,'
+            ' defense, element, url, growth_stage, growth_index, growth_time, "IV")'
+            " VALUES ($1, $2, $2, $3, $4, $5, $6, $7, 'baby', 1, NOW(), $8);",
+            egg["user_id"],
+            egg["egg_type"],
+            round(egg["hp"] * 0.25),
+            round(egg["attack"] * 0.25),
+            round(egg["defense"] * 0.25),
+            egg["element"],
+            egg["url"],
+            egg["IV"],
+        )
+    return eggs
+
+
+async def measure(conn, name, coro_func, count):
+    await seed(conn, count)
+    start = time.perf_counter()
+    async with conn.transaction():
+        rows = await coro_func(conn)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {len(rows):>7} rows {elapsed * 1000:>10.1f}ms")
+
+
+async def main(count):
+    config = ConfigLoader("config.toml")
+    conn = await asyncpg.connect(
+        database=config.database.postgres_name,
+        user=config.database.postgres_user,
+        password=config.database.postgres_password,
+        host=config.database.postgres_host,
+        port=config.database.postgres_port,
+    )
+    try:
+        await conn.execute(SETUP)
+        await measure(conn, "growth, per row", grow_per_row, count)
+        await measure(
+            conn, "growth, set based", lambda c: Battles.grow_due_pets(None, c), count
+        )
+        await measure(conn, "hatching, per row", hatch_per_row, count)
+        await measure(
+            conn, "hatching, set based", lambda c: Battles.hatch_due_eggs(None, c), count
+        )
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
@@ -0,0 +1,102 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+A stand-in for Okapi that answers every render with the same tiny PNG, for
+trying the bot and benchmarking the client without the real service. Set
+okapi_url in config.toml to its address. A background or overlay URL
+containing "broken" is rejected the way Okapi rejects unreadable images.
+
+Usage (from the repository root):
+    python scripts/okapi_stub.py [port] [delay in seconds]
+"""
+import asyncio
+import base64
+import sys
+
+from aiohttp import web
+
+# a 1x1 transparent PNG
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+ENDPOINTS = (
+    "genprofile",
+    "genoverlay",
+    "genchess",
+    "imageops/pixel",
+    "imageops/edges",
+    "imageops/invert",
+    "imageops/oil",
+)
+
+
+class OkapiStub:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        # endpoint -> renders, "image" counts the fetched images
+        self.calls = {}
+        self.app = web.Application()
+        for endpoint in ENDPOINTS:
+            self.app.router.add_post(f"/api/{endpoint}", self.render)
+        self.app.router.add_get("/images/{name}", self.image)
+        self.app.router.add_get("/stats", self.stats)
+
+    async def render(self, request: web.Request) -> web.Response:
+        endpoint = request.path.removeprefix("/api/")
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+        payload = await request.json()
+        await asyncio.sleep(self.delay)
+        if "broken" in str(payload.get("image") or payload.get("url") or ""):
+            return web.json_response(
+                {"reason": "Invalid image", "detail": "could not decode"}, status=400
+            )
+        number = sum(self.calls.values())
+        return web.Response(text=f"{request.url.origin()}/images/{number}.png")
+
+    async def image(self, request: web.Request) -> web.Response:
+        self.calls["image"] = self.calls.get("image", 0) + 1
+        return web.Response(body=PNG, content_type="image/png")
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.calls)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 3000) -> web.AppRunner:
+        runner = web.AppRunner(self.app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+async def main(port, delay):
+    stub = OkapiStub(delay)
+    runner = await stub.start(port=port)
+    print(f"Okapi stub listening on http://127.0.0.1:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 3000,
+            float(sys.argv[2]) if len(sys.argv) > 2 else 0.0,
+        )
+    )
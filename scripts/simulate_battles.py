@@ -0,0 +1,455 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Runs raid battles headless on utils.combat.engine across a process pool
+and reports win rates, mean actions and damage/heal distributions per
+class line, element pairing and tank/mage evolution tier.
+
+Combatants are synthetic by default. --snapshot samples real profiles
+from the database in config.toml instead, using the raw stats of their
+equipped items (no race, class or building bonuses).
+
+--benchmark times the per-action hot path and the whole fight in the
+style of pytest-benchmark. --benchmark-json saves the numbers and
+--benchmark-compare exits with 1 if the mean regressed by more than
+--benchmark-max-regression percent, so CI can run it on engine changes.
+
+Usage (from the repository root):
+    python scripts/simulate_battles.py [--fights 1000000] [--workers 8]
+    python scripts/simulate_battles.py --snapshot 5000
+    python scripts/simulate_battles.py --benchmark --benchmark-json bench.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.classes import ALL_CLASSES_TYPES, get_class_evolves  # noqa: E402
+from utils.combat.engine import (  # noqa: E402
+    ELEMENT_STRENGTHS,
+    LIFESTEAL_VALUES,
+    MAGE_EVOLUTION_LEVELS,
+    TANK_EVOLUTION_LEVELS,
+    Battle,
+    Combatant,
+    evolution_tier,
+    tank_bonuses,
+)
+from utils.combat.entity import Faction  # noqa: E402
+
+ELEMENTS = [element for element in ELEMENT_STRENGTHS if element != "Unknown"]
+# Distributions are kept as histograms so workers can merge them cheaply
+HISTOGRAM_BUCKET = 50
+CHUNK_SIZE = 5_000
+
+
+def luck_percent(luck_value):
+    """Maps profile.luck to the 20-100 trip threshold, as fetch_combatants does"""
+    if luck_value <= 0.3:
+        return 20.0
+    return round(((luck_value - 0.3) / (1.5 - 0.3)) * 80 + 20, 2)
+
+
+def class_line(classes):
+    for name in classes:
+        for line_name, line in ALL_CLASSES_TYPES.items():
+            if any(c.class_name() == name for c in get_class_evolves(line)):
+                return line_name
+    return "None"
+
+
+def synthetic_profile(rng, level_range, stat_range):
+    line = rng.choice(list(ALL_CLASSES_TYPES.values()))
+    classes = [rng.choice(get_class_evolves(line)).class_name()]
+    # There is no tank class line yet, hand out tank tiers on the second slot
+    if rng.random() < 0.25:
+        classes.append(rng.choice(list(TANK_EVOLUTION_LEVELS)))
+    return {
+        "classes": classes,
+        "level": rng.randint(*level_range),
+        "health": rng.randint(0, 500),
+        "stathp": rng.randint(0, 10),
+        "luck": rng.uniform(0.3, 1.5),
+        "damage": rng.randint(*stat_range),
+        "armor": rng.randint(*stat_range),
+        "has_shield": rng.random() < 0.5,
+        "element": rng.choice(ELEMENTS),
+    }
+
+
+def build_combatant(profile, faction):
+    tank_evolution = evolution_tier(profile["classes"], TANK_EVOLUTION_LEVELS)
+    health_multiplier, damage_reflection = tank_bonuses(
+        tank_evolution, profile["has_shield"]
+    )
+    hp = (250.0 + profile["health"] + profile["level"] * 5.0 + profile["stathp"] * 50.0)
+    lifesteal = sum(LIFESTEAL_VALUES.get(name, 0) for name in profile["classes"])
+    return Combatant(
+        faction,
+        faction,
+        hp * health_multiplier,
+        profile["damage"],
+        profile["armor"],
+        element=profile["element"],
+        luck=luck_percent(profile["luck"]),
+        lifesteal=lifesteal,
+        damage_reflection=damage_reflection,
+        tank_evolution=tank_evolution,
+    )
+
+
+def groups(profile, opponent):
+    """The report rows a fight counts towards for one side"""
+    return (
+        ("class line", class_line(profile["classes"])),
+        ("element", f"{profile['element']} vs {opponent['element']}"),
+        (
+            "tank tier",
+            evolution_tier(profile["classes"], TANK_EVOLUTION_LEVELS) or 0,
+        ),
+        (
+            "mage tier",
+            evolution_tier(profile["classes"], MAGE_EVOLUTION_LEVELS) or 0,
+        ),
+    )
+
+
+class Tally:
+    __slots__ = ("fights", "wins", "actions", "damage", "healed")
+
+    def __init__(self):
+        self.fights = 0
+        self.wins = 0
+        self.actions = 0
+        self.damage = Counter()
+        self.healed = Counter()
+
+    def add(self, won, actions, damage, healed):
+        self.fights += 1
+        self.wins += won
+        self.actions += actions
+        self.damage[int(damage // HISTOGRAM_BUCKET)] += 1
+        self.healed[int(healed // HISTOGRAM_BUCKET)] += 1
+
+    def merge(self, other):
+        self.fights += other.fights
+        self.wins += other.wins
+        self.actions += other.actions
+        self.damage.update(other.damage)
+        self.healed.update(other.healed)
+
+
+def simulate_chunk(seed, fights, profiles, level_range, stat_range):
+    """Runs fights in a worker and returns the tallies per report row"""
+    rng = random.Random(seed)
+    tallies = defaultdict(Tally)
+    for _ in range(fights):
+        if profiles:
+            a, b = rng.sample(profiles, 2)
+        else:
+            a = synthetic_profile(rng, level_range, stat_range)
+            b = synthetic_profile(rng, level_range, stat_range)
+        battle = Battle(
+            [build_combatant(a, Faction.One), build_combatant(b, Faction.Two)],
+            rng=rng,
+        )
+        battle.apply_element_modifiers()
+        battle.run()
+
+        dealt = {Faction.One: 0.0, Faction.Two: 0.0}
+        healed = {Faction.One: 0.0, Faction.Two: 0.0}
+        for event in battle.log:
+            faction = event.attacker.faction
+            dealt[faction] += event.damage
+            healed[faction] += event.healed
+
+        for profile, opponent, faction in ((a, b, Faction.One), (b, a, Faction.Two)):
+            won = battle.winner == faction
+            for row in groups(profile, opponent):
+                tallies[row].add(
+                    won, len(battle.log), dealt[faction], healed[faction]
+                )
+    return dict(tallies)
+
+
+def percentile(histogram, fraction):
+    total = sum(histogram.values())
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= total * fraction:
+            return bucket * HISTOGRAM_BUCKET
+    return 0
+
+
+def report(tallies):
+    by_kind = defaultdict(list)
+    for (kind, name), tally in tallies.items():
+        by_kind[kind].append((name, tally))
+
+    for kind, rows in by_kind.items():
+        print(f"\n{kind}")
+        print(
+            f"{'':<24} {'fights':>9} {'win %':>7} {'actions':>8}"
+            f" {'dmg p50':>8} {'dmg p95':>8} {'heal p50':>9} {'heal p95':>9}"
+        )
+        for name, tally in sorted(rows, key=lambda row: str(row[0])):
+            print(
+                f"{str(name):<24} {tally.fights:>9} {tally.wins / tally.fights * 100:>7.2f}"
+                f" {tally.actions / tally.fights:>8.1f}"
+                f" {percentile(tally.damage, 0.5):>8} {percentile(tally.damage, 0.95):>8}"
+                f" {percentile(tally.healed, 0.5):>9} {percentile(tally.healed, 0.95):>9}"
+            )
+
+
+async def load_profiles(count):
+    """Samples real profiles with the raw stats of their equipped items"""
+    import asyncpg
+
+    from utils.config import ConfigLoader
+    from utils.misc import xptolevel
+
+    config = ConfigLoader("config.toml")
+    conn = await asyncpg.connect(
+        database=config.database.postgres_name,
+        user=config.database.postgres_user,
+        password=config.database.postgres_password,
+        host=config.database.postgres_host,
+        port=config.database.postgres_port,
+    )
+    try:
+        rows = await conn.fetch(
+            """
+            SELECT p."class", p."xp", p."health", p."stathp", p."luck",
+                COALESCE(SUM(ai."damage"), 0) AS "damage",
+                COALESCE(SUM(ai."armor"), 0) AS "armor",
+                COALESCE(BOOL_OR(ai."type" = 'Shield'), FALSE) AS "has_shield",
+                (ARRAY_AGG(ai."element" ORDER BY GREATEST(ai."damage", ai."armor") DESC))[1]
+                    AS "element"
+            FROM profile p
+            LEFT JOIN (
+                allitems ai JOIN inventory i ON (ai."id"=i."item" AND i."equipped")
+            ) ON (ai."owner"=p."user")
+            GROUP BY p."user"
+            ORDER BY random()
+            LIMIT $1;
+            """,
+            count,
+        )
+    finally:
+        await conn.close()
+
+    return [
+        {
+            "classes": list(row["class"] or []),
+            "level": xptolevel(row["xp"]),
+            "health": float(row["health"]),
+            "stathp": row["stathp"],
+            "luck": float(row["luck"]),
+            "damage": float(row["damage"]),
+            "armor": float(row["armor"]),
+            "has_shield": row["has_shield"],
+            "element": (row["element"] or "Unknown").capitalize(),
+        }
+        for row in rows
+    ]
+
+
+def simulate(args, profiles):
+    seeds = random.Random(args.seed)
+    chunks = [
+        min(CHUNK_SIZE, args.fights - offset)
+        for offset in range(0, args.fights, CHUNK_SIZE)
+    ]
+    tallies = defaultdict(Tally)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(
+                simulate_chunk,
+                seeds.getrandbits(64),
+                size,
+                profiles,
+                args.level,
+                args.stats,
+            )
+            for size in chunks
+        ]
+        for future in futures:
+            for row, tally in future.result().items():
+                tallies[row].merge(tally)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{args.fights} fights in {elapsed:.1f}s"
+        f" ({args.fights / elapsed:,.0f} fights/s, {args.workers} workers)"
+    )
+    report(tallies)
+
+
+def standard_fighters(hp):
+    return [
+        Combatant(
+            "A", Faction.One, hp, 300, 150, element="Fire", luck=80, lifesteal=14
+        ),
+        Combatant(
+            "B",
+            Faction.Two,
+            hp,
+            280,
+            170,
+            element="Nature",
+            luck=80,
+            damage_reflection=0.12,
+        ),
+    ]
+
+
+def bench_act(rng):
+    # the fighters can not die, so every call is one full action
+    battle = Battle(standard_fighters(math.inf), rng=rng)
+    attacker = battle.combatants[0]
+
+    def target():
+        battle.act(attacker)
+
+    return target
+
+
+def bench_fight(rng):
+    def target():
+        Battle(standard_fighters(5_000), rng=rng).run()
+
+    return target
+
+
+def measure(name, factory, rounds, iterations):
+    rng = random.Random(0)
+    target = factory(rng)
+    for _ in range(iterations):  # warmup
+        target()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            target()
+        timings.append((time.perf_counter() - start) / iterations)
+    quartiles = statistics.quantiles(timings, n=4)
+    mean = statistics.fmean(timings)
+    return {
+        "name": name,
+        "stats": {
+            "min": min(timings),
+            "max": max(timings),
+            "mean": mean,
+            "stddev": statistics.stdev(timings),
+            "median": statistics.median(timings),
+            "iqr": quartiles[2] - quartiles[0],
+            "ops": 1 / mean,
+            "rounds": rounds,
+            "iterations": iterations,
+        },
+    }
+
+
+def benchmark(args):
+    benchmarks = [
+        measure("test_battle_act", bench_act, args.rounds, 1_000),
+        measure("test_battle_run", bench_fight, args.rounds, 20),
+    ]
+
+    print(
+        f"{'Name (time in us)':<20} {'Min':>10} {'Max':>10} {'Mean':>10}"
+        f" {'StdDev':>10} {'Median':>10} {'IQR':>10} {'OPS':>12}"
+    )
+    for bench in benchmarks:
+        stats = bench["stats"]
+        print(
+            f"{bench['name']:<20}"
+            + "".join(
+                f" {stats[key] * 1e6:>10.3f}"
+                for key in ("min", "max", "mean", "stddev", "median", "iqr")
+            )
+            + f" {stats['ops']:>12,.1f}"
+        )
+
+    if args.benchmark_json:
+        with open(args.benchmark_json, "w") as f:
+            json.dump({"benchmarks": benchmarks}, f, indent=4)
+
+    if args.benchmark_compare:
+        with open(args.benchmark_compare) as f:
+            baseline = {b["name"]: b["stats"] for b in json.load(f)["benchmarks"]}
+        regressed = False
+        for bench in benchmarks:
+            if (old := baseline.get(bench["name"])) is None:
+                continue
+            change = (bench["stats"]["mean"] / old["mean"] - 1) * 100
+            print(f"{bench['name']}: {change:+.1f}% mean")
+            if change > args.benchmark_max_regression:
+                regressed = True
+        if regressed:
+            sys.exit(1)
+
+
+def stat_range(value):
+    low, high = value.split("-")
+    return int(low), int(high)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulates raid battles headless")
+    parser.add_argument("--fights", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--snapshot",
+        type=int,
+        metavar="PROFILES",
+        help="fight between this many profiles sampled from the database",
+    )
+    parser.add_argument("--level", type=stat_range, default=(1, 100))
+    parser.add_argument(
+        "--stats", type=stat_range, default=(50, 400), help="damage and armor range"
+    )
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--benchmark-json", metavar="PATH")
+    parser.add_argument("--benchmark-compare", metavar="PATH")
+    parser.add_argument("--benchmark-max-regression", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        return benchmark(args)
+
+    profiles = asyncio.run(load_profiles(args.snapshot)) if args.snapshot else None
+    simulate(args, profiles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+A stand-in for the Stockfish TCP backend that plays a random legal move
+after thinking for a fixed time per depth, for trying the chess cog and
+the engine pool without Stockfish. Every connection is its own engine,
+so point several stockfish_endpoints at it to get a pool.
+
+Usage (from the repository root):
+    python scripts/uci_stub.py [port] [seconds per depth]
+"""
+import asyncio
+import random
+import sys
+
+import chess
+
+
+class StubEngine:
+    def __init__(self, reader, writer, per_depth: float) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.per_depth = per_depth
+        self.board = chess.Board()
+        self.search = None
+
+    def send(self, line: str) -> None:
+        self.writer.write(f"{line}\n".encode())
+
+    async def think(self, seconds: float) -> None:
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            # stopped early or not, UCI always answers a search with bestmove
+            moves = list(self.board.legal_moves)
+            move = random.choice(moves).uci() if moves else "0000"
+            self.send(f"bestmove {move}")
+
+    def position(self, args: list[str]) -> None:
+        if args[0] == "startpos":
+            self.board = chess.Board()
+            args = args[1:]
+        else:
+            end = args.index("moves") if "moves" in args else len(args)
+            self.board = chess.Board(" ".join(args[1:end]))
+            args = args[end:]
+        for move in args[1:]:
+            self.board.push_uci(move)
+
+    def go(self, args: list[str]) -> None:
+        depth = int(args[args.index("depth") + 1]) if "depth" in args else 10
+        self.search = asyncio.create_task(self.think(depth * self.per_depth))
+
+    async def run(self) -> None:
+        while line := await self.reader.readline():
+            command, *args = line.decode().split() or [""]
+            if command == "uci":
+                self.send("id name Stub")
+                self.send("id author IdleRPG")
+                self.send("uciok")
+            elif command == "isready":
+                if self.search is not None:
+                    await asyncio.wait([self.search])
+                self.send("readyok")
+            elif command == "position":
+                self.position(args)
+            elif command == "go":
+                self.go(args)
+            elif command == "stop" and self.search is not None:
+                self.search.cancel()
+            elif command == "quit":
+                break
+            await self.writer.drain()
+        if self.search is not None:
+            self.search.cancel()
+        self.writer.close()
+
+
+async def main(port, per_depth):
+    async def connected(reader, writer):
+        await StubEngine(reader, writer, per_depth).run()
+
+    server = await asyncio.start_server(connected, "127.0.0.1", port)
+    print(f"UCI stub listening on 127.0.0.1:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 4000,
+            float(sys.argv[2]) if len(sys.argv) > 2 else 0.05,
+        )
+    )
@@ -0,0 +1,281 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import time
+
+from collections import deque
+
+import discord
+
+
+class ChannelStats:
+    __slots__ = (
+        "sent",
+        "edited",
+        "coalesced",
+        "failed",
+        "slow",
+        "total_latency",
+        "max_latency",
+        "last_lag",
+        "max_lag",
+    )
+
+    def __init__(self) -> None:
+        self.sent = 0
+        self.edited = 0
+        self.coalesced = 0
+        self.failed = 0
+        # deliveries that took longer than lag_warning, usually rate limits
+        self.slow = 0
+        # time spent in the request itself
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        # time between queueing and delivery
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    @property
+    def delivered(self) -> int:
+        return self.sent + self.edited
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.delivered if self.delivered else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"sent={self.sent} edited={self.edited} coalesced={self.coalesced}"
+            f" failed={self.failed} slow={self.slow}"
+            f" avg_latency={self.avg_latency:.2f}s max_lag={self.max_lag:.2f}s"
+        )
+
+
+class _Item:
+    __slots__ = (
+        "kwargs",
+        "file_path",
+        "filename",
+        "future",
+        "status",
+        "coalesced",
+        "queued_at",
+    )
+
+    def __init__(
+        self, kwargs, file_path=None, filename=None, future=None, status=False
+    ) -> None:
+        self.kwargs = kwargs
+        self.file_path = file_path
+        self.filename = filename
+        self.future = future
+        self.status = status
+        self.coalesced = False
+        self.queued_at = time.monotonic()
+
+
+class _Outbox:
+    __slots__ = ("channel", "items", "wakeup", "status_message", "stats", "task")
+
+    def __init__(self, channel) -> None:
+        self.channel = channel
+        self.items = deque()
+        self.wakeup = asyncio.Event()
+        # last status message, edited when updates had to be coalesced
+        self.status_message = None
+        self.stats = ChannelStats()
+        self.task = None
+
+
+class Broadcaster:
+    """
+    Sends the same messages to several channels concurrently
+
+    Every channel has its own queue and worker, so messages stay in order per
+    channel while a slow or rate limited channel never holds up the others.
+    discord.py already waits out the per-channel buckets, the semaphore caps
+    the requests in flight so many channels stay clear of the global limit.
+
+    status() is for live updates like a boss's HP and does not wait. When a
+    channel still has an update queued by the time the next one comes in,
+    the queued one is replaced instead of a new one being added. The channel
+    then gets the newest state by editing its last status message, so a
+    lagging channel skips updates rather than falling further behind. Events
+    every channel has to see, like deaths, go through send().
+    """
+
+    def __init__(
+        self, bot, channel_ids, concurrency: int = 10, lag_warning: float = 5.0
+    ) -> None:
+        self.bot = bot
+        self.lag_warning = lag_warning
+        self.outboxes = {}
+        self.missing = []
+        for channel_id in channel_ids:
+            if (channel := bot.get_channel(channel_id)) is None:
+                self.missing.append(channel_id)
+            else:
+                self.outboxes[channel_id] = _Outbox(channel)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._closing = False
+        for outbox in self.outboxes.values():
+            outbox.task = asyncio.create_task(self._run(outbox))
+
+    @property
+    def stats(self) -> dict[int, ChannelStats]:
+        return {
+            channel_id: outbox.stats for channel_id, outbox in self.outboxes.items()
+        }
+
+    async def send(
+        self, content=None, *, file_path=None, filename=None, **kwargs
+    ) -> dict[int, discord.Message | Exception]:
+        """
+        Sends a message to every channel and waits until all got it
+
+        file_path is opened once per channel since a discord.File can only be
+        sent once. Returns the message or the error for every channel.
+        """
+        kwargs["content"] = content
+        return await self.send_each(
+            {channel_id: kwargs for channel_id in self.outboxes},
+            file_path=file_path,
+            filename=filename,
+        )
+
+    async def send_each(
+        self, messages: dict, *, file_path=None, filename=None
+    ) -> dict[int, discord.Message | Exception]:
+        """Sends different messages, {channel_id: send kwargs}, concurrently"""
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for channel_id, kwargs in messages.items():
+            if (outbox := self.outboxes.get(channel_id)) is None:
+                continue
+            futures[channel_id] = future = loop.create_future()
+            self._push(outbox, _Item(dict(kwargs), file_path, filename, future))
+        if not futures:
+            return {}
+        await asyncio.wait(futures.values())
+        return {channel_id: future.result() for channel_id, future in futures.items()}
+
+    def status(self, content=None, *, embed=None) -> None:
+        """Queues a live update to every channel, coalescing where behind"""
+        kwargs = {"content": content, "embed": embed}
+        for outbox in self.outboxes.values():
+            tail = outbox.items[-1] if outbox.items else None
+            if tail is not None and tail.status:
+                # keep queued_at so the lag shows how stale the channel is
+                tail.kwargs = kwargs
+                tail.coalesced = True
+                outbox.stats.coalesced += 1
+            else:
+                self._push(outbox, _Item(kwargs, status=True))
+
+    def _push(self, outbox: _Outbox, item: _Item) -> None:
+        if self._closing:
+            raise RuntimeError("Broadcaster is closed")
+        outbox.items.append(item)
+        outbox.wakeup.set()
+
+    async def _run(self, outbox: _Outbox) -> None:
+        while True:
+            if not outbox.items:
+                if self._closing:
+                    return
+                outbox.wakeup.clear()
+                await outbox.wakeup.wait()
+                continue
+            item = outbox.items.popleft()
+            try:
+                await self._deliver(outbox, item)
+            finally:
+                # only left unanswered if close() had to cancel us
+                if item.future is not None and not item.future.done():
+                    item.future.set_result(asyncio.TimeoutError())
+
+    async def _deliver(self, outbox: _Outbox, item: _Item) -> None:
+        stats = outbox.stats
+        started = time.monotonic()
+        try:
+            kwargs = item.kwargs
+            if item.file_path:
+                kwargs = {
+                    **kwargs,
+                    "file": discord.File(item.file_path, filename=item.filename),
+                }
+            async with self._semaphore:
+                if item.coalesced and outbox.status_message is not None:
+                    result = await outbox.status_message.edit(**kwargs)
+                    stats.edited += 1
+                else:
+                    result = await outbox.channel.send(**kwargs)
+                    stats.sent += 1
+        except Exception as e:
+            stats.failed += 1
+            result = e
+            self.bot.logger.warning(
+                f"Broadcast to channel {outbox.channel.id} failed: {e}"
+            )
+        else:
+            # a regular message in between means the next status is a new one
+            outbox.status_message = result if item.status else None
+        finished = time.monotonic()
+
+        latency = finished - started
+        lag = finished - item.queued_at
+        stats.total_latency += latency
+        stats.max_latency = max(stats.max_latency, latency)
+        stats.last_lag = lag
+        stats.max_lag = max(stats.max_lag, lag)
+        if latency > self.lag_warning:
+            stats.slow += 1
+            self.bot.logger.warning(
+                f"Broadcast to channel {outbox.channel.id} took {latency:.2f}s,"
+                " it is probably rate limited"
+            )
+
+        if item.future is not None and not item.future.done():
+            item.future.set_result(result)
+
+    async def close(self, timeout: float | None = 30) -> None:
+        """Delivers whatever is still queued, then stops the workers"""
+        if self._closing:
+            return
+        self._closing = True
+        tasks = [outbox.task for outbox in self.outboxes.values()]
+        for outbox in self.outboxes.values():
+            outbox.wakeup.set()
+        if tasks:
+            _done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        for outbox in self.outboxes.values():
+            while outbox.items:
+                item = outbox.items.popleft()
+                if item.future is not None and not item.future.done():
+                    item.future.set_result(asyncio.TimeoutError())
+        for channel_id, stats in self.stats.items():
+            self.bot.logger.info(f"Broadcast to channel {channel_id}: {stats}")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
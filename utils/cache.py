@@ -52,14 +52,8 @@ from functools import wraps
 
 from lru import LRU
 
-
-def _wrap_and_store_coroutine(cache, key, coro):
-    async def func():
-        value = await coro
-        cache[key] = value
-        return value
-
-    return func()
+# separates positional from keyword arguments in a key
+_KWARGS = object()
 
 
 def _wrap_new_coroutine(value):
@@ -69,30 +63,68 @@ def _wrap_new_coroutine(value):
     return new_coroutine()
 
 
-class ExpiringCache(dict):
-    def __init__(self, seconds):
+class ExpiringCache:
+    """
+    A mapping whose entries expire a fixed time after they were set
+
+    Since every entry lives equally long, insertion order is expiry order.
+    Expired entries are dropped from the front until the first live one,
+    which is O(1) amortised instead of a scan on every access.
+    """
+
+    def __init__(self, seconds, callback=None):
         self.__ttl = seconds
-        super().__init__()
+        # key -> (value, time it was set)
+        self.__data = {}
+        # called with (key, value) for every expired entry
+        self.__callback = callback
 
     def __verify_cache_integrity(self):
-        # Have to do this in two steps...
-        current_time = time.monotonic()
-        to_remove = [
-            k for (k, (v, t)) in self.items() if current_time > (t + self.__ttl)
-        ]
-        for k in to_remove:
-            del self[k]
+        deadline = time.monotonic() - self.__ttl
+        data = self.__data
+        while data:
+            key = next(iter(data))
+            value, set_at = data[key]
+            if set_at >= deadline:
+                break
+            del data[key]
+            if self.__callback is not None:
+                self.__callback(key, value)
 
     def __contains__(self, key):
         self.__verify_cache_integrity()
-        return super().__contains__(key)
+        return key in self.__data
 
     def __getitem__(self, key):
         self.__verify_cache_integrity()
-        return super().__getitem__(key)
+        return self.__data[key][0]
 
     def __setitem__(self, key, value):
-        super().__setitem__(key, (value, time.monotonic()))
+        # re-insert so the entry moves to the back
+        self.__data.pop(key, None)
+        self.__data[key] = (value, time.monotonic())
+        self.__verify_cache_integrity()
+
+    def __delitem__(self, key):
+        del self.__data[key]
+
+    def __len__(self):
+        self.__verify_cache_integrity()
+        return len(self.__data)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        self.__verify_cache_integrity()
+        return list(self.__data.keys())
+
+    def items(self):
+        self.__verify_cache_integrity()
+        return [(key, value) for key, (value, _set_at) in self.__data.items()]
 
 
 class Strategy(enum.Enum):
@@ -101,41 +133,111 @@ class Strategy(enum.Enum):
     timed = 3
 
 
+class CacheStats:
+    __slots__ = ("hits", "misses", "coalesced", "evictions")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        # misses that waited for a call already running for the same key
+        self.coalesced = 0
+        # entries dropped by the LRU or because they expired
+        self.evictions = 0
+
+    def __repr__(self):
+        return (
+            f"<CacheStats hits={self.hits} misses={self.misses}"
+            f" coalesced={self.coalesced} evictions={self.evictions}>"
+        )
+
+
+def _hashable(o):
+    try:
+        hash(o)
+    except TypeError:
+        return repr(o)
+    return o
+
+
 def cache(maxsize=128, strategy=Strategy.lru, ignore_kwargs=False):
+    """
+    Caches the results of a function or coroutine function by its arguments
+
+    Keys are tuples of the arguments, unhashable ones go in by their repr.
+    For coroutine functions, concurrent calls with the same arguments share
+    a single call instead of all running it. Every argument is indexed, so
+    invalidate_containing() removes all keys with a given argument without
+    looking at the others.
+    """
+
     def decorator(func):
+        stats = CacheStats()
+        # argument -> keys it is part of
+        index = {}
+        # key -> task still computing the value
+        inflight = {}
+
+        def _unindex(key, _value=None):
+            for part in set(key):
+                if (keys := index.get(part)) is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[part]
+
+        def _evicted(key, value):
+            stats.evictions += 1
+            _unindex(key)
+
         if strategy is Strategy.lru:
-            _internal_cache = LRU(maxsize)
-            _stats = _internal_cache.get_stats
+            _internal_cache = LRU(maxsize, callback=_evicted)
         elif strategy is Strategy.raw:
             _internal_cache = {}
-            _stats = lambda: (0, 0)
         elif strategy is Strategy.timed:
-            _internal_cache = ExpiringCache(maxsize)
-            _stats = lambda: (0, 0)
+            _internal_cache = ExpiringCache(maxsize, callback=_evicted)
 
         def _make_key(args, kwargs):
-            # this is a bit of a cluster fuck
-            # we do care what 'self' parameter is when we __repr__ it
-            def _true_repr(o):
-                if o.__class__.__repr__ is object.__repr__:
-                    return f"<{o.__class__.__module__}.{o.__class__.__name__}>"
-                return repr(o)
-
-            key = [f"{func.__module__}.{func.__name__}"]
-            key.extend(_true_repr(o) for o in args)
-            if not ignore_kwargs:
-                for k, v in kwargs.items():
-                    # note: this only really works for this use case in particular
-                    # I want to pass asyncpg.Connection objects to the parameters
-                    # however, they use default __repr__ and I do not care what
-                    # connection is passed in, so I needed a bypass.
-                    if k == "connection":
-                        continue
-
-                    key.append(_true_repr(k))
-                    key.append(_true_repr(v))
-
-            return ":".join(key)
+            key = tuple(_hashable(o) for o in args)
+            if kwargs and not ignore_kwargs:
+                # note: this only really works for this use case in particular
+                # I want to pass asyncpg.Connection objects to the parameters
+                # however, I do not care what connection is passed in, so I
+                # needed a bypass.
+                key += (_KWARGS,) + tuple(
+                    (k, _hashable(v))
+                    for k, v in sorted(kwargs.items())
+                    if k != "connection"
+                )
+            return key
+
+        def _store(key, value):
+            _internal_cache[key] = value
+            for part in key:
+                index.setdefault(part, set()).add(key)
+
+        def _remove(key):
+            inflight.pop(key, None)
+            try:
+                del _internal_cache[key]
+            except KeyError:
+                return False
+            _unindex(key)
+            return True
+
+        async def _load(key, coro):
+            try:
+                value = await coro
+            except BaseException:
+                if inflight.get(key) is asyncio.current_task():
+                    del inflight[key]
+                raise
+            # otherwise it was invalidated meanwhile and the value may be outdated
+            if inflight.get(key) is asyncio.current_task():
+                del inflight[key]
+                _store(key, value)
+            return value
+
+        async def _wait(task):
+            return await asyncio.shield(task)
 
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -143,52 +245,40 @@ def cache(maxsize=128, strategy=Strategy.lru, ignore_kwargs=False):
             try:
                 value = _internal_cache[key]
             except KeyError:
+                if (task := inflight.get(key)) is not None:
+                    stats.coalesced += 1
+                    return _wait(task)
+                stats.misses += 1
                 value = func(*args, **kwargs)
 
                 if inspect.isawaitable(value):
-                    return _wrap_and_store_coroutine(_internal_cache, key, value)
+                    task = inflight[key] = asyncio.ensure_future(_load(key, value))
+                    return _wait(task)
 
-                _internal_cache[key] = value
+                _store(key, value)
                 return value
             else:
+                stats.hits += 1
                 if asyncio.iscoroutinefunction(func):
                     return _wrap_new_coroutine(value)
                 return value
 
         def _invalidate(*args, **kwargs):
-            try:
-                del _internal_cache[_make_key(args, kwargs)]
-            except KeyError:
-                return False
-            else:
-                return True
-
-        def _invalidate_containing(key):
-            to_remove = []
-            for k in _internal_cache.keys():
-                if key in k:
-                    to_remove.append(k)
-            for k in to_remove:
-                try:
-                    del _internal_cache[k]
-                except KeyError:
-                    continue
+            return _remove(_make_key(args, kwargs))
+
+        def _invalidate_containing(part):
+            for key in list(index.get(_hashable(part), ())):
+                _remove(key)
 
         def _invalidate_value(pred):
-            to_remove = []
-            for k, v in _internal_cache.items():
-                if pred(v):
-                    to_remove.append(k)
-            for k in to_remove:
-                try:
-                    del _internal_cache[k]
-                except KeyError:
-                    continue
+            for key in [k for k, v in _internal_cache.items() if pred(v)]:
+                _remove(key)
 
         wrapper.cache = _internal_cache
+        wrapper.stats = stats
         wrapper.get_key = lambda *args, **kwargs: _make_key(args, kwargs)
         wrapper.invalidate = _invalidate
-        wrapper.get_stats = _stats
+        wrapper.get_stats = lambda: (stats.hits, stats.misses)
         wrapper.invalidate_containing = _invalidate_containing
         wrapper.invalidate_value = _invalidate_value
         return wrapper
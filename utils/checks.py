@@ -166,9 +166,7 @@ def has_char() -> "_CheckDecorator":
     """Checks for a user to have a character."""
 
     async def predicate(ctx: Context) -> bool:
-        ctx.character_data = await ctx.bot.pool.fetchrow(
-            'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-        )
+        ctx.character_data = await ctx.profiles.get(ctx.author.id)
         if ctx.character_data:
             return True
         raise NoCharacter()
@@ -180,9 +178,7 @@ def has_no_char() -> "_CheckDecorator":
     """Checks for a user to have no character."""
 
     async def predicate(ctx: Context) -> bool:
-        if await ctx.bot.pool.fetchrow(
-                'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-        ):
+        if await ctx.profiles.get(ctx.author.id):
             raise NeedsNoCharacter()
         return True
 
@@ -217,9 +213,7 @@ def has_no_guild() -> "_CheckDecorator":
 
     async def predicate(ctx: Context) -> bool:
         if not hasattr(ctx, "character_data"):
-            ctx.character_data = await ctx.bot.pool.fetchrow(
-                'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-            )
+            ctx.character_data = await ctx.profiles.get(ctx.author.id)
         if not ctx.character_data["guild"]:
             return True
         raise NeedsNoGuild()
@@ -232,9 +226,7 @@ def has_guild() -> "_CheckDecorator":
 
     async def predicate(ctx: Context) -> bool:
         if not hasattr(ctx, "character_data"):
-            ctx.character_data = await ctx.bot.pool.fetchrow(
-                'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-            )
+            ctx.character_data = await ctx.profiles.get(ctx.author.id)
         if ctx.character_data and ctx.character_data["guild"]:
             return True
         raise NoGuild()
@@ -247,9 +239,7 @@ def is_guild_officer() -> "_CheckDecorator":
 
     async def predicate(ctx: Context) -> bool:
         if not hasattr(ctx, "character_data"):
-            ctx.character_data = await ctx.bot.pool.fetchrow(
-                'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-            )
+            ctx.character_data = await ctx.profiles.get(ctx.author.id)
         if (
                 ctx.character_data["guildrank"] == "Leader"
                 or ctx.character_data["guildrank"] == "Officer"
@@ -265,9 +255,7 @@ def is_guild_leader() -> "_CheckDecorator":
 
     async def predicate(ctx: Context) -> bool:
         if not hasattr(ctx, "character_data"):
-            ctx.character_data = await ctx.bot.pool.fetchrow(
-                'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-            )
+            ctx.character_data = await ctx.profiles.get(ctx.author.id)
         if ctx.character_data["guildrank"] == "Leader":
             return True
         raise NoGuildPermissions()
@@ -280,9 +268,7 @@ def is_no_guild_leader() -> "_CheckDecorator":
 
     async def predicate(ctx: Context) -> bool:
         if not hasattr(ctx, "character_data"):
-            ctx.character_data = await ctx.bot.pool.fetchrow(
-                'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-            )
+            ctx.character_data = await ctx.profiles.get(ctx.author.id)
         if ctx.character_data["guildrank"] != "Leader":
             return True
         raise NeedsNoGuildLeader()
@@ -297,9 +283,7 @@ def is_alliance_leader() -> "_CheckDecorator":
 
         async with ctx.bot.pool.acquire() as conn:
             if not hasattr(ctx, "character_data"):
-                ctx.character_data = await conn.fetchrow(
-                    'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-                )
+                ctx.character_data = await ctx.profiles.get(ctx.author.id)
             leading_guild = await conn.fetchval(
                 'SELECT alliance FROM guild WHERE "id"=$1;', ctx.character_data["guild"]
             )
@@ -319,9 +303,7 @@ def owns_city() -> "_CheckDecorator":
     async def predicate(ctx: Context) -> bool:
         async with ctx.bot.pool.acquire() as conn:
             if not hasattr(ctx, "character_data"):
-                ctx.character_data = await conn.fetchrow(
-                    'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-                )
+                ctx.character_data = await ctx.profiles.get(ctx.author.id)
             alliance = await conn.fetchval(
                 'SELECT alliance FROM guild WHERE "id"=$1', ctx.character_data["guild"]
             )
@@ -342,9 +324,7 @@ def owns_no_city() -> "_CheckDecorator":
     async def predicate(ctx: Context) -> bool:
         async with ctx.bot.pool.acquire() as conn:
             if not hasattr(ctx, "character_data"):
-                ctx.character_data = await conn.fetchrow(
-                    'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-                )
+                ctx.character_data = await ctx.profiles.get(ctx.author.id)
             alliance = await conn.fetchval(
                 'SELECT alliance FROM guild WHERE "id"=$1', ctx.character_data["guild"]
             )
@@ -363,9 +343,7 @@ def is_class(class_: type[GameClass]) -> "_CheckDecorator":
 
     async def predicate(ctx: Context) -> bool:
         if not hasattr(ctx, "character_data"):
-            ctx.character_data = await ctx.bot.pool.fetchrow(
-                'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-            )
+            ctx.character_data = await ctx.profiles.get(ctx.author.id)
         classes = [
             c for i in ctx.character_data["class"] if (c := class_from_string(i))
         ]
@@ -393,9 +371,7 @@ def has_god() -> "_CheckDecorator":
 
     async def predicate(ctx: Context) -> bool:
         if not hasattr(ctx, "character_data"):
-            ctx.character_data = await ctx.bot.pool.fetchrow(
-                'SELECT * FROM profile WHERE "user"=$1;', ctx.author.id
-            )
+            ctx.character_data = await ctx.profiles.get(ctx.author.id)
         if ctx.character_data["god"]:
             return True
         raise NeedsGod()
@@ -449,6 +425,7 @@ def update_pet() -> "_CheckDecorator":
                         classes,
                         ctx.author.id,
                     )
+                    await ctx.bot.stats.invalidate(ctx.author)
                     raise PetDied()
                 elif data["love"] < 75 and random.randint(0, 99) > data["love"]:
                     classes[idx] = "No Class"
@@ -460,6 +437,7 @@ def update_pet() -> "_CheckDecorator":
                         classes,
                         ctx.author.id,
                     )
+                    await ctx.bot.stats.invalidate(ctx.author)
                     raise PetRanAway()
         return True
 
@@ -485,14 +463,9 @@ async def has_guild_(bot: "Bot", userid: int) -> bool:
 
 
 async def is_member_of_author_guild(ctx: Context, userid: int) -> bool:
-    async with ctx.bot.pool.acquire() as conn:
-        user_1 = await conn.fetchval(
-            'SELECT guild FROM profile WHERE "user"=$1;', ctx.author.id
-        )
-        user_2 = await conn.fetchval(
-            'SELECT guild FROM profile WHERE "user"=$1;', userid
-        )
-    return user_1 == user_2
+    rows = await ctx.profiles.get_many([ctx.author.id, userid])
+    user_1, user_2 = (rows.get(ctx.author.id), rows.get(userid))
+    return (user_1 and user_1["guild"]) == (user_2 and user_2["guild"])
 
 
 async def user_has_char(bot: "Bot", userid: int) -> bool:
@@ -19,21 +19,34 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
 import asyncio
+import contextlib
 import datetime
+import hashlib
 import io
 import re
+import time
 
 import chess
 import chess.engine
 import chess.pgn
-import chess.svg
 import discord
 
 from classes.context import Context
 from classes.errors import NoChoice
-from utils import random
+from utils import random, render
 from utils.i18n import _
 
+# how long Redis keeps engine moves and rendered boards
+MOVE_TTL = 7 * 24 * 3600
+BOARD_TTL = 24 * 3600
+
+BOARD_FILENAME = "board.png"
+
+
+def position_key(board: chess.Board, limit: chess.engine.Limit) -> str:
+    # EPD leaves out the move counters, so transpositions share a key
+    return hashlib.sha1(f"{board.epd()} {limit!r}".encode()).hexdigest()
+
 
 async def update_player_elos(bot, player1, player2, outcome):
     """
@@ -148,6 +161,211 @@ class TransportAdapter(
     # control methods.
 
 
+class Engine:
+    """A UCI engine reached at a host:port endpoint or started from command"""
+
+    def __init__(self, endpoint: str | None = None, command: str | None = None):
+        self.endpoint = endpoint
+        self.command = command
+        self.transport = None
+        self.protocol = None
+
+    def __str__(self):
+        return self.endpoint or self.command
+
+    @property
+    def alive(self) -> bool:
+        return self.protocol is not None and not self.protocol.returncode.done()
+
+    async def connect(self) -> None:
+        if self.command is not None:
+            self.transport, self.protocol = await chess.engine.popen_uci(self.command)
+            return
+        host, port = self.endpoint.rsplit(":", 1)
+        self.transport, adapter = await asyncio.get_running_loop().create_connection(
+            lambda: ProtocolAdapter(chess.engine.UciProtocol()), host, int(port)
+        )
+        self.protocol = adapter.protocol
+        await self.protocol.initialize()
+
+    async def close(self) -> None:
+        if self.protocol is not None and self.alive:
+            try:
+                async with asyncio.timeout(5):
+                    await self.protocol.quit()
+            except (asyncio.TimeoutError, chess.engine.EngineError):
+                pass
+        if self.transport is not None:
+            self.transport.close()
+        self.transport = None
+        self.protocol = None
+
+
+class EngineStats:
+    __slots__ = ("moves", "cached", "failed", "reconnects", "total_wait", "max_wait")
+
+    def __init__(self):
+        self.moves = 0
+        self.cached = 0
+        self.failed = 0
+        self.reconnects = 0
+        # time spent waiting for a free engine
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.moves if self.moves else 0.0
+
+    def __str__(self):
+        return (
+            f"moves={self.moves} cached={self.cached} failed={self.failed}"
+            f" reconnects={self.reconnects}"
+            f" avg_wait={self.avg_wait * 1000:.1f}ms"
+            f" max_wait={self.max_wait * 1000:.1f}ms"
+        )
+
+
+class EnginePool:
+    """
+    Stockfish engines shared by all chess games of this cluster
+
+    Every search leases an engine for just that move, so games only wait
+    for each other when all engines are busy. An engine that fails is
+    reconnected in the background while the others keep playing, idle
+    engines are pinged every health_interval seconds to find the ones
+    that died quietly.
+
+    Moves are kept in Redis by position and search limit, so openings and
+    other positions searched before never reach an engine again.
+    """
+
+    def __init__(
+        self,
+        bot,
+        endpoints=(),
+        command: str | None = None,
+        processes: int = 0,
+        health_interval: float = 30,
+    ):
+        self.bot = bot
+        self.health_interval = health_interval
+        self.engines = [Engine(endpoint=endpoint) for endpoint in endpoints]
+        self.engines += [Engine(command=command) for _ in range(processes)]
+        self.stats = EngineStats()
+        self.waiting = 0
+        self._idle = asyncio.Queue()
+        self._tasks = set()
+
+    @property
+    def available(self) -> int:
+        return self._idle.qsize()
+
+    def __str__(self):
+        return (
+            f"engines={len(self.engines)} available={self.available}"
+            f" waiting={self.waiting} {self.stats}"
+        )
+
+    async def start(self) -> int:
+        """Connects every engine, returns how many are up"""
+        for engine in self.engines:
+            try:
+                await engine.connect()
+            except (OSError, chess.engine.EngineError):
+                self.bot.logger.warning(f"Failed to connect to chess engine {engine}")
+                self._spawn(self._reconnect(engine))
+            else:
+                self._idle.put_nowait(engine)
+        self._spawn(self._check_forever())
+        return self.available
+
+    async def play(self, board, limit, game=None) -> chess.engine.PlayResult:
+        key = f"chess:move:{position_key(board, limit)}"
+        if (move := await self.bot.redis.get(key)) is not None:
+            self.stats.cached += 1
+            return chess.engine.PlayResult(chess.Move.from_uci(move.decode()), None)
+        async with self.lease() as engine:
+            result = await engine.play(board, limit, game=game)
+        # draw offers and resignations depend on more than the position
+        if result.move is not None and not result.draw_offered and not result.resigned:
+            await self.bot.redis.set(key, result.move.uci(), ex=MOVE_TTL)
+        return result
+
+    @contextlib.asynccontextmanager
+    async def lease(self):
+        """Waits for a free engine and lends out its UCI protocol"""
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            engine = await self._idle.get()
+        finally:
+            self.waiting -= 1
+        wait = time.perf_counter() - start
+        self.stats.moves += 1
+        self.stats.total_wait += wait
+        self.stats.max_wait = max(self.stats.max_wait, wait)
+        try:
+            yield engine.protocol
+        except (chess.engine.EngineError, ConnectionError):
+            self.stats.failed += 1
+            self._spawn(self._reconnect(engine))
+            raise
+        except BaseException:
+            # timed out or cancelled, the engine may still be finishing the search
+            self._spawn(self._check(engine))
+            raise
+        else:
+            self._release(engine)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _release(self, engine: Engine) -> None:
+        if engine.alive:
+            self._idle.put_nowait(engine)
+        else:
+            self._spawn(self._reconnect(engine))
+
+    async def _check(self, engine: Engine) -> None:
+        try:
+            async with asyncio.timeout(10):
+                await engine.protocol.ping()
+        except (asyncio.TimeoutError, chess.engine.EngineError, ConnectionError):
+            self._spawn(self._reconnect(engine))
+        else:
+            self._release(engine)
+
+    async def _reconnect(self, engine: Engine) -> None:
+        delay = 1
+        while True:
+            await engine.close()
+            try:
+                await engine.connect()
+            except (OSError, chess.engine.EngineError):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
+            else:
+                self.stats.reconnects += 1
+                self._idle.put_nowait(engine)
+                return
+
+    async def _check_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for _i in range(self._idle.qsize()):
+                await self._check(self._idle.get_nowait())
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for engine in self.engines:
+            await engine.close()
+
+
 class ChessGame:
     def __init__(
         self,
@@ -162,7 +380,7 @@ class ChessGame:
         self.enemy = enemy
         self.ctx = ctx
         self.board = chess.Board()
-        self.engine = ctx.bot.cogs["Chess"].engine
+        self.engines = ctx.bot.cogs["Chess"].engines
         self.history = []
         self.move_no = 0
         self.status = "initialized"
@@ -203,20 +421,26 @@ class ChessGame:
             return False
         return move
 
-    async def get_board(self) -> str:
-        svg = chess.svg.board(
-            board=self.board,
-            flipped=self.board.turn == chess.BLACK,
-            lastmove=self.board.peek() if self.board.move_stack else None,
-            check=self.board.king(self.board.turn) if self.board.is_check() else None,
-        )
-        async with self.ctx.bot.trusted_session.post(
-            f"{self.ctx.bot.config.external.okapi_url}/api/genchess",
-            json={"xml": svg},
-            headers={"Authorization": self.ctx.bot.config.external.okapi_token},
-        ) as r:
-            image = await r.text()
-        return image
+    async def get_board(self) -> discord.File:
+        """The board as a PNG attachment, see BOARD_FILENAME"""
+        bot = self.ctx.bot
+        board_fen = self.board.board_fen()
+        lastmove = self.board.peek().uci() if self.board.move_stack else None
+        flipped = self.board.turn == chess.BLACK
+        key = f"chess:board:{board_fen}:{lastmove}:{int(flipped)}"
+        if (png := await bot.redis.get(key)) is None:
+            check = self.board.king(self.board.turn) if self.board.is_check() else None
+            while True:
+                try:
+                    png = await bot.renderer.render(
+                        render.chess_board, board_fen, lastmove, flipped, check
+                    )
+                    break
+                except render.RenderBusy:
+                    # other commands are rendering, the game still needs its board
+                    await asyncio.sleep(1)
+            await bot.redis.set(key, png, ex=BOARD_TTL)
+        return discord.File(fp=io.BytesIO(png), filename=BOARD_FILENAME)
 
     async def get_move_from(self, player):
         if player is None:
@@ -234,7 +458,8 @@ class ChessGame:
                     " lowercase: `a`, `b` or `h`. Castling is `0-0` or `0-0-0`."
                 ).format(move_no=self.move_no, player=player.mention),
                 colour=discord.Colour.blurple(),
-            ).set_image(url=image),
+            ).set_image(url=f"attachment://{BOARD_FILENAME}"),
+            file=image,
         )
 
         def check(msg):
@@ -278,7 +503,7 @@ class ChessGame:
             )
         try:
             async with asyncio.timeout(120):
-                move = await self.engine.play(self.board, self.limit)
+                move = await self.engines.play(self.board, self.limit, game=self)
         except asyncio.TimeoutError:
             move = random.choice(list(self.board.legal_moves))
             await self.msg.delete()
@@ -298,7 +523,7 @@ class ChessGame:
         msg = await self.ctx.send(_("Waiting for AI draw response..."))
         try:
             async with asyncio.timeout(120):
-                move = await self.engine.play(self.board, self.limit)
+                move = await self.engines.play(self.board, self.limit, game=self)
         except asyncio.TimeoutError:
             await msg.delete()
             return False
@@ -399,14 +624,16 @@ class ChessGame:
                 embed=discord.Embed(
                     title=_("**Checkmate! {result}**").format(result=result),
                     colour=discord.Colour.blurple(),
-                ).set_image(url=image)
+                ).set_image(url=f"attachment://{BOARD_FILENAME}"),
+                file=image,
             )
         elif self.board.is_stalemate():
             await self.ctx.send(
                 embed=discord.Embed(
                     title=_("**Stalemate! {result}**").format(result=result),
                     colour=discord.Colour.blurple(),
-                ).set_image(url=image)
+                ).set_image(url=f"attachment://{BOARD_FILENAME}"),
+                file=image,
             )
         elif self.board.is_insufficient_material():
             await self.ctx.send(
@@ -415,21 +642,24 @@ class ChessGame:
                         result=result
                     ),
                     colour=discord.Colour.blurple(),
-                ).set_image(url=image)
+                ).set_image(url=f"attachment://{BOARD_FILENAME}"),
+                file=image,
             )
         elif self.status.endswith("resigned"):
             await self.ctx.send(
                 embed=discord.Embed(
                     title=f"**{self.status.title()}! {result}**",
                     colour=discord.Colour.blurple(),
-                ).set_image(url=image)
+                ).set_image(url=f"attachment://{BOARD_FILENAME}"),
+                file=image,
             )
         elif self.status == "draw":
             await self.ctx.send(
                 embed=discord.Embed(
                     title=_("**Draw accepted! {result}**").format(result=result),
                     colour=discord.Colour.blurple(),
-                ).set_image(url=image)
+                ).set_image(url=f"attachment://{BOARD_FILENAME}"),
+                file=image,
             )
 
         await self.ctx.send(
@@ -27,6 +27,10 @@ ALL_EFFECTS = (
     "poisoned",
     "marked",
     "shattered_armor",
+    "brittle",
+    "frozen",
+    "stunned",
+    "frostbite",
 )
 
 
@@ -42,6 +46,10 @@ class Effects:
         poisoned: int = 0,
         marked: int = 0,
         shattered_armor: int = 0,
+        brittle: int = 0,
+        frozen: int = 0,
+        stunned: int = 0,
+        frostbite: int = 0,
     ) -> None:
         # Deals 30% less damage
         self.weakened = weakened
@@ -57,6 +65,18 @@ class Effects:
         self.marked = marked
         # Armor is 50% less effective
         self.shattered_armor = shattered_armor
+        # Armor is 30% less effective
+        self.brittle = brittle
+        # Cannot act
+        self.frozen = frozen
+        # Cannot act
+        self.stunned = stunned
+        # Takes the frostbite damage of the hit that caused it per tick
+        self.frostbite = frostbite
+
+    @property
+    def incapacitated(self) -> bool:
+        return self.frozen > 0 or self.stunned > 0
 
     def all(self):
         return [effect for effect in ALL_EFFECTS if getattr(self, effect) > 0]
@@ -75,6 +95,12 @@ class Effects:
                 else 0,
             )
 
-    def tick(self) -> None:
+    def tick(self) -> list[str]:
+        """Counts every effect down by one and returns the ones that ran out"""
+        expired = []
         for effect in ALL_EFFECTS:
-            setattr(self, effect, val if (val := getattr(self, effect) - 1) >= 0 else 0)
+            if (val := getattr(self, effect)) > 0:
+                if val == 1:
+                    expired.append(effect)
+                setattr(self, effect, val - 1)
+        return expired
@@ -0,0 +1,739 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from __future__ import annotations
+
+import random
+
+from collections.abc import Iterator
+from typing import Any
+
+from .entity import Entity, Faction
+from .skill import Action, BaseSkill, SkillDeck, Target
+
+# element -> the element it is strong against
+ELEMENT_STRENGTHS = {
+    "Light": "Corrupted",
+    "Dark": "Light",
+    "Corrupted": "Dark",
+    "Nature": "Electric",
+    "Electric": "Water",
+    "Water": "Fire",
+    "Fire": "Nature",
+    "Wind": "Electric",
+    "Unknown": None,
+}
+
+# Class bonuses as the battles read them off profile.class
+LIFESTEAL_VALUES = {
+    "Little Helper": 7,
+    "Gift Gatherer": 14,
+    "Holiday Aide": 21,
+    "Joyful Jester": 28,
+    "Yuletide Guardian": 35,
+    "Festive Enforcer": 40,
+    "Festive Champion": 60,
+}
+
+# chance in percent to survive a killing blow once
+DEATH_CHEAT_VALUES = {
+    "Deathshroud": 20,
+    "Soul Warden": 30,
+    "Reaper": 40,
+    "Phantom Scythe": 50,
+    "Soul Snatcher": 60,
+    "Deathbringer": 70,
+    "Grim Reaper": 80,
+}
+
+MAGE_EVOLUTION_LEVELS = {
+    "Witcher": 1,
+    "Enchanter": 2,
+    "Mage": 3,
+    "Warlock": 4,
+    "Dark Caster": 5,
+    "White Sorcerer": 6,
+}
+
+TANK_EVOLUTION_LEVELS = {
+    "Protector": 1,
+    "Guardian": 2,
+    "Bulwark": 3,
+    "Defender": 4,
+    "Vanguard": 5,
+    "Fortress": 6,
+    "Titan": 7,
+}
+
+# Every living combatant acts once per round in one random order
+TURN_ORDER_SHUFFLED = "shuffled"
+# Every living combatant acts once per round in the order they were passed in
+TURN_ORDER_FIXED = "fixed"
+# Factions take turns, every living member of the active faction attacks
+TURN_ORDER_TEAMS = "teams"
+
+# Moves of a Battle.exchange
+MOVE_ATTACK = "attack"
+MOVE_DEFEND = "defend"
+MOVE_RECOVER = "recover"
+# attacks and blocks of an exchange roll one of these shares
+SHARES = (1, 0.5, 0.2, 0.8)
+
+
+def evolution_tier(classes: list[str], levels: dict[str, int]) -> int | None:
+    """Returns the highest tier out of levels the classes reach, if any"""
+    tiers = [levels[name] for name in classes if name in levels]
+    return max(tiers) if tiers else None
+
+
+def class_bonus(classes: list[str], values: dict[str, int]) -> int:
+    """Sums up the values of all classes found in values"""
+    return sum(values.get(name, 0) for name in classes)
+
+
+def tank_bonuses(tank_evolution: int | None, has_shield: bool) -> tuple[float, float]:
+    """Returns the (health multiplier, damage reflection) of a tank"""
+    if not tank_evolution:
+        return 1.0, 0.0
+    if has_shield:
+        return 1 + 0.04 * tank_evolution, 0.03 * tank_evolution
+    # tanks without a shield keep a smaller health bonus but do not reflect
+    return 1 + 0.01 * tank_evolution, 0.0
+
+
+class Combatant(Entity):
+    """
+    An Entity with precomputed damage and armor
+
+    Battles hand out raid stats that were already calculated from items,
+    classes and buildings, so damage_against and get_armor return those
+    instead of summing up equipped items.
+    """
+
+    __slots__ = (
+        "key",
+        "owner",
+        "max_hp",
+        "damage",
+        "armor",
+        "element",
+        "luck",
+        "is_pet",
+        "lifesteal",
+        "damage_reflection",
+        "tank_evolution",
+        "variance",
+        "bonus_damage",
+        "damage_growth",
+        "damage_modifier",
+        "miss_chance",
+        "crit_chance",
+        "crit_multiplier",
+        "cheat_death",
+        "revive_hp",
+        "charge_turns",
+        "charge_damage",
+        "frostbite_damage",
+    )
+
+    def __init__(
+        self,
+        key: Any,
+        faction: Faction,
+        hp: float,
+        damage: float,
+        armor: float,
+        *,
+        max_hp: float | None = None,
+        element: str = "Unknown",
+        luck: float = 100.0,
+        is_pet: bool = False,
+        lifesteal: float = 0.0,
+        damage_reflection: float = 0.0,
+        tank_evolution: int | None = None,
+        owner: Any = None,
+        deck: SkillDeck | None = None,
+        variance: int | None = None,
+        bonus_damage: float = 0.0,
+        damage_growth: float = 0.0,
+        damage_modifier: float = 1.0,
+        miss_chance: float = 0.0,
+        crit_chance: float = 0.0,
+        crit_multiplier: float = 2.0,
+        cheat_death: float = 0.0,
+        revive_hp: float = 75.0,
+        charge_turns: int | None = None,
+        charge_damage: float = 0.0,
+    ) -> None:
+        super().__init__(float(hp), faction, is_player=not is_pet, deck=deck)
+        # key and owner are never looked at by the engine, cogs use them
+        # to map combatants back to users and pets when rendering
+        self.key = key
+        self.owner = owner
+        self.max_hp = float(max_hp if max_hp is not None else hp)
+        self.damage = float(damage)
+        self.armor = float(armor)
+        self.element = element or "Unknown"
+        self.luck = float(luck)
+        self.is_pet = is_pet
+        # in percent of the damage dealt
+        self.lifesteal = float(lifesteal)
+        # in fractions of the damage blocked by armor
+        self.damage_reflection = float(damage_reflection)
+        self.tank_evolution = tank_evolution
+        # damage rolls add randint(0, variance), None uses the rules
+        self.variance = variance
+        # added to every damage roll, crits do not scale it
+        self.bonus_damage = float(bonus_damage)
+        # added to damage at the start of every turn
+        self.damage_growth = float(damage_growth)
+        # scales normal attacks after armor, e.g. for elements
+        self.damage_modifier = float(damage_modifier)
+        self.miss_chance = miss_chance
+        self.crit_chance = crit_chance
+        self.crit_multiplier = crit_multiplier
+        # chance in percent to survive one killing blow with revive_hp
+        self.cheat_death = float(cheat_death)
+        self.revive_hp = float(revive_hp)
+        # once the battle lasted charge_turns actions, hits deal charge_damage more
+        self.charge_turns = charge_turns
+        self.charge_damage = float(charge_damage)
+        self.frostbite_damage = 0.0
+
+    @property
+    def alive(self) -> bool:
+        return self.hp > 0
+
+    def damage_against(self, other: Entity) -> float:
+        if self.effects.weakened:
+            return self.damage * 0.7
+        return self.damage
+
+    def get_armor(self) -> float:
+        armor = self.armor
+        if self.effects.shattered_armor:
+            armor *= 0.5
+        if self.effects.brittle:
+            armor *= 0.7
+        return armor
+
+    def damage_over_time(self) -> float:
+        damage = super().damage_over_time()
+        if self.effects.frostbite:
+            damage += self.frostbite_damage
+        return damage
+
+    def __repr__(self) -> str:
+        return f"<Combatant key={self.key!r} faction={self.faction!r} hp={self.hp}>"
+
+
+class Rules:
+    __slots__ = (
+        "turn_order",
+        "first_faction",
+        "player_variance",
+        "pet_variance",
+        "min_damage",
+        "precision",
+        "player_target_weight",
+        "pet_target_weight",
+        "tank_focus",
+        "element_modifiers",
+        "element_modifier_range",
+        "trip_damage",
+        "pets_fight_alone",
+        "max_actions",
+    )
+
+    def __init__(
+        self,
+        *,
+        turn_order: str = TURN_ORDER_SHUFFLED,
+        first_faction: Faction | None = None,
+        player_variance: int = 100,
+        pet_variance: int = 50,
+        min_damage: float = 1.0,
+        precision: int = 3,
+        player_target_weight: float = 0.6,
+        pet_target_weight: float = 0.4,
+        tank_focus: float = 0.0,
+        element_modifiers: bool = True,
+        element_modifier_range: tuple[float, float] = (0.1, 0.3),
+        trip_damage: float | None = None,
+        pets_fight_alone: bool = True,
+        max_actions: int | None = None,
+    ) -> None:
+        self.turn_order = turn_order
+        # the faction starting a TURN_ORDER_TEAMS battle, random if None
+        self.first_faction = first_faction
+        # damage is damage + randint(0, variance)
+        self.player_variance = player_variance
+        self.pet_variance = pet_variance
+        self.min_damage = min_damage
+        self.precision = precision
+        self.player_target_weight = player_target_weight
+        self.pet_target_weight = pet_target_weight
+        # chance to pick the target among the enemy tanks, if there are any
+        self.tank_focus = tank_focus
+        self.element_modifiers = element_modifiers
+        self.element_modifier_range = element_modifier_range
+        # if set, an attacker rolling above their luck trips and takes this damage
+        self.trip_damage = trip_damage
+        # if False, a side is beaten once all of its non-pets are
+        self.pets_fight_alone = pets_fight_alone
+        self.max_actions = max_actions
+
+
+class Hit:
+    __slots__ = (
+        "target",
+        "action",
+        "damage",
+        "blocked",
+        "reflected",
+        "critical",
+        "charged",
+        "executed",
+        "revived",
+    )
+
+    def __init__(self, target: Combatant, action: Action | None = None) -> None:
+        self.target = target
+        # the skill action this hit came from, None for normal attacks
+        self.action = action
+        self.damage = 0.0
+        self.blocked = 0.0
+        self.reflected = 0.0
+        self.critical = False
+        self.charged = False
+        self.executed = False
+        # the target cheated death on this hit
+        self.revived = False
+
+
+class Event:
+    __slots__ = (
+        "number",
+        "attacker",
+        "skill",
+        "move",
+        "hits",
+        "healed",
+        "self_damage",
+        "tripped",
+        "missed",
+        "incapacitated",
+        "defended",
+        "expired",
+        "defeated",
+    )
+
+    def __init__(self, number: int, attacker: Combatant) -> None:
+        self.number = number
+        self.attacker = attacker
+        # the skill used instead of a normal attack, if any
+        self.skill: BaseSkill | None = None
+        # the move of a Battle.exchange
+        self.move: str | None = None
+        self.hits: list[Hit] = []
+        self.healed = 0.0
+        # damage the attacker did to itself, from effects or by tripping
+        self.self_damage = 0.0
+        self.tripped = False
+        self.missed = False
+        # the attacker was frozen or stunned and lost the turn
+        self.incapacitated = False
+        # the target of a Battle.exchange attack defended
+        self.defended = False
+        # effects of the attacker that ran out at the end of the turn
+        self.expired: list[str] = []
+        # combatants that dropped to 0 HP during this action
+        self.defeated: list[Combatant] = []
+
+    @property
+    def target(self) -> Combatant | None:
+        return self.hits[0].target if self.hits else None
+
+    @property
+    def damage(self) -> float:
+        """Damage dealt by the hits, or what tripping cost the attacker"""
+        if self.tripped:
+            return self.self_damage
+        return sum(hit.damage for hit in self.hits)
+
+    @property
+    def reflected(self) -> float:
+        return sum(hit.reflected for hit in self.hits)
+
+
+class Battle:
+    """
+    A fight between the factions of the combatants
+
+    The battle only ever touches the combatants, the RNG and the rules, it
+    never awaits anything. Cogs iterate turns() or team_turns() to render the
+    fight live, simulations call run() to get the whole event log at once.
+    """
+
+    def __init__(
+        self,
+        combatants: list[Combatant],
+        rng: random.Random | None = None,
+        rules: Rules | None = None,
+    ) -> None:
+        self.combatants = combatants
+        self.rng = rng or random.SystemRandom()
+        self.rules = rules or Rules()
+        self.log: list[Event] = []
+        self._last_attacker: Combatant | None = None
+
+    def factions(self) -> list[Faction]:
+        return list(dict.fromkeys(c.faction for c in self.combatants))
+
+    def alive_factions(self) -> list[Faction]:
+        return list(
+            dict.fromkeys(
+                c.faction
+                for c in self.combatants
+                if c.alive and (self.rules.pets_fight_alone or not c.is_pet)
+            )
+        )
+
+    @property
+    def finished(self) -> bool:
+        pets_fight_alone = self.rules.pets_fight_alone
+        alive = {
+            c.faction
+            for c in self.combatants
+            if c.hp > 0 and (pets_fight_alone or not c.is_pet)
+        }
+        return len(alive) <= 1
+
+    @property
+    def winner(self) -> Faction | None:
+        """The winning faction, None if the fight has not been decided"""
+        if not self.finished:
+            return None
+        alive = self.alive_factions()
+        if alive:
+            return alive[0]
+        # both sides died in the same action, e.g. to reflected damage
+        return self._last_attacker.faction if self._last_attacker else None
+
+    def opponents(self, combatant: Combatant) -> list[Combatant]:
+        return [c for c in self.combatants if c.can_attack(combatant) and c.alive]
+
+    def element_modifier(self, attacker_element: str, defender_element: str) -> float:
+        low, high = self.rules.element_modifier_range
+        if ELEMENT_STRENGTHS.get(attacker_element) == defender_element:
+            return round(self.rng.uniform(low, high), 3)
+        elif ELEMENT_STRENGTHS.get(defender_element) == attacker_element:
+            return round(self.rng.uniform(-high, -low), 3)
+        return 0.0
+
+    def apply_element_modifiers(self) -> None:
+        """Scales everyone's damage against the element of the enemy's leader"""
+        if not self.rules.element_modifiers:
+            return
+        for combatant in self.combatants:
+            leader = next(
+                (
+                    c
+                    for c in self.combatants
+                    if c.can_attack(combatant) and not c.is_pet
+                ),
+                None,
+            )
+            if leader is None:
+                continue
+            modifier = self.element_modifier(combatant.element, leader.element)
+            combatant.damage = round(combatant.damage * (1 + modifier), 3)
+
+    def select_target(self, attacker: Combatant) -> Combatant | None:
+        targets = self.opponents(attacker)
+        if not targets:
+            return None
+        if self.rules.tank_focus and self.rng.random() < self.rules.tank_focus:
+            tanks = [c for c in targets if c.tank_evolution]
+            if tanks:
+                return self.rng.choice(tanks)
+        weights = [
+            self.rules.pet_target_weight
+            if c.is_pet
+            else self.rules.player_target_weight
+            for c in targets
+        ]
+        return self.rng.choices(targets, weights=weights)[0]
+
+    def choose_skill(self, attacker: Combatant) -> BaseSkill | None:
+        """Picks the skill for this turn, the chances of all ready skills add up"""
+        if not attacker.deck.skills:
+            return None
+        skills = [skill for skill in attacker.deck.ready() if skill.chance > 0]
+        roll = self.rng.random()
+        for skill in skills:
+            if roll < skill.chance:
+                return skill
+            roll -= skill.chance
+        return None
+
+    def roll(self, attacker: Combatant, target: Combatant, hit: Hit) -> float:
+        """Rolls the damage of an attack before armor"""
+        variance = attacker.variance
+        if variance is None:
+            if attacker.is_pet:
+                variance = self.rules.pet_variance
+            else:
+                variance = self.rules.player_variance
+        damage = attacker.damage_against(target)
+        if attacker.crit_chance and self.rng.random() < attacker.crit_chance:
+            hit.critical = True
+            damage *= attacker.crit_multiplier
+        if variance:
+            damage += self.rng.randint(0, variance)
+        return damage + attacker.bonus_damage
+
+    def deal(
+        self,
+        attacker: Combatant,
+        hit: Hit,
+        raw: float,
+        scale: float = 1.0,
+        pierce: bool = False,
+    ) -> None:
+        """Applies raw damage to the target of the hit after armor"""
+        rules = self.rules
+        target = hit.target
+        armor = 0.0 if pierce else target.get_armor()
+        hit.blocked = min(raw, armor)
+        damage = max((raw - armor) * scale, rules.min_damage)
+        if (
+            attacker.charge_turns is not None
+            and len(self.log) > attacker.charge_turns
+        ):
+            hit.charged = True
+            damage += attacker.charge_damage
+        damage = round(damage, rules.precision)
+        hit.damage = damage
+        target.hp = round(max(target.hp - damage, 0), rules.precision)
+
+        if target.damage_reflection > 0 and not pierce:
+            reflected = round(hit.blocked * target.damage_reflection, rules.precision)
+            if reflected > 0:
+                hit.reflected = reflected
+                attacker.hp = max(attacker.hp - reflected, 0)
+
+    def resolve(self, event: Event, hit: Hit) -> None:
+        """Lets the target of the hit cheat death or counts it as defeated"""
+        target = hit.target
+        if target.alive or target in event.defeated:
+            return
+        if target.cheat_death and self.rng.randint(1, 100) <= target.cheat_death:
+            target.cheat_death = 0.0
+            target.hp = target.revive_hp
+            hit.revived = True
+        else:
+            event.defeated.append(target)
+
+    def attack(self, event: Event, attacker: Combatant) -> None:
+        target = self.select_target(attacker)
+        if target is None:
+            return
+        hit = Hit(target)
+        event.hits.append(hit)
+        raw = self.roll(attacker, target, hit)
+        self.deal(attacker, hit, raw, attacker.damage_modifier)
+        self.resolve(event, hit)
+
+    def use_skill(self, event: Event, attacker: Combatant, skill: BaseSkill) -> None:
+        attacker.deck.use(skill)
+        event.skill = skill
+        if skill.area:
+            targets = self.opponents(attacker)
+        else:
+            targets = [t] if (t := self.select_target(attacker)) else []
+        for action in skill.actions:
+            if action.target == Target.Self:
+                attacker.apply_healing_reducible(action.healing)
+                attacker.effects.merge_with(action.causes_effects)
+                attacker.effects.substract(action.removes_effects)
+                continue
+            for target in targets:
+                if not target.alive:
+                    continue
+                hit = Hit(target, action)
+                event.hits.append(hit)
+                if action.damage or action.multiplier:
+                    raw = action.damage
+                    if action.variance:
+                        raw += self.rng.randint(0, action.variance)
+                    if action.multiplier:
+                        raw += self.roll(attacker, target, hit)
+                    scale = action.multiplier or 1.0
+                    self.deal(attacker, hit, raw, scale, action.pierce)
+                if (
+                    action.execute_below
+                    and target.alive
+                    and target.hp / target.max_hp <= action.execute_below
+                ):
+                    hit.damage += target.hp
+                    hit.executed = True
+                    target.hp = 0.0
+                if action.over_time:
+                    target.frostbite_damage = round(hit.damage * action.over_time, 2)
+                target.apply_healing_reducible(action.healing)
+                target.effects.merge_with(action.causes_effects)
+                target.effects.substract(action.removes_effects)
+                self.resolve(event, hit)
+
+    def act(self, attacker: Combatant) -> Event:
+        """Lets attacker take one turn and returns what happened"""
+        rules = self.rules
+        event = Event(len(self.log) + 1, attacker)
+        self.log.append(event)
+        self._last_attacker = attacker
+
+        if over_time := attacker.damage_over_time():
+            event.self_damage = round(over_time, rules.precision)
+            attacker.hp = max(attacker.hp - event.self_damage, 0)
+
+        if not attacker.alive:
+            pass
+        elif attacker.effects.incapacitated:
+            event.incapacitated = True
+        elif rules.trip_damage is not None and self.rng.randint(1, 100) > attacker.luck:
+            event.tripped = True
+            event.self_damage += rules.trip_damage
+            attacker.hp = max(attacker.hp - rules.trip_damage, 0)
+        elif attacker.miss_chance and self.rng.random() < attacker.miss_chance:
+            event.missed = True
+        else:
+            attacker.damage += attacker.damage_growth
+            skill = self.choose_skill(attacker)
+            if skill is not None and attacker.can_cast(skill, self.rng):
+                self.use_skill(event, attacker, skill)
+            else:
+                self.attack(event, attacker)
+
+            if attacker.lifesteal and not attacker.is_pet and event.hits:
+                healed = round(
+                    attacker.lifesteal / 100 * sum(hit.damage for hit in event.hits),
+                    rules.precision,
+                )
+                event.healed = healed
+                attacker.hp = min(attacker.hp + healed, attacker.max_hp)
+
+        attacker.deck.tick()
+        event.expired = attacker.effects.tick()
+        if not attacker.alive and attacker not in event.defeated:
+            event.defeated.append(attacker)
+        return event
+
+    def exchange(self, moves: dict[Combatant, str]) -> list[Event]:
+        """
+        Plays one round of simultaneous moves, as chosen by the players
+
+        MOVE_ATTACK hits for a random share of damage, less a random share of
+        the target's armor if it chose MOVE_DEFEND. MOVE_RECOVER heals a
+        quarter of the damage.
+        """
+        events = []
+        for combatant, move in moves.items():
+            event = Event(len(self.log) + 1, combatant)
+            event.move = move
+            self.log.append(event)
+            self._last_attacker = combatant
+            events.append(event)
+            if move == MOVE_RECOVER:
+                healed = round(combatant.damage * 0.25) or 1
+                event.healed = healed
+                combatant.apply_healing_reducible(healed)
+            elif move == MOVE_ATTACK:
+                target = next((c for c in moves if c.can_attack(combatant)), None)
+                if target is None:
+                    continue
+                hit = Hit(target)
+                event.hits.append(hit)
+                damage = combatant.damage_against(target)
+                damage = self.rng.choice([int(damage * share) for share in SHARES])
+                if moves[target] == MOVE_DEFEND:
+                    event.defended = True
+                    armor = target.get_armor()
+                    blocks = [int(armor * share) for share in SHARES]
+                    hit.blocked = self.rng.choice(blocks)
+                    damage = max(damage - hit.blocked, 0)
+                hit.damage = damage
+                target.hp = max(target.hp - damage, 0)
+                if not target.alive and target not in event.defeated:
+                    event.defeated.append(target)
+        return events
+
+    def _blocks(self) -> Iterator[list[Combatant]]:
+        """Yields the combatants acting together, one faction or one combatant"""
+        if self.rules.turn_order == TURN_ORDER_TEAMS:
+            factions = self.factions()
+            if self.rules.first_faction in factions:
+                index = factions.index(self.rules.first_faction)
+            else:
+                index = self.rng.randrange(len(factions))
+            while True:
+                faction = factions[index]
+                yield [c for c in self.combatants if c.faction == faction]
+                index = (index + 1) % len(factions)
+        else:
+            order = list(self.combatants)
+            if self.rules.turn_order == TURN_ORDER_SHUFFLED:
+                self.rng.shuffle(order)
+            while True:
+                for combatant in order:
+                    yield [combatant]
+
+    def _out_of_actions(self) -> bool:
+        max_actions = self.rules.max_actions
+        return max_actions is not None and len(self.log) >= max_actions
+
+    def team_turns(self) -> Iterator[list[Event]]:
+        """Yields the events of every turn of a faction until the battle is decided"""
+        if self.finished:
+            return
+        for block in self._blocks():
+            events = []
+            for combatant in block:
+                if not combatant.alive:
+                    continue
+                if self._out_of_actions():
+                    break
+                events.append(self.act(combatant))
+                if self.finished:
+                    break
+            if events:
+                yield events
+            if self.finished or self._out_of_actions():
+                return
+
+    def turns(self) -> Iterator[Event]:
+        """Yields one event per action until the battle is decided"""
+        for events in self.team_turns():
+            yield from events
+
+    def run(self) -> list[Event]:
+        """Simulates the whole battle and returns the event log"""
+        for _event in self.turns():
+            pass
+        return self.log
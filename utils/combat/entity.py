@@ -19,6 +19,8 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
+import random
+
 from enum import Enum
 
 from classes.classes import (
@@ -58,24 +60,35 @@ class Faction(Enum):
 
 
 class Entity:
+    __slots__ = (
+        "hp",
+        "faction",
+        "is_player",
+        "equipped_items",
+        "classes",
+        "race",
+        "effects",
+        "deck",
+    )
+
     def __init__(
         self,
         hp: float,
         faction: Faction,
         is_player: bool = False,
-        deck: SkillDeck = SkillDeck.empty(),
-        equipped_items: list[Item] = [],
-        classes: list[GameClass] = [],
+        deck: SkillDeck | None = None,
+        equipped_items: list[Item] | None = None,
+        classes: list[GameClass] | None = None,
         race: Race | None = None,
     ):
         self.hp = hp
         self.faction = faction
         self.is_player = is_player
-        self.equipped_items = equipped_items
-        self.classes = classes
+        self.equipped_items = equipped_items or []
+        self.classes = classes or []
         self.race = race
         self.effects = Effects()
-        self.deck = deck
+        self.deck = deck or SkillDeck.empty()
 
     def can_attack(self, other: Entity) -> bool:
         return self.faction != other.faction
@@ -183,10 +196,17 @@ class Entity:
         self.effects.merge_with(action.causes_effects)
         self.effects.substract(action.removes_effects)
 
+    def can_cast(self, skill: BaseSkill, rng: random.Random | None = None) -> bool:
+        if skill.skill_type != SkillType.Spell:
+            return True
+        if self.effects.dazed:
+            return False
+        return not (
+            self.effects.blind and (rng.randint(0, 1) if rng else randint(0, 1)) == 0
+        )
+
     def use_skill(self, skill: BaseSkill, target: Entity) -> None:
-        if skill.skill_type == SkillType.Spell and (
-            self.effects.dazed or (self.effects.blind and randint(0, 1) == 0)
-        ):
+        if not self.can_cast(skill):
             return
 
         if not self.deck.available(skill):
@@ -202,10 +222,15 @@ class Entity:
             else:
                 target.apply_action(action)
 
-    def tick(self) -> None:
+    def damage_over_time(self) -> float:
+        damage = 0
         if self.effects.bleeding:
-            self.hp -= 15
+            damage += 15
         if self.effects.poisoned:
-            self.hp -= 30
+            damage += 30
+        return damage
+
+    def tick(self) -> None:
+        self.hp -= self.damage_over_time()
         self.deck.tick()
         self.effects.tick()
@@ -44,14 +44,31 @@ class Action:
     healing: float
     causes_effects: Effects
     removes_effects: Effects
-
-
-@dataclass
+    # If set, the attacker's damage roll is added to damage and the
+    # hit after armor is scaled by this
+    multiplier: float = 0.0
+    # damage is damage + randint(0, variance)
+    variance: int = 0
+    # Armor does not apply
+    pierce: bool = False
+    # Sets the frostbite damage of the target to this share of the hit
+    over_time: float = 0.0
+    # Kills targets left at or below this share of their max HP
+    execute_below: float = 0.0
+
+
+# eq=False keeps skills hashable by identity for the SkillDeck
+@dataclass(eq=False)
 class BaseSkill:
     skill_type: SkillType
     actions: list[Action]
     name: str
     recharge: int
+    target: Target = Target.Hostile
+    # Chance per turn to use this instead of a normal attack
+    chance: float = 0.0
+    # Hits every living enemy instead of one
+    area: bool = False
 
 
 # Some really dumb example
@@ -70,6 +87,56 @@ devouring_slash = BaseSkill(
     recharge=2,
 )
 
+FIREBALL_MULTIPLIERS = {
+    1: 1.10,
+    2: 1.20,
+    3: 1.30,
+    4: 1.50,
+    5: 1.75,
+    6: 2.00,
+}
+
+
+def fireball(evolution: int, chance: float) -> BaseSkill:
+    """The Fireball of the mage class line at the given evolution"""
+    return BaseSkill(
+        skill_type=SkillType.Spell,
+        actions=[
+            Action(
+                target=Target.Hostile,
+                damage=0,
+                healing=0,
+                causes_effects=Effects(),
+                removes_effects=Effects(),
+                multiplier=FIREBALL_MULTIPLIERS.get(evolution, 1.0),
+            )
+        ],
+        name="Fireball",
+        recharge=0,
+        chance=chance,
+    )
+
+
+def smash(chance: float) -> BaseSkill:
+    """A normal attack against every enemy at once"""
+    return BaseSkill(
+        skill_type=SkillType.SpecialAttack,
+        actions=[
+            Action(
+                target=Target.Hostile,
+                damage=0,
+                healing=0,
+                causes_effects=Effects(),
+                removes_effects=Effects(),
+                multiplier=1.0,
+            )
+        ],
+        name="Smash",
+        recharge=0,
+        chance=chance,
+        area=True,
+    )
+
 
 class SkillDeck:
     def __init__(self, skills: list[BaseSkill]) -> None:
@@ -81,8 +148,11 @@ class SkillDeck:
     def available(self, skill: BaseSkill) -> bool:
         return self.skills.get(skill, -1) == 0
 
+    def ready(self) -> list[BaseSkill]:
+        return [skill for skill, recharge in self.skills.items() if recharge == 0]
+
     def tick(self) -> None:
-        self.skills = {(k, v - 1) if v != 0 else (k, 0) for k, v in self.skills.items()}
+        self.skills = {k: v - 1 if v != 0 else 0 for k, v in self.skills.items()}
 
     @classmethod
     def empty(self) -> SkillDeck:
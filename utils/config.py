@@ -65,6 +65,9 @@ class ExternalSection:
         "okapi_url",
         "proxy_url",
         "donator_roles",
+        "stockfish_endpoints",
+        "stockfish_command",
+        "stockfish_processes",
     }
 
     def __init__(self, data: dict[str, Any]) -> None:
@@ -77,6 +80,11 @@ class ExternalSection:
         self.okapi_url = data.get("okapi_url", "http://localhost:3000")
         self.proxy_url = data.get("proxy_url", None)
         self.donator_roles = [DonatorRole(i) for i in data.get("donator_roles", [])]
+        # UCI servers as host:port, plus stockfish_processes local engines
+        # started with stockfish_command
+        self.stockfish_endpoints = data.get("stockfish_endpoints", ["127.0.0.1:4000"])
+        self.stockfish_command = data.get("stockfish_command", "stockfish")
+        self.stockfish_processes = data.get("stockfish_processes", 0)
 
 
 class DatabaseSection:
@@ -0,0 +1,153 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import time
+
+# Cooldown key prefixes, the keys themselves are {scope}:{owner}:{command}
+USER = "cd"
+GUILD = "guildcd"
+ALLIANCE = "alliancecd"
+
+# Records a cooldown in the owner's index. The index is a sorted set of
+# command -> expiry, it lives as long as the longest cooldown in it and drops
+# expired members whenever it is written.
+_INDEX = """
+redis.call("ZADD", KEYS[2], ARGV[3], ARGV[1])
+redis.call("ZREMRANGEBYSCORE", KEYS[2], "-inf", ARGV[4])
+if redis.call("TTL", KEYS[2]) < tonumber(ARGV[2]) then
+    redis.call("EXPIRE", KEYS[2], ARGV[2])
+end
+"""
+
+SET_SCRIPT = f"""
+redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[2])
+{_INDEX}
+return 1
+"""
+
+# Starts the cooldown unless it is already running, then it returns the TTL
+# instead. -2 means it was started, like TTL on a key that did not exist.
+ACQUIRE_SCRIPT = f"""
+if not redis.call("SET", KEYS[1], ARGV[1], "NX", "EX", ARGV[2]) then
+    return redis.call("TTL", KEYS[1])
+end
+{_INDEX}
+return -2
+"""
+
+
+class CooldownRegistry:
+    """
+    Per-owner index of the Redis cooldowns
+
+    Listing someone's cooldowns used to run KEYS over the whole keyspace and
+    then one TTL per match, which blocks Redis for every other cluster. The
+    cooldown keys stay exactly the same, but every write also records the
+    command in a sorted set per user, guild or alliance. Listing only reads
+    that set and pipelines the TTLs of the keys it names.
+
+    Cooldowns have to be set and reset through here, otherwise the index
+    lists commands that are no longer on cooldown until they expire.
+    """
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+        # both are run with EVALSHA and only sent in full if Redis lost them
+        self._set = bot.redis.register_script(SET_SCRIPT)
+        self._acquire = bot.redis.register_script(ACQUIRE_SCRIPT)
+
+    @staticmethod
+    def key(scope: str, owner: int, command: str) -> str:
+        return f"{scope}:{owner}:{command}"
+
+    @staticmethod
+    def index_key(scope: str, owner: int) -> str:
+        return f"{scope}index:{owner}"
+
+    def _args(self, scope: str, owner: int, command: str, seconds: int) -> dict:
+        now = time.time()
+        return {
+            "keys": [self.key(scope, owner, command), self.index_key(scope, owner)],
+            "args": [command, int(seconds), now + int(seconds), now],
+        }
+
+    async def set(self, scope: str, owner: int, command: str, seconds: int) -> None:
+        """Puts a command on cooldown, overwriting an existing one"""
+        await self._set(**self._args(scope, owner, command, seconds))
+
+    async def acquire(
+        self, scope: str, owner: int, command: str, seconds: int
+    ) -> int | None:
+        """
+        Puts a command on cooldown if it is not on cooldown yet
+
+        Returns None if the cooldown was started, otherwise the seconds left
+        on the running one. Checking and setting happen atomically in Redis,
+        so two clusters handling the same user can never both pass.
+        """
+        ttl = await self._acquire(**self._args(scope, owner, command, seconds))
+        return None if ttl == -2 else ttl
+
+    async def reset(self, scope: str, owner: int, command: str) -> bool:
+        """Removes a cooldown, returns whether there was one"""
+        async with self.bot.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self.key(scope, owner, command))
+            pipe.zrem(self.index_key(scope, owner), command)
+            deleted, _removed = await pipe.execute()
+        return deleted == 1
+
+    async def timers(self, scope: str, owner: int) -> list[tuple[str, int]]:
+        """Returns the (command, seconds left) of every running cooldown"""
+        index = self.index_key(scope, owner)
+        commands = [
+            command.decode() if isinstance(command, bytes) else command
+            for command in await self.bot.redis.execute_command(
+                "ZRANGEBYSCORE", index, time.time(), "+inf"
+            )
+        ]
+        if not commands:
+            return []
+        async with self.bot.redis.pipeline(transaction=False) as pipe:
+            for command in commands:
+                pipe.ttl(self.key(scope, owner, command))
+            ttls = await pipe.execute()
+
+        running = []
+        stale = []
+        for command, ttl in zip(commands, ttls):
+            if ttl >= 0:
+                running.append((command, ttl))
+            elif ttl == -2:
+                # deleted behind our back, e.g. by a direct DEL
+                stale.append(command)
+        if stale:
+            await self.bot.redis.execute_command("ZREM", index, *stale)
+        return sorted(running, key=lambda timer: timer[1])
+
+    async def clear(self, scope: str, owner: int) -> int:
+        """Removes all cooldowns of an owner, returns how many there were"""
+        index = self.index_key(scope, owner)
+        commands = await self.bot.redis.execute_command("ZRANGE", index, 0, -1)
+        async with self.bot.redis.pipeline(transaction=True) as pipe:
+            for command in commands:
+                if isinstance(command, bytes):
+                    command = command.decode()
+                pipe.delete(self.key(scope, owner, command))
+            pipe.delete(index)
+            results = await pipe.execute()
+        return sum(results[:-1])
@@ -0,0 +1,324 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+
+import asyncpg
+import discord
+
+# profile columns that have a leaderboard
+BOARDS = ("money", "xp", "pvpwins", "lovescore")
+
+SCORES_SQL = (
+    'SELECT "user", COALESCE("money", 0) AS "money", COALESCE("xp", 0) AS "xp",'
+    ' COALESCE("pvpwins", 0) AS "pvpwins", COALESCE("lovescore", 0) AS "lovescore"'
+    " FROM profile"
+)
+
+# Returns {greater, greater or equal, score} for a member, 0 if the board
+# has no such member and -1 if the board was not built yet
+RANK_SCRIPT = """
+local score = redis.call("ZSCORE", KEYS[1], ARGV[1])
+if not score then
+    return redis.call("EXISTS", KEYS[1]) - 1
+end
+return {
+    redis.call("ZCOUNT", KEYS[1], "(" .. score, "+inf"),
+    redis.call("ZCOUNT", KEYS[1], score, "+inf"),
+    score,
+}
+"""
+
+# set while a rebuild runs, and the users flushed since it started
+REBUILDING_KEY = "leaderboard:rebuilding"
+DIRTY_KEY = "leaderboard:dirty"
+
+# While KEYS[1] exists a rebuild is running on some cluster, remember the
+# users in ARGV so it reads them again after swapping its boards in
+MARK_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    -- unpack is limited by the Lua stack, so add them in slices
+    for i = 1, #ARGV, 1000 do
+        redis.call("SADD", KEYS[2], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+    end
+end
+return 0
+"""
+
+
+class Leaderboards:
+    """
+    Profile leaderboards kept in Redis sorted sets
+
+    Top lists come from ZREVRANGE and a user's rank from two ZCOUNTs around
+    their score, both O(log n) instead of counting rows in Postgres.
+
+    Code that changes a ranked column passes the users to update(), which
+    log_transaction, stats.invalidate and delete_profile already do. Their
+    current scores are read back and written in batches every flush_every
+    seconds. The cluster holding the "leaderboards" lease rebuilds all
+    boards from Postgres every interval seconds, which also repairs any
+    change nobody reported. Users flushed by any cluster during a rebuild
+    are collected in Redis and read again once the new boards are in place.
+    Until a board was built once, reads fall back to Postgres.
+    """
+
+    def __init__(
+        self, bot, interval: int = 3600, flush_every: float = 1.0, chunk: int = 10_000
+    ) -> None:
+        self.bot = bot
+        self.interval = interval
+        self.flush_every = flush_every
+        self.chunk = chunk
+        # users whose scores may have changed since the last flush
+        self._pending = set()
+        # (connection, users) changed inside a transaction not committed yet
+        self._uncommitted = []
+        self._flusher = None
+        self._rank = bot.redis.register_script(RANK_SCRIPT)
+        self._mark = bot.redis.register_script(MARK_SCRIPT)
+
+    @staticmethod
+    def key(board: str) -> str:
+        return f"leaderboard:{board}"
+
+    async def top(self, board: str, limit: int = 10) -> list[tuple[int, int]]:
+        """Returns the best (user, score) pairs of a board"""
+        entries = await self.bot.redis.zrevrange(
+            self.key(board), 0, limit - 1, withscores=True
+        )
+        if entries:
+            return [(int(user), int(score)) for user, score in entries]
+        # a built board is never empty unless profile is
+        rows = await self.bot.pool.fetch(
+            f'SELECT "user", "{board}" FROM profile ORDER BY "{board}" DESC LIMIT $1;',
+            limit,
+        )
+        return [(row["user"], row[board]) for row in rows]
+
+    async def ranks(
+        self, user, *boards, ties_last: bool = False, conn=None
+    ) -> dict[str, tuple[int, int] | None]:
+        """
+        Returns (rank, score) of a user on each board, None if they have
+        no character. Tied users share the best rank unless ties_last is
+        set, then everyone tied is ranked behind all of them.
+        """
+        user_id = user.id if isinstance(user, (discord.User, discord.Member)) else user
+        async with self.bot.redis.pipeline(transaction=False) as pipe:
+            for board in boards:
+                await self._rank(keys=[self.key(board)], args=[user_id], client=pipe)
+            results = await pipe.execute()
+
+        ranks = {}
+        for board, result in zip(boards, results):
+            if result == -1:
+                ranks[board] = await self._rank_from_database(
+                    board, user_id, ties_last, conn=conn
+                )
+            elif result == 0:
+                ranks[board] = None
+            else:
+                greater, at_least, score = result
+                ranks[board] = (
+                    at_least if ties_last else greater + 1,
+                    int(float(score)),
+                )
+        return ranks
+
+    async def rank(self, board: str, user, conn=None) -> tuple[int, int] | None:
+        return (await self.ranks(user, board, conn=conn))[board]
+
+    async def _rank_from_database(
+        self, board: str, user_id: int, ties_last: bool, conn=None
+    ) -> tuple[int, int] | None:
+        obj = conn or self.bot.pool
+        score = await obj.fetchval(
+            f'SELECT "{board}" FROM profile WHERE "user"=$1;', user_id
+        )
+        if score is None:
+            return None
+        if ties_last:
+            rank = await obj.fetchval(
+                f'SELECT COUNT(*) FROM profile WHERE "{board}">=$1;', score
+            )
+        else:
+            rank = 1 + await obj.fetchval(
+                f'SELECT COUNT(*) FROM profile WHERE "{board}">$1;', score
+            )
+        return rank, score
+
+    def update(self, *users, conn=None) -> None:
+        """
+        Queues users whose ranked scores may have changed. When conn is
+        inside a transaction, they are held back until it is over, reading
+        them earlier would see the old scores.
+        """
+        user_ids = set()
+        for user in users:
+            if isinstance(user, (discord.User, discord.Member)):
+                user = user.id
+            if user is not None:
+                user_ids.add(user)
+        if not user_ids:
+            return
+        if conn is not None and conn.is_in_transaction():
+            self._uncommitted.append((conn, user_ids))
+        else:
+            self._pending |= user_ids
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_forever())
+
+    def _collect_committed(self) -> None:
+        waiting = []
+        for conn, user_ids in self._uncommitted:
+            try:
+                done = not conn.is_in_transaction()
+            except asyncpg.InterfaceError:
+                # released back to the pool, so the transaction is over
+                done = True
+            if done:
+                self._pending |= user_ids
+            else:
+                waiting.append((conn, user_ids))
+        self._uncommitted = waiting
+
+    async def flush(self) -> None:
+        """Writes the current scores of the users queued since the last flush"""
+        self._collect_committed()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, set()
+        try:
+            changes = await self._read(pending)
+        except BaseException:
+            self._pending |= pending
+            raise
+        await self._apply(changes)
+
+    async def _read(self, user_ids) -> dict:
+        rows = await self.bot.pool.fetch(
+            f'{SCORES_SQL} WHERE "user"=ANY($1);', list(user_ids)
+        )
+        # None removes users without a profile, e.g. after a deletion
+        changes = dict.fromkeys(user_ids)
+        for row in rows:
+            changes[row["user"]] = {board: row[board] for board in BOARDS}
+        return changes
+
+    async def _apply(self, changes: dict) -> None:
+        if not changes:
+            return
+        scores = {board: {} for board in BOARDS}
+        removed = []
+        for user_id, new in changes.items():
+            if new is None:
+                removed.append(user_id)
+                continue
+            for board, score in new.items():
+                scores[board][user_id] = score
+        # atomic so a rebuild swapping its boards in cannot land in between
+        # the mark and the writes
+        async with self.bot.redis.pipeline(transaction=True) as pipe:
+            await self._mark(
+                keys=[REBUILDING_KEY, DIRTY_KEY], args=list(changes), client=pipe
+            )
+            for board in BOARDS:
+                if scores[board]:
+                    pipe.zadd(self.key(board), scores[board])
+                if removed:
+                    pipe.zrem(self.key(board), *removed)
+            await pipe.execute()
+
+    async def rebuild(self) -> None:
+        """Rebuilds all boards from Postgres and swaps them in at once"""
+        building = {board: f"{self.key(board)}:rebuild" for board in BOARDS}
+        async with self.bot.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(DIRTY_KEY, *building.values())
+            # expires in case this cluster dies before swapping the boards in
+            pipe.set(REBUILDING_KEY, 1, ex=self.interval)
+            await pipe.execute()
+        try:
+            written = 0
+            async with self.bot.pool.acquire() as conn:
+                async with conn.transaction():
+                    batch = []
+                    async for row in conn.cursor(f"{SCORES_SQL};", prefetch=self.chunk):
+                        batch.append(row)
+                        if len(batch) >= self.chunk:
+                            await self._write_chunk(building, batch)
+                            written += len(batch)
+                            batch = []
+                    if batch:
+                        await self._write_chunk(building, batch)
+                        written += len(batch)
+
+            async with self.bot.redis.pipeline(transaction=True) as pipe:
+                for board, key in building.items():
+                    if written:
+                        pipe.rename(key, self.key(board))
+                    else:
+                        # nothing was added, so the new set does not exist
+                        pipe.delete(self.key(board))
+                pipe.smembers(DIRTY_KEY)
+                pipe.delete(DIRTY_KEY, REBUILDING_KEY)
+                *_, dirty, _ = await pipe.execute()
+        except BaseException:
+            await self.bot.redis.delete(REBUILDING_KEY, DIRTY_KEY)
+            raise
+        if dirty:
+            # flushed while the cursor ran, the new boards may hold older scores
+            await self._apply(await self._read({int(user) for user in dirty}))
+
+    async def _write_chunk(self, building: dict, rows) -> None:
+        async with self.bot.redis.pipeline(transaction=False) as pipe:
+            for board, key in building.items():
+                pipe.zadd(key, {row["user"]: row[board] for row in rows})
+            await pipe.execute()
+
+    async def _flush_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_every)
+            try:
+                await self.flush()
+            except Exception:
+                self.bot.logger.exception("Failed to update the leaderboards")
+
+    async def maintain(self) -> None:
+        """Rebuilds the boards every interval, run on the lease holder only"""
+        while True:
+            try:
+                await self.rebuild()
+            except Exception:
+                self.bot.logger.exception("Failed to rebuild the leaderboards")
+            await asyncio.sleep(self.interval)
+
+    async def close(self) -> None:
+        """Stops the flusher and writes the updates still queued"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        try:
+            await self.flush()
+        except Exception:
+            # the next rebuild picks them up
+            self.bot.logger.exception("Failed to update the leaderboards")
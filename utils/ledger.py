@@ -0,0 +1,296 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import datetime
+
+from collections import deque
+
+import asyncpg
+import orjson
+
+SUBJECTS = (
+    "crates",
+    "money",
+    "shop",
+    "offer",
+    "guild invest",
+    "guild pay",
+    "gambling",
+    "bid",
+    "item",
+    "adventure",
+    "merch",
+    "sacrifice",
+    "exchange",
+    "trade",
+    "alliance",
+    "raid",
+)
+
+TRANSACTION_COLUMNS = ("from", "to", "subject", "info", "data", "timestamp")
+MARKET_COLUMNS = (
+    "item",
+    "name",
+    "value",
+    "type",
+    "damage",
+    "armor",
+    "signature",
+    "price",
+    "offer",
+)
+
+INSERT_TRANSACTION = (
+    'INSERT INTO transactions ("from", "to", "subject", "info", "data",'
+    ' "timestamp") VALUES ($1, $2, $3, $4, $5, $6);'
+)
+INSERT_MARKET = (
+    'INSERT INTO market_history ("item", "name", "value", "type", "damage",'
+    ' "armor", "signature", "price", "offer") VALUES ($1, $2, $3, $4, $5, $6,'
+    " $7, $8, $9);"
+)
+
+# errors about the row itself, retrying those can never succeed
+ROW_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)
+
+ID_MAP = {
+    0: "Guild Bank",
+    1: "Bot (added to player)",
+    2: "Bot (removed from player)",
+}
+
+
+def _encode(value):
+    # Decimals, datetimes and whatever else ends up in the data dicts
+    return str(value)
+
+
+def _summary(content) -> str:
+    # lists only go into the JSON data, info has to fit in its varchar(582)
+    if isinstance(content, (list, tuple)):
+        return f"{len(content)} entries"
+    return str(content)
+
+
+class TransactionLedger:
+    """
+    Write-behind queue for the transactions table
+
+    log() only builds the rows and queues them. A background task writes
+    the queue with COPY every interval seconds, or as soon as batch entries
+    are waiting, so economy commands no longer pay an INSERT round trip on
+    their connection. close() writes whatever is left on shutdown.
+
+    A batch the database refuses is written row by row so only the rows it
+    refuses are dropped. A batch that fails for any other reason, like the
+    database being down, is queued again up to max_retries times. Dropped
+    entries, and entries logged while max_queue are already waiting, go to
+    the dead letter log: the bot's log and the last entries in dead.
+
+    write() inserts right away on the given connection, for entries that
+    have to commit or roll back together with the money they describe.
+    """
+
+    def __init__(
+        self,
+        bot,
+        interval: float = 0.5,
+        batch: int = 500,
+        max_queue: int = 50_000,
+        max_retries: int = 5,
+    ) -> None:
+        self.bot = bot
+        self.interval = interval
+        self.batch = batch
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.transactions = []
+        self.market = []
+        self.written = 0
+        self.dropped = 0
+        self.dead = deque(maxlen=100)
+        self._failures = 0
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = None
+        self._closed = False
+
+    def entry(self, ctx, from_, to, subject, data) -> tuple[tuple, tuple | None]:
+        """Builds the transactions and market_history rows of an entry"""
+        assert subject in SUBJECTS
+        command = ctx.command.qualified_name if ctx.command else None
+        # the readable summary shown by the transactions viewer
+        info = "\n".join(
+            (
+                f"From: {ID_MAP.get(from_, from_)}",
+                f"To: {ID_MAP.get(to, to)}",
+                f"Subject: {subject}",
+                f"Command: {command}",
+                "Data: "
+                + "\n".join(
+                    f"{name}: {_summary(content)}" for name, content in data.items()
+                ),
+            )
+        )
+        payload = orjson.dumps({"command": command, **data}, default=_encode).decode()
+        transaction = (
+            from_,
+            to,
+            subject,
+            info,
+            payload,
+            datetime.datetime.now(),
+        )
+        market = None
+        if subject == "shop":
+            # the item's ID goes into "item", the rest has the same names
+            market = (data["id"], *(data[column] for column in MARKET_COLUMNS[1:]))
+        return transaction, market
+
+    def log(self, ctx, from_, to, subject, data) -> None:
+        """Queues an entry to be written with the next batch"""
+        if self._closed:
+            raise RuntimeError("The transaction ledger is closed")
+        transaction, market = self.entry(ctx, from_, to, subject, data)
+        if len(self.transactions) >= self.max_queue:
+            self._dead_letter("transactions", [transaction], "the queue is full")
+            if market is not None:
+                self._dead_letter("market_history", [market], "the queue is full")
+            return
+        self.transactions.append(transaction)
+        if market is not None:
+            self.market.append(market)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if len(self.transactions) >= self.batch:
+            self._full.set()
+
+    async def write(self, conn, ctx, from_, to, subject, data) -> None:
+        """Writes an entry right away on conn, inside its transaction if any"""
+        transaction, market = self.entry(ctx, from_, to, subject, data)
+        await conn.execute(INSERT_TRANSACTION, *transaction)
+        if market is not None:
+            await conn.execute(INSERT_MARKET, *market)
+
+    async def flush(self) -> int:
+        """Writes everything queued so far, returns the amount of entries"""
+        async with self._lock:
+            if not self.transactions and not self.market:
+                return 0
+            transactions, self.transactions = self.transactions, []
+            market, self.market = self.market, []
+            self._full.clear()
+            written = len(transactions)
+            try:
+                async with self.bot.pool.acquire() as conn:
+                    try:
+                        await self._copy(conn, transactions, market)
+                    except ROW_ERRORS:
+                        written = await self._write_rows(conn, transactions, market)
+            except Exception:
+                self._failures += 1
+                if self._failures > self.max_retries:
+                    self._failures = 0
+                    reason = f"failed {self.max_retries + 1} times"
+                    self._dead_letter("transactions", transactions, reason)
+                    self._dead_letter("market_history", market, reason)
+                else:
+                    # put them back in front of anything queued meanwhile
+                    self.transactions[:0] = transactions
+                    self.market[:0] = market
+                raise
+            except BaseException:
+                self.transactions[:0] = transactions
+                self.market[:0] = market
+                raise
+            self._failures = 0
+            self.written += written
+            return written
+
+    async def _copy(self, conn, transactions: list, market: list) -> None:
+        async with conn.transaction():
+            if transactions:
+                await conn.copy_records_to_table(
+                    "transactions", records=transactions, columns=TRANSACTION_COLUMNS
+                )
+            if market:
+                await conn.copy_records_to_table(
+                    "market_history", records=market, columns=MARKET_COLUMNS
+                )
+
+    async def _write_rows(self, conn, transactions: list, market: list) -> int:
+        # one row broke the COPY, find it instead of retrying the batch forever.
+        # Written rows leave the lists so a failure halfway requeues only the rest
+        written = 0
+        for table, query, rows in (
+            ("transactions", INSERT_TRANSACTION, transactions),
+            ("market_history", INSERT_MARKET, market),
+        ):
+            while rows:
+                try:
+                    await conn.execute(query, *rows[0])
+                except ROW_ERRORS as e:
+                    self._dead_letter(table, rows[:1], f"{type(e).__name__}: {e}")
+                else:
+                    if table == "transactions":
+                        written += 1
+                del rows[0]
+        return written
+
+    def _dead_letter(self, table: str, rows: list, reason: str) -> None:
+        columns = TRANSACTION_COLUMNS if table == "transactions" else MARKET_COLUMNS
+        for row in rows:
+            entry = orjson.dumps(dict(zip(columns, row)), default=_encode).decode()
+            self.dead.append((table, reason, entry))
+            self.dropped += 1
+            self.bot.logger.error(
+                f"Dropped a {table} entry from the ledger ({reason}): {entry}"
+            )
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception:
+                self.bot.logger.exception("Failed to write the transaction ledger")
+                # back off instead of hammering a database that is down
+                await asyncio.sleep(self.interval * 10)
+
+    async def close(self) -> None:
+        """Stops the background writer and writes the remaining entries"""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            # nothing retries after shutdown, keep them in the log at least
+            self.bot.logger.exception("Failed to write the transaction ledger")
+            self._dead_letter("transactions", self.transactions, "shutdown")
+            self._dead_letter("market_history", self.market, "shutdown")
+            self.transactions, self.market = [], []
@@ -23,11 +23,9 @@ import hashlib
 import hmac
 import time
 
-from decimal import Decimal
-
 from discord.errors import NotFound
 
-from utils import random
+from utils import odds, random
 
 levels = {
     1: 0,
@@ -171,32 +169,18 @@ def xptonextlevel(xp):
 def calcchance(
         sword, shield, dungeon, level, luck, returnsuccess=False, booster=False, bonus=0
 ):
+    """
+    Returns the exact success chance in percent for an adventure,
+    or decides the adventure if returnsuccess is True
+    """
     if returnsuccess is False:
-        val1 = sword + shield + 75 - dungeon * 7 + bonus - level / Decimal("2")
-        val2 = sword + shield + 75 - dungeon + bonus + level
-        val1 = round(val1 * luck) if val1 >= 0 else round(val1 / luck)
-        val2 = round(val2 * luck) if val2 >= 0 else round(val2 / luck)
-        if booster:
-            val1 += 25
-            val2 += 25
-        return (val1, val2)
+        return odds.success_chance(
+            sword + shield, dungeon, level, luck, booster=booster, bonus=bonus
+        ) * 100
     else:
-        randomn = random.randint(0, 100)
-        if booster:
-            randomn -= 25
-        success = (
-                sword
-                + shield
-                + 75
-                - (dungeon * (random.randint(1, 7)))
-                + random.choice([level, -level / Decimal("2")])
-                + bonus
+        return odds.roll_success(
+            sword + shield, dungeon, level, luck, booster=booster, bonus=bonus
         )
-        if success >= 0:
-            success = round(success * luck)
-        else:
-            success = round(success / luck)
-        return randomn <= success
 
 
 async def lookup(bot, userid, return_none=False):
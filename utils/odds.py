@@ -0,0 +1,85 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+from decimal import Decimal
+from functools import lru_cache
+
+from utils import random
+
+# An adventure roll draws randint(0, 100), randint(1, 7) and a choice of two
+DUNGEON_ROLLS = range(1, 8)
+OUTCOMES = 101 * len(DUNGEON_ROLLS) * 2
+MAX_DUNGEON = 100
+
+
+@lru_cache(maxsize=4096)
+def success_counts(stats, level, luck, booster=False, bonus=0):
+    """
+    Returns the number of successful outcomes out of OUTCOMES for every
+    dungeon from 1 to MAX_DUNGEON, index 0 being dungeon 1
+
+    stats is damage + armor, the arithmetic mirrors utils.misc.calcchance
+    """
+    base = stats + 75 + bonus
+    extras = (level, -level / Decimal("2"))
+    # randomn <= success is the same as randint(0, 100) <= success + 25
+    shift = 26 if booster else 1
+    counts = []
+    for dungeon in range(1, MAX_DUNGEON + 1):
+        count = 0
+        for roll in DUNGEON_ROLLS:
+            penalty = base - dungeon * roll
+            for extra in extras:
+                success = penalty + extra
+                if success >= 0:
+                    success = round(success * luck)
+                else:
+                    success = round(success / luck)
+                count += min(max(success + shift, 0), 101)
+        counts.append(count)
+    return tuple(counts)
+
+
+def success_chances(stats, level, luck, booster=False, bonus=0):
+    """Returns the exact success chance between 0 and 1 for every dungeon"""
+    counts = success_counts(stats, level, luck, bool(booster), bonus)
+    return tuple(count / OUTCOMES for count in counts)
+
+
+def success_chance(stats, dungeon, level, luck, booster=False, bonus=0):
+    """Returns the exact success chance between 0 and 1 for one dungeon"""
+    return (
+        success_counts(stats, level, luck, bool(booster), bonus)[dungeon - 1]
+        / OUTCOMES
+    )
+
+
+def roll_success(stats, dungeon, level, luck, booster=False, bonus=0):
+    """Decides an adventure with a single draw against the exact odds"""
+    count = success_counts(stats, level, luck, bool(booster), bonus)[dungeon - 1]
+    return random.randint(1, OUTCOMES) <= count
+
+
+def display_percent(chance):
+    """Rounds a chance to a whole percent, only a sure success shows as 100"""
+    percent = round(chance * 100)
+    if percent == 100 and chance < 1:
+        return 99
+    return percent
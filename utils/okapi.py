@@ -0,0 +1,174 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import hashlib
+
+import aiohttp
+import orjson
+
+from aiohttp.client_exceptions import ContentTypeError
+
+
+class OkapiError(Exception):
+    """Okapi refused a render or the generated image could not be fetched"""
+
+    def __init__(
+        self,
+        status: int,
+        reason: str | None = None,
+        detail: str | None = None,
+        url: str | None = None,
+    ) -> None:
+        super().__init__(f"Okapi returned {status}: {reason} ({detail})")
+        self.status = status
+        # only set when Okapi explained the error, e.g. an unreadable background
+        self.reason = reason
+        self.detail = detail
+        # only set when the render worked but its image could not be fetched
+        self.url = url
+
+
+class OkapiStats:
+    __slots__ = ("requests", "cached", "coalesced", "failed")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.cached = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    def __str__(self) -> str:
+        return (
+            f"requests={self.requests} cached={self.cached}"
+            f" coalesced={self.coalesced} failed={self.failed}"
+        )
+
+
+class Okapi:
+    """
+    Client for the Okapi image service
+
+    All renders share one connection pool, run at most concurrency at a
+    time and time out after timeout seconds. A render is identified by the
+    hash of its endpoint and payload: identical renders in flight on this
+    cluster share one request, finished ones are kept in Redis for ttl
+    seconds so every cluster can reuse them. Without redis only the
+    coalescing applies.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: str | None,
+        redis=None,
+        concurrency: int = 8,
+        timeout: float = 30,
+        ttl: int = 600,
+        max_cached_size: int = 2 * 1024 * 1024,
+    ) -> None:
+        self.url = url.rstrip("/")
+        self.redis = redis
+        self.ttl = ttl
+        self.max_cached_size = max_cached_size
+        self.stats = OkapiStats()
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=concurrency * 2),
+            timeout=aiohttp.ClientTimeout(total=timeout, connect=5),
+            headers={"Authorization": token} if token else None,
+        )
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._inflight = {}
+
+    @staticmethod
+    def digest(endpoint: str, payload: dict) -> str:
+        return hashlib.sha256(
+            orjson.dumps([endpoint, payload], option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    async def profile(self, payload: dict) -> bytes:
+        """The profile card PNG for the card inputs in payload"""
+        return await self.render_image("genprofile", payload)
+
+    async def image_op(self, op: str, image: str) -> bytes:
+        """An avatar run through one of pixel, edges, invert or oil"""
+        return await self.render_image(f"imageops/{op}", {"image": image})
+
+    async def overlay(self, url: str, style: str) -> str:
+        """URL of a profile background made from url with a dark or light overlay"""
+        return await self.render("genoverlay", {"url": url, "style": style})
+
+    async def render(self, endpoint: str, payload: dict) -> str:
+        """Runs a render and returns the URL of the generated image"""
+        key = f"okapi:url:{self.digest(endpoint, payload)}"
+        url = await self._once(key, lambda: self._post(endpoint, payload))
+        return url.decode() if isinstance(url, bytes) else url
+
+    async def render_image(self, endpoint: str, payload: dict) -> bytes:
+        """Runs a render and returns the generated image itself"""
+        key = f"okapi:image:{self.digest(endpoint, payload)}"
+
+        async def fetch():
+            return await self._get(await self.render(endpoint, payload))
+
+        return await self._once(key, fetch)
+
+    async def _once(self, key: str, load):
+        if (task := self._inflight.get(key)) is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(task)
+        if self.redis is not None and (cached := await self.redis.get(key)) is not None:
+            self.stats.cached += 1
+            return cached
+        # someone may have started it while we asked redis
+        if (task := self._inflight.get(key)) is None:
+            task = self._inflight[key] = asyncio.create_task(self._store(key, load))
+            task.add_done_callback(lambda _task: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _store(self, key: str, load):
+        result = await load()
+        if self.redis is not None and len(result) <= self.max_cached_size:
+            await self.redis.set(key, result, ex=self.ttl)
+        return result
+
+    async def _post(self, endpoint: str, payload: dict) -> str:
+        self.stats.requests += 1
+        async with self._semaphore:
+            async with self.session.post(
+                f"{self.url}/api/{endpoint}", json=payload
+            ) as resp:
+                if resp.status == 200:
+                    return await resp.text()
+                self.stats.failed += 1
+                try:
+                    error = await resp.json()
+                except (ContentTypeError, ValueError):
+                    raise OkapiError(resp.status)
+                raise OkapiError(resp.status, error.get("reason"), error.get("detail"))
+
+    async def _get(self, url: str) -> bytes:
+        async with self._semaphore:
+            async with self.session.get(url) as resp:
+                if resp.status != 200:
+                    self.stats.failed += 1
+                    raise OkapiError(resp.status, url=url)
+                return await resp.read()
@@ -56,8 +56,10 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 import asyncio
+import contextvars
 
-from typing import Any, Generator
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Generator
 
 import discord
 
@@ -412,6 +414,8 @@ class ChooseShop(NormalPaginator):
     ) -> None:
         item_id = self.ids[self.current]
         command = self.ctx.bot.get_command("buy")
+        # the profile was loaded when the shop opened, the balance may have moved
+        self.ctx.profiles.refresh(self.ctx.author.id)
         if not await command.can_run(self.ctx):
             return await interaction.response.send_message(
                 _("You don't have a character anymore."), ephemeral=True
@@ -483,6 +487,198 @@ class AchievmentPaginator:
         await view.start(location or ctx)
 
 
+class KeysetPages:
+    """
+    Pages of rows loaded on demand with keyset (seek) pagination
+
+    fetch(after, limit) returns up to limit rows in a stable order that come
+    after the cursor after, None for the first page. key(row) returns the
+    cursor of a row, usually a tuple of the ORDER BY columns. Each query loads
+    the requested page and prefetch pages after it, the next batch is loaded
+    in the background once the user reaches it. Only window pages are kept,
+    so memory does not grow with the size of the result.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Any, int], Awaitable[list[Any]]],
+        key: Callable[[Any], Any],
+        per_page: int = 1,
+        prefetch: int = 2,
+        window: int = 10,
+    ) -> None:
+        self.fetch = fetch
+        self.key = key
+        self.per_page = per_page
+        self.prefetch = prefetch
+        self.window = window
+        # cursors[i] is the cursor page i starts after
+        self.cursors = [None]
+        # index of the last page, known once we have seen the end
+        self.last: int | None = None
+        self._pages: OrderedDict[int, list[Any]] = OrderedDict()
+        self._loading: dict[int, asyncio.Task] = {}
+
+    def exists(self, index: int) -> bool:
+        """Whether page index exists as far as we know, it can be loaded if so"""
+        return 0 <= index < len(self.cursors) and (
+            self.last is None or index <= self.last
+        )
+
+    async def get(self, index: int) -> list[Any] | None:
+        """Returns the rows of a page, None if there is no such page"""
+        if not self.exists(index):
+            return None
+        if index in self._pages:
+            self._pages.move_to_end(index)
+        else:
+            if (task := self._loading.get(index)) is None:
+                task = self._loading[index] = asyncio.create_task(self._load(index))
+            await task
+        next_page = index + 1
+        if (
+            next_page not in self._pages
+            and next_page not in self._loading
+            and self.exists(next_page)
+        ):
+            self._loading[next_page] = asyncio.create_task(self._load(next_page))
+        return self._pages.get(index)
+
+    async def _load(self, index: int) -> None:
+        try:
+            limit = self.per_page * (1 + self.prefetch)
+            # one extra row tells us whether there is anything after the batch
+            rows = await self.fetch(self.cursors[index], limit + 1)
+            more = len(rows) > limit
+            chunks = list(pager(rows[:limit], self.per_page))
+            for offset, chunk in enumerate(chunks):
+                page = index + offset
+                self._pages[page] = chunk
+                self._pages.move_to_end(page)
+                cursor = self.key(chunk[-1])
+                if page + 1 < len(self.cursors):
+                    self.cursors[page + 1] = cursor
+                else:
+                    self.cursors.append(cursor)
+            if not more:
+                self.last = index + len(chunks) - 1
+                del self.cursors[index + len(chunks) + 1 :]
+            while len(self._pages) > self.window:
+                self._pages.popitem(last=False)
+        finally:
+            self._loading.pop(index, None)
+
+    def refresh(self, index: int = 0) -> None:
+        """Forgets page index and everything after it, e.g. after a change"""
+        for page in [page for page in self._pages if page >= index]:
+            del self._pages[page]
+        for page in [page for page in self._loading if page >= index]:
+            self._loading.pop(page).cancel()
+        del self.cursors[index + 1 :]
+        self.last = None
+
+
+class LazyPaginator(NormalPaginator):
+    """
+    NormalPaginator over KeysetPages, a page is only rendered when shown
+
+    render(rows, index, total) builds the embed for a page. total is the
+    result of count() once it answered and None before that, the count runs
+    after the first page was sent so it never delays it. Pages are rendered
+    in the context of the command, so they keep the invoker's locale.
+    """
+
+    def __init__(
+        self,
+        ctx: Context,
+        source: KeysetPages,
+        render: Callable[[list[Any], int, int | None], discord.Embed],
+        *args,
+        count: Callable[[], Awaitable[int]] | None = None,
+        **kwargs,
+    ) -> None:
+        super(ChooseLong, self).__init__(*args, **kwargs)
+        self.ctx = ctx
+        self.source = source
+        self.render = render
+        self.count = count
+        self.total: int | None = None
+        self.current = 0
+        self.message: discord.Message | None = None
+        self.allowed_user = ctx.author
+        self._context = contextvars.copy_context()
+        # there is no cheap way to jump to the end of a keyset
+        self.remove_item(self.last)
+
+    @property
+    def max(self) -> int:
+        if self.source.exists(self.current + 1):
+            return self.current + 1
+        return self.current
+
+    async def start(
+        self,
+        messagable: discord.abc.Messageable,
+        user: discord.User | None = None,
+    ) -> None:
+        self.allowed_user = (
+            user
+            if user
+            else (
+                messagable
+                if isinstance(messagable, (discord.User, discord.Member))
+                else self.ctx.author
+            )
+        )
+        rows = await self.source.get(0)
+        self.message = await messagable.send(embed=self.render_page(rows, 0), view=self)
+        if self.count is not None:
+            asyncio.create_task(self.load_count())
+
+    async def load_count(self) -> None:
+        self.total = await self.count()
+
+    def render_page(self, rows: list[Any], index: int) -> discord.Embed:
+        return self._context.run(self.render, rows, index, self.total)
+
+    async def update(self) -> None:
+        if (rows := await self.source.get(self.current)) is None:
+            return
+        await self.message.edit(embed=self.render_page(rows, self.current))
+
+
+class LazyChooseShop(LazyPaginator):
+    """LazyPaginator over market rows, one per page, with a buy button"""
+
+    @discord.ui.button(label="Buy", style=discord.ButtonStyle.green, row=1, emoji="💰")
+    async def buy(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ) -> None:
+        rows = await self.source.get(self.current)
+        command = self.ctx.bot.get_command("buy")
+        # the profile was loaded when the shop opened, the balance may have moved
+        self.ctx.profiles.refresh(self.ctx.author.id)
+        if not await command.can_run(self.ctx):
+            return await interaction.response.send_message(
+                _("You don't have a character anymore."), ephemeral=True
+            )
+        if not await self.ctx.invoke(command, itemid=rows[0]["item"]):
+            return
+
+        # the item left the market, reload from here on
+        self.source.refresh(self.current)
+        if self.total is not None:
+            self.total -= 1
+        while self.current > 0 and await self.source.get(self.current) is None:
+            self.current -= 1
+        if await self.source.get(self.current) is None:
+            self.stop()
+            self.cleanup()
+            return
+
+        await self.update()
+
+
 class ChoosePaginator:
     def __init__(
         self,
@@ -0,0 +1,485 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import multiprocessing
+import random
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import requests
+
+import chess
+
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
+
+WARMAP_FLAG_SIZE = (75, 150)
+WARMAP_FLAGS = {
+    "Asterea": "assets/conquest/Good_Flag.png",
+    "Sepulchre": "assets/conquest/Evil_Flag.png",
+    "Drakath": "assets/conquest/Chaos_Flag.png",
+    "Neutral": "assets/conquest/Neutral.png",
+}
+WARMAP_COLORS = {
+    "Asterea": (255, 255, 0),
+    "Sepulchre": (255, 0, 0),
+    "Drakath": (128, 0, 128),
+    "Neutral": (255, 255, 255),
+}
+
+DRAGON_BACKGROUND = (
+    "https://storage.googleapis.com/fablerpg-f74c2.appspot.com/"
+    "295173706496475136_Picsart_24-04-13_11-36-22-184.jpg"
+)
+DRAGON_FONT = "EightBitDragon-anqx.ttf"
+# the action boxes on the dragon background, highlighted by the event number
+DRAGON_ACTIONS = [
+    [(228, 369), (354, 402)],
+    [(228, 402), (354, 437)],
+    [(425, 369), (500, 402)],
+    [(425, 402), (590, 437)],
+    [(615, 369), (710, 402)],
+]
+
+CAPTCHA_FONT = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+CAPTCHA_COLORS = ["red", "green", "blue", "purple", "orange"]
+
+CHESS_SQUARE = 60
+CHESS_MARGIN = 20
+CHESS_FONT = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+# the same colours as chess.svg, which Okapi used to rasterise
+CHESS_COLORS = {
+    "light": (255, 206, 158),
+    "dark": (209, 139, 71),
+    "light lastmove": (205, 209, 106),
+    "dark lastmove": (170, 162, 59),
+    "check": (255, 0, 0),
+    "margin": (33, 33, 33),
+    "coord": (229, 229, 229),
+}
+# the outlined (white) and solid (black) chess glyphs of each piece type
+CHESS_OUTLINED = dict(zip("kqrbnp", "\u2654\u2655\u2656\u2657\u2658\u2659"))
+CHESS_SOLID = dict(zip("kqrbnp", "\u265a\u265b\u265c\u265d\u265e\u265f"))
+
+# Decoded assets of this worker process, they are never modified in place
+_assets = {}
+
+
+class RenderBusy(Exception):
+    """Raised when too many renders are queued already"""
+
+
+def _asset(key, load):
+    if (asset := _assets.get(key)) is None:
+        asset = _assets[key] = load()
+    return asset
+
+
+def _file(path: str, convert: str | None = None) -> Image.Image:
+    def load():
+        image = Image.open(path)
+        image.load()
+        return image.convert(convert) if convert else image
+
+    return _asset(("file", path, convert), load)
+
+
+def _remote(url: str, convert: str | None = None) -> Image.Image:
+    def load():
+        resp = requests.get(url, timeout=30)
+        resp.raise_for_status()
+        image = Image.open(BytesIO(resp.content))
+        image.load()
+        return image.convert(convert) if convert else image
+
+    return _asset(("remote", url, convert), load)
+
+
+def _font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return _asset(("font", path, size), lambda: ImageFont.truetype(path, size=size))
+
+
+def _png(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def preload() -> None:
+    """Worker initializer, decodes the local assets the renders need"""
+    try:
+        _warmap_base()
+        for path in WARMAP_FLAGS.values():
+            _warmap_flag(path)
+        _font(CAPTCHA_FONT, 40)
+        for symbol in "KQRBNPkqrbnp":
+            _chess_piece(symbol)
+        _chess_base(False)
+        _chess_base(True)
+        _font(DRAGON_FONT, 33)
+        _font(DRAGON_FONT, 38)
+    except OSError:
+        # loaded again on first use, which then reports the error
+        pass
+
+
+def _warmap_base() -> Image.Image:
+    def load():
+        base = _file("assets/conquest/Map.png")
+        return ImageEnhance.Brightness(base).enhance(0.65)
+
+    return _asset(("warmap", "base"), load)
+
+
+def _warmap_flag(path: str) -> Image.Image:
+    return _asset(("warmap", path), lambda: _file(path).resize(WARMAP_FLAG_SIZE))
+
+
+def _lerp(a, b, t):
+    return a + (b - a) * t
+
+
+def _gradient_arrow(draw, start, end, start_color, end_color, steps=100):
+    """Draws an arrow with a gradient from start_color to end_color"""
+    for i in range(steps):
+        t = i / steps
+        color = tuple(int(_lerp(start_color[c], end_color[c], t)) for c in range(3))
+        segment_start = (_lerp(start[0], end[0], t), _lerp(start[1], end[1], t))
+        segment_end = (
+            _lerp(start[0], end[0], t + 1 / steps),
+            _lerp(start[1], end[1], t + 1 / steps),
+        )
+        draw.line([segment_start, segment_end], fill=color, width=5)
+
+    # the arrowhead
+    length, width = 15, 10
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    norm = (dx**2 + dy**2) ** 0.5
+    dx, dy = dx / norm, dy / norm
+    left = (
+        end[0] - length * dx + width * 0.5 * dy,
+        end[1] - length * dy - width * 0.5 * dx,
+    )
+    right = (
+        end[0] - length * dx - width * 0.5 * dy,
+        end[1] - length * dy + width * 0.5 * dx,
+    )
+    draw.polygon([end, left, right], fill=end_color)
+
+
+def warmap(coords: dict, connections: list, control: dict) -> bytes:
+    """The conquest map with every territory flagged by whoever controls it"""
+    image = _warmap_base().copy()
+    flags = {god: _warmap_flag(path) for god, path in WARMAP_FLAGS.items()}
+    width, height = WARMAP_FLAG_SIZE
+
+    def paste_flag(territory):
+        flag = flags[control.get(territory, "Neutral")]
+        x, y = coords[territory]
+        image.paste(flag, (x - width // 2, y - height), flag)
+
+    for territory in coords:
+        paste_flag(territory)
+
+    draw = ImageDraw.Draw(image)
+    for start, end in connections:
+        _gradient_arrow(
+            draw,
+            coords[start],
+            coords[end],
+            WARMAP_COLORS[control.get(start, "Neutral")],
+            WARMAP_COLORS[control.get(end, "Neutral")],
+        )
+        # flags stay on top of the arrows
+        paste_flag(start)
+        paste_flag(end)
+    return _png(image)
+
+
+def _avatar_on(base_url: str, avatar: bytes, size: int) -> tuple:
+    base = _remote(base_url, "RGBA").copy()
+    stamp = Image.open(BytesIO(avatar)).convert("RGBA").resize((size, size))
+    return base, stamp.rotate(35, expand=True)
+
+
+def poop(base_url: str, avatar: bytes) -> bytes:
+    """The avatar stuck below the middle of the base image"""
+    base, stamp = _avatar_on(base_url, avatar, 200)
+    x = (base.width - stamp.width) // 2
+    y = int(base.height * 0.75) - stamp.height // 2
+    base.paste(stamp, (x, y), stamp.split()[3])
+    return _png(base)
+
+
+def trash(base_url: str, avatar: bytes) -> bytes:
+    """The avatar slightly above the middle of the base image"""
+    base, stamp = _avatar_on(base_url, avatar, 100)
+    x = (base.width - stamp.width) // 2
+    y = (base.height - stamp.height) // 2 - int(stamp.height * 0.20)
+    base.paste(stamp, (x, y), stamp.split()[3])
+    return _png(base)
+
+
+def captcha(text: str) -> bytes:
+    """The captcha text on a noisy background, blurred and contoured"""
+    width, height = 300, 100
+    image = Image.new("RGB", (width, height), "grey")
+    draw = ImageDraw.Draw(image)
+
+    for _i in range(1000):
+        x = random.randint(0, width - 1)
+        y = random.randint(0, height - 1)
+        draw.point((x, y), fill=random.choice(CAPTCHA_COLORS))
+
+    for _i in range(50):
+        x = random.uniform(0, width)
+        y = random.uniform(0, height)
+        color = random.choice(CAPTCHA_COLORS)
+        if random.choice(["ellipse", "line"]) == "ellipse":
+            size = random.randint(2, 5)
+            draw.ellipse((x, y, x + size, y + size), outline=color, width=1)
+        else:
+            x2, y2 = x + random.randint(10, 30), y + random.randint(10, 30)
+            draw.line([(x, y), (x2, y2)], fill=color, width=1)
+
+    font = _font(CAPTCHA_FONT, 40)
+    for i, char in enumerate(text):
+        x = i * width / len(text)
+        y = random.uniform(0, height / 2)
+        draw.text((x, y), char, font=font, fill=random.choice(CAPTCHA_COLORS))
+
+    image = image.filter(ImageFilter.GaussianBlur(1))
+    image = image.filter(ImageFilter.CONTOUR)
+    return _png(image)
+
+
+def dragon_event(player_hp: int, dragon_hp: int, action: int) -> bytes:
+    """The dragon fight with both HP values and the rolled action outlined"""
+    image = _remote(DRAGON_BACKGROUND).copy()
+    draw = ImageDraw.Draw(image)
+    draw.text((80, 391), f"{player_hp}", font=_font(DRAGON_FONT, 33), fill="cyan")
+    draw.text((673, 10), f"{dragon_hp}", font=_font(DRAGON_FONT, 38), fill="white")
+    draw.rounded_rectangle(DRAGON_ACTIONS[action - 1], 20, outline="red")
+    return _png(image)
+
+
+def _chess_piece(symbol: str) -> Image.Image:
+    """A piece sprite, rasterised from the font once per worker"""
+
+    def load():
+        size = (CHESS_SQUARE, CHESS_SQUARE)
+        font = _font(CHESS_FONT, int(CHESS_SQUARE * 0.85))
+        center = (CHESS_SQUARE / 2, CHESS_SQUARE / 2)
+        piece = symbol.lower()
+
+        # the glyphs have see-through details, so the piece gets a white body
+        # shaped like everything the outline encloses
+        outline = Image.new("L", size)
+        ImageDraw.Draw(outline).text(
+            center, CHESS_OUTLINED[piece], 255, font=font, anchor="mm"
+        )
+        body = outline.point(lambda value: 255 if value else 0)
+        ImageDraw.floodfill(body, (0, 0), 128)
+        body = body.point(lambda value: 0 if value == 128 else 255)
+
+        sprite = Image.new("RGBA", size)
+        sprite.paste((255, 255, 255, 255), mask=body)
+        glyph = CHESS_OUTLINED[piece] if symbol.isupper() else CHESS_SOLID[piece]
+        ImageDraw.Draw(sprite).text(center, glyph, "black", font=font, anchor="mm")
+        return sprite
+
+    return _asset(("chess", symbol), load)
+
+
+def _chess_xy(square: int, flipped: bool) -> tuple[int, int]:
+    file, rank = chess.square_file(square), chess.square_rank(square)
+    if flipped:
+        file, rank = 7 - file, 7 - rank
+    return CHESS_MARGIN + file * CHESS_SQUARE, CHESS_MARGIN + (7 - rank) * CHESS_SQUARE
+
+
+def _chess_shade(square: int) -> str:
+    return "light" if chess.BB_SQUARES[square] & chess.BB_LIGHT_SQUARES else "dark"
+
+
+def _chess_fill(draw, square: int, flipped: bool, color) -> None:
+    x, y = _chess_xy(square, flipped)
+    draw.rectangle((x, y, x + CHESS_SQUARE - 1, y + CHESS_SQUARE - 1), fill=color)
+
+
+def _chess_base(flipped: bool) -> Image.Image:
+    """The empty board with its coordinates, seen from white or black"""
+
+    def load():
+        size = 2 * CHESS_MARGIN + 8 * CHESS_SQUARE
+        image = Image.new("RGB", (size, size), CHESS_COLORS["margin"])
+        draw = ImageDraw.Draw(image)
+        font = _font(CHESS_FONT, CHESS_MARGIN * 3 // 4)
+        for square in chess.SQUARES:
+            _chess_fill(draw, square, flipped, CHESS_COLORS[_chess_shade(square)])
+        for i in range(8):
+            x, y = _chess_xy(chess.square(i, i), flipped)
+            for position in (
+                (x + CHESS_SQUARE / 2, CHESS_MARGIN / 2),
+                (x + CHESS_SQUARE / 2, size - CHESS_MARGIN / 2),
+            ):
+                draw.text(
+                    position,
+                    chess.FILE_NAMES[i],
+                    font=font,
+                    fill=CHESS_COLORS["coord"],
+                    anchor="mm",
+                )
+            for position in (
+                (CHESS_MARGIN / 2, y + CHESS_SQUARE / 2),
+                (size - CHESS_MARGIN / 2, y + CHESS_SQUARE / 2),
+            ):
+                draw.text(
+                    position,
+                    chess.RANK_NAMES[i],
+                    font=font,
+                    fill=CHESS_COLORS["coord"],
+                    anchor="mm",
+                )
+        return image
+
+    return _asset(("chess", "base", flipped), load)
+
+
+def chess_board(
+    board_fen: str, lastmove: str | None, flipped: bool, check: int | None
+) -> bytes:
+    """The position with the last move highlighted and a king in check marked"""
+    image = _chess_base(flipped).copy()
+    draw = ImageDraw.Draw(image)
+    if lastmove is not None:
+        move = chess.Move.from_uci(lastmove)
+        for square in (move.from_square, move.to_square):
+            color = CHESS_COLORS[f"{_chess_shade(square)} lastmove"]
+            _chess_fill(draw, square, flipped, color)
+    if check is not None:
+        # a red glow fading into the square
+        x, y = _chess_xy(check, flipped)
+        color = CHESS_COLORS[_chess_shade(check)]
+        steps = CHESS_SQUARE // 4
+        for i in range(steps):
+            t = i / steps
+            fill = tuple(
+                int(_lerp(color[c], CHESS_COLORS["check"][c], t)) for c in range(3)
+            )
+            inset = CHESS_SQUARE * t / 2
+            end = CHESS_SQUARE - inset
+            draw.ellipse((x + inset, y + inset, x + end, y + end), fill=fill)
+    for square, piece in chess.BaseBoard(board_fen).piece_map().items():
+        sprite = _chess_piece(piece.symbol())
+        image.paste(sprite, _chess_xy(square, flipped), sprite)
+    return _png(image)
+
+
+def _timed(job, args) -> tuple:
+    start = time.perf_counter()
+    return job(*args), time.perf_counter() - start
+
+
+class RenderStats:
+    __slots__ = (
+        "renders",
+        "failed",
+        "total_time",
+        "max_time",
+        "total_wait",
+        "max_wait",
+    )
+
+    def __init__(self) -> None:
+        self.renders = 0
+        self.failed = 0
+        # time spent rendering in the worker
+        self.total_time = 0.0
+        self.max_time = 0.0
+        # time spent queued and moving data between the processes
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.renders if self.renders else 0.0
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.renders if self.renders else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"renders={self.renders} failed={self.failed}"
+            f" avg_time={self.avg_time * 1000:.1f}ms"
+            f" max_time={self.max_time * 1000:.1f}ms"
+            f" avg_wait={self.avg_wait * 1000:.1f}ms"
+        )
+
+
+class RenderService:
+    """
+    Runs Pillow renders in worker processes instead of on the event loop
+
+    Jobs are the module level functions above, they return PNG bytes and
+    never write files. Every worker keeps the assets it decoded, so the
+    map, flags, fonts and remote backgrounds are only loaded once per
+    worker. At most max_queue renders may be waiting or running, more
+    raise RenderBusy rather than piling up behind a slow render.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 16) -> None:
+        self.max_queue = max_queue
+        self.pending = 0
+        self.stats = {}
+        # spawn, forking a process running an event loop and threads is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=preload,
+        )
+
+    async def render(self, job, *args) -> bytes:
+        """Runs job(*args) in a worker and returns what it rendered"""
+        if self.pending >= self.max_queue:
+            raise RenderBusy("Too many images are being rendered, try again later.")
+        stats = self.stats.setdefault(job.__name__, RenderStats())
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            result, elapsed = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _timed, job, args
+            )
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+        wait = time.perf_counter() - start - elapsed
+        stats.renders += 1
+        stats.total_time += elapsed
+        stats.max_time = max(stats.max_time, elapsed)
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        return result
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,92 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from lru import LRU
+
+_MISSING = object()
+
+
+class SettingsCache:
+    """
+    Bounded cache of a setting that most users or servers leave at its default
+
+    values holds the IDs that have a row, missing the ones known to have
+    none, so the default is not looked up again and again. After warm() loaded
+    every row there is, an ID found in neither has no row either and needs no
+    query at all. That holds until a row is evicted because there are more
+    than fit, then misses go back to the database.
+
+    Changes have to go through set(), it tells every cluster the new value.
+    """
+
+    def __init__(
+        self,
+        bot,
+        name: str,
+        select: str,
+        select_all: str,
+        maxsize: int = 100_000,
+        missing_maxsize: int = 200_000,
+    ) -> None:
+        # name is the attribute on the bot, other clusters find us by it
+        self.bot = bot
+        self.name = name
+        # $1 is the ID, returns the value or NULL
+        self.select = select
+        # returns every (ID, value) row whose value is not NULL
+        self.select_all = select_all
+        self.values = LRU(maxsize, callback=self._evicted)
+        self.missing = LRU(missing_maxsize)
+        self.complete = False
+
+    def _evicted(self, key, value) -> None:
+        self.complete = False
+
+    async def warm(self) -> None:
+        """Loads all rows, afterwards misses need no query while they fit"""
+        rows = await self.bot.pool.fetch(self.select_all)
+        for id_, value in rows:
+            self.values[id_] = value
+        self.complete = len(rows) <= self.values.get_size()
+
+    async def get(self, id_: int):
+        """Returns the setting of an ID, None if it uses the default"""
+        value = self.values.get(id_, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.complete or id_ in self.missing:
+            return None
+        value = await self.bot.pool.fetchval(self.select, id_)
+        self.store(id_, value)
+        return value
+
+    def store(self, id_: int, value) -> None:
+        """Changes the value on this cluster only"""
+        if value is None:
+            self.values.pop(id_, None)
+            self.missing[id_] = True
+        else:
+            self.missing.pop(id_, None)
+            self.values[id_] = value
+
+    async def set(self, id_: int, value) -> None:
+        """Changes the value everywhere, call it after the database write"""
+        self.store(id_, value)
+        await self.bot.cogs["Sharding"].handler(
+            "update_setting", 0, args={"name": self.name, "id_": id_, "value": value}
+        )
@@ -0,0 +1,161 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+
+from functools import wraps
+from uuid import uuid4
+
+# Extends the lease only if we still own it
+RENEW_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("EXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Deletes the lease only if we still own it
+RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class ClusterLeases:
+    """
+    Redis leases that make work run on exactly one cluster
+
+    A lease is a key holding this cluster's token with a TTL. The holder
+    renews it every ttl / 3 seconds, so when a cluster dies its leases
+    expire and another cluster takes over on its next attempt.
+    """
+
+    def __init__(self, bot, ttl: int = 30) -> None:
+        self.bot = bot
+        self.ttl = ttl
+        self.token = f"{bot.cluster_id}:{uuid4().hex}"
+        self._held = set()
+        self._wanted = {}
+        self._tasks = {}
+        self._renew = bot.redis.register_script(RENEW_SCRIPT)
+        self._release = bot.redis.register_script(RELEASE_SCRIPT)
+        self._heartbeat = None
+
+    @staticmethod
+    def key(name: str) -> str:
+        return f"lease:{name}"
+
+    def start(self) -> None:
+        self._heartbeat = asyncio.create_task(self.heartbeat())
+
+    async def close(self) -> None:
+        if self._heartbeat:
+            self._heartbeat.cancel()
+        for task in self._tasks.values():
+            task.cancel()
+        for name in list(self._held):
+            await self.release(name)
+
+    def holds(self, name: str) -> bool:
+        return name in self._held
+
+    async def acquire(self, name: str) -> bool:
+        """Takes or renews a lease, returns whether this cluster holds it"""
+        if name in self._held:
+            renewed = await self._renew(
+                keys=[self.key(name)], args=[self.token, self.ttl]
+            )
+            if renewed:
+                return True
+            self._lost(name)
+
+        acquired = await self.bot.redis.execute_command(
+            "SET", self.key(name), self.token, "NX", "EX", self.ttl
+        )
+        if acquired:
+            self._held.add(name)
+        return bool(acquired)
+
+    async def release(self, name: str) -> None:
+        self._held.discard(name)
+        await self._release(keys=[self.key(name)], args=[self.token])
+
+    def _lost(self, name: str) -> None:
+        self._held.discard(name)
+        if task := self._tasks.pop(name, None):
+            task.cancel()
+
+    def run_exclusive(self, name: str, factory) -> None:
+        """
+        Keeps the coroutine returned by factory running on the cluster
+        holding the lease for name, restarting it if it exits
+        """
+        self._wanted[name] = factory
+        asyncio.create_task(self._supervise(name))
+
+    async def stop_exclusive(self, name: str) -> None:
+        self._wanted.pop(name, None)
+        if task := self._tasks.pop(name, None):
+            task.cancel()
+        if name in self._held:
+            await self.release(name)
+
+    async def _supervise(self, name: str) -> None:
+        factory = self._wanted.get(name)
+        if factory is None:
+            return
+        if not await self.acquire(name):
+            return
+        task = self._tasks.get(name)
+        if task is None or task.done():
+            self._tasks[name] = asyncio.create_task(factory())
+
+    async def heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            for name in set(self._held) | set(self._wanted):
+                try:
+                    if name in self._wanted:
+                        await self._supervise(name)
+                    else:
+                        await self.acquire(name)
+                except Exception:
+                    # keep beating, the lease expires on its own if redis is gone
+                    self.bot.logger.exception(f"Failed to renew lease {name}")
+
+
+def cluster_exclusive(name: str = None):
+    """
+    Makes a cog method (usually a tasks.loop body) only run on the cluster
+    holding the lease for name. Put it below the @tasks.loop decorator.
+    """
+
+    def decorator(func):
+        lease = name or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            if not await self.bot.leases.acquire(lease):
+                return
+            return await func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
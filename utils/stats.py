@@ -0,0 +1,275 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2021 Diniboy and Gelbpunkt
+Copyright (C) 2024 Lunar (discord itslunar.)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+
+from decimal import Decimal
+
+import discord
+
+from lru import LRU
+
+# Only writes the snapshot if nobody invalidated the user while we built it
+STORE_SCRIPT = """
+if (redis.call("GET", KEYS[2]) or "0") == ARGV[1] then
+    redis.call("SET", KEYS[1], ARGV[2], "EX", ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+def _encode(value):
+    # numerics round-trip as JSON numbers, loads() parses them back to Decimal
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Can not serialize {type(value).__name__}")
+
+
+class StatSnapshots:
+    """
+    Versioned per-user combat stat snapshots
+
+    A snapshot holds everything the battle code reads about a player: the
+    profile columns that feed damage and armor, the equipped items, the
+    resulting damage and armor, the alliance raid building, the element and
+    the shield flag. Snapshots live in an in-process LRU in front of Redis.
+
+    Anything changing those inputs has to call invalidate(),
+    invalidate_guild() or invalidate_alliance() after committing. That bumps
+    the user's version, so a snapshot built from older data is never stored,
+    and drops the local copies on every cluster.
+    """
+
+    def __init__(self, bot, maxsize: int = 20_000, ttl: int = 900) -> None:
+        self.bot = bot
+        self.ttl = ttl
+        self.local = LRU(maxsize)
+        # user -> (guild, alliance), shares the invalidation of the snapshots
+        self.memberships = LRU(maxsize)
+        self._store = bot.redis.register_script(STORE_SCRIPT)
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"stats:{user_id}"
+
+    @staticmethod
+    def version_key(user_id: int) -> str:
+        return f"stats:version:{user_id}"
+
+    @staticmethod
+    def loads(raw: bytes | str) -> dict:
+        return json.loads(raw, parse_float=Decimal)
+
+    async def get(self, user, conn=None) -> dict | None:
+        """Returns the snapshot of a user, None if they have no character"""
+        user_id = user.id if isinstance(user, (discord.User, discord.Member)) else user
+        if (snapshot := self.local.get(user_id)) is not None:
+            return snapshot
+        return (await self.get_many([user_id], conn=conn)).get(user_id)
+
+    async def get_many(self, users, conn=None) -> dict[int, dict]:
+        """
+        Returns the snapshots of many users keyed by user ID, users without
+        a character are left out. Misses are built with one query per table.
+        """
+        user_ids = list(
+            dict.fromkeys(
+                u.id if isinstance(u, (discord.User, discord.Member)) else u
+                for u in users
+            )
+        )
+        snapshots = {}
+        missing = []
+        for user_id in user_ids:
+            if (snapshot := self.local.get(user_id)) is not None:
+                snapshots[user_id] = snapshot
+            else:
+                missing.append(user_id)
+        if not missing:
+            return snapshots
+
+        values = await self.bot.redis.execute_command(
+            "MGET",
+            *[self.key(user_id) for user_id in missing],
+            *[self.version_key(user_id) for user_id in missing],
+        )
+        versions = {}
+        for user_id, raw, version in zip(
+            missing, values[: len(missing)], values[len(missing) :]
+        ):
+            version = int(version or 0)
+            if raw is not None and (snapshot := self.loads(raw))["version"] == version:
+                self.local[user_id] = snapshots[user_id] = snapshot
+            else:
+                versions[user_id] = version
+        if not versions:
+            return snapshots
+
+        built = await self.build_many(versions, conn=conn)
+        async with self.bot.redis.pipeline(transaction=False) as pipe:
+            for user_id, snapshot in built.items():
+                await self._store(
+                    keys=[self.key(user_id), self.version_key(user_id)],
+                    args=[
+                        snapshot["version"],
+                        json.dumps(snapshot, default=_encode),
+                        self.ttl,
+                    ],
+                    client=pipe,
+                )
+            stored = await pipe.execute()
+        for (user_id, snapshot), ok in zip(built.items(), stored):
+            snapshots[user_id] = snapshot
+            if ok:
+                self.local[user_id] = snapshot
+        return snapshots
+
+    async def build_many(self, versions: dict[int, int], conn=None) -> dict[int, dict]:
+        """Builds snapshots from the database for a {user_id: version} mapping"""
+        user_ids = list(versions)
+        local = False
+        if conn is None:
+            conn = await self.bot.pool.acquire()
+            local = True
+        try:
+            rows = await conn.fetch(
+                'SELECT "user", "class", "race", "guild", "god", "atkmultiply",'
+                ' "defmultiply", "statatk", "statdef", "luck", "health", "stathp" FROM'
+                ' profile WHERE "user"=ANY($1);',
+                user_ids,
+            )
+            items = {}
+            for item in await conn.fetch(
+                "SELECT ai.* FROM allitems ai JOIN inventory i ON (ai.id=i.item)"
+                " WHERE i.equipped IS TRUE AND ai.owner=ANY($1);",
+                user_ids,
+            ):
+                items.setdefault(item["owner"], []).append(dict(item))
+            buildings = {
+                row["id"]: row["raid_building"]
+                for row in await conn.fetch(
+                    'SELECT g."id", c."raid_building" FROM guild g JOIN city c ON'
+                    ' (c."owner"=g."alliance") WHERE g."id"=ANY($1);',
+                    list({row["guild"] for row in rows if row["guild"]}),
+                )
+            }
+        finally:
+            if local:
+                await self.bot.pool.release(conn)
+
+        return {
+            row["user"]: self.snapshot_from(
+                row,
+                items.get(row["user"], []),
+                buildings.get(row["guild"], 0),
+                versions[row["user"]],
+            )
+            for row in rows
+        }
+
+    def snapshot_from(self, row, items, raid_building, version) -> dict:
+        damage, armor = self.bot.damage_armor_from(items, row["class"], row["race"])
+        strongest = max(
+            items, key=lambda item: max(item["damage"], item["armor"]), default=None
+        )
+        element = (
+            strongest["element"].capitalize()
+            if strongest and strongest.get("element")
+            else "Unknown"
+        )
+        return {
+            "user": row["user"],
+            "version": version,
+            "classes": list(row["class"]),
+            "race": row["race"],
+            "guild": row["guild"],
+            "god": row["god"],
+            "atkmultiply": row["atkmultiply"],
+            "defmultiply": row["defmultiply"],
+            "statatk": row["statatk"],
+            "statdef": row["statdef"],
+            "luck": row["luck"],
+            "health": row["health"],
+            "stathp": row["stathp"],
+            "items": items,
+            "damage": Decimal(damage),
+            "armor": Decimal(armor),
+            "raid_building": raid_building or 0,
+            "element": element,
+            "has_shield": any(item["type"] == "Shield" for item in items),
+        }
+
+    async def membership(self, user, conn=None) -> tuple[int | None, int | None]:
+        """Returns the (guild, alliance) IDs of a user, cached until invalidated"""
+        user_id = user.id if isinstance(user, (discord.User, discord.Member)) else user
+        if (membership := self.memberships.get(user_id)) is not None:
+            return membership
+        obj = conn or self.bot.pool
+        row = await obj.fetchrow(
+            'SELECT p."guild", g."alliance" FROM profile p LEFT JOIN guild g ON'
+            ' (g."id"=p."guild") WHERE p."user"=$1;',
+            user_id,
+        )
+        if row is None:
+            # no character, not worth remembering as it is about to change
+            return None, None
+        membership = self.memberships[user_id] = (row["guild"], row["alliance"])
+        return membership
+
+    def forget(self, user_ids) -> None:
+        """Drops local copies, called on every cluster by invalidate()"""
+        for user_id in user_ids:
+            self.local.pop(user_id, None)
+            self.memberships.pop(user_id, None)
+
+    async def invalidate(self, *users) -> None:
+        """Marks the snapshots of users as outdated everywhere"""
+        user_ids = [
+            u.id if isinstance(u, (discord.User, discord.Member)) else u for u in users
+        ]
+        if not user_ids:
+            return
+        self.forget(user_ids)
+        self.bot.leaderboards.update(*user_ids)
+        async with self.bot.redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.incr(self.version_key(user_id))
+                pipe.delete(self.key(user_id))
+            await pipe.execute()
+        await self.bot.cogs["Sharding"].handler(
+            "clear_stats_cache", 0, args={"user_ids": user_ids}
+        )
+
+    async def invalidate_guild(self, guild_id: int, conn=None) -> None:
+        """Invalidates all members of a guild, e.g. after it changed alliance"""
+        obj = conn or self.bot.pool
+        members = await obj.fetch(
+            'SELECT "user" FROM profile WHERE "guild"=$1;', guild_id
+        )
+        await self.invalidate(*[member["user"] for member in members])
+
+    async def invalidate_alliance(self, alliance_id: int, conn=None) -> None:
+        """Invalidates everyone in an alliance, e.g. after a city building changed"""
+        obj = conn or self.bot.pool
+        members = await obj.fetch(
+            'SELECT "user" FROM profile WHERE "guild" IN (SELECT "id" FROM guild'
+            ' WHERE "alliance"=$1);',
+            alliance_id,
+        )
+        await self.invalidate(*[member["user"] for member in members])